@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, Optional
+
+# Bump when the shape of cached file results changes
+CACHE_VERSION = 1
+
+
+def _json_default(obj: Any) -> Any:
+    # Report objects such as CompactSheet know how to serialize themselves
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class AnalysisCache:
+    """On-disk cache of per-file analysis results (one JSON entry per workbook).
+
+    An entry is reused only when the workbook's content hash, mtime and the
+    analyzer options all match what was stored; anything else is a miss and
+    the file is re-analyzed. The key of a miss is kept until ``put``
+    stores that file's result, so each re-analyzed file is hashed once.
+    """
+
+    def __init__(self, cache_dir: str, options: Dict[str, Any]) -> None:
+        self.cache_dir = cache_dir
+        self.options = dict(options)
+        self.hits = 0
+        self.misses = 0
+        # Keys computed by get() for files that missed, by path, waiting for put()
+        self._miss_keys: Dict[str, Dict[str, Any]] = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_path(self, file_path: str) -> str:
+        name = hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    def _key(self, file_path: str) -> Dict[str, Any]:
+        return {
+            "version": CACHE_VERSION,
+            "sha256": file_digest(file_path),
+            "mtime": os.path.getmtime(file_path),
+            "options": self.options,
+        }
+
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        entry_path = self._entry_path(file_path)
+        try:
+            key = self._key(file_path)
+        except Exception:
+            self.misses += 1
+            return None
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if entry.get("key") == key:
+                self.hits += 1
+                return entry["result"]
+        except Exception:
+            pass
+        self.misses += 1
+        self._miss_keys[file_path] = key
+        return None
+
+    def put(self, file_path: str, file_result: Dict[str, Any]) -> None:
+        # The key as of the lookup: the file the result was computed from
+        key = self._miss_keys.pop(file_path, None)
+        # Failed files are retried on the next run rather than cached
+        if "error" in file_result:
+            return
+        try:
+            entry = {
+                "file": os.path.abspath(file_path),
+                "key": key if key is not None else self._key(file_path),
+                "result": file_result,
+            }
+        except Exception:
+            return
+        entry_path = self._entry_path(file_path)
+        tmp_path = entry_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, default=_json_default)
+            os.replace(tmp_path, entry_path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except Exception:
+                pass
+
+    def discard(self, file_path: str) -> None:
+        """Forget the key kept by get() for a result that will not be stored."""
+        self._miss_keys.pop(file_path, None)
+
+    def evict_missing(self, directory_path: str, current_files: Iterable[str]) -> int:
+        """Drop entries for workbooks that no longer exist, or that vanished from ``directory_path``."""
+        root = os.path.join(os.path.abspath(directory_path), "")
+        current = {os.path.abspath(p) for p in current_files}
+        evicted = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            entry_path = os.path.join(self.cache_dir, name)
+            try:
+                with open(entry_path, "r", encoding="utf-8") as f:
+                    source = json.load(f).get("file", "")
+            except Exception:
+                source = ""
+            gone = not source or not os.path.exists(source)
+            if source.startswith(root) and source not in current:
+                gone = True
+            if gone:
+                try:
+                    os.remove(entry_path)
+                    evicted += 1
+                except Exception:
+                    pass
+        return evicted
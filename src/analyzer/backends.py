@@ -0,0 +1,104 @@
+import os
+from typing import Any, Iterable, Optional
+
+from analyzer.biff_reader import BiffWorkbook, snapshot_biff_sheet
+from analyzer.session_pool import DEFAULT_RECYCLE_AFTER, ExcelSessionPool
+from analyzer.sheet_snapshot import SheetSnapshot, snapshot_com_sheet
+
+try:
+    import win32com.client as win32
+except Exception:
+    win32 = None  # Allows linting on non-Windows or without pywin32
+
+
+class ComReaderBackend:
+    """Reads workbooks through tuned Excel instances (Windows + pywin32).
+
+    Without ``session_pool`` the backend runs a private one-instance pool and
+    quits it on ``close``; a shared pool stays warm for the next run. The
+    private pool's size is fixed at one: a backend reads one workbook at a
+    time, so more instances would sit idle. Parallel reads come from
+    ``--workers``, each worker process running its own backend and instance.
+    """
+
+    name = "com"
+    supports_per_cell = True
+
+    def __init__(
+        self, session_pool: Optional[ExcelSessionPool] = None, recycle_after: int = DEFAULT_RECYCLE_AFTER
+    ) -> None:
+        self.owns_pool = session_pool is None
+        self.pool = session_pool if session_pool is not None else ExcelSessionPool(recycle_after=recycle_after)
+
+    def start(self) -> None:
+        if self.owns_pool and win32 is None:
+            raise RuntimeError("pywin32 is required to analyze Excel files on Windows.")
+        self.pool.start()
+
+    def close(self) -> None:
+        if self.owns_pool:
+            self.pool.close()
+
+    def open_workbook(self, path: str) -> Any:
+        return self.pool.open_workbook(path)
+
+    def close_workbook(self, wb: Any) -> None:
+        self.pool.close_workbook(wb)
+
+    def iter_sheets(self, wb: Any) -> Iterable[Any]:
+        return wb.Worksheets
+
+    def snapshot(self, sheet: Any, include_styles: bool, style_regions: bool = False) -> SheetSnapshot:
+        return snapshot_com_sheet(sheet, include_styles=include_styles, style_regions=style_regions)
+
+
+class BiffReaderBackend:
+    """Parses .xls (BIFF8) files directly; no Excel process is involved."""
+
+    name = "biff"
+    supports_per_cell = False
+
+    def start(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def open_workbook(self, path: str) -> BiffWorkbook:
+        if os.path.splitext(path)[1].lower() != ".xls":
+            raise RuntimeError("biff backend only reads .xls files")
+        return BiffWorkbook.from_path(path)
+
+    def close_workbook(self, wb: BiffWorkbook) -> None:
+        pass
+
+    def iter_sheets(self, wb: BiffWorkbook) -> Iterable[Any]:
+        return [(wb, sheet) for sheet in wb.worksheets]
+
+    def snapshot(self, sheet: Any, include_styles: bool, style_regions: bool = False) -> SheetSnapshot:
+        # Styles are decoded once per XF record, so region-level reads save nothing here
+        book, biff_sheet = sheet
+        return snapshot_biff_sheet(book, biff_sheet, include_styles=include_styles)
+
+
+BACKENDS = {
+    ComReaderBackend.name: ComReaderBackend,
+    BiffReaderBackend.name: BiffReaderBackend,
+}
+
+
+def resolve_backend_name(name: Optional[str]) -> str:
+    """'auto' picks Excel automation when pywin32 is importable, else the BIFF reader."""
+    if not name or name == "auto":
+        return ComReaderBackend.name if win32 is not None else BiffReaderBackend.name
+    if name not in BACKENDS:
+        raise ValueError(f"unknown reader backend: {name}")
+    return name
+
+
+def create_backend(name: Optional[str] = "auto", **com_options: Any) -> Any:
+    """Reader backend by name; ``com_options`` (session_pool, recycle_after) apply to the COM backend only."""
+    resolved = resolve_backend_name(name)
+    if resolved == ComReaderBackend.name:
+        return ComReaderBackend(**com_options)
+    return BACKENDS[resolved]()
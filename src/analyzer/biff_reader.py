@@ -0,0 +1,739 @@
+"""Pure-Python reader for legacy .xls (OLE2 compound file + BIFF8) workbooks.
+
+Only the records the pattern analyzer needs are decoded: sheet directory,
+shared strings, cell values, merged ranges, the ROW/COLINFO default formats,
+and the XF/FONT/FORMAT/PALETTE records that carry border, font and number
+formatting. Numbers are shown
+through their number format like ``Range.Text``.
+"""
+
+import struct
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from analyzer.sheet_snapshot import BORDER_SIDES, SheetSnapshot, format_number
+
+OLE_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+FREESECT = 0xFFFFFFFF
+ENDOFCHAIN = 0xFFFFFFFE
+NOSTREAM = 0xFFFFFFFF
+
+# BIFF record ids
+REC_BOF = 0x0809
+REC_EOF = 0x000A
+REC_FILEPASS = 0x002F
+REC_BOUNDSHEET = 0x0085
+REC_SST = 0x00FC
+REC_CONTINUE = 0x003C
+REC_FONT = 0x0031
+REC_XF = 0x00E0
+REC_FORMAT = 0x041E
+REC_PALETTE = 0x0092
+REC_DIMENSIONS = 0x0200
+REC_ROW = 0x0208
+REC_COLINFO = 0x007D
+REC_LABELSST = 0x00FD
+REC_LABEL = 0x0204
+REC_RSTRING = 0x00D6
+REC_NUMBER = 0x0203
+REC_RK = 0x027E
+REC_MULRK = 0x00BD
+REC_BLANK = 0x0201
+REC_MULBLANK = 0x00BE
+REC_BOOLERR = 0x0205
+REC_FORMULA = 0x0006
+REC_STRING = 0x0207
+REC_MERGEDCELLS = 0x00E5
+
+BIFF8_VERSION = 0x0600
+
+ERROR_TEXT = {
+    0x00: "#NULL!",
+    0x07: "#DIV/0!",
+    0x0F: "#VALUE!",
+    0x17: "#REF!",
+    0x1D: "#NAME?",
+    0x24: "#NUM!",
+    0x2A: "#N/A",
+}
+
+# Built-in number formats (FORMAT index -> format string, en-US) that files do not store
+BUILTIN_FORMATS = {
+    0: "General",
+    1: "0",
+    2: "0.00",
+    3: "#,##0",
+    4: "#,##0.00",
+    5: '"$"#,##0_);("$"#,##0)',
+    6: '"$"#,##0_);[Red]("$"#,##0)',
+    7: '"$"#,##0.00_);("$"#,##0.00)',
+    8: '"$"#,##0.00_);[Red]("$"#,##0.00)',
+    9: "0%",
+    10: "0.00%",
+    11: "0.00E+00",
+    12: "# ?/?",
+    13: "# ??/??",
+    14: "m/d/yyyy",
+    15: "d-mmm-yy",
+    16: "d-mmm",
+    17: "mmm-yy",
+    18: "h:mm AM/PM",
+    19: "h:mm:ss AM/PM",
+    20: "h:mm",
+    21: "h:mm:ss",
+    22: "m/d/yyyy h:mm",
+    37: "#,##0_);(#,##0)",
+    38: "#,##0_);[Red](#,##0)",
+    39: "#,##0.00_);(#,##0.00)",
+    40: "#,##0.00_);[Red](#,##0.00)",
+    41: '_(* #,##0_);_(* (#,##0);_(* "-"_);_(@_)',
+    42: '_("$"* #,##0_);_("$"* (#,##0);_("$"* "-"_);_(@_)',
+    43: '_(* #,##0.00_);_(* (#,##0.00);_(* "-"??_);_(@_)',
+    44: '_("$"* #,##0.00_);_("$"* (#,##0.00);_("$"* "-"??_);_(@_)',
+    45: "mm:ss",
+    46: "[h]:mm:ss",
+    47: "mm:ss.0",
+    48: "##0.0E+0",
+    49: "@",
+}
+
+# BIFF border line style code -> (Excel LineStyle, Excel Weight) as COM reports them
+BORDER_STYLE_MAP = {
+    0: (-4142, 2),       # none -> xlLineStyleNone, xlThin
+    1: (1, 2),           # thin
+    2: (1, -4138),       # medium
+    3: (-4115, 2),       # dashed
+    4: (-4118, 2),       # dotted
+    5: (1, 4),           # thick
+    6: (-4119, 4),       # double
+    7: (1, 1),           # hair
+    8: (-4115, -4138),   # medium dashed
+    9: (4, 2),           # thin dash-dot
+    10: (4, -4138),      # medium dash-dot
+    11: (5, 2),          # thin dash-dot-dot
+    12: (5, -4138),      # medium dash-dot-dot
+    13: (13, -4138),     # slanted medium dash-dot
+}
+
+# Built-in colour indexes 0-7 plus the default BIFF8 palette for indexes 8-63 (RGB)
+_BUILTIN_COLORS = [
+    (0, 0, 0), (255, 255, 255), (255, 0, 0), (0, 255, 0),
+    (0, 0, 255), (255, 255, 0), (255, 0, 255), (0, 255, 255),
+]
+DEFAULT_PALETTE = [
+    (0, 0, 0), (255, 255, 255), (255, 0, 0), (0, 255, 0),
+    (0, 0, 255), (255, 255, 0), (255, 0, 255), (0, 255, 255),
+    (128, 0, 0), (0, 128, 0), (0, 0, 128), (128, 128, 0),
+    (128, 0, 128), (0, 128, 128), (192, 192, 192), (128, 128, 128),
+    (153, 153, 255), (153, 51, 102), (255, 255, 204), (204, 255, 255),
+    (102, 0, 102), (255, 128, 128), (0, 102, 204), (204, 204, 255),
+    (0, 0, 128), (255, 0, 255), (255, 255, 0), (0, 255, 255),
+    (128, 0, 128), (128, 0, 0), (0, 128, 128), (0, 0, 255),
+    (0, 204, 255), (204, 255, 255), (204, 255, 204), (255, 255, 153),
+    (153, 204, 255), (255, 153, 204), (204, 153, 255), (255, 204, 153),
+    (51, 102, 255), (51, 204, 204), (153, 204, 0), (255, 204, 0),
+    (255, 153, 0), (255, 102, 0), (102, 102, 153), (150, 150, 150),
+    (0, 51, 102), (51, 153, 102), (0, 51, 0), (51, 51, 0),
+    (153, 51, 0), (153, 51, 102), (51, 51, 153), (51, 51, 51),
+]
+
+
+class BiffError(ValueError):
+    """Raised for files that are not readable BIFF8 workbooks."""
+
+
+# ---------------------------------------------------------------------------
+# OLE2 compound file
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class DirectoryEntry:
+    sid: int
+    name: str
+    entry_type: int
+    left: int
+    right: int
+    child: int
+    start_sector: int
+    size: int
+    raw: bytes
+
+
+class CompoundFile:
+    """Minimal read-only OLE2 compound document parser."""
+
+    def __init__(self, data: bytes) -> None:
+        if data[:8] != OLE_SIGNATURE:
+            raise BiffError("not an OLE2 compound file")
+        self.data = data
+        (
+            self.minor_version,
+            self.major_version,
+            _byte_order,
+            self.sector_shift,
+            self.mini_sector_shift,
+        ) = struct.unpack_from("<HHHHH", data, 0x18)
+        (
+            _num_dir_sectors,
+            _num_fat_sectors,
+            self.first_dir_sector,
+            _transaction,
+            self.mini_cutoff,
+            self.first_minifat_sector,
+            _num_minifat_sectors,
+            self.first_difat_sector,
+            _num_difat_sectors,
+        ) = struct.unpack_from("<IIIIIIIII", data, 0x28)
+        self.sector_size = 1 << self.sector_shift
+        self.mini_sector_size = 1 << self.mini_sector_shift
+
+        self.fat = self._load_fat()
+        self.entries = self._load_directory()
+        root = self.entries[0]
+        self.mini_stream = self._read_chain(root.start_sector, root.size)
+        self.minifat = self._load_minifat()
+
+    @classmethod
+    def from_path(cls, path: str) -> "CompoundFile":
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def _sector(self, index: int) -> bytes:
+        start = (index + 1) << self.sector_shift
+        return self.data[start:start + self.sector_size]
+
+    def _load_fat(self) -> List[int]:
+        per_sector = self.sector_size // 4
+        difat = [s for s in struct.unpack_from("<109I", self.data, 0x4C) if s not in (FREESECT, ENDOFCHAIN)]
+        next_difat = self.first_difat_sector
+        seen = set()
+        while next_difat not in (FREESECT, ENDOFCHAIN) and next_difat not in seen:
+            seen.add(next_difat)
+            entries = struct.unpack("<%dI" % per_sector, self._sector(next_difat))
+            difat.extend(s for s in entries[:-1] if s not in (FREESECT, ENDOFCHAIN))
+            next_difat = entries[-1]
+
+        fat: List[int] = []
+        for sector in difat:
+            raw = self._sector(sector)
+            fat.extend(struct.unpack("<%dI" % (len(raw) // 4), raw))
+        return fat
+
+    def _chain(self, start: int, table: List[int]) -> List[int]:
+        chain: List[int] = []
+        seen = set()
+        sector = start
+        while sector not in (FREESECT, ENDOFCHAIN) and sector < len(table):
+            if sector in seen:
+                raise BiffError("cyclic sector chain")
+            seen.add(sector)
+            chain.append(sector)
+            sector = table[sector]
+        return chain
+
+    def _read_chain(self, start: int, size: Optional[int] = None) -> bytes:
+        data = b"".join(self._sector(s) for s in self._chain(start, self.fat))
+        return data if size is None else data[:size]
+
+    def _load_directory(self) -> List[DirectoryEntry]:
+        raw = self._read_chain(self.first_dir_sector)
+        entries: List[DirectoryEntry] = []
+        for sid in range(len(raw) // 128):
+            chunk = raw[sid * 128:(sid + 1) * 128]
+            name_len = struct.unpack_from("<H", chunk, 0x40)[0]
+            name = chunk[:max(0, name_len - 2)].decode("utf-16-le", errors="replace")
+            entry_type = chunk[0x42]
+            left, right, child = struct.unpack_from("<III", chunk, 0x44)
+            start_sector = struct.unpack_from("<I", chunk, 0x74)[0]
+            size = struct.unpack_from("<Q", chunk, 0x78)[0]
+            if self.major_version == 3:
+                size &= 0xFFFFFFFF
+            entries.append(DirectoryEntry(sid, name, entry_type, left, right, child, start_sector, size, chunk))
+        return entries
+
+    def _load_minifat(self) -> List[int]:
+        if self.first_minifat_sector in (FREESECT, ENDOFCHAIN):
+            return []
+        raw = self._read_chain(self.first_minifat_sector)
+        return list(struct.unpack("<%dI" % (len(raw) // 4), raw))
+
+    def find(self, name: str) -> Optional[DirectoryEntry]:
+        for entry in self.entries:
+            if entry.entry_type == 2 and entry.name.lower() == name.lower():
+                return entry
+        return None
+
+    def read_entry(self, entry: DirectoryEntry) -> bytes:
+        if entry.size < self.mini_cutoff:
+            chunks = []
+            for sector in self._chain(entry.start_sector, self.minifat):
+                start = sector * self.mini_sector_size
+                chunks.append(self.mini_stream[start:start + self.mini_sector_size])
+            return b"".join(chunks)[:entry.size]
+        return self._read_chain(entry.start_sector, entry.size)
+
+    def read_stream(self, name: str) -> bytes:
+        entry = self.find(name)
+        if entry is None:
+            raise BiffError(f"stream not found: {name}")
+        return self.read_entry(entry)
+
+
+# ---------------------------------------------------------------------------
+# BIFF8 records
+# ---------------------------------------------------------------------------
+
+
+def iter_records(stream: bytes, pos: int = 0) -> Iterator[Tuple[int, int, bytes]]:
+    """Yield (offset, record_id, payload) from a BIFF stream."""
+    end = len(stream)
+    while pos + 4 <= end:
+        rec_id, length = struct.unpack_from("<HH", stream, pos)
+        yield pos, rec_id, stream[pos + 4:pos + 4 + length]
+        pos += 4 + length
+
+
+def _decode_rk(rk: int) -> float:
+    if rk & 0x02:
+        value: float = float(struct.unpack("<i", struct.pack("<I", rk & 0xFFFFFFFC))[0] >> 2)
+    else:
+        value = struct.unpack("<d", struct.pack("<Q", (rk & 0xFFFFFFFC) << 32))[0]
+    if rk & 0x01:
+        value /= 100.0
+    return value
+
+
+def _read_short_string(data: bytes, pos: int) -> str:
+    """ShortXLUnicodeString: 1-byte length, flags, characters."""
+    cch = data[pos]
+    high = data[pos + 1] & 0x01
+    start = pos + 2
+    if high:
+        return data[start:start + cch * 2].decode("utf-16-le", errors="replace")
+    return data[start:start + cch].decode("latin-1")
+
+
+def _read_unicode_string(data: bytes, pos: int) -> str:
+    """XLUnicodeString: 2-byte length, flags, optional rich/ext headers, characters."""
+    cch = struct.unpack_from("<H", data, pos)[0]
+    flags = data[pos + 2]
+    pos += 3
+    if flags & 0x08:
+        pos += 2
+    if flags & 0x04:
+        pos += 4
+    if flags & 0x01:
+        return data[pos:pos + cch * 2].decode("utf-16-le", errors="replace")
+    return data[pos:pos + cch].decode("latin-1")
+
+
+class _ContinuedReader:
+    """Reads across a record and its CONTINUE records as the SST/STRING layouts require."""
+
+    def __init__(self, segments: List[bytes]) -> None:
+        self.segments = segments
+        self.seg = 0
+        self.pos = 0
+
+    def _advance(self) -> bool:
+        if self.pos < len(self.segments[self.seg]):
+            return True
+        if self.seg + 1 >= len(self.segments):
+            return False
+        self.seg += 1
+        self.pos = 0
+        return True
+
+    def read_bytes(self, n: int) -> bytes:
+        out = bytearray()
+        while n > 0 and self._advance():
+            chunk = self.segments[self.seg][self.pos:self.pos + n]
+            out += chunk
+            self.pos += len(chunk)
+            n -= len(chunk)
+        return bytes(out)
+
+    def skip(self, n: int) -> None:
+        self.read_bytes(n)
+
+    def read_u8(self) -> int:
+        return self.read_bytes(1)[0]
+
+    def read_u16(self) -> int:
+        return struct.unpack("<H", self.read_bytes(2))[0]
+
+    def read_u32(self) -> int:
+        return struct.unpack("<I", self.read_bytes(4))[0]
+
+    def read_chars(self, cch: int, high: int) -> str:
+        # A character array split across CONTINUE records restarts with a fresh
+        # flags byte, even when the split falls right after the string header.
+        parts: List[str] = []
+        while True:
+            segment = self.segments[self.seg]
+            width = 2 if high else 1
+            take = min(cch, (len(segment) - self.pos) // width)
+            raw = segment[self.pos:self.pos + take * width]
+            self.pos += take * width
+            parts.append(raw.decode("utf-16-le", errors="replace") if high else raw.decode("latin-1"))
+            cch -= take
+            if cch <= 0 or self.seg + 1 >= len(self.segments):
+                break
+            self.seg += 1
+            self.pos = 0
+            high = self.read_u8() & 0x01
+        return "".join(parts)
+
+    def read_rich_string(self) -> str:
+        cch = self.read_u16()
+        flags = self.read_u8()
+        runs = self.read_u16() if flags & 0x08 else 0
+        ext = self.read_u32() if flags & 0x04 else 0
+        text = self.read_chars(cch, flags & 0x01)
+        self.skip(runs * 4 + ext)
+        return text
+
+
+def parse_sst(segments: List[bytes]) -> List[str]:
+    reader = _ContinuedReader(segments)
+    reader.read_u32()  # total references
+    unique = reader.read_u32()
+    strings: List[str] = []
+    for _ in range(unique):
+        if not reader._advance():
+            break
+        strings.append(reader.read_rich_string())
+    return strings
+
+
+@dataclass
+class BiffFont:
+    name: str
+    height: int  # twips
+    italic: bool
+    weight: int
+    color_index: int
+
+
+@dataclass
+class BiffXF:
+    font_index: int
+    format_index: int
+    # Per side: (biff line style code, palette colour index)
+    borders: Dict[str, Tuple[int, int]]
+
+
+@dataclass
+class BiffSheet:
+    name: str
+    offset: int
+    sheet_type: int
+    # (row, col) 1-based -> (value preview, xf index)
+    cells: Dict[Tuple[int, int], Tuple[str, int]] = field(default_factory=dict)
+    # (row, col) -> value of the number cells (NUMBER/RK/MULRK and numeric formula results)
+    numbers: Dict[Tuple[int, int], float] = field(default_factory=dict)
+    merges: List[Tuple[int, int, int, int]] = field(default_factory=list)
+    # Row -> XF of a ROW record with fGhostDirty set; column -> XF of its COLINFO record (1-based)
+    row_xfs: Dict[int, int] = field(default_factory=dict)
+    col_xfs: Dict[int, int] = field(default_factory=dict)
+    dimensions: Optional[Tuple[int, int, int, int]] = None  # first_row, last_row, first_col, last_col (1-based)
+
+    def cell_xf(self, row: int, col: int) -> int:
+        """XF of a cell: its own record's, else its row's, else its column's, else the default (15)."""
+        cell = self.cells.get((row, col))
+        if cell is not None:
+            return cell[1]
+        if row in self.row_xfs:
+            return self.row_xfs[row]
+        return self.col_xfs.get(col, 15)
+
+
+class BiffWorkbook:
+    """Decoded BIFF8 workbook: globals (fonts, XFs, palette, strings) plus worksheets."""
+
+    def __init__(self, stream: bytes) -> None:
+        self.stream = stream
+        self.sheets: List[BiffSheet] = []
+        self.fonts: List[BiffFont] = []
+        self.xfs: List[BiffXF] = []
+        # FORMAT index -> format string, the built-in ones plus those the file defines
+        self.formats: Dict[int, str] = dict(BUILTIN_FORMATS)
+        self.palette: List[Tuple[int, int, int]] = list(DEFAULT_PALETTE)
+        self.sst: List[str] = []
+        self._parse_globals()
+        for sheet in self.sheets:
+            if sheet.sheet_type == 0:
+                self._parse_sheet(sheet)
+
+    @classmethod
+    def from_path(cls, path: str) -> "BiffWorkbook":
+        ole = CompoundFile.from_path(path)
+        entry = ole.find("Workbook")
+        if entry is None:
+            if ole.find("Book") is not None:
+                raise BiffError("BIFF5/BIFF7 workbooks are not supported")
+            raise BiffError("no Workbook stream")
+        return cls(ole.read_entry(entry))
+
+    @property
+    def worksheets(self) -> List[BiffSheet]:
+        return [s for s in self.sheets if s.sheet_type == 0]
+
+    def _parse_globals(self) -> None:
+        records = iter_records(self.stream)
+        first = next(records, None)
+        if first is None or first[1] != REC_BOF:
+            raise BiffError("missing BOF record")
+        version = struct.unpack_from("<H", first[2], 0)[0]
+        if version != BIFF8_VERSION:
+            raise BiffError(f"unsupported BIFF version 0x{version:04X}")
+
+        sst_segments: Optional[List[bytes]] = None
+        for _pos, rec_id, data in records:
+            if sst_segments is not None:
+                if rec_id == REC_CONTINUE:
+                    sst_segments.append(data)
+                    continue
+                self.sst = parse_sst(sst_segments)
+                sst_segments = None
+
+            if rec_id == REC_EOF:
+                break
+            if rec_id == REC_FILEPASS:
+                raise BiffError("encrypted workbooks are not supported")
+            if rec_id == REC_BOUNDSHEET:
+                offset = struct.unpack_from("<I", data, 0)[0]
+                self.sheets.append(BiffSheet(name=_read_short_string(data, 6), offset=offset, sheet_type=data[5]))
+            elif rec_id == REC_SST:
+                sst_segments = [data]
+            elif rec_id == REC_FONT:
+                height, grbit, color, weight = struct.unpack_from("<HHHH", data, 0)
+                self.fonts.append(BiffFont(
+                    name=_read_short_string(data, 14),
+                    height=height,
+                    italic=bool(grbit & 0x02),
+                    weight=weight,
+                    color_index=color,
+                ))
+            elif rec_id == REC_XF:
+                self.xfs.append(self._parse_xf(data))
+            elif rec_id == REC_FORMAT:
+                ifmt = struct.unpack_from("<H", data, 0)[0]
+                self.formats[ifmt] = _read_unicode_string(data, 2)
+            elif rec_id == REC_PALETTE:
+                count = struct.unpack_from("<H", data, 0)[0]
+                for i in range(count):
+                    r, g, b, _ = data[2 + i * 4:6 + i * 4]
+                    idx = 8 + i
+                    if idx < len(self.palette):
+                        self.palette[idx] = (r, g, b)
+        if sst_segments is not None:
+            self.sst = parse_sst(sst_segments)
+
+    @staticmethod
+    def _parse_xf(data: bytes) -> BiffXF:
+        font_index, format_index = struct.unpack_from("<HH", data, 0)
+        line, colors = struct.unpack_from("<II", data, 10)
+        borders = {
+            "left": (line & 0x0F, (line >> 16) & 0x7F),
+            "right": ((line >> 4) & 0x0F, (line >> 23) & 0x7F),
+            "top": ((line >> 8) & 0x0F, colors & 0x7F),
+            "bottom": ((line >> 12) & 0x0F, (colors >> 7) & 0x7F),
+        }
+        return BiffXF(font_index=font_index, format_index=format_index, borders=borders)
+
+    def _parse_sheet(self, sheet: BiffSheet) -> None:
+        records = iter_records(self.stream, sheet.offset)
+        first = next(records, None)
+        if first is None or first[1] != REC_BOF:
+            return
+        cells = sheet.cells
+
+        def number(row: int, col: int, xf: int, value: float) -> None:
+            sheet.numbers[(row + 1, col + 1)] = value
+            cells[(row + 1, col + 1)] = (format_number(value, self.xf_number_format(xf)), xf)
+
+        pending_formula: Optional[Tuple[int, int, int]] = None
+        depth = 0
+        for _pos, rec_id, data in records:
+            if rec_id == REC_BOF:
+                # Embedded substreams (charts) end with their own EOF
+                depth += 1
+                continue
+            if rec_id == REC_EOF:
+                if depth == 0:
+                    break
+                depth -= 1
+                continue
+            if depth:
+                continue
+
+            if pending_formula is not None and rec_id != REC_STRING:
+                pending_formula = None
+
+            if rec_id == REC_LABELSST:
+                row, col, xf, isst = struct.unpack_from("<HHHI", data, 0)
+                text = self.sst[isst] if isst < len(self.sst) else ""
+                cells[(row + 1, col + 1)] = (text, xf)
+            elif rec_id == REC_NUMBER:
+                row, col, xf, value = struct.unpack_from("<HHHd", data, 0)
+                number(row, col, xf, value)
+            elif rec_id == REC_RK:
+                row, col, xf, rk = struct.unpack_from("<HHHI", data, 0)
+                number(row, col, xf, _decode_rk(rk))
+            elif rec_id == REC_MULRK:
+                row, first_col = struct.unpack_from("<HH", data, 0)
+                count = (len(data) - 6) // 6
+                for i in range(count):
+                    xf, rk = struct.unpack_from("<HI", data, 4 + i * 6)
+                    number(row, first_col + i, xf, _decode_rk(rk))
+            elif rec_id == REC_BLANK:
+                row, col, xf = struct.unpack_from("<HHH", data, 0)
+                cells[(row + 1, col + 1)] = ("", xf)
+            elif rec_id == REC_MULBLANK:
+                row, first_col = struct.unpack_from("<HH", data, 0)
+                count = (len(data) - 6) // 2
+                for i in range(count):
+                    xf = struct.unpack_from("<H", data, 4 + i * 2)[0]
+                    cells[(row + 1, first_col + i + 1)] = ("", xf)
+            elif rec_id == REC_BOOLERR:
+                row, col, xf, val, is_err = struct.unpack_from("<HHHBB", data, 0)
+                text = ERROR_TEXT.get(val, "#ERR") if is_err else ("TRUE" if val else "FALSE")
+                cells[(row + 1, col + 1)] = (text, xf)
+            elif rec_id in (REC_LABEL, REC_RSTRING):
+                row, col, xf = struct.unpack_from("<HHH", data, 0)
+                cells[(row + 1, col + 1)] = (_read_unicode_string(data, 6), xf)
+            elif rec_id == REC_FORMULA:
+                row, col, xf = struct.unpack_from("<HHH", data, 0)
+                result = data[6:14]
+                sheet.numbers.pop((row + 1, col + 1), None)
+                if result[6:8] == b"\xff\xff":
+                    kind = result[0]
+                    if kind == 0:
+                        pending_formula = (row + 1, col + 1, xf)
+                        text = ""
+                    elif kind == 1:
+                        text = "TRUE" if result[2] else "FALSE"
+                    elif kind == 2:
+                        text = ERROR_TEXT.get(result[2], "#ERR")
+                    else:
+                        text = ""
+                else:
+                    number(row, col, xf, struct.unpack("<d", result)[0])
+                    continue
+                cells[(row + 1, col + 1)] = (text, xf)
+            elif rec_id == REC_STRING and pending_formula is not None:
+                row, col, xf = pending_formula
+                cells[(row, col)] = (_read_unicode_string(data, 0), xf)
+                pending_formula = None
+            elif rec_id == REC_MERGEDCELLS:
+                count = struct.unpack_from("<H", data, 0)[0]
+                for i in range(count):
+                    r1, r2, c1, c2 = struct.unpack_from("<HHHH", data, 2 + i * 8)
+                    sheet.merges.append((r1 + 1, c1 + 1, r2 - r1 + 1, c2 - c1 + 1))
+            elif rec_id == REC_ROW:
+                row, flags, ixfe = struct.unpack_from("<H10xHH", data, 0)
+                if flags & 0x80:
+                    sheet.row_xfs[row + 1] = ixfe & 0x0FFF
+            elif rec_id == REC_COLINFO:
+                first_col, last_col, _width, ixfe = struct.unpack_from("<HHHH", data, 0)
+                for col in range(first_col, min(last_col, 255) + 1):
+                    sheet.col_xfs[col + 1] = ixfe
+            elif rec_id == REC_DIMENSIONS:
+                r1, r2, c1, c2 = struct.unpack_from("<IIHH", data, 0)
+                if r2 > r1 and c2 > c1:
+                    sheet.dimensions = (r1 + 1, r2, c1 + 1, c2)
+
+    # -- style helpers -----------------------------------------------------
+
+    def color_value(self, index: int) -> int:
+        """Palette index -> COM ``Color`` value (R + G*256 + B*65536); automatic is black."""
+        if 0 <= index < len(self.palette):
+            r, g, b = self.palette[index]
+        elif index < 8:
+            r, g, b = _BUILTIN_COLORS[index]
+        else:
+            r, g, b = 0, 0, 0
+        return r + (g << 8) + (b << 16)
+
+    def xf_number_format(self, xf_index: int) -> str:
+        """Number format string of an XF; General for unknown XFs or formats."""
+        if not 0 <= xf_index < len(self.xfs):
+            return "General"
+        return self.formats.get(self.xfs[xf_index].format_index, "General")
+
+    def xf_borders(self, xf_index: int) -> Dict[str, Dict[str, Any]]:
+        if not 0 <= xf_index < len(self.xfs):
+            return {name: {"error": "border_read_failed"} for name in BORDER_SIDES.values()}
+        xf = self.xfs[xf_index]
+        info: Dict[str, Dict[str, Any]] = {}
+        for name in BORDER_SIDES.values():
+            style, color_idx = xf.borders[name]
+            line_style, weight = BORDER_STYLE_MAP.get(style, (1, 2))
+            info[name] = {
+                "line_style": line_style,
+                "weight": weight,
+                "color": self.color_value(color_idx) if style else 0,
+            }
+        return info
+
+    def xf_font(self, xf_index: int) -> Dict[str, Any]:
+        if not 0 <= xf_index < len(self.xfs):
+            return {"error": "font_read_failed"}
+        font_index = self.xfs[xf_index].font_index
+        # FONT index 4 is never written; indexes above it are shifted by one
+        if font_index >= 4:
+            font_index -= 1
+        if not 0 <= font_index < len(self.fonts):
+            return {"error": "font_read_failed"}
+        font = self.fonts[font_index]
+        return {
+            "name": font.name,
+            "size": int(font.height / 20),
+            "bold": font.weight >= 700,
+            "italic": font.italic,
+            "color": 0 if font.color_index == 0x7FFF else self.color_value(font.color_index),
+        }
+
+
+def snapshot_biff_sheet(book: BiffWorkbook, sheet: BiffSheet, include_styles: bool = False) -> SheetSnapshot:
+    """Build a SheetSnapshot equivalent to the COM UsedRange snapshot."""
+    if sheet.dimensions is not None:
+        first_row, last_row, first_col, last_col = sheet.dimensions
+    elif sheet.cells:
+        first_row = min(r for r, _ in sheet.cells)
+        last_row = max(r for r, _ in sheet.cells)
+        first_col = min(c for _, c in sheet.cells)
+        last_col = max(c for _, c in sheet.cells)
+    else:
+        # Excel reports A1 as the used range of an empty sheet
+        first_row = last_row = first_col = last_col = 1
+
+    rows = last_row - first_row + 1
+    cols = last_col - first_col + 1
+    values = [
+        [sheet.cells.get((r, c), ("", 0))[0] for c in range(first_col, last_col + 1)]
+        for r in range(first_row, last_row + 1)
+    ]
+    snapshot = SheetSnapshot(
+        name=sheet.name,
+        first_row=first_row,
+        first_col=first_col,
+        rows=rows,
+        cols=cols,
+        values=values,
+        merges=list(sheet.merges),
+    )
+
+    if include_styles:
+        border_cache: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        font_cache: Dict[int, Dict[str, Any]] = {}
+        for r, c in snapshot.iter_coords():
+            xf = sheet.cell_xf(r, c)
+            if xf not in border_cache:
+                border_cache[xf] = book.xf_borders(xf)
+                font_cache[xf] = book.xf_font(xf)
+            snapshot.borders[(r, c)] = border_cache[xf]
+            snapshot.fonts[(r, c)] = font_cache[xf]
+    return snapshot
@@ -0,0 +1,279 @@
+"""Writing side of the .xls support: BIFF8 record helpers, formula row shifting
+and an OLE2 compound file builder.
+
+Used by the headless punch engine to patch workbooks on disk. Only what a
+row insertion needs is covered: records are re-emitted, not re-encoded, and
+formulas are rewritten token by token so their row references follow the
+inserted rows.
+"""
+
+import struct
+from typing import Callable, Dict, List, Optional
+
+from analyzer.biff_reader import ENDOFCHAIN, FREESECT, NOSTREAM, BiffError, CompoundFile
+
+FATSECT = 0xFFFFFFFD
+DIFSECT = 0xFFFFFFFC
+SECTOR_SIZE = 512
+MINI_SECTOR_SIZE = 64
+MINI_CUTOFF = 4096
+# Largest BIFF8 record payload
+MAX_RECORD_DATA = 8224
+MAX_ROW_INDEX = 0xFFFF
+
+# 0-based row -> 0-based row after the inserted rows
+RowShift = Callable[[int], int]
+
+
+class BiffWriteError(BiffError):
+    """Raised for content the writer cannot patch faithfully."""
+
+
+def record(rec_id: int, payload: bytes) -> bytes:
+    if len(payload) > MAX_RECORD_DATA:
+        raise BiffWriteError(f"record 0x{rec_id:04X} too long ({len(payload)} bytes)")
+    return struct.pack("<HH", rec_id, len(payload)) + payload
+
+
+def row_shift(edits: List[tuple]) -> RowShift:
+    """RowShift for ``FakeWorksheet.row_edits``-style ("insert", at, count) edits (``at`` 1-based)."""
+    inserts = []
+    for kind, at, count in edits:
+        if kind != "insert":
+            raise BiffWriteError(f"row edit '{kind}' is not supported")
+        inserts.append((at - 1, count))
+
+    def shift(row: int) -> int:
+        if row == MAX_ROW_INDEX:
+            # Whole-column references end on the last row and stay there
+            return row
+        for at, count in inserts:
+            if row >= at:
+                row += count
+        if row > MAX_ROW_INDEX:
+            raise BiffWriteError("rows pushed past the last BIFF8 row")
+        return row
+
+    return shift
+
+
+# ---------------------------------------------------------------------------
+# Formulas
+# ---------------------------------------------------------------------------
+
+# Fixed operand sizes (bytes after the ptg byte) for the base tokens 0x01-0x1F
+_BASE_SIZES = {
+    0x01: 4,  # ptgExp
+    0x02: 4,  # ptgTbl
+    0x15: 0,  # ptgParen
+    0x16: 0,  # ptgMissArg
+    0x1C: 1,  # ptgErr
+    0x1D: 1,  # ptgBool
+    0x1E: 2,  # ptgInt
+    0x1F: 8,  # ptgNum
+}
+# Operand sizes for classed tokens, keyed by (ptg & 0x1F) | 0x20
+_CLASSED_SIZES = {
+    0x20: 7,   # ptgArray
+    0x21: 2,   # ptgFunc
+    0x22: 3,   # ptgFuncVar
+    0x23: 4,   # ptgName
+    0x24: 4,   # ptgRef
+    0x25: 8,   # ptgArea
+    0x26: 6,   # ptgMemArea
+    0x27: 6,   # ptgMemErr
+    0x28: 6,   # ptgMemNoMem
+    0x29: 2,   # ptgMemFunc
+    0x2A: 4,   # ptgRefErr
+    0x2B: 8,   # ptgAreaErr
+    0x2C: 4,   # ptgRefN
+    0x2D: 8,   # ptgAreaN
+    0x39: 6,   # ptgNameX
+    0x3A: 6,   # ptgRef3d
+    0x3B: 10,  # ptgArea3d
+    0x3C: 6,   # ptgRefErr3d
+    0x3D: 10,  # ptgAreaErr3d
+}
+_COL_ROW_RELATIVE = 0x8000
+
+
+def shift_formula_rows(
+    rgce: bytes,
+    shift_2d: Optional[RowShift],
+    shift_3d: Callable[[int], Optional[RowShift]],
+    shared: bool = False,
+) -> bytes:
+    """Rewrite a BIFF8 formula token array so its row references follow inserted rows.
+
+    ``shift_2d`` applies to references on the formula's own sheet (None: that
+    sheet is unchanged); ``shift_3d(ixti)`` returns the shift for the sheet an
+    EXTERNSHEET entry points at, or None. In shared formulas (``shared``)
+    row-relative references are offsets and are left alone. Unknown tokens
+    raise BiffWriteError rather than risk a corrupt formula.
+    """
+    out = bytearray(rgce)
+    pos = 0
+    end = len(out)
+
+    def shift_row(at: int, fn: RowShift, relative: bool) -> None:
+        if shared and relative:
+            return
+        row = struct.unpack_from("<H", out, at)[0]
+        struct.pack_into("<H", out, at, fn(row))
+
+    while pos < end:
+        ptg = out[pos]
+        pos += 1
+        if ptg < 0x20:
+            if 0x03 <= ptg <= 0x14:
+                continue  # operators
+            if ptg == 0x17:  # ptgStr
+                cch, flags = out[pos], out[pos + 1]
+                pos += 2 + cch * (2 if flags & 0x01 else 1)
+                continue
+            if ptg == 0x19:  # ptgAttr
+                grbit = out[pos]
+                options = struct.unpack_from("<H", out, pos + 1)[0]
+                pos += 3
+                if grbit & 0x04:  # tAttrChoose jump table
+                    pos += 2 * (options + 1)
+                continue
+            if ptg in (0x01, 0x02) and shift_2d is not None:
+                shift_row(pos, shift_2d, False)
+            size = _BASE_SIZES.get(ptg)
+            if size is None:
+                raise BiffWriteError(f"unsupported formula token 0x{ptg:02X}")
+            pos += size
+            continue
+
+        base = (ptg & 0x1F) | 0x20
+        size = _CLASSED_SIZES.get(base)
+        if size is None:
+            raise BiffWriteError(f"unsupported formula token 0x{ptg:02X}")
+        if base in (0x24, 0x2C) and shift_2d is not None:  # ptgRef / ptgRefN
+            col = struct.unpack_from("<H", out, pos + 2)[0]
+            shift_row(pos, shift_2d, bool(col & _COL_ROW_RELATIVE))
+        elif base in (0x25, 0x2D) and shift_2d is not None:  # ptgArea / ptgAreaN
+            col1, col2 = struct.unpack_from("<HH", out, pos + 4)
+            shift_row(pos, shift_2d, bool(col1 & _COL_ROW_RELATIVE))
+            shift_row(pos + 2, shift_2d, bool(col2 & _COL_ROW_RELATIVE))
+        elif base == 0x3A:  # ptgRef3d
+            fn = shift_3d(struct.unpack_from("<H", out, pos)[0])
+            if fn is not None:
+                col = struct.unpack_from("<H", out, pos + 4)[0]
+                shift_row(pos + 2, fn, bool(col & _COL_ROW_RELATIVE))
+        elif base == 0x3B:  # ptgArea3d
+            fn = shift_3d(struct.unpack_from("<H", out, pos)[0])
+            if fn is not None:
+                col1, col2 = struct.unpack_from("<HH", out, pos + 6)
+                shift_row(pos + 2, fn, bool(col1 & _COL_ROW_RELATIVE))
+                shift_row(pos + 4, fn, bool(col2 & _COL_ROW_RELATIVE))
+        pos += size
+    if pos != end:
+        raise BiffWriteError("formula token array overruns its length")
+    return bytes(out)
+
+
+# ---------------------------------------------------------------------------
+# OLE2 compound file
+# ---------------------------------------------------------------------------
+
+
+def _pad(data: bytes, size: int) -> bytes:
+    rem = len(data) % size
+    return data if rem == 0 and data else data + b"\x00" * ((size - rem) if data else size)
+
+
+def build_compound_file(ole: CompoundFile, replacements: Dict[str, bytes]) -> bytes:
+    """Re-pack ``ole``'s streams (version 3, 512-byte sectors), swapping in ``replacements`` by stream name.
+
+    The directory tree (names, colours, links, CLSIDs, timestamps) is kept
+    as it is; only stream locations and sizes are rewritten. Streams under
+    4096 bytes go to the mini stream as the format requires.
+    """
+    wanted = {name.lower(): data for name, data in replacements.items()}
+    sectors: List[bytes] = []
+    fat: List[int] = []
+
+    def allocate(data: bytes) -> int:
+        if not data:
+            return ENDOFCHAIN
+        start = len(sectors)
+        count = (len(data) + SECTOR_SIZE - 1) // SECTOR_SIZE
+        for i in range(count):
+            sectors.append(_pad(data[i * SECTOR_SIZE:(i + 1) * SECTOR_SIZE], SECTOR_SIZE))
+            fat.append(start + i + 1 if i < count - 1 else ENDOFCHAIN)
+        return start
+
+    raw_entries = [bytearray(entry.raw) for entry in ole.entries]
+    mini = bytearray()
+    minifat: List[int] = []
+    for entry, raw in zip(ole.entries, raw_entries):
+        if entry.entry_type != 2:
+            continue
+        data = wanted.get(entry.name.lower())
+        if data is None:
+            data = ole.read_entry(entry)
+        if not data:
+            start = ENDOFCHAIN
+        elif len(data) < MINI_CUTOFF:
+            start = len(mini) // MINI_SECTOR_SIZE
+            count = (len(data) + MINI_SECTOR_SIZE - 1) // MINI_SECTOR_SIZE
+            mini += _pad(data, MINI_SECTOR_SIZE)
+            minifat.extend(start + i + 1 if i < count - 1 else ENDOFCHAIN for i in range(count))
+        else:
+            start = allocate(data)
+        struct.pack_into("<IQ", raw, 0x74, start, len(data))
+
+    root = raw_entries[0]
+    struct.pack_into("<IQ", root, 0x74, allocate(bytes(mini)), len(mini))
+
+    minifat_bytes = b"".join(struct.pack("<I", s) for s in minifat)
+    if minifat_bytes:
+        minifat_bytes += struct.pack("<I", FREESECT) * ((-len(minifat)) % (SECTOR_SIZE // 4))
+    first_minifat = allocate(minifat_bytes)
+    num_minifat = len(minifat_bytes) // SECTOR_SIZE
+
+    empty = bytearray(128)
+    struct.pack_into("<III", empty, 0x44, NOSTREAM, NOSTREAM, NOSTREAM)
+    while len(raw_entries) % (SECTOR_SIZE // 128):
+        raw_entries.append(bytearray(empty))
+    first_dir = allocate(b"".join(bytes(e) for e in raw_entries))
+
+    per_sector = SECTOR_SIZE // 4
+    num_fat = num_difat = 0
+    while True:
+        total = len(sectors) + num_fat + num_difat
+        need_fat = (total + per_sector - 1) // per_sector
+        need_difat = max(0, (need_fat - 109 + per_sector - 2) // (per_sector - 1))
+        if need_fat == num_fat and need_difat == num_difat:
+            break
+        num_fat, num_difat = need_fat, need_difat
+
+    fat_start = len(sectors)
+    fat_ids = list(range(fat_start, fat_start + num_fat))
+    difat_ids = list(range(fat_start + num_fat, fat_start + num_fat + num_difat))
+    fat.extend([FATSECT] * num_fat + [DIFSECT] * num_difat)
+    fat.extend([FREESECT] * (num_fat * per_sector - len(fat)))
+    fat_bytes = b"".join(struct.pack("<I", s) for s in fat)
+    for i in range(num_fat):
+        sectors.append(fat_bytes[i * SECTOR_SIZE:(i + 1) * SECTOR_SIZE])
+    overflow = fat_ids[109:]
+    for i, sector_id in enumerate(difat_ids):
+        chunk = overflow[i * (per_sector - 1):(i + 1) * (per_sector - 1)]
+        chunk += [FREESECT] * (per_sector - 1 - len(chunk))
+        chunk.append(difat_ids[i + 1] if i + 1 < len(difat_ids) else ENDOFCHAIN)
+        sectors.append(b"".join(struct.pack("<I", s) for s in chunk))
+
+    header = bytearray(SECTOR_SIZE)
+    header[0:8] = ole.data[0:8]
+    struct.pack_into("<HHHHH", header, 0x18, 0x003E, 3, 0xFFFE, 9, 6)
+    struct.pack_into(
+        "<IIIIIIIII", header, 0x28,
+        0, num_fat, first_dir, 0, MINI_CUTOFF,
+        first_minifat, num_minifat,
+        difat_ids[0] if difat_ids else ENDOFCHAIN, num_difat,
+    )
+    head_ids = fat_ids[:109] + [FREESECT] * (109 - len(fat_ids[:109]))
+    struct.pack_into("<109I", header, 0x4C, *head_ids)
+    return bytes(header) + b"".join(sectors)
@@ -0,0 +1,195 @@
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from analyzer.sheet_snapshot import MergeTuple, a1_address
+
+# Marks "no merge" / "no style read" in the id columns
+NO_ID = -1
+
+ENCODING_NAME = "columnar"
+
+
+def _freeze(value: Any) -> Any:
+    """Hashable key for a nested style dict."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class _InternTable:
+    __slots__ = ("items", "_ids")
+
+    def __init__(self) -> None:
+        self.items: List[Any] = []
+        self._ids: Dict[Any, int] = {}
+
+    def intern(self, item: Any, key: Any = None) -> int:
+        key = _freeze(item) if key is None else key
+        found = self._ids.get(key)
+        if found is None:
+            found = len(self.items)
+            self.items.append(item)
+            self._ids[key] = found
+        return found
+
+
+class CompactSheet:
+    """Column-oriented cell storage for one analyzed sheet.
+
+    Cells live in parallel ``array`` columns (row, col, value, merge id,
+    border id, font id). Merge areas and border/font styles are stored once
+    in lookup tables and referenced by index, so size grows with the number
+    of distinct styles and merges rather than with the cell count.
+    """
+
+    __slots__ = (
+        "rows",
+        "cols",
+        "values",
+        "merge_ids",
+        "border_ids",
+        "font_ids",
+        "_merges",
+        "_borders",
+        "_fonts",
+    )
+
+    def __init__(self) -> None:
+        self.rows = array("I")
+        self.cols = array("I")
+        self.values: List[str] = []
+        self.merge_ids = array("i")
+        self.border_ids = array("i")
+        self.font_ids = array("i")
+        self._merges = _InternTable()
+        self._borders = _InternTable()
+        self._fonts = _InternTable()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def merges(self) -> List[MergeTuple]:
+        return self._merges.items
+
+    @property
+    def border_styles(self) -> List[Dict[str, Dict[str, Any]]]:
+        return self._borders.items
+
+    @property
+    def font_styles(self) -> List[Dict[str, Any]]:
+        return self._fonts.items
+
+    def add_cell(
+        self,
+        row: int,
+        col: int,
+        value: str,
+        merge: Optional[MergeTuple] = None,
+        borders: Optional[Dict[str, Dict[str, Any]]] = None,
+        font: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.rows.append(row)
+        self.cols.append(col)
+        self.values.append(value)
+        self.merge_ids.append(self._merges.intern(merge, merge) if merge is not None else NO_ID)
+        self.border_ids.append(self._borders.intern(borders) if borders else NO_ID)
+        self.font_ids.append(self._fonts.intern(font) if font else NO_ID)
+
+    @classmethod
+    def from_cells(cls, cells: List[Dict[str, Any]]) -> "CompactSheet":
+        """Convert legacy per-cell dicts (``asdict(CellFormatInfo)``); error cells are skipped."""
+        sheet = cls()
+        for cell in cells:
+            if "error" in cell:
+                continue
+            merge = cell.get("merge")
+            area = (merge["top"], merge["left"], merge["rows"], merge["cols"]) if merge else None
+            sheet.add_cell(
+                int(cell["row"]),
+                int(cell["col"]),
+                cell.get("value_preview", ""),
+                area,
+                cell.get("borders") or None,
+                cell.get("font") or None,
+            )
+        return sheet
+
+    def merge_block_sizes(self) -> Dict[str, int]:
+        """Per-cell merge block counts, matching ``_summarize_merge_blocks``."""
+        per_area = [0] * len(self._merges.items)
+        for merge_id in self.merge_ids:
+            if merge_id != NO_ID:
+                per_area[merge_id] += 1
+        blocks: Dict[str, int] = {}
+        for (_top, _left, nrows, ncols), count in zip(self._merges.items, per_area):
+            key = f"{nrows}x{ncols}"
+            blocks[key] = blocks.get(key, 0) + count
+        return blocks
+
+    def iter_cells(self) -> Iterator[Dict[str, Any]]:
+        """Expand back to the legacy per-cell dict shape, one cell at a time."""
+        for i in range(len(self.rows)):
+            yield self.cell(i)
+
+    def cell(self, i: int) -> Dict[str, Any]:
+        row = self.rows[i]
+        col = self.cols[i]
+        merge_id = self.merge_ids[i]
+        merge = None
+        if merge_id != NO_ID:
+            top, left, nrows, ncols = self._merges.items[merge_id]
+            merge = {"top": top, "left": left, "rows": nrows, "cols": ncols}
+        border_id = self.border_ids[i]
+        font_id = self.font_ids[i]
+        return {
+            "address": a1_address(row, col),
+            "row": row,
+            "col": col,
+            "value_preview": self.values[i],
+            "merge": merge,
+            "borders": self._borders.items[border_id] if border_id != NO_ID else {},
+            "font": self._fonts.items[font_id] if font_id != NO_ID else {},
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "encoding": ENCODING_NAME,
+            "row": self.rows.tolist(),
+            "col": self.cols.tolist(),
+            "value": list(self.values),
+            "merge": self.merge_ids.tolist(),
+            "border": self.border_ids.tolist(),
+            "font": self.font_ids.tolist(),
+            "merges": [list(m) for m in self._merges.items],
+            "border_styles": list(self._borders.items),
+            "font_styles": list(self._fonts.items),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CompactSheet":
+        sheet = cls()
+        sheet.rows = array("I", data.get("row", []))
+        sheet.cols = array("I", data.get("col", []))
+        sheet.values = list(data.get("value", []))
+        sheet.merge_ids = array("i", data.get("merge", []))
+        sheet.border_ids = array("i", data.get("border", []))
+        sheet.font_ids = array("i", data.get("font", []))
+        for area in data.get("merges", []):
+            area_t: Tuple[int, int, int, int] = tuple(area)  # type: ignore[assignment]
+            sheet._merges.intern(area_t, area_t)
+        for style in data.get("border_styles", []):
+            sheet._borders.intern(style)
+        for font in data.get("font_styles", []):
+            sheet._fonts.intern(font)
+        return sheet
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return self.to_dict()
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        restored = CompactSheet.from_dict(state)
+        for name in CompactSheet.__slots__:
+            setattr(self, name, getattr(restored, name))
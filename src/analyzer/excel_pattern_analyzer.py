@@ -1,12 +1,20 @@
 import json
 import os
 from dataclasses import dataclass, asdict
-from typing import Any, Dict, List, Optional, Tuple
-
-try:
-    import win32com.client as win32
-except Exception:
-    win32 = None  # Allows linting on non-Windows or without pywin32
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from analyzer.analysis_cache import AnalysisCache
+from analyzer.backends import create_backend, resolve_backend_name
+from analyzer.compact_sheet import CompactSheet
+from analyzer.session_pool import DEFAULT_RECYCLE_AFTER, ExcelSessionPool
+from analyzer.sheet_snapshot import (
+    MergeTuple,
+    SheetSnapshot,
+    a1_address,
+    enumerate_com_merges,
+    read_cell_borders,
+    read_cell_font,
+)
 
 
 @dataclass
@@ -29,9 +37,35 @@ class CellFormatInfo:
 
 
 class ExcelPatternAnalyzer:
-    def __init__(self, directory_path: str, include_borders: bool = False) -> None:
+    def __init__(
+        self,
+        directory_path: str,
+        include_borders: bool = False,
+        bulk_read: bool = True,
+        backend: str = "auto",
+        compact: bool = False,
+        coverage: str = "cells",
+        session_pool: Optional[ExcelSessionPool] = None,
+        recycle_after: int = DEFAULT_RECYCLE_AFTER,
+    ) -> None:
         self.directory_path = directory_path
         self.include_borders = include_borders
+        # bulk_read: snapshot the whole UsedRange instead of sampling cell by cell
+        self.bulk_read = bulk_read
+        # backend: "com" (Excel automation), "biff" (direct .xls parsing) or "auto"
+        self.backend_name = backend
+        # compact: store cells as a CompactSheet ("columnar" key) instead of per-cell dicts
+        self.compact = compact
+        # coverage: "cells" reports every used cell; "regions" reports each merge
+        # area once (at its top-left) plus every non-merged cell, and reads styles
+        # once per merge area / uniform run
+        if coverage not in ("cells", "regions"):
+            raise ValueError(f"unknown coverage mode: {coverage}")
+        self.coverage = coverage
+        # session_pool: shared pre-warmed Excel instances (COM backend); kept open after the run.
+        # Without one each run starts its own instance, replaced after recycle_after files
+        self.session_pool = session_pool
+        self.recycle_after = recycle_after
 
     def _list_excel_files(self) -> List[str]:
         allowed_ext = {".xls", ".xlsx", ".xlsm"}
@@ -43,45 +77,232 @@ class ExcelPatternAnalyzer:
                     files.append(path)
         return sorted(files)
 
-    def analyze(self, max_cells_per_sheet: int = 2000) -> Dict[str, Any]:
-        if win32 is None:
-            raise RuntimeError("pywin32 is required to analyze Excel files on Windows.")
-
-        excel = win32.DispatchEx("Excel.Application")
-        excel.Visible = False
-        excel.DisplayAlerts = False
+    def _worker_config(self) -> Dict[str, Any]:
+        """Constructor kwargs used to rebuild this analyzer inside a worker process."""
+        return {
+            "directory_path": self.directory_path,
+            "include_borders": self.include_borders,
+            "bulk_read": self.bulk_read,
+            "backend": self.backend_name,
+            "compact": self.compact,
+            "coverage": self.coverage,
+            "recycle_after": self.recycle_after,
+        }
 
-        results: Dict[str, Any] = {"files": []}
+    def _create_backend(self) -> Any:
+        return create_backend(self.backend_name, session_pool=self.session_pool, recycle_after=self.recycle_after)
+
+    def cache_options(self, max_cells_per_sheet: int) -> Dict[str, Any]:
+        """Analyzer options that change per-file results, used in cache keys.
+
+        Bulk reads cover the whole used range, so the sampling cap is only
+        part of the key without them (results of a per-cell fallback are
+        not cached, see ``_cacheable``).
+        """
+        options: Dict[str, Any] = {
+            "include_borders": self.include_borders,
+            "bulk_read": self.bulk_read,
+            "backend": resolve_backend_name(self.backend_name),
+            "compact": self.compact,
+            "coverage": self.coverage,
+        }
+        if not self.bulk_read:
+            options["max_cells"] = max_cells_per_sheet
+        return options
+
+    def _cacheable(self, file_result: Dict[str, Any]) -> bool:
+        # A sampled sheet depends on max_cells, which bulk-read cache keys leave out
+        return not self.bulk_read or all(sheet.get("coverage") != "sampled" for sheet in file_result.get("sheets", ()))
+
+    def analyze(
+        self,
+        max_cells_per_sheet: int = 2000,
+        workers: int = 1,
+        file_timeout: Optional[float] = None,
+        cache: Optional[AnalysisCache] = None,
+    ) -> Dict[str, Any]:
+        files = self.iter_analyze(max_cells_per_sheet, workers, file_timeout, cache)
+        return {"files": list(files)}
+
+    def iter_analyze(
+        self,
+        max_cells_per_sheet: int = 2000,
+        workers: int = 1,
+        file_timeout: Optional[float] = None,
+        cache: Optional[AnalysisCache] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield one file result at a time, in sorted file order."""
+        all_files = self._list_excel_files()
+        cached: Dict[str, Dict[str, Any]] = {}
+        dirty: List[str] = []
+        for file_path in all_files:
+            hit = cache.get(file_path) if cache is not None else None
+            if hit is not None:
+                cached[file_path] = hit
+            else:
+                dirty.append(file_path)
+
+        fresh = self._iter_analyze_files(dirty, max_cells_per_sheet, workers, file_timeout)
         try:
-            for file_path in self._list_excel_files():
-                file_result: Dict[str, Any] = {"file": file_path, "sheets": []}
-                try:
-                    wb = excel.Workbooks.Open(os.path.abspath(file_path))
-                except Exception as open_err:
-                    file_result["error"] = f"open_failed: {open_err}"
-                    results["files"].append(file_result)
+            for file_path in all_files:
+                if file_path in cached:
+                    yield cached.pop(file_path)
                     continue
+                file_result = next(fresh)
+                if cache is not None:
+                    if self._cacheable(file_result):
+                        cache.put(file_path, file_result)
+                    else:
+                        cache.discard(file_path)
+                yield file_result
+        finally:
+            fresh.close()
+        if cache is not None:
+            cache.evict_missing(self.directory_path, all_files)
+
+    def _iter_analyze_files(
+        self,
+        files: List[str],
+        max_cells_per_sheet: int,
+        workers: int,
+        file_timeout: Optional[float],
+    ) -> Iterator[Dict[str, Any]]:
+        if not files:
+            return
+        if workers > 1:
+            from analyzer.parallel import iter_files_parallel
+
+            yield from iter_files_parallel(
+                self._worker_config(),
+                files,
+                max_cells=max_cells_per_sheet,
+                workers=workers,
+                file_timeout=file_timeout,
+            )
+            return
+
+        backend = self._create_backend()
+        backend.start()
+        try:
+            for file_path in files:
+                yield self._analyze_file(backend, file_path, max_cells_per_sheet)
+        finally:
+            backend.close()
 
-                try:
-                    for sheet in wb.Worksheets:
-                        sheet_info = self._analyze_sheet(sheet, max_cells_per_sheet)
-                        file_result["sheets"].append(sheet_info)
-                finally:
-                    wb.Close(SaveChanges=False)
+    def _analyze_file(self, backend: Any, file_path: str, max_cells_per_sheet: int) -> Dict[str, Any]:
+        file_result: Dict[str, Any] = {"file": file_path, "sheets": []}
+        try:
+            wb = backend.open_workbook(file_path)
+        except Exception as open_err:
+            file_result["error"] = f"open_failed: {open_err}"
+            return file_result
 
-                results["files"].append(file_result)
+        try:
+            for sheet in backend.iter_sheets(wb):
+                sheet_info = self._analyze_sheet(backend, sheet, max_cells_per_sheet)
+                file_result["sheets"].append(sheet_info)
         finally:
-            excel.Quit()
+            backend.close_workbook(wb)
+        return file_result
+
+    def _analyze_sheet(self, backend: Any, sheet: Any, max_cells_per_sheet: int) -> Dict[str, Any]:
+        sheet_info = self._analyze_sheet_cells(backend, sheet, max_cells_per_sheet)
+        if self.compact and "cells" in sheet_info:
+            sheet_info["columnar"] = CompactSheet.from_cells(sheet_info.pop("cells"))
+        return sheet_info
+
+    def _analyze_sheet_cells(self, backend: Any, sheet: Any, max_cells_per_sheet: int) -> Dict[str, Any]:
+        regions = self.coverage == "regions"
+        if not backend.supports_per_cell:
+            return self._analyze_snapshot(backend.snapshot(sheet, self.include_borders, regions))
+        if self.bulk_read:
+            try:
+                snapshot = backend.snapshot(sheet, self.include_borders, regions)
+            except Exception:
+                # Fall back to the per-cell path if a bulk read is rejected
+                return self._analyze_sheet_per_cell(sheet, max_cells_per_sheet)
+            return self._analyze_snapshot(snapshot)
+        return self._analyze_sheet_per_cell(sheet, max_cells_per_sheet)
+
+    def _snapshot_coords(self, snapshot: SheetSnapshot) -> Iterator[Tuple[int, int, Optional[MergeTuple]]]:
+        """Cells to report, with their merge area; regions mode skips merge interiors."""
+        merge_lookup = snapshot.merge_lookup()
+        seen_areas = set()
+        for r, c in snapshot.iter_coords():
+            area = merge_lookup.get((r, c))
+            if self.coverage == "regions" and area is not None:
+                if area in seen_areas:
+                    continue
+                seen_areas.add(area)
+                # Report the area at its top-left, where its styles were read
+                r, c = area[0], area[1]
+            yield r, c, area
+
+    def _analyze_snapshot(self, snapshot: SheetSnapshot) -> Dict[str, Any]:
+        """Build the per-sheet report from a snapshot, covering every used cell."""
+        if self.compact:
+            compact = CompactSheet()
+            for r, c, area in self._snapshot_coords(snapshot):
+                compact.add_cell(
+                    r,
+                    c,
+                    snapshot.value_at(r, c)[:40],
+                    area,
+                    snapshot.borders.get((r, c)),
+                    snapshot.fonts.get((r, c)),
+                )
+            block_sizes = compact.merge_block_sizes()
+            return {
+                "name": snapshot.name,
+                "used_rows": snapshot.rows,
+                "used_cols": snapshot.cols,
+                "coverage": self.coverage,
+                "sampled_cell_count": len(compact),
+                "merge_blocks_summary": {
+                    "block_sizes": block_sizes,
+                    "distinct_block_count": len(block_sizes),
+                    "area_counts": self._count_merge_areas(snapshot.merges),
+                },
+                "columnar": compact,
+            }
 
-        return results
+        cells_info: List[Dict[str, Any]] = []
+        for r, c, area in self._snapshot_coords(snapshot):
+            merge_info = None
+            if area is not None:
+                top, left, nrows, ncols = area
+                merge_info = MergeAreaInfo(top=top, left=left, rows=nrows, cols=ncols)
+            cell_info = CellFormatInfo(
+                address=a1_address(r, c),
+                row=r,
+                col=c,
+                value_preview=snapshot.value_at(r, c)[:40],
+                merge=merge_info,
+                borders=snapshot.borders.get((r, c), {}),
+                font=snapshot.fonts.get((r, c), {}),
+            )
+            cells_info.append(asdict(cell_info))
 
-    def _analyze_sheet(self, sheet: Any, max_cells_per_sheet: int) -> Dict[str, Any]:
+        return {
+            "name": snapshot.name,
+            "used_rows": snapshot.rows,
+            "used_cols": snapshot.cols,
+            "coverage": self.coverage,
+            "sampled_cell_count": len(cells_info),
+            "merge_blocks_summary": self._summarize_merge_blocks(cells_info, snapshot.merges),
+            "cells": cells_info,
+        }
+
+    def _analyze_sheet_per_cell(self, sheet: Any, max_cells_per_sheet: int) -> Dict[str, Any]:
         used_range = sheet.UsedRange
         rows = int(used_range.Rows.Count)
         cols = int(used_range.Columns.Count)
 
-        # Sample cells from the used range to keep runtime bounded
-        sampled_cells = self._sample_cells(rows, cols, max_cells_per_sheet)
+        merges: Optional[List[MergeTuple]] = None
+        if self.coverage == "regions":
+            merges = enumerate_com_merges(sheet, 1, 1, rows, cols)
+        # Sample cells from the used range to keep runtime bounded (regions: exact, uncapped)
+        sampled_cells = self._sample_cells(rows, cols, max_cells_per_sheet, merges)
 
         cells_info: List[Dict[str, Any]] = []
         for r, c in sampled_cells:
@@ -124,22 +345,49 @@ class ExcelPatternAnalyzer:
                     "error": f"cell_inspect_failed: {err}",
                 })
 
-        merge_blocks_summary = self._summarize_merge_blocks(cells_info)
+        merge_blocks_summary = self._summarize_merge_blocks(cells_info, merges)
+        if merges is not None:
+            coverage = "regions"
+        elif len(sampled_cells) < rows * cols:
+            coverage = "sampled"
+        else:
+            coverage = "cells"
 
         return {
             "name": str(sheet.Name),
             "used_rows": rows,
             "used_cols": cols,
+            "coverage": coverage,
             "sampled_cell_count": len(sampled_cells),
             "merge_blocks_summary": merge_blocks_summary,
             "cells": cells_info,
         }
 
-    def _sample_cells(self, rows: int, cols: int, max_cells: int) -> List[Tuple[int, int]]:
+    def _sample_cells(
+        self,
+        rows: int,
+        cols: int,
+        max_cells: int,
+        merges: Optional[List[MergeTuple]] = None,
+    ) -> List[Tuple[int, int]]:
         coords: List[Tuple[int, int]] = []
         if rows <= 0 or cols <= 0:
             return coords
 
+        if merges is not None:
+            # Merge-aware full coverage: every non-merged cell plus one top-left per merge area
+            interior = set()
+            for top, left, nrows, ncols in merges:
+                for r in range(top, top + nrows):
+                    for c in range(left, left + ncols):
+                        if (r, c) != (top, left):
+                            interior.add((r, c))
+            for r in range(1, rows + 1):
+                for c in range(1, cols + 1):
+                    if (r, c) not in interior:
+                        coords.append((r, c))
+            return coords
+
         total = rows * cols
         if total <= max_cells:
             for r in range(1, rows + 1):
@@ -155,56 +403,108 @@ class ExcelPatternAnalyzer:
         return coords[:max_cells]
 
     def _extract_borders(self, cell: Any) -> Dict[str, Dict[str, Any]]:
-        # Excel border index mapping
-        # 1: xlEdgeLeft, 2: xlEdgeTop, 3: xlEdgeBottom, 4: xlEdgeRight, 5: xlInsideVertical, 6: xlInsideHorizontal
-        sides = {
-            1: "left",
-            2: "top",
-            3: "bottom",
-            4: "right",
-        }
-        border_info: Dict[str, Dict[str, Any]] = {}
-        for idx, name in sides.items():
-            try:
-                b = cell.Borders(idx)
-                border_info[name] = {
-                    "line_style": int(b.LineStyle) if b.LineStyle is not None else None,
-                    "weight": int(b.Weight) if b.Weight is not None else None,
-                    "color": int(b.Color) if b.Color is not None else None,
-                }
-            except Exception as _:
-                border_info[name] = {"error": "border_read_failed"}
-        return border_info
+        return read_cell_borders(cell)
 
     def _extract_font(self, cell: Any) -> Dict[str, Any]:
-        try:
-            f = cell.Font
-            return {
-                "name": str(getattr(f, "Name", "")),
-                "size": int(getattr(f, "Size", 0) or 0),
-                "bold": bool(getattr(f, "Bold", False)),
-                "italic": bool(getattr(f, "Italic", False)),
-                "color": int(getattr(f, "Color", 0) or 0),
-            }
-        except Exception as _:
-            return {"error": "font_read_failed"}
-
-    def _summarize_merge_blocks(self, cells: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return read_cell_font(cell)
+
+    def _summarize_merge_blocks(
+        self,
+        cells: List[Dict[str, Any]],
+        merges: Optional[List[MergeTuple]] = None,
+    ) -> Dict[str, Any]:
+        """Merge block counts per reported cell, plus exact per-area counts.
+
+        ``block_sizes`` counts reported cells that sit in a merge of each size,
+        so in "cells" coverage an area is counted once per member cell.
+        ``area_counts`` counts each distinct area once, from ``merges`` when the
+        merge list is known, else from the distinct areas seen in ``cells``.
+        """
         blocks: Dict[str, int] = {}
+        seen: Dict[Tuple[int, int], MergeTuple] = {}
         for c in cells:
             merge = c.get("merge")
             if not merge:
                 continue
             key = f"{merge['rows']}x{merge['cols']}"
             blocks[key] = blocks.get(key, 0) + 1
+            seen[(merge["top"], merge["left"])] = (merge["top"], merge["left"], merge["rows"], merge["cols"])
         return {
             "block_sizes": blocks,
             "distinct_block_count": len(blocks),
+            "area_counts": self._count_merge_areas(merges if merges is not None else list(seen.values())),
         }
 
+    def _count_merge_areas(self, merges: List[MergeTuple]) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for _top, _left, nrows, ncols in merges:
+            key = f"{nrows}x{ncols}"
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+
+def report_json_default(obj: Any) -> Any:
+    """json ``default`` hook for report objects that are not plain JSON types."""
+    if isinstance(obj, CompactSheet):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
 
 def write_json_report(data: Dict[str, Any], out_path: str) -> None:
     with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+        json.dump(data, f, indent=2, default=report_json_default)
+
+
+class NdjsonReportWriter:
+    """Streams a report as newline-delimited JSON, one record per line.
+
+    Each file produces a ``{"type": "file", ...}`` header followed by one
+    ``{"type": "sheet", "file": ..., ...}`` record per sheet, and is flushed
+    to disk before the next file starts, so an interrupted run leaves every
+    completed file readable. A final ``{"type": "end"}`` record marks a
+    complete report.
+    """
+
+    def __init__(self, out_path: str) -> None:
+        self.out_path = out_path
+        self.file_count = 0
+        self._f: Optional[TextIO] = None
+
+    def __enter__(self) -> "NdjsonReportWriter":
+        self._f = open(self.out_path, "w", encoding="utf-8")
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._f is None:
+            return
+        if exc_type is None:
+            self._write({"type": "end", "file_count": self.file_count})
+        self._f.close()
+        self._f = None
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        assert self._f is not None
+        self._f.write(json.dumps(record, separators=(",", ":"), default=report_json_default))
+        self._f.write("\n")
+
+    def write_file(self, file_result: Dict[str, Any]) -> None:
+        assert self._f is not None
+        sheets = file_result.get("sheets", [])
+        header = {k: v for k, v in file_result.items() if k != "sheets"}
+        header["sheet_count"] = len(sheets)
+        self._write({"type": "file", **header})
+        for sheet in sheets:
+            self._write({"type": "sheet", "file": file_result.get("file", ""), **sheet})
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self.file_count += 1
+
+
+def write_ndjson_report(files: Iterable[Dict[str, Any]], out_path: str) -> int:
+    """Write file results as they are produced; returns the number of files written."""
+    with NdjsonReportWriter(out_path) as writer:
+        for file_result in files:
+            writer.write_file(file_result)
+        return writer.file_count
 
 
@@ -0,0 +1,205 @@
+import multiprocessing as mp
+import queue
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+# Parent <-> worker message kinds
+_MSG_READY = "ready"
+_MSG_DONE = "done"
+
+
+def _worker_main(worker_id: int, config: Dict[str, Any], max_cells: int, tasks: Any, results: Any) -> None:
+    """Worker process: owns one reader backend (and so one Excel instance for COM)."""
+    from analyzer.excel_pattern_analyzer import ExcelPatternAnalyzer
+
+    analyzer = ExcelPatternAnalyzer(**config)
+    backend = analyzer._create_backend()
+    try:
+        backend.start()
+    except Exception as err:
+        results.put((_MSG_READY, worker_id, f"backend_start_failed: {err}"))
+        return
+    results.put((_MSG_READY, worker_id, None))
+
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            index, file_path = task
+            try:
+                file_result = analyzer._analyze_file(backend, file_path, max_cells)
+            except Exception as err:
+                file_result = {"file": file_path, "sheets": [], "error": f"analyze_failed: {err}"}
+            results.put((_MSG_DONE, worker_id, (index, file_result)))
+    finally:
+        backend.close()
+
+
+class _Worker:
+    def __init__(self, ctx: Any, worker_id: int, config: Dict[str, Any], max_cells: int, results: Any) -> None:
+        self.worker_id = worker_id
+        self.tasks = ctx.Queue()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(worker_id, config, max_cells, self.tasks, results),
+            daemon=True,
+        )
+        self.process.start()
+        self.current: Optional[int] = None
+        self.started_at = 0.0
+
+    def assign(self, index: int, file_path: str) -> None:
+        self.current = index
+        self.started_at = time.monotonic()
+        self.tasks.put((index, file_path))
+
+    def stop(self) -> None:
+        try:
+            self.tasks.put(None)
+        except Exception:
+            pass
+
+    def kill(self) -> None:
+        try:
+            self.process.terminate()
+            self.process.join(5)
+        except Exception:
+            pass
+
+
+def analyze_files_parallel(
+    config: Dict[str, Any],
+    files: List[str],
+    max_cells: int,
+    workers: int,
+    file_timeout: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    return list(iter_files_parallel(config, files, max_cells, workers, file_timeout))
+
+
+def iter_files_parallel(
+    config: Dict[str, Any],
+    files: List[str],
+    max_cells: int,
+    workers: int,
+    file_timeout: Optional[float] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Shard ``files`` across worker processes, one file in flight per worker.
+
+    Results are yielded in the order of ``files`` as soon as every earlier
+    file has finished, regardless of completion order. A file that raises, crashes its worker, or exceeds
+    ``file_timeout`` seconds is recorded with an ``error`` entry and its
+    worker is replaced; the rest of the run continues. A terminated COM
+    worker can leave its Excel process behind, as with any killed client.
+    """
+    ctx = mp.get_context("spawn")
+    results_q = ctx.Queue()
+    file_results: List[Optional[Dict[str, Any]]] = [None] * len(files)
+    next_out = 0
+    pending = list(range(len(files)))
+    pending.reverse()
+    next_id = 0
+
+    def spawn() -> _Worker:
+        nonlocal next_id
+        worker = _Worker(ctx, next_id, config, max_cells, results_q)
+        next_id += 1
+        return worker
+
+    pool: Dict[int, _Worker] = {}
+    idle: List[int] = []
+    for _ in range(max(1, min(workers, len(files)))):
+        w = spawn()
+        pool[w.worker_id] = w
+
+    def fail(index: int, reason: str) -> None:
+        file_results[index] = {"file": files[index], "sheets": [], "error": reason}
+
+    def dispatch() -> None:
+        while idle and pending:
+            worker = pool.get(idle.pop())
+            if worker is None:
+                continue
+            if not worker.process.is_alive():
+                # Died while idle; its replacement gets work once it reports ready
+                replace(worker)
+                continue
+            index = pending.pop()
+            worker.assign(index, files[index])
+
+    # Bound replacements so a worker that dies on startup cannot respawn forever
+    respawns_left = len(files) + workers
+
+    def replace(worker: _Worker) -> None:
+        nonlocal respawns_left
+        worker.kill()
+        pool.pop(worker.worker_id, None)
+        if worker.worker_id in idle:
+            idle.remove(worker.worker_id)
+        if pending and respawns_left > 0:
+            respawns_left -= 1
+            w = spawn()
+            pool[w.worker_id] = w
+
+    try:
+        while pool:
+            dispatch()
+            try:
+                kind, worker_id, payload = results_q.get(timeout=0.5)
+            except queue.Empty:
+                kind = None
+
+            if kind == _MSG_READY:
+                worker = pool.get(worker_id)
+                if worker is None:
+                    continue
+                if payload is not None:
+                    # Backend could not start (e.g. Excel unavailable): fail the rest loudly
+                    for index in pending:
+                        fail(index, payload)
+                    pending.clear()
+                    replace(worker)
+                    continue
+                idle.append(worker_id)
+            elif kind == _MSG_DONE:
+                index, file_result = payload
+                file_results[index] = file_result
+                worker = pool.get(worker_id)
+                if worker is not None:
+                    worker.current = None
+                    idle.append(worker_id)
+
+            now = time.monotonic()
+            for worker in list(pool.values()):
+                if worker.current is None:
+                    if not worker.process.is_alive():
+                        replace(worker)
+                    continue
+                if not worker.process.is_alive():
+                    fail(worker.current, f"worker_crashed: exit code {worker.process.exitcode}")
+                    replace(worker)
+                elif file_timeout and now - worker.started_at > file_timeout:
+                    fail(worker.current, f"timeout: exceeded {file_timeout:g}s")
+                    replace(worker)
+
+            while next_out < len(files) and file_results[next_out] is not None:
+                yield file_results[next_out]
+                file_results[next_out] = None
+                next_out += 1
+
+            if not pending and all(w.current is None for w in pool.values()):
+                break
+    finally:
+        for worker in pool.values():
+            worker.stop()
+        for worker in pool.values():
+            worker.process.join(10)
+            if worker.process.is_alive():
+                worker.kill()
+
+    for index in range(next_out, len(files)):
+        file_result = file_results[index]
+        if file_result is None:
+            file_result = {"file": files[index], "sheets": [], "error": "not_analyzed"}
+        yield file_result
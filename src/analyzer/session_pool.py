@@ -0,0 +1,208 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import win32com.client as win32
+except Exception:
+    win32 = None  # Allows linting on non-Windows or without pywin32
+
+XL_CALCULATION_MANUAL = -4135
+# Workbooks.Open(UpdateLinks=0): don't update external references
+XL_UPDATE_LINKS_NEVER = 0
+
+DEFAULT_RECYCLE_AFTER = 50
+DEFAULT_MAX_MEMORY_GROWTH_MB = 512.0
+
+
+def _dispatch_excel() -> Any:
+    if win32 is None:
+        raise RuntimeError("pywin32 is required to analyze Excel files on Windows.")
+    return win32.DispatchEx("Excel.Application")
+
+
+def excel_process_memory(app: Any) -> Optional[int]:
+    """Resident memory of the Excel process behind ``app`` in bytes, or None when it cannot be measured."""
+    try:
+        import psutil
+        import win32process
+
+        _thread_id, pid = win32process.GetWindowThreadProcessId(int(app.Hwnd))
+        return int(psutil.Process(pid).memory_info().rss)
+    except Exception:
+        return None
+
+
+class ExcelSession:
+    """One tuned Excel instance owned by an ExcelSessionPool."""
+
+    def __init__(self, session_id: int, app: Any, baseline_memory: Optional[int]) -> None:
+        self.session_id = session_id
+        self.app = app
+        self.started = time.monotonic()
+        self.baseline_memory = baseline_memory
+        self.files_opened = 0
+        self.open_workbooks = 0
+        # Excel refuses Calculation changes while no workbook is open; retried after the first Open
+        self.calculation_set = False
+
+
+class ExcelSessionPool:
+    """Pre-warmed Excel instances for reading many workbooks.
+
+    ``start`` launches ``size`` instances once and tunes them for reading:
+    hidden, alerts/events/screen updating off, manual calculation, no link
+    prompts. ``open_workbook`` hands each workbook to the least-used
+    instance and opens it read-only without updating links; an instance is
+    quit and replaced once it has opened ``recycle_after`` files or its
+    process grew by more than ``max_memory_growth_mb`` since it started.
+
+    ``factory`` creates an Excel Application (``DispatchEx`` by default, or a
+    fake for tests) and ``memory_probe(app)`` reports its memory in bytes
+    (None when unknown). Like any COM object, the pool is used from the
+    thread that started it.
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        recycle_after: int = DEFAULT_RECYCLE_AFTER,
+        max_memory_growth_mb: Optional[float] = DEFAULT_MAX_MEMORY_GROWTH_MB,
+        factory: Optional[Callable[[], Any]] = None,
+        memory_probe: Optional[Callable[[Any], Optional[int]]] = None,
+    ) -> None:
+        self.size = max(1, size)
+        self.recycle_after = recycle_after
+        self.max_memory_growth_mb = max_memory_growth_mb
+        self.factory = factory or _dispatch_excel
+        self.memory_probe = memory_probe or excel_process_memory
+        self.sessions: List[ExcelSession] = []
+        self.recycled = 0
+        self._next_id = 0
+        self._owners: Dict[int, ExcelSession] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def started(self) -> bool:
+        return bool(self.sessions)
+
+    def start(self) -> None:
+        with self._lock:
+            while len(self.sessions) < self.size:
+                self.sessions.append(self._launch())
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self.sessions:
+                self._quit(session)
+            self.sessions = []
+            self._owners.clear()
+
+    def __enter__(self) -> "ExcelSessionPool":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _launch(self) -> ExcelSession:
+        app = self.factory()
+        self._tune(app)
+        session = ExcelSession(self._next_id, app, self._memory(app))
+        self._next_id += 1
+        self._set_manual_calculation(session)
+        return session
+
+    def _tune(self, app: Any) -> None:
+        for name, value in (
+            ("Visible", False),
+            ("DisplayAlerts", False),
+            ("ScreenUpdating", False),
+            ("EnableEvents", False),
+            ("AskToUpdateLinks", False),
+        ):
+            try:
+                setattr(app, name, value)
+            except Exception:
+                pass
+
+    def _set_manual_calculation(self, session: ExcelSession) -> None:
+        if session.calculation_set:
+            return
+        try:
+            session.app.Calculation = XL_CALCULATION_MANUAL
+            session.calculation_set = True
+        except Exception:
+            pass
+
+    def _memory(self, app: Any) -> Optional[int]:
+        try:
+            return self.memory_probe(app)
+        except Exception:
+            return None
+
+    def _quit(self, session: ExcelSession) -> None:
+        try:
+            session.app.Quit()
+        except Exception:
+            pass
+
+    def _needs_recycle(self, session: ExcelSession) -> bool:
+        if session.open_workbooks:
+            return False
+        if self.recycle_after and session.files_opened >= self.recycle_after:
+            return True
+        if self.max_memory_growth_mb and session.baseline_memory is not None:
+            current = self._memory(session.app)
+            if current is not None and current - session.baseline_memory > self.max_memory_growth_mb * 1024 * 1024:
+                return True
+        return False
+
+    def _recycle(self, session: ExcelSession) -> ExcelSession:
+        self._quit(session)
+        fresh = self._launch()
+        self.sessions[self.sessions.index(session)] = fresh
+        self.recycled += 1
+        return fresh
+
+    def open_workbook(self, path: str) -> Any:
+        """Open ``path`` read-only on the least-used instance; close it with ``close_workbook``."""
+        if not self.sessions:
+            self.start()
+        with self._lock:
+            session = min(self.sessions, key=lambda s: (s.open_workbooks, s.files_opened))
+            if self._needs_recycle(session):
+                session = self._recycle(session)
+            session.open_workbooks += 1
+        try:
+            wb = session.app.Workbooks.Open(
+                os.path.abspath(path), UpdateLinks=XL_UPDATE_LINKS_NEVER, ReadOnly=True
+            )
+        except Exception:
+            with self._lock:
+                session.open_workbooks -= 1
+                session.files_opened += 1
+            raise
+        self._set_manual_calculation(session)
+        with self._lock:
+            self._owners[id(wb)] = session
+        return wb
+
+    def close_workbook(self, wb: Any) -> None:
+        with self._lock:
+            session = self._owners.pop(id(wb), None)
+        try:
+            wb.Close(SaveChanges=False)
+        finally:
+            if session is not None:
+                with self._lock:
+                    session.open_workbooks -= 1
+                    session.files_opened += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "instances": len(self.sessions),
+            "recycled": self.recycled,
+            "files_opened": [s.files_opened for s in self.sessions],
+        }
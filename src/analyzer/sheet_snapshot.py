@@ -0,0 +1,605 @@
+import datetime
+import re
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+# (top_row, left_col, num_rows, num_cols), same shape as pattern_analyzer._get_merge_area
+MergeTuple = Tuple[int, int, int, int]
+
+# Excel border index mapping
+# 1: xlEdgeLeft, 2: xlEdgeTop, 3: xlEdgeBottom, 4: xlEdgeRight
+BORDER_SIDES = {
+    1: "left",
+    2: "top",
+    3: "bottom",
+    4: "right",
+}
+XL_INSIDE_VERTICAL = 11
+
+# Shortest run of cells worth a uniform-style probe: a mixed pair costs its failed probe
+# on top of the two cell reads, more than a uniform pair saves
+MIN_STYLE_RUN = 3
+
+# Serial 0 of Excel's 1900 date system (1899-12-30 absorbs the phantom 1900-02-29)
+EXCEL_EPOCH = datetime.datetime(1899, 12, 30)
+
+
+@dataclass
+class SheetSnapshot:
+    """Backend-neutral picture of a sheet's used range.
+
+    Coordinates are absolute 1-based worksheet rows/columns. ``values`` is a
+    rows x cols grid of display strings; ``borders``/``fonts`` are only filled
+    when styles were requested.
+    """
+
+    name: str
+    first_row: int
+    first_col: int
+    rows: int
+    cols: int
+    values: List[List[str]]
+    merges: List[MergeTuple]
+    borders: Dict[Tuple[int, int], Dict[str, Dict[str, Any]]] = field(default_factory=dict)
+    fonts: Dict[Tuple[int, int], Dict[str, Any]] = field(default_factory=dict)
+
+    @property
+    def last_row(self) -> int:
+        return self.first_row + self.rows - 1
+
+    @property
+    def last_col(self) -> int:
+        return self.first_col + self.cols - 1
+
+    def iter_coords(self) -> Iterator[Tuple[int, int]]:
+        for r in range(self.first_row, self.last_row + 1):
+            for c in range(self.first_col, self.last_col + 1):
+                yield r, c
+
+    def value_at(self, row: int, col: int) -> str:
+        try:
+            return self.values[row - self.first_row][col - self.first_col]
+        except IndexError:
+            return ""
+
+    def merge_lookup(self) -> Dict[Tuple[int, int], MergeTuple]:
+        """Map every member cell of every merge area to its area."""
+        lookup: Dict[Tuple[int, int], MergeTuple] = {}
+        for area in self.merges:
+            top, left, nrows, ncols = area
+            for r in range(top, top + nrows):
+                for c in range(left, left + ncols):
+                    lookup[(r, c)] = area
+        return lookup
+
+
+def column_letter(col: int) -> str:
+    letters = ""
+    while col > 0:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def a1_address(row: int, col: int) -> str:
+    """Absolute A1 address as returned by Range.Address, e.g. ``$B$3``."""
+    return f"${column_letter(col)}${row}"
+
+
+def block_range(sheet: Any, r1: int, c1: int, r2: int, c2: int) -> Any:
+    """Range by A1 address: one COM call instead of Range(Cells(..), Cells(..))'s three."""
+    return sheet.Range(f"{column_letter(c1)}{r1}:{column_letter(c2)}{r2}")
+
+
+def format_value(value: Any) -> str:
+    """Approximate Range.Text for a raw Range.Value element, ignoring its number format (see ``format_number``)."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float):
+        if value.is_integer():
+            return str(int(value))
+        return repr(value)
+    return str(value)
+
+
+# Number format pieces: quoted text, escapes, [colour]/[$-locale] brackets, _x/*x padding, date/time codes
+_FORMAT_TOKEN = re.compile(
+    r'"[^"]*"|\\.|\[[^\]]*\]|_.|\*.|AM/PM|A/P|y{1,4}|m{1,5}|d{1,4}|h{1,2}|s{1,2}|E[+-]|.',
+    re.IGNORECASE,
+)
+_DIGIT = set("0#?")
+
+
+def _format_sections(number_format: str) -> List[str]:
+    sections, start, quoted = [], 0, False
+    for i, ch in enumerate(number_format):
+        if ch == '"':
+            quoted = not quoted
+        elif ch == ";" and not quoted and (i == 0 or number_format[i - 1] != "\\"):
+            sections.append(number_format[start:i])
+            start = i + 1
+    sections.append(number_format[start:])
+    return sections
+
+
+def _literal(token: str) -> Optional[str]:
+    """Text a non-placeholder token shows as, or None for a placeholder/code."""
+    if token.startswith('"'):
+        return token[1:-1]
+    if token.startswith("\\"):
+        return token[1:]
+    if token.startswith("["):
+        return ""
+    if token.startswith("_"):
+        return " "
+    if token.startswith("*"):
+        return ""
+    return None
+
+
+def _is_date_format(section: str) -> bool:
+    return any(
+        _literal(token) is None and token[0].lower() in "ydhsm" or token.upper() in ("AM/PM", "A/P")
+        for token in _FORMAT_TOKEN.findall(section)
+    )
+
+
+def _general_text(value: float) -> str:
+    # Up to ten significant digits, as in a default-width column
+    if float(value).is_integer() and abs(value) < 1e11:
+        return str(int(value))
+    return format(value, ".10G")
+
+
+def _date_text(moment: datetime.datetime, section: str) -> str:
+    tokens = _FORMAT_TOKEN.findall(section)
+    codes = [i for i, token in enumerate(tokens) if _literal(token) is None and token[0].lower() in "ymdhs"]
+    twelve_hour = any(token.upper() in ("AM/PM", "A/P") for token in tokens)
+    out: List[str] = []
+    for i, token in enumerate(tokens):
+        literal = _literal(token)
+        if literal is not None:
+            out.append(literal)
+            continue
+        code, lower = token.upper(), token.lower()
+        if code == "AM/PM":
+            out.append("AM" if moment.hour < 12 else "PM")
+        elif code == "A/P":
+            out.append("A" if moment.hour < 12 else "P")
+        elif lower[0] == "y":
+            out.append(f"{moment.year % 100:02d}" if len(token) <= 2 else f"{moment.year:04d}")
+        elif lower[0] == "m":
+            # m/mm right after an hour or right before a second are minutes
+            k = codes.index(i)
+            before = tokens[codes[k - 1]].lower()[0] if k > 0 else ""
+            after = tokens[codes[k + 1]].lower()[0] if k + 1 < len(codes) else ""
+            if len(token) <= 2 and (before == "h" or after == "s"):
+                out.append(f"{moment.minute:0{len(token)}d}")
+            elif len(token) <= 2:
+                out.append(f"{moment.month:0{len(token)}d}")
+            else:
+                name = moment.strftime("%B")
+                out.append(name[:1] if len(token) == 5 else name if len(token) == 4 else name[:3])
+        elif lower[0] == "d":
+            if len(token) <= 2:
+                out.append(f"{moment.day:0{len(token)}d}")
+            else:
+                out.append(moment.strftime("%A" if len(token) == 4 else "%a"))
+        elif lower[0] == "h":
+            hour = (moment.hour % 12 or 12) if twelve_hour else moment.hour
+            out.append(f"{hour:0{len(token)}d}")
+        elif lower[0] == "s":
+            out.append(f"{moment.second:0{len(token)}d}")
+        else:
+            out.append(token)
+    return "".join(out)
+
+
+def _number_text(value: float, section: str, signed: bool) -> str:
+    tokens = _FORMAT_TOKEN.findall(section)
+
+    def shown(token: str) -> str:
+        literal = _literal(token)
+        return token if literal is None else literal
+
+    places = [i for i, token in enumerate(tokens) if _literal(token) is None and token in _DIGIT]
+    if not places:
+        return "".join(shown(token) for token in tokens) or _general_text(value)
+    first = places[0]
+    exponent = next((i for i in range(first, len(tokens)) if tokens[i].upper() in ("E+", "E-")), None)
+    mantissa_end = exponent if exponent is not None else len(tokens)
+    last = max(i for i in places if i < mantissa_end)
+    core = "".join(token for token in tokens[first : last + 1] if token in _DIGIT or token in ".,")
+    # Commas right after the last digit scale by a thousand each
+    while last + 1 < mantissa_end and tokens[last + 1] == ",":
+        value /= 1000
+        last += 1
+    if exponent is not None:
+        last = exponent + sum(1 for token in tokens[exponent + 1 :] if token in _DIGIT)
+    if "%" in tokens:
+        value *= 100
+    integer, _dot, fraction = core.partition(".")
+    max_places = sum(1 for ch in fraction if ch in _DIGIT)
+    min_places = fraction.count("0")
+
+    if exponent is not None:
+        digits = sum(1 for token in tokens[exponent + 1 :] if token in _DIGIT)
+        mantissa, _e, power = format(abs(value), f".{max_places}E").partition("E")
+        power_sign = "-" if power.startswith("-") else ("+" if tokens[exponent][1] == "+" else "")
+        body = f"{mantissa}{tokens[exponent][0]}{power_sign}{abs(int(power)):0{max(digits, 1)}d}"
+    else:
+        # Excel rounds halves away from zero
+        rounded = Decimal(repr(abs(value))).quantize(Decimal(1).scaleb(-max_places), rounding=ROUND_HALF_UP)
+        body = format(rounded, f"{',' if ',' in integer else ''}.{max_places}f")
+        if max_places > min_places:
+            # Optional places drop trailing zeros; the point stays ("#.##" shows 5 as "5.")
+            whole, _dot, decimals = body.partition(".")
+            body = f"{whole}.{decimals.rstrip('0').ljust(min_places, '0')}"
+        if "0" not in integer and (body == "0" or body.startswith("0.")):
+            body = body[1:]
+    prefix = "".join(shown(token) for token in tokens[:first])
+    suffix = "".join(shown(token) for token in tokens[last + 1 :])
+    return f"{'-' if signed and value < 0 else ''}{prefix}{body}{suffix}"
+
+
+def format_number(value: Any, number_format: Optional[str]) -> str:
+    """Range.Text of a number or date ``value`` shown with ``number_format``.
+
+    Covers the formats tables use: General, digit placeholders with
+    thousands separators, percent, scientific, literal text and colours in
+    up to three sections, and date/time codes. Anything else (fractions,
+    elapsed time, column-width effects) is approximated, and a value that
+    is not a number or date goes through ``format_value``.
+    """
+    if isinstance(value, datetime.datetime):
+        moment = value.replace(tzinfo=None)
+        serial = (moment - EXCEL_EPOCH).total_seconds() / 86400.0
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        moment, serial = None, float(value)
+    else:
+        return format_value(value)
+    if not number_format or number_format in ("General", "@"):
+        if moment is None:
+            return _general_text(serial)
+        return _date_text(moment, "m/d/yyyy h:mm" if moment.time() != datetime.time() else "m/d/yyyy")
+    sections = _format_sections(number_format)
+    section, signed = sections[0], True
+    if serial < 0 and len(sections) > 1:
+        section, signed = sections[1], False
+    elif serial == 0 and len(sections) > 2:
+        section = sections[2]
+    if _is_date_format(section):
+        if moment is None:
+            if not 0 <= serial < 2958466:
+                return "#" * 8
+            moment = EXCEL_EPOCH + datetime.timedelta(days=serial)
+            # Excel shows the nearest second
+            moment = (moment + datetime.timedelta(microseconds=500000)).replace(microsecond=0)
+        return _date_text(moment, section)
+    if section.strip().lower() == "general":
+        return _general_text(serial)
+    return _number_text(serial if signed else abs(serial), section, signed)
+
+
+def _to_grid(raw: Any, rows: int, cols: int) -> List[List[Any]]:
+    # Range.Value returns a scalar for a single cell and a tuple of row tuples otherwise
+    if rows == 1 and cols == 1 and not isinstance(raw, tuple):
+        return [[raw]]
+    return [list(row_values) for row_values in raw or ()]
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float, datetime.datetime)) and not isinstance(value, bool)
+
+
+def _column_formats(sheet: Any, first_row: int, col: int, rows: Sequence[int], out: Dict[int, Optional[str]]) -> None:
+    """Fill out[row] with NumberFormat for rows of one column, one read per uniform stretch (bisecting)."""
+    try:
+        if len(rows) == 1:
+            shared = sheet.Cells(first_row + rows[0], col).NumberFormat
+        else:
+            shared = block_range(sheet, first_row + rows[0], col, first_row + rows[-1], col).NumberFormat
+    except Exception:
+        shared = None
+    if shared is not None or len(rows) == 1:
+        for row in rows:
+            out[row] = shared
+        return
+    mid = len(rows) // 2
+    _column_formats(sheet, first_row, col, rows[:mid], out)
+    _column_formats(sheet, first_row, col, rows[mid:], out)
+
+
+def _display_grid(sheet: Any, first_row: int, first_col: int, raw: List[List[Any]]) -> List[List[str]]:
+    """Range.Text-like strings for a Range.Value grid: numbers and dates through their NumberFormat."""
+    grid = [[format_value(v) for v in row_values] for row_values in raw]
+    numeric: Dict[int, List[int]] = {}
+    for i, row_values in enumerate(raw):
+        for j, value in enumerate(row_values):
+            if _is_number(value):
+                numeric.setdefault(j, []).append(i)
+    for j, rows in numeric.items():
+        formats: Dict[int, Optional[str]] = {}
+        _column_formats(sheet, first_row, first_col + j, rows, formats)
+        for i in rows:
+            grid[i][j] = format_number(raw[i][j], formats[i])
+    return grid
+
+
+def read_cell_border(cell: Any, idx: int) -> Dict[str, Any]:
+    """One side (``BORDER_SIDES`` index) of a cell's borders, one read per property."""
+    try:
+        b = cell.Borders(idx)
+        line_style, weight, color = b.LineStyle, b.Weight, b.Color
+        return {
+            "line_style": int(line_style) if line_style is not None else None,
+            "weight": int(weight) if weight is not None else None,
+            "color": int(color) if color is not None else None,
+        }
+    except Exception as _:
+        return {"error": "border_read_failed"}
+
+
+def read_cell_borders(cell: Any) -> Dict[str, Dict[str, Any]]:
+    return {name: read_cell_border(cell, idx) for idx, name in BORDER_SIDES.items()}
+
+
+def read_cell_font(cell: Any) -> Dict[str, Any]:
+    try:
+        f = cell.Font
+        return {
+            "name": str(getattr(f, "Name", "")),
+            "size": int(getattr(f, "Size", 0) or 0),
+            "bold": bool(getattr(f, "Bold", False)),
+            "italic": bool(getattr(f, "Italic", False)),
+            "color": int(getattr(f, "Color", 0) or 0),
+        }
+    except Exception as _:
+        return {"error": "font_read_failed"}
+
+
+def _uniform_border(rng: Any, idx: int) -> Optional[Dict[str, Any]]:
+    """Border of a multi-cell range, or None when it differs across the range."""
+    b = rng.Borders(idx)
+    line_style = b.LineStyle
+    if line_style is None:
+        return None
+    weight = b.Weight
+    if weight is None:
+        return None
+    color = b.Color
+    if color is None:
+        return None
+    return {"line_style": int(line_style), "weight": int(weight), "color": int(color)}
+
+
+def _uniform_font(rng: Any) -> Optional[Dict[str, Any]]:
+    f = rng.Font
+    name, size, bold, italic, color = f.Name, f.Size, f.Bold, f.Italic, f.Color
+    if None in (name, size, bold, italic, color):
+        return None
+    return {
+        "name": str(name),
+        "size": int(size or 0),
+        "bold": bool(bold),
+        "italic": bool(italic),
+        "color": int(color or 0),
+    }
+
+
+def read_uniform_run_border(rng: Any, idx: int) -> Optional[Dict[str, Any]]:
+    """One side (``BORDER_SIDES`` index) shared by every cell of a one-row range, or None if it differs.
+
+    The left and right sides of the cells are the outer edge plus the
+    inside-vertical edges, so those must agree.
+    """
+    if idx in (2, 3):
+        return _uniform_border(rng, idx)
+    inside = _uniform_border(rng, XL_INSIDE_VERTICAL)
+    if inside is None or _uniform_border(rng, idx) != inside:
+        return None
+    return inside
+
+
+def _uniform_verticals(rng: Any) -> Optional[Dict[str, Any]]:
+    """Left/right border shared by every cell of a one-row range: outer and inside-vertical edges agree."""
+    inside = _uniform_border(rng, XL_INSIDE_VERTICAL)
+    if inside is None or _uniform_border(rng, 1) != inside or _uniform_border(rng, 4) != inside:
+        return None
+    return inside
+
+
+# Parts of a run's style probed with range reads, in probing order
+_RUN_PARTS: Tuple[Tuple[str, Callable[[Any], Optional[Dict[str, Any]]]], ...] = (
+    ("top", lambda rng: _uniform_border(rng, 2)),
+    ("bottom", lambda rng: _uniform_border(rng, 3)),
+    ("vertical", _uniform_verticals),
+    ("font", _uniform_font),
+)
+
+
+def _read_run_styles(
+    sheet: Any, row: int, c1: int, c2: int, snapshot: "SheetSnapshot", known: Optional[Dict[str, Any]] = None
+) -> None:
+    """Read styles for cells row[c1..c2] with one set of range reads per uniform run.
+
+    A run is uniform when its top/bottom edges, its inside-vertical edge and
+    both outer edges agree, and its font has no mixed properties; every cell
+    in it then shares one style. Mixed runs are bisected, and the parts found
+    uniform over a run (``known``) are not read again for its halves; runs
+    shorter than ``MIN_STYLE_RUN`` are read cell by cell since probing them
+    costs as much.
+    """
+    known = dict(known or {})
+    if c2 - c1 + 1 < MIN_STYLE_RUN:
+        for c in range(c1, c2 + 1):
+            cell = sheet.Cells(row, c)
+            borders = {}
+            for idx, name in BORDER_SIDES.items():
+                part = "vertical" if name in ("left", "right") else name
+                borders[name] = known[part] if part in known else read_cell_border(cell, idx)
+            snapshot.borders[(row, c)] = borders
+            snapshot.fonts[(row, c)] = known["font"] if "font" in known else read_cell_font(cell)
+        return
+
+    try:
+        rng = block_range(sheet, row, c1, row, c2)
+        for part, read in _RUN_PARTS:
+            if part not in known:
+                shared = read(rng)
+                if shared is None:
+                    break
+                known[part] = shared
+    except Exception:
+        pass
+
+    if len(known) == len(_RUN_PARTS):
+        vertical = known["vertical"]
+        borders = {"left": vertical, "top": known["top"], "bottom": known["bottom"], "right": vertical}
+        for c in range(c1, c2 + 1):
+            snapshot.borders[(row, c)] = borders
+            snapshot.fonts[(row, c)] = known["font"]
+        return
+
+    mid = (c1 + c2) // 2
+    _read_run_styles(sheet, row, c1, mid, snapshot, known)
+    _read_run_styles(sheet, row, mid + 1, c2, snapshot, known)
+
+
+def read_region_styles(sheet: Any, snapshot: "SheetSnapshot") -> None:
+    """Fill styles for one representative per region instead of every cell.
+
+    Each merge area is read once (perimeter borders from the MergeArea range,
+    font from its top-left cell) and stored at its top-left coordinate;
+    non-merged cells are read per uniform run by ``_read_run_styles``.
+    """
+    merge_lookup = snapshot.merge_lookup()
+    for top, left, nrows, ncols in snapshot.merges:
+        area = block_range(sheet, top, left, top + nrows - 1, left + ncols - 1)
+        snapshot.borders[(top, left)] = read_cell_borders(area)
+        snapshot.fonts[(top, left)] = read_cell_font(sheet.Cells(top, left))
+
+    for r in range(snapshot.first_row, snapshot.last_row + 1):
+        run_start: Optional[int] = None
+        for c in range(snapshot.first_col, snapshot.last_col + 2):
+            free = c <= snapshot.last_col and (r, c) not in merge_lookup
+            if free and run_start is None:
+                run_start = c
+            elif not free and run_start is not None:
+                _read_run_styles(sheet, r, run_start, c - 1, snapshot)
+                run_start = None
+
+
+def _merge_state(rng: Any) -> Optional[bool]:
+    """Range.MergeCells: True if all cells merged, False if none, None if mixed."""
+    state = rng.MergeCells
+    if state is None:
+        return None
+    return bool(state)
+
+
+def _scan_row_segment(
+    sheet: Any,
+    row: int,
+    c1: int,
+    c2: int,
+    covered: Set[Tuple[int, int]],
+    merges: List[MergeTuple],
+) -> None:
+    # Skip cells already claimed by a merge area found on an earlier row/segment
+    while c1 <= c2 and (row, c1) in covered:
+        c1 += 1
+    while c2 >= c1 and (row, c2) in covered:
+        c2 -= 1
+    if c1 > c2:
+        return
+
+    if c1 < c2:
+        state = _merge_state(block_range(sheet, row, c1, row, c2))
+        if state is False:
+            return
+        if state is None:
+            mid = (c1 + c2) // 2
+            _scan_row_segment(sheet, row, c1, mid, covered, merges)
+            _scan_row_segment(sheet, row, mid + 1, c2, covered, merges)
+            return
+        # Every cell is merged: take the first cell's area, then scan what it leaves of the segment
+        cell = sheet.Cells(row, c1)
+    else:
+        cell = sheet.Cells(row, c1)
+        if not bool(cell.MergeCells):
+            return
+    area = cell.MergeArea
+    top = int(area.Row)
+    left = int(area.Column)
+    nrows = int(area.Rows.Count)
+    ncols = int(area.Columns.Count)
+    merges.append((top, left, nrows, ncols))
+    for r in range(top, top + nrows):
+        for c in range(left, left + ncols):
+            covered.add((r, c))
+    if left + ncols <= c2:
+        _scan_row_segment(sheet, row, left + ncols, c2, covered, merges)
+
+
+def enumerate_com_merges(sheet: Any, first_row: int, first_col: int, rows: int, cols: int) -> List[MergeTuple]:
+    """List each distinct merge area intersecting the block exactly once.
+
+    Range.MergeCells on a multi-cell range answers "none/all/mixed" in one
+    call, so merge-free rows and column segments are discarded wholesale,
+    mixed segments are bisected, and a fully merged segment is resolved from
+    its first cell's ``MergeArea``.
+    """
+    merges: List[MergeTuple] = []
+    if rows <= 0 or cols <= 0:
+        return merges
+    last_row = first_row + rows - 1
+    last_col = first_col + cols - 1
+    block = block_range(sheet, first_row, first_col, last_row, last_col)
+    if _merge_state(block) is False:
+        return merges
+
+    covered: Set[Tuple[int, int]] = set()
+    for r in range(first_row, last_row + 1):
+        _scan_row_segment(sheet, r, first_col, last_col, covered, merges)
+    return merges
+
+
+def snapshot_com_sheet(sheet: Any, include_styles: bool = False, style_regions: bool = False) -> SheetSnapshot:
+    """Capture a worksheet's UsedRange with a handful of bulk COM calls.
+
+    Values come from a single ``UsedRange.Value`` read and merge areas are
+    enumerated once per distinct area. Numbers and dates are shown through
+    their ``NumberFormat`` like ``Range.Text`` (see ``format_number``), read
+    once per column stretch that shares it. Borders and fonts have no bulk COM
+    accessor, so with ``include_styles`` every cell's style is read once per
+    uniform run of its row, or with ``style_regions`` once per merge area /
+    uniform run of non-merged cells (see ``read_region_styles``).
+    """
+    used_range = sheet.UsedRange
+    first_row = int(used_range.Row)
+    first_col = int(used_range.Column)
+    rows = int(used_range.Rows.Count)
+    cols = int(used_range.Columns.Count)
+
+    values = _display_grid(sheet, first_row, first_col, _to_grid(used_range.Value, rows, cols))
+    merges = enumerate_com_merges(sheet, first_row, first_col, rows, cols)
+    snapshot = SheetSnapshot(
+        name=str(sheet.Name),
+        first_row=first_row,
+        first_col=first_col,
+        rows=rows,
+        cols=cols,
+        values=values,
+        merges=merges,
+    )
+
+    if include_styles and style_regions:
+        read_region_styles(sheet, snapshot)
+    elif include_styles:
+        for r in range(snapshot.first_row, snapshot.last_row + 1):
+            _read_run_styles(sheet, r, snapshot.first_col, snapshot.last_col, snapshot)
+    return snapshot
@@ -0,0 +1,219 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from row_plan import CategoryStamp, InsertStep, RowPlan, RowStyles
+from sheet_structure import HARD_CAP_COLS, WINDOW_ROWS_ABOVE, WINDOW_ROWS_BELOW, SheetStructure, read_row_signature
+
+# Sheets remembered at once (one entry per workbook/sheet the user clicks in)
+DEFAULT_MAX_SHEETS = 8
+
+SheetKey = Tuple[str, str]
+
+
+def _sheet_key(ws: Any) -> Optional[SheetKey]:
+    try:
+        return str(ws.Parent.Name), str(ws.Name)
+    except Exception:
+        return None
+
+
+def _fingerprint(ws: Any) -> Optional[str]:
+    # Cheap structural check: rows/columns added or removed by hand change the used range
+    try:
+        return str(ws.UsedRange.Address)
+    except Exception:
+        return None
+
+
+class _Entry:
+    def __init__(self, structure: SheetStructure, fingerprint: Optional[str]) -> None:
+        self.structure = structure
+        self.fingerprint = fingerprint
+        # Add New Category template rows by header row
+        self.stamps: Dict[int, CategoryStamp] = {}
+        # Anchor row read ahead by warm(); the next structure_for there skips its refresh
+        self.warm_row: Optional[int] = None
+
+
+class CategoryContextCache:
+    """SheetStructure models kept between RowInserter operations, one per worksheet.
+
+    Clicking repeatedly in one table resolves the same header, template row,
+    width and vertical merges from the same rows, so the model (merge index,
+    values, window) is built once and reused. Entries are keyed by
+    workbook/sheet name and checked against the used-range address;
+    ``note_inserted`` keeps an entry valid across the operation's own row
+    inserts (the model itself is shifted by ``SheetStructure.insert_rows``).
+    A reused model re-reads its values, checks its merges and forgets
+    cached styles, so text, formatting and merges changed by hand in
+    between are seen (see ``SheetStructure.refresh``).
+
+    Each entry also keeps the CategoryStamp of the tables Add New Category
+    was used in, so the next new category there plans against the stamped
+    header and data rows instead of reading them again. Stamps are shifted
+    by the operations' inserts, dropped when an operation writes next to
+    them and with the entry when the used range changes by hand. Before a
+    stamp is used each of its rows is checked with one style-signature
+    read, so rows reformatted by hand in between drop it (within the limits
+    of ``read_row_signature``).
+
+    ``warm`` reads a model ahead of the next operation (see
+    SelectionPrefetcher); that operation then uses it as read, with only
+    the rows reported through ``note_changed`` re-read. ``cool`` withdraws
+    warm models when the selection moves.
+    """
+
+    def __init__(self, max_sheets: int = DEFAULT_MAX_SHEETS) -> None:
+        self.max_sheets = max_sheets
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[SheetKey, _Entry]" = OrderedDict()
+
+    def structure_for(self, ws: Any, anchor_row: int) -> SheetStructure:
+        key = _sheet_key(ws)
+        fingerprint = _fingerprint(ws)
+        entry = self._entries.get(key) if key is not None else None
+        if (
+            entry is not None
+            and fingerprint is not None
+            and entry.fingerprint == fingerprint
+            and entry.structure.covers(anchor_row)
+        ):
+            self._entries.move_to_end(key)
+            entry.structure.ws = ws
+            if entry.warm_row != anchor_row:
+                entry.structure.refresh()
+            entry.warm_row = None
+            self.hits += 1
+            return entry.structure
+
+        self.misses += 1
+        structure = SheetStructure.build(ws, anchor_row=anchor_row)
+        if key is not None:
+            new_entry = _Entry(structure, fingerprint)
+            # Only the window moved: the stamped rows are as they were
+            if entry is not None and fingerprint is not None and entry.fingerprint == fingerprint:
+                new_entry.stamps = entry.stamps
+            self._entries[key] = new_entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_sheets:
+                self._entries.popitem(last=False)
+        return structure
+
+    def warm(self, ws: Any, anchor_row: int) -> SheetStructure:
+        """The model for ``anchor_row``, kept as read for the next structure_for at that row."""
+        structure = self.structure_for(ws, anchor_row)
+        key = _sheet_key(ws)
+        entry = self._entries.get(key) if key is not None else None
+        if entry is not None:
+            entry.warm_row = anchor_row
+        return structure
+
+    def cool(self) -> None:
+        """Refresh every model on its next use again (the selection moved since it was warmed)."""
+        for entry in self._entries.values():
+            entry.warm_row = None
+
+    def note_changed(self, ws: Any, first_row: int, last_row: int) -> None:
+        """Re-read rows first_row..last_row changed on the sheet since the model was read."""
+        key = _sheet_key(ws)
+        entry = self._entries.get(key) if key is not None else None
+        if entry is None:
+            return
+        entry.structure.refresh_rows(first_row, last_row)
+        entry.stamps = {
+            stamp.header_row: stamp for stamp in entry.stamps.values() if not stamp.touches(first_row, last_row)
+        }
+
+    def stamp_rows(self, ws: Any, anchor_row: int) -> Dict[int, RowStyles]:
+        """Styles of the stamped rows an operation at anchor_row can use, for RowPlanner.preload.
+
+        Only stamps within the rows the operation searches are considered;
+        one whose rows no longer match their signatures is dropped.
+        """
+        key = _sheet_key(ws)
+        entry = self._entries.get(key) if key is not None else None
+        rows: Dict[int, RowStyles] = {}
+        if entry is None:
+            return rows
+        first_row, last_row = anchor_row - WINDOW_ROWS_ABOVE, anchor_row + WINDOW_ROWS_BELOW
+        # (row, signature) -> matches the sheet; a row stamped twice is read once per kind of signature
+        checked: Dict[Tuple[int, Any], bool] = {}
+        for header_row, stamp in list(entry.stamps.items()):
+            if not stamp.touches(first_row, last_row):
+                continue
+            for row, styles in stamp.rows.items():
+                key = (row, styles.signature)
+                if key not in checked:
+                    signature = read_row_signature(ws, row, styles.max_cols, formats=bool(styles.formats))
+                    checked[key] = signature is not None and signature == styles.signature
+                if not checked[key]:
+                    del entry.stamps[header_row]
+                    break
+            else:
+                for row, styles in stamp.rows.items():
+                    # A row stamped by two categories: keep the copy with formats
+                    if row not in rows or styles.formats:
+                        rows[row] = styles
+        return rows
+
+    def store_stamp(self, ws: Any, stamp: CategoryStamp) -> None:
+        """Remember ``stamp`` (in the sheet's rows after the operation, i.e. after note_inserted).
+
+        Reads each row's signature from the sheet as the operation left it.
+        """
+        key = _sheet_key(ws)
+        entry = self._entries.get(key) if key is not None else None
+        if entry is None:
+            return
+        for row, styles in stamp.rows.items():
+            styles.signature = read_row_signature(ws, row, styles.max_cols, formats=bool(styles.formats))
+        entry.stamps[stamp.header_row] = stamp
+
+    def note_inserted(self, ws: Any, plans: Sequence[RowPlan] = ()) -> None:
+        """Record the sheet's used range after an operation inserted rows through the cached model.
+
+        ``plans`` are the operation's committed plans: stamps move with its
+        inserts and are dropped where it wrote next to them.
+        """
+        key = _sheet_key(ws)
+        entry = self._entries.get(key) if key is not None else None
+        if entry is None:
+            return
+        for plan in plans:
+            inserts = [step for step in plan.steps if isinstance(step, InsertStep)]
+            for step in inserts:
+                for stamp in entry.stamps.values():
+                    stamp.insert_rows(step.at, step.count)
+            # Stamps are keyed by their (possibly shifted) header row
+            entry.stamps = {stamp.header_row: stamp for stamp in entry.stamps.values()}
+            if len(inserts) == len(plan.steps):
+                # Inserting leaves the existing rows' styles as they were
+                continue
+            # Shared edges reach one row past each side of the plan
+            entry.stamps = {
+                header_row: stamp
+                for header_row, stamp in entry.stamps.items()
+                if not stamp.touches(plan.first_row - 1, plan.last_row + 1)
+            }
+        try:
+            used = ws.UsedRange
+            fingerprint = str(used.Address)
+            used_cols = min(int(used.Columns.Count), HARD_CAP_COLS)
+        except Exception:
+            self._entries.pop(key, None)
+            return
+        # Formatting the new rows can widen the used range; past the model's columns it must be rebuilt
+        if used_cols > entry.structure.cols:
+            self._entries.pop(key, None)
+            return
+        entry.structure.used_cols = used_cols
+        entry.fingerprint = fingerprint
+
+    def forget(self, ws: Any) -> None:
+        key = _sheet_key(ws)
+        if key is not None:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,280 @@
+import contextlib
+import inspect
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+_THIS_FILE = os.path.abspath(__file__)
+
+# COM type of the object returned by a property/method, for readable labels
+_RESULT_TYPES = {
+    "Application": "Application",
+    "ActiveWorkbook": "Workbook",
+    "ActiveSheet": "Worksheet",
+    "ActiveCell": "Range",
+    "Selection": "Range",
+    "Workbooks": "Workbooks",
+    "Worksheets": "Sheets",
+    "Sheets": "Sheets",
+    "Parent": "Object",
+    "Cells": "Range",
+    "Range": "Range",
+    "Rows": "Range",
+    "Columns": "Range",
+    "UsedRange": "Range",
+    "MergeArea": "Range",
+    "EntireRow": "Range",
+    "EntireColumn": "Range",
+    "Resize": "Range",
+    "Offset": "Range",
+    "Borders": "Borders",
+    "Font": "Font",
+    "Interior": "Interior",
+}
+# Calling a collection returns one of its items
+_ITEM_TYPES = {"Borders": "Border", "Sheets": "Worksheet", "Workbooks": "Workbook"}
+
+_PRIMITIVES = (str, int, float, bool, bytes, tuple, list, type(None))
+
+# (call stack outermost-first, member such as "Range.Borders", kind get/set/call)
+EventKey = Tuple[Tuple[str, ...], str, str]
+
+
+def _call_stack() -> Tuple[str, ...]:
+    """Repo functions on the current stack, outermost first, as "module.qualname"."""
+    frames: List[str] = []
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        path = os.path.abspath(filename)
+        if not filename.startswith("<") and path != _THIS_FILE and path.startswith(_SRC_DIR):
+            module = os.path.splitext(os.path.relpath(path, _SRC_DIR))[0].replace(os.sep, ".")
+            name = getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+            frames.append(f"{module}.{name}")
+        frame = frame.f_back
+    frames.reverse()
+    return tuple(frames)
+
+
+class OperationProfile:
+    """COM events recorded during one operation (e.g. one button press)."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.started = time.time()
+        self.wall_seconds = 0.0
+        self.counts: Dict[EventKey, int] = defaultdict(int)
+        self.seconds: Dict[EventKey, float] = defaultdict(float)
+
+    def record(self, stack: Tuple[str, ...], member: str, kind: str, seconds: float) -> None:
+        key = (stack, member, kind)
+        self.counts[key] += 1
+        self.seconds[key] += seconds
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def com_seconds(self) -> float:
+        return sum(self.seconds.values())
+
+    def flat_rows(self) -> List[Dict[str, Any]]:
+        """One row per (call site, member, kind), slowest first; the call site is the innermost repo function."""
+        merged: Dict[Tuple[str, str, str], List[float]] = {}
+        for (stack, member, kind), count in self.counts.items():
+            site = stack[-1] if stack else "<unknown>"
+            entry = merged.setdefault((site, member, kind), [0, 0.0])
+            entry[0] += count
+            entry[1] += self.seconds[(stack, member, kind)]
+        rows = [
+            {"call_site": site, "member": member, "kind": kind, "calls": int(n), "seconds": secs}
+            for (site, member, kind), (n, secs) in merged.items()
+        ]
+        rows.sort(key=lambda r: (-r["seconds"], -r["calls"]))
+        return rows
+
+    def summary(self) -> str:
+        return (
+            f"{self.name}: wall {self.wall_seconds * 1000.0:.1f} ms, "
+            f"COM {self.com_seconds * 1000.0:.1f} ms in {self.total_calls} calls"
+        )
+
+    def format_flat(self) -> str:
+        lines = [
+            self.summary(),
+            "",
+            f"{'ms':>9} {'calls':>7} {'us/call':>9}  {'kind':<4} {'member':<28} call site",
+        ]
+        for row in self.flat_rows():
+            per_call = row["seconds"] / row["calls"] * 1e6 if row["calls"] else 0.0
+            lines.append(
+                f"{row['seconds'] * 1000.0:>9.2f} {row['calls']:>7} {per_call:>9.1f}  "
+                f"{row['kind']:<4} {row['member']:<28} {row['call_site']}"
+            )
+        return "\n".join(lines) + "\n"
+
+    def collapsed_stacks(self) -> List[str]:
+        """flamegraph.pl/speedscope "collapsed" lines weighted by microseconds spent in COM."""
+        lines = []
+        for key in sorted(self.counts):
+            stack, member, kind = key
+            frames = [self.name] + list(stack) + [f"{member} ({kind})"]
+            micros = max(1, int(round(self.seconds[key] * 1e6)))
+            lines.append(";".join(f.replace(";", ":") for f in frames) + f" {micros}")
+        return lines
+
+
+class ComProfiler:
+    """Opt-in recorder for COM traffic, fed by ``ComProxy`` objects.
+
+    Wrap the Application/Worksheet/Range objects with ``wrap`` and group the
+    work of one button press with ``operation(name)``. Each finished
+    operation is kept in ``profiles`` and, when ``out_dir`` is set, written
+    as a flat table (``.txt``) and a collapsed-stack file (``.folded``).
+    """
+
+    def __init__(self, out_dir: Optional[str] = None) -> None:
+        self.out_dir = out_dir
+        self.profiles: List[OperationProfile] = []
+        self._current: Optional[OperationProfile] = None
+
+    def wrap(self, obj: Any, type_name: str = "Object") -> Any:
+        if isinstance(obj, _PRIMITIVES) or isinstance(obj, ComProxy):
+            return obj
+        return ComProxy(obj, self, type_name)
+
+    def record(self, member: str, kind: str, seconds: float) -> None:
+        # Traffic outside an operation (e.g. attaching to Excel) is not profiled
+        if self._current is not None:
+            self._current.record(_call_stack(), member, kind, seconds)
+
+    @contextlib.contextmanager
+    def operation(self, name: str) -> Iterator[OperationProfile]:
+        profile = OperationProfile(name)
+        previous = self._current
+        self._current = profile
+        start = time.perf_counter()
+        try:
+            yield profile
+        finally:
+            profile.wall_seconds = time.perf_counter() - start
+            self._current = previous
+            self.profiles.append(profile)
+            if self.out_dir:
+                try:
+                    self.write_profile(profile, self.out_dir)
+                except Exception:
+                    pass
+
+    def write_profile(self, profile: OperationProfile, out_dir: str) -> Tuple[str, str]:
+        os.makedirs(out_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(profile.started))
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", profile.name)
+        stem = os.path.join(out_dir, f"{stamp}_{safe_name}_{len(self.profiles)}")
+        table_path = stem + ".txt"
+        folded_path = stem + ".folded"
+        with open(table_path, "w", encoding="utf-8") as f:
+            f.write(profile.format_flat())
+        with open(folded_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(profile.collapsed_stacks()) + "\n")
+        return table_path, folded_path
+
+
+def profile_operation(profiler: Optional[ComProfiler], name: str) -> Any:
+    """``profiler.operation(name)``, or a no-op context when profiling is off."""
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.operation(name)
+
+
+def _unwrap(value: Any) -> Any:
+    if isinstance(value, ComProxy):
+        return object.__getattribute__(value, "_target")
+    return value
+
+
+class _MethodProxy:
+    """A COM method fetched through a ComProxy; the call itself is timed."""
+
+    def __init__(self, method: Any, profiler: ComProfiler, member: str, result_type: str) -> None:
+        self._method = method
+        self._profiler = profiler
+        self._member = member
+        self._result_type = result_type
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        args = tuple(_unwrap(a) for a in args)
+        kwargs = {k: _unwrap(v) for k, v in kwargs.items()}
+        start = time.perf_counter()
+        try:
+            result = self._method(*args, **kwargs)
+        finally:
+            self._profiler.record(self._member, "call", time.perf_counter() - start)
+        return self._profiler.wrap(result, self._result_type)
+
+
+class ComProxy:
+    """Transparent wrapper around a COM object that reports every get/set/call to a ComProfiler.
+
+    Results that are themselves COM objects come back wrapped too, so
+    ``ws.Cells(r, c).Borders(3).LineStyle`` is recorded as three events.
+    Proxies passed back into COM calls (``ws.Range(c1, c2)``) are unwrapped.
+    """
+
+    def __init__(self, target: Any, profiler: ComProfiler, type_name: str) -> None:
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_profiler", profiler)
+        object.__setattr__(self, "_type_name", type_name)
+
+    def __getattr__(self, name: str) -> Any:
+        target = object.__getattribute__(self, "_target")
+        profiler = object.__getattribute__(self, "_profiler")
+        member = f"{object.__getattribute__(self, '_type_name')}.{name}"
+        result_type = _RESULT_TYPES.get(name, name)
+        start = time.perf_counter()
+        value = getattr(target, name)
+        elapsed = time.perf_counter() - start
+        if inspect.ismethod(value) or inspect.isfunction(value) or inspect.isbuiltin(value):
+            # Bound method: the COM round trip happens when it is called
+            return _MethodProxy(value, profiler, member, result_type)
+        profiler.record(member, "get", elapsed)
+        return profiler.wrap(value, result_type)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        target = object.__getattribute__(self, "_target")
+        profiler = object.__getattribute__(self, "_profiler")
+        member = f"{object.__getattribute__(self, '_type_name')}.{name}"
+        start = time.perf_counter()
+        try:
+            setattr(target, name, _unwrap(value))
+        finally:
+            profiler.record(member, "set", time.perf_counter() - start)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        # Default member, e.g. ws.Rows(5) or rng.Borders(3)
+        target = object.__getattribute__(self, "_target")
+        profiler = object.__getattribute__(self, "_profiler")
+        type_name = object.__getattribute__(self, "_type_name")
+        args = tuple(_unwrap(a) for a in args)
+        kwargs = {k: _unwrap(v) for k, v in kwargs.items()}
+        start = time.perf_counter()
+        try:
+            result = target(*args, **kwargs)
+        finally:
+            profiler.record(f"{type_name}.Item", "call", time.perf_counter() - start)
+        return profiler.wrap(result, _ITEM_TYPES.get(type_name, type_name))
+
+    def __iter__(self) -> Iterator[Any]:
+        target = object.__getattribute__(self, "_target")
+        profiler = object.__getattribute__(self, "_profiler")
+        item_type = _ITEM_TYPES.get(object.__getattribute__(self, "_type_name"), "Object")
+        for item in target:
+            yield profiler.wrap(item, item_type)
+
+    def __repr__(self) -> str:
+        return f"<ComProxy {object.__getattribute__(self, '_type_name')} of {object.__getattribute__(self, '_target')!r}>"
@@ -1,13 +1,48 @@
-from typing import Any, Optional, Tuple
+from typing import Any, Callable, Optional, Tuple
+
+from com_profiler import ComProfiler
 
 try:
+    import pythoncom
     import win32com.client as win32
 except Exception:  # pragma: no cover
+    pythoncom = None
     win32 = None
 
 
+class _ApplicationEvents:
+    """Excel.Application event sink for ``ExcelConnector.watch_events``.
+
+    win32com calls these from ``pythoncom.PumpWaitingMessages`` on the
+    thread that subscribed; errors are swallowed so a failing callback
+    never reaches Excel.
+    """
+
+    on_selection_change: Optional[Callable[[Any, int], None]] = None
+    on_sheet_change: Optional[Callable[[Any, int, int], None]] = None
+
+    def OnSheetSelectionChange(self, Sh: Any, Target: Any) -> None:
+        if self.on_selection_change is None:
+            return
+        try:
+            # The operations act on the active cell, which a multi-cell selection keeps
+            self.on_selection_change(Sh, int(Sh.Application.ActiveCell.Row))
+        except Exception:
+            pass
+
+    def OnSheetChange(self, Sh: Any, Target: Any) -> None:
+        if self.on_sheet_change is None:
+            return
+        try:
+            for area in Target.Areas:
+                first_row = int(area.Row)
+                self.on_sheet_change(Sh, first_row, first_row + int(area.Rows.Count) - 1)
+        except Exception:
+            pass
+
+
 class ExcelConnector:
-    def __init__(self) -> None:
+    def __init__(self, profiler: Optional[ComProfiler] = None) -> None:
         if win32 is None:
             raise RuntimeError("pywin32 is required on Windows")
         # Try to attach to a running Excel instance first; fall back to new
@@ -16,22 +51,46 @@ class ExcelConnector:
         except Exception:
             self.app = win32.Dispatch("Excel.Application")
         self.app.Visible = True
+        # With a profiler, everything handed out is a recording proxy of the real objects
+        self.profiler = profiler
+        self._app = profiler.wrap(self.app, "Application") if profiler is not None else self.app
+        self._events: Any = None
 
     def application(self) -> Any:
-        return self.app
+        return self._app
 
     def get_active_cell(self) -> Tuple[Any, Any, Any]:
-        wb = self.app.ActiveWorkbook
-        ws = self.app.ActiveSheet
-        cell = self.app.ActiveCell
+        wb = self._app.ActiveWorkbook
+        ws = self._app.ActiveSheet
+        cell = self._app.ActiveCell
         if ws is None or cell is None:
             raise RuntimeError("No active worksheet or cell.")
         return wb, ws, cell
 
+    def watch_events(
+        self,
+        on_selection_change: Callable[[Any, int], None],
+        on_sheet_change: Callable[[Any, int, int], None],
+    ) -> None:
+        """Subscribe to selection changes (sheet, active row) and cell changes (sheet, first row, last row).
+
+        Events are delivered on the subscribing thread while it runs ``pump_events``;
+        worksheets are passed as the raw COM objects, outside any profile.
+        """
+        events = win32.WithEvents(self.app, _ApplicationEvents)
+        events.on_selection_change = on_selection_change
+        events.on_sheet_change = on_sheet_change
+        self._events = events
+
+    def pump_events(self) -> None:
+        if self._events is not None and pythoncom is not None:
+            pythoncom.PumpWaitingMessages()
+
     def insert_row_below(self, ws: Any, row_index: int) -> None:
         ws.Rows(row_index + 1).Insert()
 
     def quit(self) -> None:
+        self._events = None
         try:
             self.app.Quit()
         except Exception:
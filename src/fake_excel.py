@@ -0,0 +1,971 @@
+"""In-memory stand-in for the subset of the Excel COM object model used by the puncher.
+
+``FakeApplication``/``FakeWorkbook``/``FakeWorksheet``/``FakeRange`` mimic the
+calls made by ``row_inserter``, ``pattern_analyzer``, ``format_utils`` and the
+analyzer (``Cells``, ``Range``, ``Rows(...).Insert``, ``MergeArea``,
+``Borders(idx)``, ``Font``, ``UsedRange`` ...). Every COM-style attribute
+access (CamelCase name) is counted on the owning application, which is what
+the benchmarks report: one access is one cross-process round trip with real
+Excel.
+"""
+
+import copy
+import re
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+XL_EDGE_LEFT = 1
+XL_EDGE_TOP = 2
+XL_EDGE_BOTTOM = 3
+XL_EDGE_RIGHT = 4
+XL_INSIDE_VERTICAL = 11
+XL_INSIDE_HORIZONTAL = 12
+XL_LINE_STYLE_NONE = -4142
+XL_THIN = 2
+XL_PASTE_FORMATS = -4122
+XL_PASTE_ALL = -4104
+
+MAX_ROWS = 1048576
+MAX_COLS = 16384
+
+# (line_style, weight, color) for an edge with no line
+NO_BORDER = (XL_LINE_STYLE_NONE, XL_THIN, 0)
+DEFAULT_FONT = {"Name": "Arial", "Size": 10.0, "Bold": False, "Italic": False, "Color": 0}
+DEFAULT_INTERIOR = {"Color": 16777215, "Pattern": XL_LINE_STYLE_NONE}
+FORMAT_PROPS = ("NumberFormat", "HorizontalAlignment", "VerticalAlignment", "WrapText")
+DEFAULT_FORMAT = {"NumberFormat": "General", "HorizontalAlignment": 1, "VerticalAlignment": -4107, "WrapText": False}
+
+
+class CellData:
+    """Stored state of one cell (value plus formatting)."""
+
+    __slots__ = ("value", "fmt", "font", "interior", "borders", "xf")
+
+    def __init__(self) -> None:
+        self.value: Any = None
+        # BIFF XF index the formatting came from (loaded cells and their format copies); None otherwise
+        self.xf: Optional[int] = None
+        self.fmt: Dict[str, Any] = dict(DEFAULT_FORMAT)
+        self.font: Dict[str, Any] = dict(DEFAULT_FONT)
+        self.interior: Dict[str, Any] = dict(DEFAULT_INTERIOR)
+        self.borders: Dict[int, Tuple[int, int, int]] = {}
+
+    def copy_format(self) -> "CellData":
+        other = CellData()
+        other.fmt = dict(self.fmt)
+        other.font = dict(self.font)
+        other.interior = dict(self.interior)
+        other.borders = dict(self.borders)
+        other.xf = self.xf
+        return other
+
+    def is_default(self) -> bool:
+        return (
+            self.value is None
+            and self.fmt == DEFAULT_FORMAT
+            and self.font == DEFAULT_FONT
+            and self.interior == DEFAULT_INTERIOR
+            and all(b[0] == XL_LINE_STYLE_NONE for b in self.borders.values())
+        )
+
+
+class CallCounter:
+    """Counts COM-style accesses as (kind, "Class.Member") pairs."""
+
+    def __init__(self) -> None:
+        self.counts: Counter = Counter()
+        self.enabled = True
+
+    def record(self, kind: str, owner: str, name: str) -> None:
+        if self.enabled:
+            self.counts[(kind, f"{owner}.{name}")] += 1
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def by_kind(self) -> Dict[str, int]:
+        out: Dict[str, int] = {}
+        for (kind, _name), n in self.counts.items():
+            out[kind] = out.get(kind, 0) + n
+        return out
+
+    def reset(self) -> None:
+        self.counts.clear()
+
+
+class _ComObject:
+    """Base class: CamelCase attribute gets/sets are recorded on the application counter."""
+
+    _counter: CallCounter
+
+    def __getattribute__(self, name: str) -> Any:
+        if name[:1].isupper():
+            object.__getattribute__(self, "_counter").record("get", type(self).__name__[4:], name)
+        return object.__getattribute__(self, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name[:1].isupper():
+            object.__getattribute__(self, "_counter").record("set", type(self).__name__[4:], name)
+        object.__setattr__(self, name, value)
+
+
+def _col_from_letters(letters: str) -> int:
+    col = 0
+    for ch in letters.upper():
+        col = col * 26 + (ord(ch) - 64)
+    return col
+
+
+def _letters(col: int) -> str:
+    letters = ""
+    while col > 0:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+_A1 = re.compile(r"^\$?([A-Za-z]+)\$?(\d+)$")
+
+
+def _parse_a1(ref: str) -> Tuple[int, int, int, int]:
+    parts = ref.split(":")
+    coords = []
+    for part in parts:
+        m = _A1.match(part.strip())
+        if not m:
+            raise ValueError(f"unsupported range reference: {ref}")
+        coords.append((int(m.group(2)), _col_from_letters(m.group(1))))
+    (r1, c1), (r2, c2) = coords[0], coords[-1]
+    return min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2)
+
+
+def _uniform(values: Iterator[Any]) -> Any:
+    """Excel returns Null (None) for a multi-cell property that is not uniform."""
+    first = True
+    result = None
+    for v in values:
+        if first:
+            result = v
+            first = False
+        elif v != result:
+            return None
+    return result
+
+
+class FakeApplication(_ComObject):
+    def __init__(self) -> None:
+        object.__setattr__(self, "_counter", CallCounter())
+        object.__setattr__(self, "_workbooks", [])
+        object.__setattr__(self, "_active_sheet", None)
+        object.__setattr__(self, "_active_cell", None)
+        object.__setattr__(self, "_clipboard", None)
+        object.__setattr__(self, "_settings", {
+            "ScreenUpdating": True,
+            "EnableEvents": True,
+            "DisplayAlerts": True,
+            "Calculation": -4105,
+            "Visible": False,
+            "AskToUpdateLinks": True,
+        })
+        object.__setattr__(self, "quit_called", False)
+
+    @property
+    def counter(self) -> CallCounter:
+        return object.__getattribute__(self, "_counter")
+
+    def __getattr__(self, name: str) -> Any:
+        settings = object.__getattribute__(self, "_settings")
+        if name in settings:
+            return settings[name]
+        raise AttributeError(name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in ("ScreenUpdating", "EnableEvents", "DisplayAlerts", "Calculation", "Visible", "AskToUpdateLinks"):
+            self._counter.record("set", "Application", name)
+            self._settings[name] = value
+            return
+        if name == "CutCopyMode":
+            self._counter.record("set", "Application", name)
+            object.__setattr__(self, "_clipboard", None)
+            return
+        super().__setattr__(name, value)
+
+    @property
+    def Workbooks(self) -> "FakeWorkbooks":
+        return FakeWorkbooks(self)
+
+    @property
+    def ActiveWorkbook(self) -> Optional["FakeWorkbook"]:
+        sheet = self._active_sheet
+        return sheet._workbook if sheet is not None else None
+
+    @property
+    def ActiveSheet(self) -> Optional["FakeWorksheet"]:
+        return self._active_sheet
+
+    @property
+    def ActiveCell(self) -> Optional["FakeRange"]:
+        return self._active_cell
+
+    @property
+    def Selection(self) -> Optional["FakeRange"]:
+        return self._active_cell
+
+    def Quit(self) -> None:
+        object.__setattr__(self, "quit_called", True)
+
+    def new_workbook(self, name: str = "Book1") -> "FakeWorkbook":
+        wb = FakeWorkbook(self, name)
+        self._workbooks.append(wb)
+        return wb
+
+
+class FakeWorkbooks(_ComObject):
+    def __init__(self, app: FakeApplication) -> None:
+        object.__setattr__(self, "_counter", app._counter)
+        object.__setattr__(self, "_app", app)
+
+    @property
+    def Count(self) -> int:
+        return len(self._app._workbooks)
+
+    def Add(self) -> "FakeWorkbook":
+        wb = self._app.new_workbook(f"Book{len(self._app._workbooks) + 1}")
+        wb.Worksheets.Add()
+        return wb
+
+    def Open(self, path: str, UpdateLinks: Any = None, ReadOnly: Any = None, **_kwargs: Any) -> "FakeWorkbook":
+        wb = load_biff_workbook(path, self._app)
+        object.__setattr__(wb, "open_options", {"UpdateLinks": UpdateLinks, "ReadOnly": ReadOnly})
+        return wb
+
+
+class FakeWorkbook(_ComObject):
+    def __init__(self, app: FakeApplication, name: str) -> None:
+        object.__setattr__(self, "_counter", app._counter)
+        object.__setattr__(self, "_app", app)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_sheets", [])
+        object.__setattr__(self, "closed", False)
+        object.__setattr__(self, "open_options", {})
+
+    @property
+    def Name(self) -> str:
+        return self._name
+
+    @property
+    def Application(self) -> FakeApplication:
+        return self._app
+
+    @property
+    def Worksheets(self) -> "FakeSheets":
+        return FakeSheets(self)
+
+    @property
+    def Sheets(self) -> "FakeSheets":
+        return FakeSheets(self)
+
+    def Close(self, SaveChanges: Any = None) -> None:
+        object.__setattr__(self, "closed", True)
+        if self in self._app._workbooks:
+            self._app._workbooks.remove(self)
+
+
+class FakeSheets(_ComObject):
+    def __init__(self, wb: FakeWorkbook) -> None:
+        object.__setattr__(self, "_counter", wb._counter)
+        object.__setattr__(self, "_wb", wb)
+
+    def __iter__(self) -> Iterator["FakeWorksheet"]:
+        return iter(list(self._wb._sheets))
+
+    def __len__(self) -> int:
+        return len(self._wb._sheets)
+
+    def __call__(self, key: Any) -> "FakeWorksheet":
+        self._counter.record("get", "Sheets", "Item")
+        if isinstance(key, int):
+            return self._wb._sheets[key - 1]
+        for sheet in self._wb._sheets:
+            if sheet._name == key:
+                return sheet
+        raise KeyError(key)
+
+    @property
+    def Count(self) -> int:
+        return len(self._wb._sheets)
+
+    def Add(self, Before: Any = None, After: Any = None) -> "FakeWorksheet":
+        sheet = FakeWorksheet(self._wb, f"Sheet{len(self._wb._sheets) + 1}")
+        self._wb._sheets.append(sheet)
+        return sheet
+
+
+class FakeWorksheet(_ComObject):
+    def __init__(self, wb: FakeWorkbook, name: str) -> None:
+        object.__setattr__(self, "_counter", wb._counter)
+        object.__setattr__(self, "_workbook", wb)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_visible", -1)
+        object.__setattr__(self, "cells", {})
+        # Merge areas as [top, left, bottom, right]
+        object.__setattr__(self, "merges", [])
+        # ("insert" | "delete", at, count) in the order the rows were inserted/deleted
+        object.__setattr__(self, "row_edits", [])
+
+    # -- COM surface -------------------------------------------------------
+
+    @property
+    def Name(self) -> str:
+        return self._name
+
+    @Name.setter
+    def Name(self, value: str) -> None:
+        object.__setattr__(self, "_name", value)
+
+    @property
+    def Visible(self) -> int:
+        return self._visible
+
+    @Visible.setter
+    def Visible(self, value: int) -> None:
+        object.__setattr__(self, "_visible", value)
+
+    @property
+    def Parent(self) -> FakeWorkbook:
+        return self._workbook
+
+    @property
+    def Application(self) -> FakeApplication:
+        return self._workbook._app
+
+    def Cells(self, row: int, col: int) -> "FakeRange":
+        return FakeRange(self, row, col, row, col)
+
+    def Range(self, first: Any, second: Any = None) -> "FakeRange":
+        if isinstance(first, str):
+            r1, c1, r2, c2 = _parse_a1(first)
+        else:
+            r1, c1, r2, c2 = first._r1, first._c1, first._r2, first._c2
+        if second is not None:
+            if isinstance(second, str):
+                s1, d1, s2, d2 = _parse_a1(second)
+            else:
+                s1, d1, s2, d2 = second._r1, second._c1, second._r2, second._c2
+            r1, c1, r2, c2 = min(r1, s1), min(c1, d1), max(r2, s2), max(c2, d2)
+        return FakeRange(self, r1, c1, r2, c2)
+
+    def Rows(self, row: int) -> "FakeRange":
+        return FakeRange(self, row, 1, row, MAX_COLS)
+
+    def Columns(self, col: int) -> "FakeRange":
+        return FakeRange(self, 1, col, MAX_ROWS, col)
+
+    @property
+    def UsedRange(self) -> "FakeRange":
+        r1, c1, r2, c2 = self.used_bounds()
+        return FakeRange(self, r1, c1, r2, c2)
+
+    def Activate(self) -> None:
+        object.__setattr__(self._workbook._app, "_active_sheet", self)
+
+    # -- Python-side helpers (not counted) ---------------------------------
+
+    def used_bounds(self) -> Tuple[int, int, int, int]:
+        coords = [rc for rc, data in self.cells.items() if not data.is_default()]
+        for top, left, bottom, right in self.merges:
+            coords.append((top, left))
+            coords.append((bottom, right))
+        if not coords:
+            return 1, 1, 1, 1
+        rows = [r for r, _ in coords]
+        cols = [c for _, c in coords]
+        return min(rows), min(cols), max(rows), max(cols)
+
+    def data(self, row: int, col: int, create: bool = False) -> CellData:
+        cell = self.cells.get((row, col))
+        if cell is None:
+            cell = CellData()
+            if create:
+                self.cells[(row, col)] = cell
+        return cell
+
+    def merge_at(self, row: int, col: int) -> Optional[List[int]]:
+        for area in self.merges:
+            if area[0] <= row <= area[2] and area[1] <= col <= area[3]:
+                return area
+        return None
+
+    def set_value(self, row: int, col: int, value: Any) -> None:
+        self.data(row, col, create=True).value = value
+
+    def set_border(self, row: int, col: int, idx: int, line_style: int, weight: int = XL_THIN, color: int = 0) -> None:
+        self.data(row, col, create=True).borders[idx] = (line_style, weight, color)
+
+    def add_merge(self, top: int, left: int, bottom: int, right: int) -> None:
+        self.merges.append([top, left, bottom, right])
+
+    def insert_rows(self, at: int, count: int) -> None:
+        """Insert ``count`` blank rows at ``at``, formatted like the row above (xlFormatFromLeftOrAbove)."""
+        self.row_edits.append(("insert", at, count))
+        shifted: Dict[Tuple[int, int], CellData] = {}
+        for (r, c), data in self.cells.items():
+            shifted[(r + count if r >= at else r, c)] = data
+        if at > 1:
+            for (r, c), data in list(self.cells.items()):
+                if r == at - 1:
+                    for k in range(count):
+                        shifted[(at + k, c)] = data.copy_format()
+        object.__setattr__(self, "cells", shifted)
+        for area in self.merges:
+            if area[0] >= at:
+                area[0] += count
+                area[2] += count
+            elif area[2] >= at:
+                # Insertion inside a vertical merge grows it
+                area[2] += count
+
+    def delete_rows(self, at: int, count: int) -> None:
+        self.row_edits.append(("delete", at, count))
+        kept: Dict[Tuple[int, int], CellData] = {}
+        for (r, c), data in self.cells.items():
+            if r < at:
+                kept[(r, c)] = data
+            elif r >= at + count:
+                kept[(r - count, c)] = data
+        object.__setattr__(self, "cells", kept)
+        merges = []
+        for top, left, bottom, right in self.merges:
+            if top >= at + count:
+                merges.append([top - count, left, bottom - count, right])
+            elif bottom < at:
+                merges.append([top, left, bottom, right])
+            else:
+                new_top = min(top, at)
+                new_bottom = max(new_top, bottom - count) if bottom >= at + count else at - 1
+                if new_bottom > new_top or right > left:
+                    merges.append([new_top, left, new_bottom, right])
+        object.__setattr__(self, "merges", merges)
+
+
+class FakeRange(_ComObject):
+    def __init__(self, ws: FakeWorksheet, r1: int, c1: int, r2: int, c2: int) -> None:
+        object.__setattr__(self, "_counter", ws._counter)
+        object.__setattr__(self, "_ws", ws)
+        object.__setattr__(self, "_r1", r1)
+        object.__setattr__(self, "_c1", c1)
+        object.__setattr__(self, "_r2", r2)
+        object.__setattr__(self, "_c2", c2)
+
+    def _coords(self) -> Iterator[Tuple[int, int]]:
+        r2, c2 = self._bounded()
+        for r in range(self._r1, r2 + 1):
+            for c in range(self._c1, c2 + 1):
+                yield r, c
+
+    def _bounded(self) -> Tuple[int, int]:
+        # Whole-row/column ranges only need to visit the populated part of the sheet
+        r2, c2 = self._r2, self._c2
+        if r2 - self._r1 > 10000 or c2 - self._c1 > 1000:
+            _ur1, _uc1, ur2, uc2 = self._ws.used_bounds()
+            r2 = min(r2, max(ur2, self._r1))
+            c2 = min(c2, max(uc2, self._c1))
+        return r2, c2
+
+    # -- geometry ----------------------------------------------------------
+
+    @property
+    def Row(self) -> int:
+        return self._r1
+
+    @property
+    def Column(self) -> int:
+        return self._c1
+
+    @property
+    def Rows(self) -> "FakeCount":
+        return FakeCount(self, self._r2 - self._r1 + 1, "rows")
+
+    @property
+    def Columns(self) -> "FakeCount":
+        return FakeCount(self, self._c2 - self._c1 + 1, "cols")
+
+    @property
+    def Count(self) -> int:
+        return (self._r2 - self._r1 + 1) * (self._c2 - self._c1 + 1)
+
+    @property
+    def Address(self) -> str:
+        first = f"${_letters(self._c1)}${self._r1}"
+        if (self._r1, self._c1) == (self._r2, self._c2):
+            return first
+        return f"{first}:${_letters(self._c2)}${self._r2}"
+
+    @property
+    def Worksheet(self) -> FakeWorksheet:
+        return self._ws
+
+    @property
+    def Parent(self) -> FakeWorksheet:
+        return self._ws
+
+    @property
+    def Application(self) -> FakeApplication:
+        return self._ws._workbook._app
+
+    @property
+    def EntireRow(self) -> "FakeRange":
+        return FakeRange(self._ws, self._r1, 1, self._r2, MAX_COLS)
+
+    def Cells(self, row: int, col: int) -> "FakeRange":
+        r = self._r1 + row - 1
+        c = self._c1 + col - 1
+        return FakeRange(self._ws, r, c, r, c)
+
+    def Resize(self, rows: Optional[int] = None, cols: Optional[int] = None) -> "FakeRange":
+        nrows = rows if rows is not None else self._r2 - self._r1 + 1
+        ncols = cols if cols is not None else self._c2 - self._c1 + 1
+        return FakeRange(self._ws, self._r1, self._c1, self._r1 + nrows - 1, self._c1 + ncols - 1)
+
+    def Offset(self, rows: int = 0, cols: int = 0) -> "FakeRange":
+        return FakeRange(self._ws, self._r1 + rows, self._c1 + cols, self._r2 + rows, self._c2 + cols)
+
+    # -- values ------------------------------------------------------------
+
+    @property
+    def Value(self) -> Any:
+        if self._r1 == self._r2 and self._c1 == self._c2:
+            return self._ws.data(self._r1, self._c1).value
+        r2, c2 = self._bounded()
+        return tuple(
+            tuple(self._ws.data(r, c).value for c in range(self._c1, c2 + 1))
+            for r in range(self._r1, r2 + 1)
+        )
+
+    @Value.setter
+    def Value(self, value: Any) -> None:
+        if isinstance(value, (tuple, list)):
+            for i, row_values in enumerate(value):
+                for j, v in enumerate(row_values):
+                    self._ws.set_value(self._r1 + i, self._c1 + j, v)
+            return
+        for r, c in self._coords():
+            self._ws.set_value(r, c, value)
+
+    Value2 = Value
+
+    @property
+    def Text(self) -> str:
+        value = self._ws.data(self._r1, self._c1).value
+        if value is None:
+            return ""
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+
+    def ClearContents(self) -> None:
+        for r, c in self._coords():
+            if (r, c) in self._ws.cells:
+                self._ws.cells[(r, c)].value = None
+
+    # -- merges ------------------------------------------------------------
+
+    @property
+    def MergeCells(self) -> Optional[bool]:
+        return _uniform(self._ws.merge_at(r, c) is not None for r, c in self._coords())
+
+    @MergeCells.setter
+    def MergeCells(self, value: bool) -> None:
+        if value:
+            self._merge()
+        else:
+            self._unmerge()
+
+    @property
+    def MergeArea(self) -> "FakeRange":
+        area = self._ws.merge_at(self._r1, self._c1)
+        if area is None:
+            return FakeRange(self._ws, self._r1, self._c1, self._r1, self._c1)
+        return FakeRange(self._ws, area[0], area[1], area[2], area[3])
+
+    def Merge(self, Across: bool = False) -> None:
+        if Across:
+            for r in range(self._r1, self._r2 + 1):
+                FakeRange(self._ws, r, self._c1, r, self._c2)._merge()
+            return
+        self._merge()
+
+    def UnMerge(self) -> None:
+        self._unmerge()
+
+    def _merge(self) -> None:
+        if self._r1 == self._r2 and self._c1 == self._c2:
+            return
+        top, left, bottom, right = self._r1, self._c1, self._r2, self._c2
+        # Excel grows the target to absorb any partially overlapping merge; growing can reach
+        # areas the original target missed, so repeat until nothing else overlaps
+        merges = list(self._ws.merges)
+        while True:
+            keep = []
+            grown = False
+            for area in merges:
+                if area[0] <= bottom and area[2] >= top and area[1] <= right and area[3] >= left:
+                    top, left = min(top, area[0]), min(left, area[1])
+                    bottom, right = max(bottom, area[2]), max(right, area[3])
+                    grown = True
+                else:
+                    keep.append(area)
+            merges = keep
+            if not grown:
+                break
+        merges.append([top, left, bottom, right])
+        object.__setattr__(self._ws, "merges", merges)
+
+    def _unmerge(self) -> None:
+        keep = []
+        for area in self._ws.merges:
+            if area[0] <= self._r2 and area[2] >= self._r1 and area[1] <= self._c2 and area[3] >= self._c1:
+                continue
+            keep.append(area)
+        object.__setattr__(self._ws, "merges", keep)
+
+    # -- formatting --------------------------------------------------------
+
+    def _get_fmt(self, prop: str) -> Any:
+        return _uniform(self._ws.data(r, c).fmt[prop] for r, c in self._coords())
+
+    def _set_fmt(self, prop: str, value: Any) -> None:
+        for r, c in self._coords():
+            self._ws.data(r, c, create=True).fmt[prop] = value
+
+    NumberFormat = property(
+        lambda self: self._get_fmt("NumberFormat"), lambda self, v: self._set_fmt("NumberFormat", v)
+    )
+    HorizontalAlignment = property(
+        lambda self: self._get_fmt("HorizontalAlignment"), lambda self, v: self._set_fmt("HorizontalAlignment", v)
+    )
+    VerticalAlignment = property(
+        lambda self: self._get_fmt("VerticalAlignment"), lambda self, v: self._set_fmt("VerticalAlignment", v)
+    )
+    WrapText = property(lambda self: self._get_fmt("WrapText"), lambda self, v: self._set_fmt("WrapText", v))
+
+    @property
+    def Font(self) -> "FakeStyleGroup":
+        return FakeStyleGroup(self, "font")
+
+    @property
+    def Interior(self) -> "FakeStyleGroup":
+        return FakeStyleGroup(self, "interior")
+
+    @property
+    def Borders(self) -> "FakeBorders":
+        return FakeBorders(self)
+
+    # -- structure ---------------------------------------------------------
+
+    def Insert(self, Shift: Any = None, CopyOrigin: Any = None) -> None:
+        self._ws.insert_rows(self._r1, self._r2 - self._r1 + 1)
+
+    def Delete(self, Shift: Any = None) -> None:
+        self._ws.delete_rows(self._r1, self._r2 - self._r1 + 1)
+
+    def Select(self) -> None:
+        app = self._ws._workbook._app
+        object.__setattr__(app, "_active_sheet", self._ws)
+        object.__setattr__(app, "_active_cell", FakeRange(self._ws, self._r1, self._c1, self._r1, self._c1))
+
+    def Copy(self, Destination: Any = None) -> None:
+        if Destination is None:
+            object.__setattr__(self._ws._workbook._app, "_clipboard", self)
+            return
+        Destination._paste_from(self, formats_only=False)
+
+    def PasteSpecial(self, Paste: Any = XL_PASTE_ALL, **_kwargs: Any) -> None:
+        source = self._ws._workbook._app._clipboard
+        if source is None:
+            raise RuntimeError("PasteSpecial with an empty clipboard")
+        self._paste_from(source, formats_only=(Paste == XL_PASTE_FORMATS))
+
+    def _paste_from(self, source: "FakeRange", formats_only: bool) -> None:
+        src_ws = source._ws
+        sr2, sc2 = source._bounded()
+        nrows = sr2 - source._r1 + 1
+        ncols = sc2 - source._c1 + 1
+        # A single-cell destination expands to the source size
+        if self._r1 == self._r2 and self._c1 == self._c2:
+            dr2, dc2 = self._r1 + nrows - 1, self._c1 + ncols - 1
+        else:
+            dr2, dc2 = self._bounded()
+        row_offset = self._r1 - source._r1
+        col_offset = self._c1 - source._c1
+        for r in range(self._r1, dr2 + 1):
+            for c in range(self._c1, dc2 + 1):
+                sr = source._r1 + (r - self._r1) % nrows
+                sc = source._c1 + (c - self._c1) % ncols
+                src = src_ws.data(sr, sc)
+                dst = self._ws.data(r, c, create=True)
+                value = dst.value
+                new = src.copy_format()
+                new.value = value if formats_only else src.value
+                self._ws.cells[(r, c)] = new
+        # Merges inside the source block are reproduced at the destination
+        FakeRange(self._ws, self._r1, self._c1, dr2, dc2)._unmerge()
+        for top, left, bottom, right in list(src_ws.merges):
+            if top >= source._r1 and bottom <= sr2 and left >= source._c1 and right <= sc2:
+                self._ws.merges.append([top + row_offset, left + col_offset, bottom + row_offset, right + col_offset])
+
+
+class FakeCount(_ComObject):
+    """``Range.Rows`` / ``Range.Columns``: exposes ``Count`` and item access."""
+
+    def __init__(self, rng: FakeRange, count: int, axis: str) -> None:
+        object.__setattr__(self, "_counter", rng._counter)
+        object.__setattr__(self, "_rng", rng)
+        object.__setattr__(self, "_count", count)
+        object.__setattr__(self, "_axis", axis)
+
+    @property
+    def Count(self) -> int:
+        return self._count
+
+    def __call__(self, index: int) -> FakeRange:
+        rng = self._rng
+        if self._axis == "rows":
+            r = rng._r1 + index - 1
+            return FakeRange(rng._ws, r, rng._c1, r, rng._c2)
+        c = rng._c1 + index - 1
+        return FakeRange(rng._ws, rng._r1, c, rng._r2, c)
+
+
+class FakeStyleGroup(_ComObject):
+    """``Range.Font`` / ``Range.Interior``: uniform reads, broadcast writes."""
+
+    def __init__(self, rng: FakeRange, group: str) -> None:
+        object.__setattr__(self, "_counter", rng._counter)
+        object.__setattr__(self, "_rng", rng)
+        object.__setattr__(self, "_group", group)
+
+    def __getattr__(self, name: str) -> Any:
+        rng = object.__getattribute__(self, "_rng")
+        group = object.__getattribute__(self, "_group")
+        defaults = DEFAULT_FONT if group == "font" else DEFAULT_INTERIOR
+        if name not in defaults:
+            raise AttributeError(name)
+        object.__getattribute__(self, "_counter").record("get", group.capitalize(), name)
+        return _uniform(getattr(rng._ws.data(r, c), group)[name] for r, c in rng._coords())
+
+    def __getattribute__(self, name: str) -> Any:
+        # Style properties are counted in __getattr__ with the group name
+        return object.__getattribute__(self, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        group = self._group
+        defaults = DEFAULT_FONT if group == "font" else DEFAULT_INTERIOR
+        if name not in defaults:
+            raise AttributeError(name)
+        self._counter.record("set", group.capitalize(), name)
+        rng = self._rng
+        for r, c in rng._coords():
+            getattr(rng._ws.data(r, c, create=True), group)[name] = value
+
+
+class FakeBorders(_ComObject):
+    """``Range.Borders``: callable by edge index; property writes apply to all four edges."""
+
+    def __init__(self, rng: FakeRange) -> None:
+        object.__setattr__(self, "_counter", rng._counter)
+        object.__setattr__(self, "_rng", rng)
+
+    def __call__(self, idx: int) -> "FakeBorder":
+        self._counter.record("get", "Borders", "Item")
+        return FakeBorder(self._rng, idx)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name not in ("LineStyle", "Weight", "Color"):
+            raise AttributeError(name)
+        self._counter.record("set", "Borders", name)
+        for idx in (XL_EDGE_LEFT, XL_EDGE_TOP, XL_EDGE_BOTTOM, XL_EDGE_RIGHT, XL_INSIDE_VERTICAL, XL_INSIDE_HORIZONTAL):
+            FakeBorder(self._rng, idx)._set(name, value)
+
+
+_PROP_INDEX = {"LineStyle": 0, "Weight": 1, "Color": 2}
+# cell edge -> (row offset, col offset, edge index) of the same line seen from the neighbour
+_SHARED_EDGE = {
+    XL_EDGE_LEFT: (0, -1, XL_EDGE_RIGHT),
+    XL_EDGE_RIGHT: (0, 1, XL_EDGE_LEFT),
+    XL_EDGE_TOP: (-1, 0, XL_EDGE_BOTTOM),
+    XL_EDGE_BOTTOM: (1, 0, XL_EDGE_TOP),
+}
+
+
+class FakeBorder(_ComObject):
+    def __init__(self, rng: FakeRange, idx: int) -> None:
+        object.__setattr__(self, "_counter", rng._counter)
+        object.__setattr__(self, "_rng", rng)
+        object.__setattr__(self, "_idx", idx)
+
+    def _cell_edges(self) -> Iterator[Tuple[int, int, int]]:
+        """(row, col, cell edge index) pairs this range-level border covers."""
+        rng = self._rng
+        r2, c2 = rng._bounded()
+        idx = self._idx
+        if idx == XL_EDGE_LEFT:
+            for r in range(rng._r1, r2 + 1):
+                yield r, rng._c1, XL_EDGE_LEFT
+        elif idx == XL_EDGE_RIGHT:
+            for r in range(rng._r1, r2 + 1):
+                yield r, c2, XL_EDGE_RIGHT
+        elif idx == XL_EDGE_TOP:
+            for c in range(rng._c1, c2 + 1):
+                yield rng._r1, c, XL_EDGE_TOP
+        elif idx == XL_EDGE_BOTTOM:
+            for c in range(rng._c1, c2 + 1):
+                yield r2, c, XL_EDGE_BOTTOM
+        elif idx == XL_INSIDE_VERTICAL:
+            # Both cells sharing an inside edge take part; a conflict reads as mixed
+            for r in range(rng._r1, r2 + 1):
+                for c in range(rng._c1, c2):
+                    yield r, c, XL_EDGE_RIGHT
+                    yield r, c + 1, XL_EDGE_LEFT
+        elif idx == XL_INSIDE_HORIZONTAL:
+            for r in range(rng._r1, r2):
+                for c in range(rng._c1, c2 + 1):
+                    yield r, c, XL_EDGE_BOTTOM
+                    yield r + 1, c, XL_EDGE_TOP
+
+    def _get(self, name: str) -> Any:
+        ws = self._rng._ws
+        pos = _PROP_INDEX[name]
+        return _uniform(ws.data(r, c).borders.get(edge, NO_BORDER)[pos] for r, c, edge in self._cell_edges())
+
+    def _set(self, name: str, value: Any) -> None:
+        ws = self._rng._ws
+        pos = _PROP_INDEX[name]
+        for r, c, edge in list(self._cell_edges()):
+            data = ws.data(r, c, create=True)
+            current = list(data.borders.get(edge, NO_BORDER))
+            current[pos] = value
+            if name == "LineStyle" and value in (XL_LINE_STYLE_NONE, 0, None):
+                current = list(NO_BORDER)
+            elif name != "LineStyle" and current[0] == XL_LINE_STYLE_NONE:
+                # Setting Weight/Color on an empty edge draws a continuous line
+                current[0] = 1
+            data.borders[edge] = tuple(current)
+            # Neighbouring cells share the edge, as in Excel
+            dr, dc, other = _SHARED_EDGE[edge]
+            if r + dr >= 1 and c + dc >= 1:
+                ws.data(r + dr, c + dc, create=True).borders[other] = tuple(current)
+
+    LineStyle = property(lambda self: self._get("LineStyle"), lambda self, v: self._set("LineStyle", v))
+    Weight = property(lambda self: self._get("Weight"), lambda self, v: self._set("Weight", v))
+    Color = property(lambda self: self._get("Color"), lambda self, v: self._set("Color", v))
+
+
+# ---------------------------------------------------------------------------
+# Loading layouts from Base Case Files
+# ---------------------------------------------------------------------------
+
+
+def load_biff_workbook(path: str, app: Optional[FakeApplication] = None) -> FakeWorkbook:
+    """Build a fake workbook from an .xls file via the offline BIFF reader."""
+    from analyzer.biff_reader import BiffWorkbook
+
+    return fake_workbook_from_biff(BiffWorkbook.from_path(path), path, app)
+
+
+_BIFF_EDGES = {"left": XL_EDGE_LEFT, "top": XL_EDGE_TOP, "bottom": XL_EDGE_BOTTOM, "right": XL_EDGE_RIGHT}
+
+
+def biff_xf_style(book: Any, xf_index: int) -> Tuple[Dict[int, Tuple[int, int, int]], Dict[str, Any]]:
+    """(borders, font) a cell with this XF gets in the fake model; unknown XFs give no borders and the default font."""
+    from analyzer.biff_reader import BORDER_STYLE_MAP
+
+    borders: Dict[int, Tuple[int, int, int]] = {}
+    font_info = dict(DEFAULT_FONT)
+    if 0 <= xf_index < len(book.xfs):
+        for side, (style, color_idx) in book.xfs[xf_index].borders.items():
+            if style:
+                line_style, weight = BORDER_STYLE_MAP.get(style, (1, XL_THIN))
+                borders[_BIFF_EDGES[side]] = (line_style, weight, book.color_value(color_idx))
+        font = book.xf_font(xf_index)
+        if "error" not in font:
+            font_info = {
+                "Name": font["name"],
+                "Size": float(font["size"]),
+                "Bold": font["bold"],
+                "Italic": font["italic"],
+                "Color": font["color"],
+            }
+    return borders, font_info
+
+
+def fake_workbook_from_biff(book: Any, name: str, app: Optional[FakeApplication] = None) -> FakeWorkbook:
+    """Fake workbook holding a decoded ``BiffWorkbook``'s worksheets (values, borders, fonts, merges).
+
+    Each loaded cell remembers its XF index in ``CellData.xf`` and takes the
+    XF's ``NumberFormat``; number cells hold their value, not its text.
+    """
+    app = app or FakeApplication()
+    counter = app.counter
+    was_enabled = counter.enabled
+    counter.enabled = False
+    try:
+        wb = app.new_workbook(name)
+        styles: Dict[int, Tuple[Dict[int, Tuple[int, int, int]], Dict[str, Any]]] = {}
+        for biff_sheet in book.worksheets:
+            ws = FakeWorksheet(wb, biff_sheet.name)
+            wb._sheets.append(ws)
+            for (r, c), (text, xf_index) in biff_sheet.cells.items():
+                data = ws.data(r, c, create=True)
+                data.value = text if text != "" else None
+                data.xf = xf_index
+                data.fmt["NumberFormat"] = book.xf_number_format(xf_index)
+                if (r, c) in biff_sheet.numbers:
+                    data.value = biff_sheet.numbers[(r, c)]
+                if xf_index not in styles:
+                    styles[xf_index] = biff_xf_style(book, xf_index)
+                borders, font = styles[xf_index]
+                data.borders = dict(borders)
+                data.font = dict(font)
+            for top, left, nrows, ncols in biff_sheet.merges:
+                ws.merges.append([top, left, top + nrows - 1, left + ncols - 1])
+    finally:
+        counter.enabled = was_enabled
+    return wb
+
+
+def clone_sheet(ws: FakeWorksheet) -> FakeWorksheet:
+    """Deep copy of a sheet's contents into a fresh workbook with its own counter."""
+    app = FakeApplication()
+    wb = app.new_workbook(ws._workbook._name)
+    clone = FakeWorksheet(wb, ws._name)
+    object.__setattr__(clone, "cells", copy.deepcopy(ws.cells))
+    object.__setattr__(clone, "merges", [list(m) for m in ws.merges])
+    wb._sheets.append(clone)
+    return clone
+
+
+def tile_sheet(ws: FakeWorksheet, target_rows: int) -> FakeWorksheet:
+    """Synthetic larger layout: repeat the sheet's used block downwards until it has target_rows rows.
+
+    Values, formats and merges are repeated, so category/header patterns
+    keep their shape at every size.
+    """
+    first_row, first_col, last_row, last_col = ws.used_bounds()
+    block = last_row - first_row + 1
+    copies = max(1, -(-target_rows // block))
+    app = FakeApplication()
+    wb = app.new_workbook(ws._workbook._name)
+    tiled = FakeWorksheet(wb, ws._name)
+    wb._sheets.append(tiled)
+    for k in range(copies):
+        offset = k * block
+        for (r, c), data in ws.cells.items():
+            if first_row <= r <= last_row:
+                cell = data.copy_format()
+                cell.value = data.value
+                tiled.cells[(r + offset, c)] = cell
+        for top, left, bottom, right in ws.merges:
+            tiled.merges.append([top + offset, left, bottom + offset, right])
+    return tiled
@@ -1,170 +1,202 @@
-from typing import Any
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-def _range(ws: Any, r1: int, c1: int, r2: int, c2: int) -> Any:
-    return ws.Range(ws.Cells(r1, c1), ws.Cells(r2, c2))
+from analyzer.sheet_snapshot import block_range
+from sheet_structure import SheetStructure, read_row_formats
 
+# Border indices: 1-left, 2-top, 3-bottom, 4-right, 11/12-inside vertical/horizontal
+XL_EDGE_LEFT = 1
+XL_EDGE_TOP = 2
+XL_EDGE_BOTTOM = 3
+XL_EDGE_RIGHT = 4
+XL_INSIDE_VERTICAL = 11
+XL_INSIDE_HORIZONTAL = 12
+XL_PASTE_FORMATS = -4122
 
-def _clear_row_borders(ws: Any, row: int, max_cols: int) -> None:
-    for c in range(1, max_cols + 1):
-        try:
-            cell = ws.Cells(row, c)
-            for idx in (1, 2, 3, 4):
-                b = cell.Borders(idx)
-                b.LineStyle = 0
-        except Exception:
-            continue
+# (col, side, style) with style in the read_cell_borders shape ({"line_style", "weight", "color"})
+BorderWrite = Tuple[int, str, Optional[Dict[str, Any]]]
+# (r1, r2, c1, c2, border index, style): one Range(r1..r2, c1..c2).Borders(index) assignment
+BorderJob = Tuple[int, int, int, int, int, Dict[str, Any]]
 
 
-def copy_merge_and_borders_from_above(ws: Any, target_row: int, ref_row: int, max_cols: int = 30) -> None:
-    """Lightweight format copy from ref_row to target_row for 1..max_cols.
-    - Does NOT copy borders (handled separately to avoid outlines)
-    - Copies basic font/alignment/number format only
-    - Clears existing borders on the target row first
-    """
-    _clear_row_borders(ws, target_row, max_cols)
-    for c in range(1, max_cols + 1):
-        try:
-            src = ws.Cells(ref_row, c)
-            dst = ws.Cells(target_row, c)
-            # Number format and alignment
-            try:
-                dst.NumberFormat = src.NumberFormat
-            except Exception:
-                pass
-            try:
-                dst.HorizontalAlignment = src.HorizontalAlignment
-                dst.VerticalAlignment = src.VerticalAlignment
-                dst.WrapText = src.WrapText
-            except Exception:
-                pass
-            # Font basics
-            try:
-                dst.Font.Name = src.Font.Name
-                dst.Font.Size = src.Font.Size
-                dst.Font.Bold = src.Font.Bold
-                dst.Font.Italic = src.Font.Italic
-                dst.Font.Color = src.Font.Color
-            except Exception:
-                pass
-            # Interior/shading
-            try:
-                dst.Interior.Color = src.Interior.Color
-                dst.Interior.Pattern = src.Interior.Pattern
-            except Exception:
-                pass
-        except Exception:
-            continue
+def _range(ws: Any, r1: int, c1: int, r2: int, c2: int) -> Any:
+    return block_range(ws, r1, c1, r2, c2)
 
 
-def apply_horizontal_merges_like_row(ws: Any, source_row: int, target_row: int, max_cols: int = 30) -> None:
-    c = 1
-    while c <= max_cols:
-        cell = ws.Cells(source_row, c)
-        try:
-            if bool(getattr(cell, "MergeCells", False)):
-                area = cell.MergeArea
-                top = int(area.Row)
-                left = int(area.Column)
-                nrows = int(area.Rows.Count)
-                ncols = int(area.Columns.Count)
-                if nrows == 1 and top == source_row and ncols > 1:
-                    _range(ws, target_row, left, target_row, left + ncols - 1).Merge()
-                    c = left + ncols
-                    continue
-        except Exception:
-            pass
-        c += 1
+def value_runs(values: Dict[int, Any]) -> List[Tuple[int, int, Any]]:
+    """Consecutive positions with equal values as (first, last, value)."""
+    runs: List[Tuple[int, int, Any]] = []
+    for pos in sorted(values):
+        value = values[pos]
+        if runs and runs[-1][1] == pos - 1 and runs[-1][2] == value:
+            runs[-1] = (runs[-1][0], pos, value)
+        else:
+            runs.append((pos, pos, value))
+    return runs
 
 
-def extend_vertical_merges_below(ws: Any, areas: list[tuple[int, int, int, int]]) -> None:
-    for top, left, nrows, ncols in areas:
-        try:
-            # Extend by one row (after insertion)
-            _range(ws, top, left, top + nrows, left + ncols - 1).Merge()
-        except Exception:
-            continue
+def _apply_format(dst: Any, fmt: Dict[str, Any]) -> None:
+    # fmt as read by sheet_structure.read_uniform_format; groups fail independently like the live copy
+    try:
+        dst.NumberFormat = fmt["NumberFormat"]
+    except Exception:
+        pass
+    try:
+        dst.HorizontalAlignment = fmt["HorizontalAlignment"]
+        dst.VerticalAlignment = fmt["VerticalAlignment"]
+        dst.WrapText = fmt["WrapText"]
+    except Exception:
+        pass
+    try:
+        font = dst.Font
+        font.Name = fmt["Font.Name"]
+        font.Size = fmt["Font.Size"]
+        font.Bold = fmt["Font.Bold"]
+        font.Italic = fmt["Font.Italic"]
+        font.Color = fmt["Font.Color"]
+    except Exception:
+        pass
+    try:
+        interior = dst.Interior
+        interior.Color = fmt["Interior.Color"]
+        interior.Pattern = fmt["Interior.Pattern"]
+    except Exception:
+        pass
 
 
-def _copy_border_props(src: Any, dst: Any) -> None:
-    # Border indices: 1-left, 2-top, 3-bottom, 4-right
-    for idx in (1, 2, 3, 4):
+def row_has_merges(ws: Any, row: int, max_cols: int, structure: Optional[SheetStructure]) -> bool:
+    merges = structure.merges_in_row(row, max_cols) if structure is not None else None
+    if merges is not None:
+        return bool(merges)
+    try:
+        merged = _range(ws, row, 1, row, max_cols).MergeCells
+    except Exception:
+        return True
+    # Excel reports None when only some of the cells are merged
+    return merged is None or bool(merged)
+
+
+def copy_row_formats(
+    ws: Any, ref_row: int, target_row: int, max_cols: int, structure: Optional[SheetStructure], rows: int = 1
+) -> None:
+    """Write ref_row's formats onto target_row (and the ``rows - 1`` rows below), one assignment per property and run."""
+    if structure is not None:
+        formats = {c: structure.cell_format(ref_row, c) for c in range(1, max_cols + 1)}
+    else:
+        formats = read_row_formats(ws, ref_row, 1, max_cols)
+    for first, last, fmt in value_runs(formats):
+        if not fmt:
+            continue
         try:
-            s = src.Borders(idx)
-            d = dst.Borders(idx)
-            d.LineStyle = s.LineStyle
-            d.Weight = s.Weight
-            d.Color = s.Color
+            _apply_format(_range(ws, target_row, first, target_row + rows - 1, last), fmt)
         except Exception:
             continue
 
 
-def apply_borders_like_row(ws: Any, source_row: int, target_row: int, max_cols: int = 30) -> None:
-    """Copy perimeter border properties from source_row to target_row.
-    Handles merged horizontal blocks by copying the merged range edge borders.
-    """
+def _merge_area(ws: Any, row: int, col: int, structure: Optional[SheetStructure]) -> Tuple[int, int, int, int]:
+    if structure is not None:
+        return structure.merge_area(row, col)
+    cell = ws.Cells(row, col)
+    if bool(getattr(cell, "MergeCells", False)):
+        area = cell.MergeArea
+        return int(area.Row), int(area.Column), int(area.Rows.Count), int(area.Columns.Count)
+    return row, col, 1, 1
+
+
+def row_spans(ws: Any, row: int, max_cols: int, structure: Optional[SheetStructure]) -> List[Tuple[int, int]]:
+    """(left, right) of each horizontal merged block starting on ``row`` and of every other cell in 1..max_cols."""
+    spans: List[Tuple[int, int]] = []
     c = 1
     while c <= max_cols:
-        cell = ws.Cells(source_row, c)
-        try:
-            if bool(getattr(cell, "MergeCells", False)):
-                area = cell.MergeArea
-                top = int(area.Row)
-                left = int(area.Column)
-                nrows = int(area.Rows.Count)
-                ncols = int(area.Columns.Count)
-                if nrows == 1 and top == source_row and ncols > 1:
-                    src_rng = _range(ws, source_row, left, source_row, left + ncols - 1)
-                    dst_rng = _range(ws, target_row, left, target_row, left + ncols - 1)
-                    _copy_border_props(src_rng, dst_rng)
-                    c = left + ncols
-                    continue
-        except Exception:
-            pass
-
-        # Non-merged cell: copy borders cell-to-cell
         try:
-            src_cell = ws.Cells(source_row, c)
-            dst_cell = ws.Cells(target_row, c)
-            _copy_border_props(src_cell, dst_cell)
+            top, left, nrows, ncols = _merge_area(ws, row, c, structure)
         except Exception:
-            pass
+            top, left, nrows, ncols = row, c, 1, 1
+        if nrows == 1 and top == row and ncols > 1:
+            spans.append((left, left + ncols - 1))
+            c = left + ncols
+            continue
+        spans.append((c, c))
         c += 1
+    return spans
 
 
-def apply_neighbor_edge_borders(ws: Any, target_row: int, left_col: int, right_col: int) -> None:
-    """Match the target row's top/bottom edges to neighbors above/below per column.
-    This helps preserve dashed/solid patterns across inserted rows.
-    """
-    for c in range(left_col, right_col + 1):
-        try:
-            # Top edge from row above bottom edge
-            if target_row > 1:
-                above = ws.Cells(target_row - 1, c)
-                curr = ws.Cells(target_row, c)
-                curr.Borders(2).LineStyle = above.Borders(3).LineStyle  # top from above's bottom
-                curr.Borders(2).Weight = above.Borders(3).Weight
-                curr.Borders(2).Color = above.Borders(3).Color
-        except Exception:
-            pass
-        try:
-            # Bottom edge from row below top edge
-            below = ws.Cells(target_row + 1, c)
-            curr = ws.Cells(target_row, c)
-            curr.Borders(3).LineStyle = below.Borders(2).LineStyle  # bottom from below's top
-            curr.Borders(3).Weight = below.Borders(2).Weight
-            curr.Borders(3).Color = below.Borders(2).Color
-        except Exception:
-            pass
-
-
-def copy_font_from_cell(src_cell: Any, dst_cell: Any) -> None:
-    try:
-        dst_cell.Font.Name = src_cell.Font.Name
-        dst_cell.Font.Size = src_cell.Font.Size
-        dst_cell.Font.Bold = src_cell.Font.Bold
-        dst_cell.Font.Italic = src_cell.Font.Italic
-        dst_cell.Font.Color = src_cell.Font.Color
-    except Exception:
-        pass
-
+def border_jobs(first_row: int, last_row: int, writes: Iterable[BorderWrite]) -> List[BorderJob]:
+    """Range-level border assignments equivalent to per-cell writes on rows first_row..last_row.
 
+    ``writes`` are given in the order a cell-by-cell copy would make them;
+    writes without a line style (mixed or unreadable source) are skipped.
+    A cell's left edge is the same line as its neighbour's right edge, so
+    the final style of each edge is worked out first (later writes win) and
+    adjacent edges with identical styles are then painted together: top and
+    bottom edges per run of columns, vertical lines as the left/inside/right
+    edges of a range spanning the run. When several rows are painted, the
+    lines between them take the top style (the bottom style where a column
+    has no top).
+    """
+    tops: Dict[int, Dict[str, Any]] = {}
+    bottoms: Dict[int, Dict[str, Any]] = {}
+    verticals: Dict[int, Dict[str, Any]] = {}  # keyed by the column the line is the left edge of
+    for col, side, style in writes:
+        if not style or style.get("line_style") is None:
+            continue
+        if side == "top":
+            tops[col] = style
+        elif side == "bottom":
+            bottoms[col] = style
+        elif side == "left":
+            verticals[col] = style
+        elif side == "right":
+            verticals[col + 1] = style
+
+    jobs: List[BorderJob] = []
+    for a, z, style in value_runs(tops):
+        jobs.append((first_row, first_row, a, z, XL_EDGE_TOP, style))
+    for a, z, style in value_runs(bottoms):
+        jobs.append((last_row, last_row, a, z, XL_EDGE_BOTTOM, style))
+    if last_row > first_row:
+        between = {c: tops.get(c) or bottoms[c] for c in set(tops) | set(bottoms)}
+        for a, z, style in value_runs(between):
+            jobs.append((first_row, last_row, a, z, XL_INSIDE_HORIZONTAL, style))
+    for p, q, style in value_runs(verticals):
+        if p == q:
+            jobs.append((first_row, last_row, p, p, XL_EDGE_LEFT, style))
+            continue
+        # Lines p..q are the left edge, inside verticals and right edge of columns p..q-1
+        jobs.append((first_row, last_row, p, q - 1, XL_EDGE_LEFT, style))
+        if q - 1 > p:
+            jobs.append((first_row, last_row, p, q - 1, XL_INSIDE_VERTICAL, style))
+        jobs.append((first_row, last_row, p, q - 1, XL_EDGE_RIGHT, style))
+    return jobs
+
+
+def _block_edge_borders(borders: Dict[int, Dict[str, Any]], left: int, right: int) -> Dict[str, Any]:
+    """Range-level edge borders of columns left..right: top/bottom are None unless uniform."""
+    def uniform(name: str) -> Optional[Dict[str, Any]]:
+        edges: List[Any] = [borders.get(c, {}).get(name) for c in range(left, right + 1)]
+        return edges[0] if all(e == edges[0] for e in edges) else None
+
+    return {
+        "left": borders.get(left, {}).get("left"),
+        "top": uniform("top"),
+        "bottom": uniform("bottom"),
+        "right": borders.get(right, {}).get("right"),
+    }
+
+
+def span_border_writes(
+    spans: List[Tuple[int, int]], borders: Dict[int, Dict[str, Any]], sides: Tuple[str, ...]
+) -> List[BorderWrite]:
+    # Per-cell copy order: span by span, left/top/bottom/right (Borders 1..4)
+    writes: List[BorderWrite] = []
+    for left, right in spans:
+        edges = _block_edge_borders(borders, left, right) if right > left else borders.get(left, {})
+        for side in ("left", "top", "bottom", "right"):
+            if side not in sides:
+                continue
+            if side == "left":
+                writes.append((left, side, edges.get(side)))
+            elif side == "right":
+                writes.append((right, side, edges.get(side)))
+            else:
+                writes.extend((c, side, edges.get(side)) for c in range(left, right + 1))
+    return writes
@@ -0,0 +1,176 @@
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+# (level, message): level is "busy", "done" or "error"
+Status = Tuple[str, str]
+
+# How often an idle worker with an ``idle`` callback runs it (COM events are pumped there)
+IDLE_INTERVAL_S = 0.05
+
+
+class CommandWorker:
+    """Runs GUI commands one at a time on a dedicated COM thread.
+
+    Every COM call happens on this thread (``CoInitialize``d, with the Excel
+    objects created there by ``setup``), so button presses and global
+    hotkeys never touch COM directly and never interleave. ``setup`` runs
+    before the first command rather than at start, so the window does not
+    wait for Excel; if it fails it is retried on the next command. Commands wait in
+    a bounded queue; a press of a ``batchable`` command while the same
+    command is still pending adds to its count instead of queueing another
+    insert, so the handler receives the total (``handler(count)``). Progress
+    is reported through ``poll_status``, which the Tk side drains from
+    ``root.after``.
+
+    With an ``idle`` callback the worker connects as soon as it starts and
+    calls ``idle()`` every ``idle_interval`` seconds while no command is
+    waiting, on the same thread; that is where COM events are pumped and
+    background reads happen. Its errors are ignored.
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[str, Callable[..., Any]],
+        setup: Optional[Callable[[], None]] = None,
+        batchable: Iterable[str] = (),
+        max_pending: int = 8,
+        max_batch: int = 99,
+        idle: Optional[Callable[[], Any]] = None,
+        idle_interval: float = IDLE_INTERVAL_S,
+    ) -> None:
+        self.handlers = handlers
+        self.setup = setup
+        self.idle = idle
+        self.idle_interval = idle_interval
+        self.batchable = set(batchable)
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self._pending: Deque[List[Any]] = deque()  # [name, count]
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._status: "queue.Queue[Status]" = queue.Queue()
+        self._ready = setup is None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="com-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            self._stopping = True
+            self._pending.clear()
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def submit(self, name: str, count: int = 1) -> bool:
+        """Queue a command from any thread; False when the queue is full (the press is dropped)."""
+        with self._cond:
+            if self._stopping:
+                return False
+            if name in self.batchable and self._pending:
+                last = self._pending[-1]
+                if last[0] == name and last[1] + count <= self.max_batch:
+                    last[1] += count
+                    self._cond.notify()
+                    return True
+            if len(self._pending) >= self.max_pending:
+                self._status.put(("error", "Busy: too many queued commands, press ignored"))
+                return False
+            self._pending.append([name, count])
+            self._cond.notify()
+            return True
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def poll_status(self) -> List[Status]:
+        """Status messages posted since the last poll, oldest first."""
+        messages: List[Status] = []
+        while True:
+            try:
+                messages.append(self._status.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def _next(self, timeout: Optional[float] = None) -> Optional[List[Any]]:
+        """The next command; None when stopping or when none arrived within ``timeout``."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending or self._stopping, timeout)
+            if self._stopping or not self._pending:
+                return None
+            return self._pending.popleft()
+
+    def _run(self) -> None:
+        # COM apartment for the worker thread; imported here to keep it off the GUI's startup path
+        try:
+            import pythoncom
+        except Exception:  # pragma: no cover
+            pythoncom = None
+        if pythoncom is not None:
+            pythoncom.CoInitialize()
+        try:
+            # Events only arrive once connected, so an idle callback connects up front
+            if self.idle is not None and self._connect():
+                self._status.put(("done", "Ready"))
+            while True:
+                command = self._next(self.idle_interval if self.idle is not None else None)
+                if self._stopping:
+                    return
+                if command is None:
+                    self._run_idle()
+                    continue
+                self._execute(command[0], command[1])
+        finally:
+            if pythoncom is not None:
+                try:
+                    pythoncom.CoUninitialize()
+                except Exception:
+                    pass
+
+    def _connect(self) -> bool:
+        if self._ready:
+            return True
+        self._status.put(("busy", "Connecting to Excel..."))
+        try:
+            self.setup()
+        except Exception as e:
+            self._status.put(("error", f"Could not connect to Excel: {e}"))
+            return False
+        self._ready = True
+        return True
+
+    def _run_idle(self) -> None:
+        if not self._ready:
+            return
+        try:
+            self.idle()
+        except Exception:
+            pass
+
+    def _execute(self, name: str, count: int) -> None:
+        label = f"{name} x{count}" if name in self.batchable else name
+        if not self._connect():
+            return
+        handler = self.handlers.get(name)
+        if handler is None:
+            self._status.put(("error", f"Unknown command: {name}"))
+            return
+        self._status.put(("busy", f"Running {label}..."))
+        start = time.perf_counter()
+        try:
+            if name in self.batchable:
+                handler(count)
+            else:
+                handler()
+        except Exception as e:
+            self._status.put(("error", str(e)))
+            return
+        self._status.put(("done", f"{label} done in {time.perf_counter() - start:.2f} s"))
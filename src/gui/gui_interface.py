@@ -1,27 +1,50 @@
+import queue
 import tkinter as tk
 from tkinter import messagebox
-try:
-    import keyboard  # global hotkeys
-except Exception:
-    keyboard = None
+
+# Largest count accepted by the rows spinner / Ctrl+Alt+<digits> prefix
+MAX_BATCH_ROWS = 99
+
+# Command names handed to the CommandWorker
+CMD_ADD_ROWS = "add_rows"
+CMD_ADD_CATEGORY = "add_category"
+
+# How often the Tk loop picks up hotkeys and worker status
+POLL_MS = 50
 
 
 class LinePuncherGUI:
-    def __init__(self, on_add_row, on_add_category):
+    def __init__(self, on_add_row, on_add_category, on_add_rows=None, worker=None):
         self.on_add_row = on_add_row
         self.on_add_category = on_add_category
+        # on_add_rows(count) inserts several category rows at once; without it only single rows are offered
+        self.on_add_rows = on_add_rows
+        # With a CommandWorker the buttons only queue CMD_* commands and the window never waits on Excel
+        self.worker = worker
+        self._count_prefix = ""
+        # Hotkeys fire on the keyboard library's thread; they are handed to the Tk loop through this queue
+        self._hotkeys = queue.Queue()
         self.root = tk.Tk()
         self.root.title("Flynn Line Puncher")
 
-        btn_row = tk.Button(self.root, text="Add Row to Category", width=24, command=self._call(self.on_add_row))
-        btn_row.pack(padx=12, pady=8)
+        row_frame = tk.Frame(self.root)
+        row_frame.pack(padx=12, pady=8)
+        btn_row = tk.Button(row_frame, text="Add Row to Category", width=24, command=self._call(self._add_rows))
+        btn_row.pack(side=tk.LEFT)
+        self.row_count = None
+        if on_add_rows is not None:
+            self.row_count = tk.Spinbox(row_frame, from_=1, to=MAX_BATCH_ROWS, width=3)
+            self.row_count.pack(side=tk.LEFT, padx=(6, 0))
 
-        btn_cat = tk.Button(self.root, text="Add New Category", width=24, command=self._call(self.on_add_category))
+        btn_cat = tk.Button(self.root, text="Add New Category", width=24, command=self._call(self._add_category))
         btn_cat.pack(padx=12, pady=4)
 
         quit_btn = tk.Button(self.root, text="Quit", width=24, command=self.root.destroy)
         quit_btn.pack(padx=12, pady=8)
 
+        self.status = tk.Label(self.root, text="Ready", anchor="w", width=36)
+        self.status.pack(padx=12, pady=(0, 8))
+
         # Bring window to front and center it shortly after launch
         self._bring_to_front()
         self.root.after(200, self._center_window)
@@ -31,21 +54,95 @@ class LinePuncherGUI:
             self._safe_call(fn)
         return handler
 
+    def _spinner_count(self):
+        if self.row_count is None:
+            return 1
+        try:
+            return max(1, min(MAX_BATCH_ROWS, int(self.row_count.get())))
+        except Exception:
+            return 1
+
+    def _add_rows(self, count=None):
+        if count is None:
+            count = self._spinner_count()
+        if self.worker is not None:
+            if self.worker.submit(CMD_ADD_ROWS, count):
+                self._set_status(f"Queued {count} row(s)")
+        elif count > 1 and self.on_add_rows is not None:
+            self.on_add_rows(count)
+        else:
+            self.on_add_row()
+
+    def _add_category(self):
+        if self.worker is not None:
+            if self.worker.submit(CMD_ADD_CATEGORY):
+                self._set_status("Queued new category")
+        else:
+            self.on_add_category()
+
+    def _hotkey_digit(self, digit):
+        # Ctrl+Alt+<digits> then Ctrl+Alt+A adds that many rows (e.g. 2, 0 -> 20)
+        self._count_prefix = (self._count_prefix + digit)[-2:]
+
+    def _hotkey_add_rows(self):
+        prefix, self._count_prefix = self._count_prefix, ""
+        count = int(prefix) if prefix.strip("0") else self._spinner_count()
+        self._add_rows(max(1, min(MAX_BATCH_ROWS, count)))
+
     def _safe_call(self, fn):
         try:
             fn()
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
-    def run(self):
-        # Global hotkeys: Ctrl+Alt+A for Add Row, Ctrl+Alt+C for New Category
-        if keyboard is not None:
+    def _set_status(self, text):
+        try:
+            self.status.config(text=text)
+        except Exception:
+            pass
+
+    def _poll(self):
+        # Runs on the Tk thread: hotkeys first, then whatever the worker reported
+        while True:
             try:
-                keyboard.add_hotkey('ctrl+alt+a', self._call(self.on_add_row))
-                keyboard.add_hotkey('ctrl+alt+c', self._call(self.on_add_category))
-            except Exception:
-                pass
-        self.root.mainloop()
+                action = self._hotkeys.get_nowait()
+            except queue.Empty:
+                break
+            self._safe_call(action)
+        if self.worker is not None:
+            for level, message in self.worker.poll_status():
+                self._set_status(message)
+                if level == "error":
+                    messagebox.showerror("Error", message)
+        self.root.after(POLL_MS, self._poll)
+
+    def _register_hotkeys(self):
+        # Global hotkeys: Ctrl+Alt+A for Add Row, Ctrl+Alt+C for New Category,
+        # Ctrl+Alt+<digits> before Ctrl+Alt+A for several rows.
+        # Imported here so the keyboard hook is installed after the window is up
+        try:
+            import keyboard
+        except Exception:
+            return
+        try:
+            keyboard.add_hotkey('ctrl+alt+a', lambda: self._hotkeys.put(self._hotkey_add_rows))
+            keyboard.add_hotkey('ctrl+alt+c', lambda: self._hotkeys.put(self._add_category))
+            if self.on_add_rows is not None or self.worker is not None:
+                for digit in "0123456789":
+                    keyboard.add_hotkey(f'ctrl+alt+{digit}', lambda d=digit: self._hotkey_digit(d))
+        except Exception:
+            pass
+
+    def run(self):
+        self.root.after_idle(self._register_hotkeys)
+        if self.worker is not None:
+            self.worker.start()
+        self.root.after(POLL_MS, self._poll)
+        try:
+            self.root.mainloop()
+        finally:
+            if self.worker is not None:
+                self.worker.stop()
 
     def _bring_to_front(self) -> None:
         try:
@@ -77,6 +174,9 @@ if __name__ == "__main__":
     def _dummy_cat():
         print("Add Category clicked")
 
-    LinePuncherGUI(_dummy_row, _dummy_cat).run()
+    def _dummy_rows(count):
+        print(f"Add {count} Rows clicked")
+
+    LinePuncherGUI(_dummy_row, _dummy_cat, _dummy_rows).run()
 
 
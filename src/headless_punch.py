@@ -0,0 +1,717 @@
+"""Headless punch engine: RowInserter operations applied to .xls workbooks on disk.
+
+Each workbook is decoded with the offline BIFF reader into the fake Excel
+model, the jobs run through the normal ``RowInserter`` code paths against
+it, and the changed sheets are written back by patching their BIFF8
+records: existing cell records keep their bytes (rows moved, formulas
+re-pointed), new cells get XFs derived from the cells they were copied
+from, and the merge table is rewritten from the model. No Excel is
+involved, so files can be processed in parallel worker processes.
+
+Sheets whose content is anchored in ways the patcher does not move
+(drawings, comments, conditional formats, data validation, array
+formulas) are refused with PunchUnsupported rather than written out of step.
+"""
+
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Tuple
+
+from analyzer.biff_reader import (
+    BORDER_STYLE_MAP,
+    REC_BLANK,
+    REC_BOF,
+    REC_BOOLERR,
+    REC_BOUNDSHEET,
+    REC_CONTINUE,
+    REC_DIMENSIONS,
+    REC_EOF,
+    REC_FORMULA,
+    REC_LABEL,
+    REC_LABELSST,
+    REC_MERGEDCELLS,
+    REC_MULBLANK,
+    REC_MULRK,
+    REC_NUMBER,
+    REC_RK,
+    REC_RSTRING,
+    REC_STRING,
+    REC_XF,
+    BiffWorkbook,
+    CompoundFile,
+    iter_records,
+)
+from analyzer.biff_writer import BiffWriteError, RowShift, build_compound_file, record, row_shift, shift_formula_rows
+from fake_excel import (
+    DEFAULT_FONT,
+    XL_EDGE_BOTTOM,
+    XL_EDGE_LEFT,
+    XL_EDGE_RIGHT,
+    XL_EDGE_TOP,
+    XL_LINE_STYLE_NONE,
+    CellData,
+    FakeWorksheet,
+    biff_xf_style,
+    fake_workbook_from_biff,
+)
+from row_inserter import RowInserter
+
+# Job operation -> RowInserter method
+OPERATIONS = {
+    "add_row": "add_row_to_category",
+    "add_rows": "add_rows_to_category",
+    "add_category": "add_new_category",
+}
+
+DEFAULT_CELL_XF = 15
+# Excel's limit on cell formats per workbook
+MAX_XF_COUNT = 4050
+ROWS_PER_BLOCK = 32
+MAX_MERGES_PER_RECORD = 1026
+
+REC_ROW = 0x0208
+REC_INDEX = 0x020B
+REC_DBCELL = 0x00D7
+REC_SHRFMLA = 0x04BC
+REC_ARRAY = 0x0221
+REC_BRAI = 0x1051
+REC_HLINK = 0x01B8
+REC_HLINKTOOLTIP = 0x0800
+REC_HPAGEBREAKS = 0x001B
+REC_DEFAULTROWHEIGHT = 0x0225
+REC_NAME = 0x0018
+REC_SUPBOOK = 0x01AE
+REC_EXTERNSHEET = 0x0017
+REC_EXTSST = 0x00FF
+
+CELL_RECORDS = {
+    REC_LABELSST, REC_LABEL, REC_RSTRING, REC_NUMBER, REC_RK, REC_MULRK,
+    REC_BLANK, REC_MULBLANK, REC_BOOLERR, REC_FORMULA,
+}
+# Sheet records anchored to cells that the patcher does not move
+UNSUPPORTED_RECORDS = {
+    0x00EC: "drawings",
+    0x005D: "drawing objects",
+    0x001C: "cell comments",
+    0x01B6: "text boxes",
+    0x01B0: "conditional formats",
+    0x01B1: "conditional formats",
+    0x0879: "conditional formats",
+    0x087A: "conditional formats",
+    0x01B2: "data validation",
+    0x01BE: "data validation",
+    REC_ARRAY: "array formulas",
+    0x0236: "data tables",
+    0x0868: "shared features",
+    0x015F: "label ranges",
+}
+# Records holding a formula: record id -> (offset of cce, shared formula)
+FORMULA_RECORDS = {
+    REC_FORMULA: (20, False),
+    REC_SHRFMLA: (8, True),
+    REC_ARRAY: (12, False),
+    REC_BRAI: (6, False),
+}
+# cell edge -> (row offset, col offset, edge index) of the same line seen from the neighbour
+_FACING = {
+    XL_EDGE_LEFT: (0, -1, XL_EDGE_RIGHT),
+    XL_EDGE_RIGHT: (0, 1, XL_EDGE_LEFT),
+    XL_EDGE_TOP: (-1, 0, XL_EDGE_BOTTOM),
+    XL_EDGE_BOTTOM: (1, 0, XL_EDGE_TOP),
+}
+# (LineStyle, Weight) -> BIFF border style code
+_STYLE_CODES = {v: k for k, v in BORDER_STYLE_MAP.items() if k}
+
+# (row0, col0, value at load) of each loaded cell, keyed by id() of its CellData
+LoadedCells = Dict[int, Tuple[int, int, Any]]
+
+
+class PunchUnsupported(BiffWriteError):
+    """The workbook uses something the headless engine cannot patch faithfully."""
+
+
+@dataclass
+class PunchJob:
+    path: str
+    sheet: str
+    row: int
+    op: str = "add_row"
+    count: int = 1
+
+
+def _rgce_patched(data: bytes, rec_id: int, shift_2d: Optional[RowShift], shift_3d: Any) -> bytes:
+    cce_at, shared = FORMULA_RECORDS[rec_id]
+    cce = struct.unpack_from("<H", data, cce_at)[0]
+    start = cce_at + 2
+    rgce = shift_formula_rows(data[start:start + cce], shift_2d, shift_3d, shared=shared)
+    return data[:start] + rgce + data[start + cce:]
+
+
+def _shift_rows_at(data: bytes, offsets: Tuple[int, ...], shift: RowShift) -> bytes:
+    out = bytearray(data)
+    for at in offsets:
+        struct.pack_into("<H", out, at, shift(struct.unpack_from("<H", out, at)[0]))
+    return bytes(out)
+
+
+def _split_cells(rec_id: int, data: bytes) -> List[Tuple[Tuple[int, int], int, bytes]]:
+    """((row0, col0), record id, payload) per cell; MULRK/MULBLANK become RK/BLANK records."""
+    row, col = struct.unpack_from("<HH", data, 0)
+    if rec_id == REC_MULRK:
+        return [
+            ((row, col + i), REC_RK, struct.pack("<HH", row, col + i) + data[4 + i * 6:10 + i * 6])
+            for i in range((len(data) - 6) // 6)
+        ]
+    if rec_id == REC_MULBLANK:
+        return [
+            ((row, col + i), REC_BLANK, struct.pack("<HH", row, col + i) + data[4 + i * 2:6 + i * 2])
+            for i in range((len(data) - 6) // 2)
+        ]
+    return [((row, col), rec_id, data)]
+
+
+def _value_record(row: int, col: int, xf: int, value: Any) -> bytes:
+    if value is None:
+        return record(REC_BLANK, struct.pack("<HHH", row, col, xf))
+    if isinstance(value, bool):
+        return record(REC_BOOLERR, struct.pack("<HHHBB", row, col, xf, int(value), 0))
+    if isinstance(value, (int, float)):
+        return record(REC_NUMBER, struct.pack("<HHHd", row, col, xf, float(value)))
+    text = str(value)
+    if len(text) > 255:
+        raise PunchUnsupported("cell text longer than 255 characters")
+    try:
+        raw, flags = text.encode("latin-1"), 0
+    except UnicodeEncodeError:
+        raw, flags = text.encode("utf-16-le"), 1
+    return record(REC_LABEL, struct.pack("<HHHHB", row, col, xf, len(text), flags) + raw)
+
+
+def _style_key(borders: Dict[int, Tuple[int, int, int]], font: Dict[str, Any]) -> Tuple[Any, ...]:
+    return tuple(sorted(borders.items())), tuple(sorted(font.items()))
+
+
+class _WorkbookPatcher:
+    """Rewrites a BIFF8 Workbook stream after row insertions on some of its worksheets."""
+
+    def __init__(self, book: BiffWorkbook) -> None:
+        self.book = book
+        self.globals: List[Tuple[int, int, bytes]] = []
+        for pos, rec_id, data in iter_records(book.stream):
+            self.globals.append((pos, rec_id, data))
+            if rec_id == REC_EOF:
+                break
+        self.xf_payloads = [data for _pos, rec_id, data in self.globals if rec_id == REC_XF]
+        self.xf_by_payload: Dict[bytes, int] = {}
+        for i, payload in enumerate(self.xf_payloads):
+            self.xf_by_payload.setdefault(payload, i)
+        self.new_xfs: List[bytes] = []
+        self.shifts: Dict[int, RowShift] = {}
+        self._styles: Dict[int, Tuple[Dict[int, Tuple[int, int, int]], Dict[str, Any]]] = {}
+        self._colors: Dict[int, int] = {}
+        self._fonts: Optional[List[Tuple[int, Dict[str, Any]]]] = None
+
+        self.internal_supbook: Optional[int] = None
+        self.externsheet: List[Tuple[int, int, int]] = []
+        supbooks = 0
+        for i, (_pos, rec_id, data) in enumerate(self.globals):
+            if rec_id == REC_SUPBOOK:
+                if len(data) >= 4 and struct.unpack_from("<H", data, 2)[0] == 0x0401:
+                    self.internal_supbook = supbooks
+                supbooks += 1
+            elif rec_id == REC_EXTERNSHEET:
+                if i + 1 < len(self.globals) and self.globals[i + 1][1] == REC_CONTINUE:
+                    raise PunchUnsupported("continued EXTERNSHEET record")
+                count = struct.unpack_from("<H", data, 0)[0]
+                self.externsheet = [struct.unpack_from("<HHH", data, 2 + k * 6) for k in range(count)]
+
+    # -- formulas ------------------------------------------------------------
+
+    def shift_3d(self, ixti: int) -> Optional[RowShift]:
+        if not self.shifts or ixti >= len(self.externsheet):
+            return None
+        supbook, first, last = self.externsheet[ixti]
+        if supbook != self.internal_supbook or first >= 0xFFFE:
+            return None
+        if not any(first <= itab <= last for itab in self.shifts):
+            return None
+        if first != last:
+            raise PunchUnsupported("3-D reference spans a changed sheet")
+        return self.shifts[first]
+
+    # -- styles --------------------------------------------------------------
+
+    def _style(self, xf: int) -> Tuple[Dict[int, Tuple[int, int, int]], Dict[str, Any]]:
+        if xf not in self._styles:
+            self._styles[xf] = biff_xf_style(self.book, xf)
+        return self._styles[xf]
+
+    def _color_index(self, color: int) -> int:
+        if color not in self._colors:
+            for icv in range(8, 64):
+                if self.book.color_value(icv) == color:
+                    self._colors[color] = icv
+                    break
+            else:
+                raise PunchUnsupported(f"border colour {color:#08x} is not in the palette")
+        return self._colors[color]
+
+    def _font_index(self, font: Dict[str, Any], current: int) -> int:
+        if self._fonts is None:
+            book = self.book
+            self._fonts = []
+            for i, f in enumerate(book.fonts):
+                # FONT index 4 is never written; indexes above it are shifted by one
+                self._fonts.append((i if i < 4 else i + 1, {
+                    "Name": f.name,
+                    "Size": float(int(f.height / 20)),
+                    "Bold": f.weight >= 700,
+                    "Italic": f.italic,
+                    "Color": 0 if f.color_index == 0x7FFF else book.color_value(f.color_index),
+                }))
+        matches = [index for index, info in self._fonts if info == font]
+        if not matches:
+            raise PunchUnsupported(f"font {font['Name']} {font['Size']:g}pt is not in the workbook")
+        return current if current in matches else matches[0]
+
+    def _mirrored(self, ws: FakeWorksheet, r: int, c: int, edge: int, line: Tuple[int, int, int]) -> bool:
+        """True when the neighbour's own XF already draws this shared line."""
+        dr, dc, other = _FACING[edge]
+        neighbour = ws.cells.get((r + dr, c + dc))
+        if neighbour is None or neighbour.borders.get(other) != line:
+            return False
+        base = DEFAULT_CELL_XF if neighbour.xf is None else neighbour.xf
+        return self._style(base)[0].get(other) == line
+
+    def _derived_xf(self, base: int, sides: Dict[int, Optional[Tuple[int, int, int]]], font: Optional[Dict[str, Any]]) -> int:
+        if base >= len(self.xf_payloads):
+            raise PunchUnsupported(f"cell format {base} is not in the workbook")
+        out = bytearray(self.xf_payloads[base])
+        line, colors = struct.unpack_from("<II", out, 10)
+        for edge, style in sides.items():
+            code = icv = 0
+            if style is not None:
+                code = _STYLE_CODES.get(style[:2])
+                if code is None:
+                    raise PunchUnsupported(f"border style {style[:2]} has no BIFF equivalent")
+                icv = self._color_index(style[2])
+            if edge == XL_EDGE_LEFT:
+                line = (line & ~0x007F000F) | code | (icv << 16)
+            elif edge == XL_EDGE_RIGHT:
+                line = (line & ~0x3F8000F0) | (code << 4) | (icv << 23)
+            elif edge == XL_EDGE_TOP:
+                line = (line & ~0x00000F00) | (code << 8)
+                colors = (colors & ~0x0000007F) | icv
+            else:
+                line = (line & ~0x0000F000) | (code << 12)
+                colors = (colors & ~0x00003F80) | (icv << 7)
+        struct.pack_into("<II", out, 10, line, colors)
+        if sides:
+            out[9] |= 0x20  # fAtrBdr
+        if font is not None:
+            current = struct.unpack_from("<H", out, 0)[0]
+            struct.pack_into("<H", out, 0, self._font_index(font, current))
+            out[9] |= 0x08  # fAtrFnt
+        payload = bytes(out)
+        index = self.xf_by_payload.get(payload)
+        if index is None:
+            index = len(self.xf_payloads) + len(self.new_xfs)
+            if index >= MAX_XF_COUNT:
+                raise PunchUnsupported("too many cell formats")
+            self.new_xfs.append(payload)
+            self.xf_by_payload[payload] = index
+        return index
+
+    def _cell_xf(
+        self, ws: FakeWorksheet, r: int, c: int, data: CellData, matches: Optional[Dict[Tuple[Any, ...], int]]
+    ) -> int:
+        """XF for a cell's model borders and font, starting from the XF it was loaded or copied with.
+
+        A line the model has only because the neighbour sharing the edge
+        draws it is left to the neighbour, as Excel stores it. New cells
+        (``matches`` given) reuse an existing XF of the sheet with the same
+        borders and font before a new one is derived.
+        """
+        base = DEFAULT_CELL_XF if data.xf is None else data.xf
+        base_borders, base_font = self._style(base)
+        if data.xf is None:
+            # Cells the model made from nothing carry its stand-in font, not a real one
+            base_font = DEFAULT_FONT
+        wanted = {edge: line for edge, line in data.borders.items() if edge in _FACING and line[0] != XL_LINE_STYLE_NONE}
+        sides: Dict[int, Optional[Tuple[int, int, int]]] = {}
+        for edge in _FACING:
+            line = wanted.get(edge)
+            have = base_borders.get(edge)
+            if line == have:
+                continue
+            if line is not None and have is None and self._mirrored(ws, r, c, edge, line):
+                continue
+            sides[edge] = line
+        font = None if data.font == base_font else data.font
+        if not sides and font is None:
+            return base
+        if matches is not None:
+            match = matches.get(_style_key(wanted, data.font))
+            if match is not None:
+                return match
+        return self._derived_xf(base, sides, font)
+
+    # -- sheets --------------------------------------------------------------
+
+    def _substream_end(self, offset: int) -> int:
+        depth = 0
+        for pos, rec_id, data in iter_records(self.book.stream, offset):
+            if rec_id == REC_BOF:
+                depth += 1
+            elif rec_id == REC_EOF:
+                depth -= 1
+                if depth == 0:
+                    return pos + 4 + len(data)
+        raise PunchUnsupported("substream without EOF")
+
+    def _copy_sheet(self, offset: int, delta: int) -> bytes:
+        """A substream as it is, with stream offsets moved by ``delta`` and 3-D references re-pointed."""
+        end = self._substream_end(offset)
+        if not delta and not self.shifts:
+            return self.book.stream[offset:end]
+        out = []
+        for pos, rec_id, data in iter_records(self.book.stream, offset):
+            if pos >= end:
+                break
+            if rec_id == REC_INDEX and delta:
+                ib = bytearray(data)
+                for at in range(12, len(ib) - 3, 4):
+                    value = struct.unpack_from("<I", ib, at)[0]
+                    if value:
+                        struct.pack_into("<I", ib, at, value + delta)
+                data = bytes(ib)
+            elif rec_id in FORMULA_RECORDS and self.shifts:
+                data = _rgce_patched(data, rec_id, None, self.shift_3d)
+            out.append(record(rec_id, data))
+        return b"".join(out)
+
+    def _rebuild_sheet(self, itab: int, ws: FakeWorksheet, loaded: LoadedCells) -> bytes:
+        sheet = self.book.sheets[itab]
+        shift = self.shifts[itab]
+        # Record bytes, with "table", "dimensions" and "merges" marking where the rebuilt parts go
+        parts: List[Any] = []
+        rows: Dict[int, bytes] = {}
+        cells: Dict[Tuple[int, int], Tuple[int, bytes, List[Tuple[int, bytes]]]] = {}
+        last: Optional[Tuple[int, int]] = None
+        placed: Dict[str, bool] = {}
+        default_height = 0x00FF
+        records = iter_records(self.book.stream, sheet.offset)
+        _pos, rec_id, data = next(records)
+        parts.append(record(rec_id, data))
+        for _pos, rec_id, data in records:
+            if rec_id == REC_EOF:
+                break
+            if rec_id == REC_BOF:
+                raise PunchUnsupported(f"sheet '{sheet.name}' has an embedded chart")
+            what = UNSUPPORTED_RECORDS.get(rec_id)
+            if what:
+                raise PunchUnsupported(f"sheet '{sheet.name}' has {what}")
+            if rec_id == REC_ROW or rec_id in CELL_RECORDS:
+                if not placed.get("table"):
+                    placed["table"] = True
+                    parts.append("table")
+                if rec_id == REC_ROW:
+                    rows[struct.unpack_from("<H", data, 0)[0]] = data
+                else:
+                    for key, cell_id, payload in _split_cells(rec_id, data):
+                        cells[key] = (cell_id, payload, [])
+                        last = key
+            elif rec_id in (REC_STRING, REC_SHRFMLA):
+                if last is None:
+                    raise PunchUnsupported(f"sheet '{sheet.name}' has a formula record outside a cell")
+                cells[last][2].append((rec_id, data))
+            elif rec_id in (REC_INDEX, REC_DBCELL):
+                # Lookup aids for the old cell table; Excel reads the sheet without them
+                continue
+            elif rec_id == REC_DIMENSIONS:
+                placed["dimensions"] = True
+                parts.append("dimensions")
+            elif rec_id == REC_MERGEDCELLS:
+                if not placed.get("merges"):
+                    placed["merges"] = True
+                    parts.append("merges")
+            elif rec_id == REC_HPAGEBREAKS:
+                count = struct.unpack_from("<H", data, 0)[0]
+                parts.append(record(rec_id, _shift_rows_at(data, tuple(2 + k * 6 for k in range(count)), shift)))
+            elif rec_id == REC_HLINK:
+                parts.append(record(rec_id, _shift_rows_at(data, (0, 2), shift)))
+            elif rec_id == REC_HLINKTOOLTIP:
+                parts.append(record(rec_id, _shift_rows_at(data, (2, 4), shift)))
+            else:
+                if rec_id == REC_DEFAULTROWHEIGHT and len(data) >= 4:
+                    default_height = struct.unpack_from("<H", data, 2)[0]
+                parts.append(record(rec_id, data))
+
+        table, dimensions = self._cell_table(itab, ws, loaded, rows, cells, default_height)
+        if not placed.get("table"):
+            parts.insert(parts.index("dimensions") + 1 if placed.get("dimensions") else 1, "table")
+        if not placed.get("merges"):
+            parts.append("merges")
+        markers = {"table": table, "dimensions": record(REC_DIMENSIONS, dimensions), "merges": self._merge_records(ws)}
+        return b"".join(markers[p] if isinstance(p, str) else p for p in parts) + record(REC_EOF, b"")
+
+    def _cell_table(
+        self,
+        itab: int,
+        ws: FakeWorksheet,
+        loaded: LoadedCells,
+        rows: Dict[int, bytes],
+        cells: Dict[Tuple[int, int], Tuple[int, bytes, List[Tuple[int, bytes]]]],
+        default_height: int,
+    ) -> Tuple[bytes, bytes]:
+        """(ROW blocks with their cells, DIMENSIONS payload) for the sheet as the model now has it."""
+        shift = self.shifts[itab]
+        # ROW records follow the inserted rows; new rows take the row above's, like the model's cells
+        for _kind, at, count in ws.row_edits:
+            at0 = at - 1
+            moved = {(r + count if r >= at0 else r): payload for r, payload in rows.items()}
+            above = rows.get(at0 - 1) if at0 >= 1 else None
+            if above is not None:
+                for k in range(count):
+                    moved[at0 + k] = above
+            rows = moved
+
+        matches: Dict[Tuple[Any, ...], int] = {}
+        for _key, (_text, xf) in sorted(self.book.sheets[itab].cells.items()):
+            borders, font = self._style(xf)
+            matches.setdefault(_style_key(borders, font), xf)
+
+        emitted: Dict[int, List[Tuple[int, bytes]]] = {}
+        for (r, c), data in sorted(ws.cells.items()):
+            row0, col0 = r - 1, c - 1
+            if row0 > 0xFFFF or col0 > 0xFF:
+                raise PunchUnsupported("cell outside the BIFF8 grid")
+            origin = loaded.get(id(data))
+            if origin is not None:
+                old_row, old_col, value = origin
+                if old_col != col0:
+                    raise PunchUnsupported("cell moved between columns")
+                cell_id, payload, trailer = cells[(old_row, old_col)]
+                xf = self._cell_xf(ws, r, c, data, None)
+                if data.value == value:
+                    out = bytearray(payload)
+                    struct.pack_into("<H", out, 0, row0)
+                    struct.pack_into("<H", out, 4, xf)
+                    chunk = [record(cell_id, _rgce_patched(bytes(out), cell_id, shift, self.shift_3d)
+                                    if cell_id == REC_FORMULA else bytes(out))]
+                    for extra_id, extra in trailer:
+                        if extra_id == REC_SHRFMLA:
+                            extra = _shift_rows_at(extra, (0, 2), shift)
+                            extra = _rgce_patched(extra, REC_SHRFMLA, shift, self.shift_3d)
+                        chunk.append(record(extra_id, extra))
+                    emitted.setdefault(row0, []).append((col0, b"".join(chunk)))
+                    continue
+                if any(extra_id == REC_SHRFMLA for extra_id, _extra in trailer):
+                    raise PunchUnsupported("value change on a shared formula's anchor cell")
+            else:
+                xf = self._cell_xf(ws, r, c, data, matches)
+                if data.value is None and xf == DEFAULT_CELL_XF:
+                    continue
+            emitted.setdefault(row0, []).append((col0, _value_record(row0, col0, xf, data.value)))
+
+        default_row = struct.pack("<HHHHHHI", 0, 0, 0, default_height, 0, 0, 0x000F0100)
+        out: List[bytes] = []
+        all_rows = sorted(set(rows) | set(emitted))
+        for _index, block_rows in groupby(all_rows, key=lambda r: r // ROWS_PER_BLOCK):
+            block = list(block_rows)
+            for r in block:
+                payload = bytearray(rows.get(r, default_row))
+                struct.pack_into("<H", payload, 0, r)
+                if r in emitted:
+                    cols = [col for col, _chunk in emitted[r]]
+                    struct.pack_into("<HH", payload, 2, min(cols), max(cols) + 1)
+                out.append(record(REC_ROW, bytes(payload)))
+            for r in block:
+                out.extend(chunk for _col, chunk in emitted.get(r, []))
+
+        if emitted:
+            cols = [col for row in emitted.values() for col, _chunk in row]
+            dimensions = struct.pack("<IIHHH", min(emitted), max(emitted) + 1, min(cols), max(cols) + 1, 0)
+        else:
+            dimensions = struct.pack("<IIHHH", 0, 0, 0, 0, 0)
+        return b"".join(out), dimensions
+
+    @staticmethod
+    def _merge_records(ws: FakeWorksheet) -> bytes:
+        merges = sorted(tuple(area) for area in ws.merges if (area[0], area[1]) != (area[2], area[3]))
+        # Excel never stores overlapping areas and repairs (or refuses) a file that has them
+        for i, (top, left, bottom, right) in enumerate(merges):
+            for other in merges[i + 1:]:
+                if other[0] > bottom:
+                    break
+                if other[1] <= right and other[3] >= left:
+                    raise PunchUnsupported(f"sheet '{ws.Name}' would get overlapping merged cells {list(merges[i])} and {list(other)}")
+        areas = [struct.pack("<HHHH", top - 1, bottom - 1, left - 1, right - 1) for top, left, bottom, right in merges]
+        out = []
+        for i in range(0, len(areas), MAX_MERGES_PER_RECORD):
+            chunk = areas[i:i + MAX_MERGES_PER_RECORD]
+            out.append(record(REC_MERGEDCELLS, struct.pack("<H", len(chunk)) + b"".join(chunk)))
+        return b"".join(out)
+
+    # -- workbook ------------------------------------------------------------
+
+    def _shift_name(self, data: bytes) -> bytes:
+        cch = data[3]
+        cce = struct.unpack_from("<H", data, 4)[0]
+        start = 15 + cch * (2 if data[14] & 0x01 else 1)
+        rgce = shift_formula_rows(data[start:start + cce], None, self.shift_3d)
+        return data[:start] + rgce + data[start + cce:]
+
+    def _globals(self, offsets: List[int]) -> bytes:
+        new_xfs = b"".join(record(REC_XF, payload) for payload in self.new_xfs)
+        last_xf = max((i for i, (_pos, rec_id, _data) in enumerate(self.globals) if rec_id == REC_XF), default=-1)
+        # Stream position the new XF records go in at; EXTSST points at SST strings after it
+        insert_at = self.globals[last_xf + 1][0] if last_xf >= 0 else 0
+        out = []
+        sheet = 0
+        for i, (_pos, rec_id, data) in enumerate(self.globals):
+            if rec_id == REC_BOUNDSHEET:
+                data = struct.pack("<I", offsets[sheet]) + data[4:]
+                sheet += 1
+            elif rec_id == REC_NAME and self.shifts:
+                if i + 1 < len(self.globals) and self.globals[i + 1][1] == REC_CONTINUE:
+                    raise PunchUnsupported("continued NAME record")
+                data = self._shift_name(data)
+            elif rec_id == REC_EXTSST and new_xfs:
+                buckets = bytearray(data)
+                for at in range(2, len(buckets) - 7, 8):
+                    ib = struct.unpack_from("<I", buckets, at)[0]
+                    if ib >= insert_at:
+                        struct.pack_into("<I", buckets, at, ib + len(new_xfs))
+                data = bytes(buckets)
+            out.append(record(rec_id, data))
+            if i == last_xf:
+                out.append(new_xfs)
+        return b"".join(out)
+
+    def build(self, targets: Dict[int, Tuple[FakeWorksheet, LoadedCells]]) -> bytes:
+        """The new Workbook stream with the ``targets`` sheets (BOUNDSHEET index -> sheet, loaded cells) rewritten."""
+        self.shifts = {itab: row_shift(ws.row_edits) for itab, (ws, _loaded) in targets.items()}
+        bodies: Dict[int, bytes] = {}
+        for itab, (ws, loaded) in targets.items():
+            bodies[itab] = self._rebuild_sheet(itab, ws, loaded)
+
+        sheets = self.book.sheets
+        order = sorted(range(len(sheets)), key=lambda i: sheets[i].offset)
+        sizes = {
+            i: len(bodies[i]) if i in bodies else self._substream_end(sheets[i].offset) - sheets[i].offset
+            for i in order
+        }
+        offsets = [0] * len(sheets)
+        pos = len(self._globals(offsets))
+        for i in order:
+            offsets[i] = pos
+            pos += sizes[i]
+
+        out = [self._globals(offsets)]
+        for i in order:
+            out.append(bodies[i] if i in bodies else self._copy_sheet(sheets[i].offset, offsets[i] - sheets[i].offset))
+        return b"".join(out)
+
+
+def _run_job(inserter: RowInserter, ws: FakeWorksheet, job: PunchJob) -> None:
+    method = OPERATIONS.get(job.op)
+    if method is None:
+        raise ValueError(f"unknown operation '{job.op}' (expected one of {', '.join(OPERATIONS)})")
+    ws.Cells(job.row, 1).Select()
+    if job.op == "add_rows":
+        inserter.add_rows_to_category(ws, job.row, job.count)
+    else:
+        getattr(inserter, method)(ws, job.row)
+
+
+def punch_workbook(path: str, jobs: List[PunchJob], out_path: Optional[str] = None) -> Dict[str, Any]:
+    """Apply ``jobs`` (in order) to one .xls file and write the result to ``out_path`` (default: in place)."""
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        ole = CompoundFile(f.read())
+    entry = ole.find("Workbook")
+    if entry is None:
+        raise PunchUnsupported("no BIFF8 Workbook stream")
+    book = BiffWorkbook(ole.read_entry(entry))
+    wb = fake_workbook_from_biff(book, path)
+
+    by_name = {ws.Name: (book.sheets.index(biff_sheet), ws) for biff_sheet, ws in zip(book.worksheets, wb.Worksheets)}
+    targets: Dict[int, Tuple[FakeWorksheet, LoadedCells]] = {}
+    inserter = RowInserter()
+    for job in jobs:
+        found = by_name.get(job.sheet)
+        if found is None:
+            found = next((v for k, v in by_name.items() if k.lower() == job.sheet.lower()), None)
+        if found is None:
+            raise KeyError(f"sheet '{job.sheet}' not found in {os.path.basename(path)}")
+        itab, ws = found
+        if itab not in targets:
+            targets[itab] = (ws, {id(data): (r - 1, c - 1, data.value) for (r, c), data in ws.cells.items()})
+        _run_job(inserter, ws, job)
+
+    patcher = _WorkbookPatcher(book)
+    stream = patcher.build(targets)
+    out_path = out_path or path
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(build_compound_file(ole, {entry.name: stream}))
+    os.replace(tmp_path, out_path)
+    return {
+        "file": path,
+        "out": out_path,
+        "jobs": len(jobs),
+        "rows_added": sum(count for ws, _loaded in targets.values() for _kind, _at, count in ws.row_edits),
+        "new_formats": len(patcher.new_xfs),
+        "ms": (time.perf_counter() - start) * 1000.0,
+    }
+
+
+def _punch_task(task: Tuple[str, List[PunchJob], str]) -> Dict[str, Any]:
+    path, jobs, out_path = task
+    try:
+        return punch_workbook(path, jobs, out_path)
+    except Exception as e:
+        return {"file": path, "out": None, "jobs": len(jobs), "error": f"{type(e).__name__}: {e}"}
+
+
+def output_path(path: str, out_dir: Optional[str] = None, suffix: str = "_punched") -> str:
+    """Where a punched copy of ``path`` goes: ``out_dir`` with the same name, else ``<stem><suffix>.xls`` next to it."""
+    if out_dir:
+        return os.path.join(out_dir, os.path.basename(path))
+    stem, ext = os.path.splitext(path)
+    return f"{stem}{suffix}{ext}"
+
+
+def punch_files(
+    jobs: List[PunchJob],
+    out_dir: Optional[str] = None,
+    suffix: str = "_punched",
+    in_place: bool = False,
+    workers: int = 1,
+) -> List[Dict[str, Any]]:
+    """Run jobs grouped per file (job order kept within a file), one worker process per file at a time.
+
+    Returns one result per file in first-seen order; failures carry an
+    ``error`` and leave the file unwritten.
+    """
+    grouped: Dict[str, List[PunchJob]] = {}
+    for job in jobs:
+        grouped.setdefault(job.path, []).append(job)
+    if out_dir and not in_place:
+        names = [os.path.basename(p).lower() for p in grouped]
+        if len(set(names)) != len(names):
+            raise ValueError("files with the same name cannot share one output directory")
+        os.makedirs(out_dir, exist_ok=True)
+    tasks = [
+        (path, file_jobs, path if in_place else output_path(path, out_dir, suffix))
+        for path, file_jobs in grouped.items()
+    ]
+    if workers <= 1 or len(tasks) <= 1:
+        return [_punch_task(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        return list(pool.map(_punch_task, tasks))
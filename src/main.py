@@ -1,9 +1,10 @@
 import argparse
 import os
-from analyzer.excel_pattern_analyzer import ExcelPatternAnalyzer, write_json_report
-from excel_connector import ExcelConnector, ExcelPerformanceTuner
-from row_inserter import RowInserter
-from gui.gui_interface import LinePuncherGUI
+from typing import Any, Callable, List
+
+# Each mode imports its own modules inside run_gui/run_analysis: analysis never
+# loads Tk or the keyboard hook, the GUI never loads the analyzer and its
+# readers. tools/check_startup.py keeps it that way.
 
 
 def parse_args() -> argparse.Namespace:
@@ -17,15 +18,29 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--out",
         dest="out_path",
-        default=os.path.join("reports", "analysis.json"),
-        help="Output JSON report path",
+        default=None,
+        help="Output report path (default: reports/analysis.ndjson, or analysis.json with --format json)",
+    )
+    parser.add_argument(
+        "--format",
+        dest="report_format",
+        choices=["ndjson", "json"],
+        default=None,
+        help="Report format: streamed NDJSON (one record per sheet) or a single JSON document; "
+        "defaults from the --out extension",
     )
     parser.add_argument(
         "--max-cells",
         dest="max_cells",
         type=int,
         default=2000,
-        help="Maximum sampled cells per sheet",
+        help="Maximum sampled cells per sheet (per-cell mode only)",
+    )
+    parser.add_argument(
+        "--per-cell",
+        dest="per_cell",
+        action="store_true",
+        help="Use the legacy per-cell COM sampling instead of bulk UsedRange snapshots",
     )
     parser.add_argument(
         "--borders",
@@ -33,53 +48,233 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Include border and font extraction (slower)",
     )
+    parser.add_argument(
+        "--backend",
+        dest="backend",
+        choices=["auto", "com", "biff"],
+        default="auto",
+        help="Workbook reader: Excel automation (com), direct .xls parsing (biff), or auto",
+    )
+    parser.add_argument(
+        "--compact",
+        dest="compact",
+        action="store_true",
+        help="Write cells in the columnar encoding (shared merge and style tables) instead of per-cell dicts",
+    )
+    parser.add_argument(
+        "--coverage",
+        dest="coverage",
+        choices=["cells", "regions"],
+        default="cells",
+        help="cells: report every used cell; regions: each merge area once plus non-merged cells, "
+        "with style reads per merge area/uniform run",
+    )
+    parser.add_argument(
+        "--workers",
+        dest="workers",
+        type=int,
+        default=1,
+        help="Analyze files in N parallel worker processes, each with its own reader/Excel instance "
+        "(the number of Excel instances the COM backend runs)",
+    )
+    parser.add_argument(
+        "--file-timeout",
+        dest="file_timeout",
+        type=float,
+        default=300.0,
+        help="Per-file timeout in seconds when --workers > 1 (0 disables)",
+    )
+    parser.add_argument(
+        "--recycle-after",
+        dest="recycle_after",
+        type=int,
+        default=None,
+        help="COM backend: restart each Excel instance after this many workbooks (default 50, 0 disables)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        dest="cache_dir",
+        default=os.path.join("reports", ".cache"),
+        help="Directory for cached per-file analysis results",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="no_cache",
+        action="store_true",
+        help="Re-analyze every file and leave the analysis cache untouched",
+    )
     parser.add_argument(
         "--gui",
         dest="run_gui",
         action="store_true",
         help="Launch the two-button GUI instead of running analysis",
     )
+    parser.add_argument(
+        "--prefetch",
+        dest="prefetch",
+        action="store_true",
+        help="GUI mode: follow Excel's selection and read the rows around it before a button is pressed",
+    )
+    parser.add_argument(
+        "--no-context-cache",
+        dest="no_context_cache",
+        action="store_true",
+        help="GUI mode: read the sheet afresh on every button press (no reused sheet model; disables --prefetch)",
+    )
+    parser.add_argument(
+        "--profile",
+        dest="profile",
+        action="store_true",
+        help="GUI mode: record every COM call per button press (flat table + collapsed stacks)",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        dest="profile_dir",
+        default=os.path.join("reports", "profiles"),
+        help="Directory for --profile output",
+    )
     return parser.parse_args()
 
 
-def main() -> None:
-    args = parse_args()
+def run_gui(args: argparse.Namespace, repo_root: str) -> None:
+    # Only Tk and the worker are loaded before the window shows; pywin32 and the
+    # inserter are imported by the worker when the first command arrives (at start with --prefetch)
+    from gui.command_worker import CommandWorker
+    from gui.gui_interface import CMD_ADD_CATEGORY, CMD_ADD_ROWS, MAX_BATCH_ROWS, LinePuncherGUI
+
+    profiler = None
+    if args.profile:
+        from com_profiler import ComProfiler
+
+        profile_dir = args.profile_dir
+        if not os.path.isabs(profile_dir):
+            profile_dir = os.path.join(repo_root, profile_dir)
+        profiler = ComProfiler(out_dir=profile_dir)
+    # Prefetching fills the context cache, so it needs one
+    prefetch = args.prefetch and not args.no_context_cache
+    # connect() fills in [ExcelConnector, RowInserter, SelectionPrefetcher or None]
+    session: List[Any] = []
+
+    def connect() -> None:
+        # Runs on the worker thread, so the Excel objects live in its COM apartment
+        from category_context import CategoryContextCache
+        from excel_connector import ExcelConnector
+        from row_inserter import RowInserter
+
+        conn = ExcelConnector(profiler=profiler)
+        # Consecutive clicks in one table reuse the sheet model
+        inserter = RowInserter(context_cache=None if args.no_context_cache else CategoryContextCache())
+        prefetcher = None
+        if prefetch:
+            from selection_prefetch import SelectionPrefetcher
+
+            prefetcher = SelectionPrefetcher(inserter)
+            conn.watch_events(prefetcher.selection_changed, prefetcher.sheet_changed)
+        session[:] = [conn, inserter, prefetcher]
+
+    def idle() -> None:
+        # Worker thread, between commands: deliver Excel's events, then prefetch once the selection rests
+        conn, _inserter, prefetcher = session
+        conn.pump_events()
+        prefetcher.run_due()
+
+    def run_on_active_cell(label: str, action: Callable[[Any, Any, int], None]) -> None:
+        from com_profiler import profile_operation
+        from excel_connector import ExcelPerformanceTuner
+
+        conn, inserter, prefetcher = session
+        with profile_operation(profiler, label):
+            with ExcelPerformanceTuner(conn.application()):
+                _, ws, cell = conn.get_active_cell()
+                action(inserter, ws, int(cell.Row))
+        if profiler is not None:
+            print(profiler.profiles[-1].summary())
+        if prefetcher is not None:
+            # Events were off while the operation moved the selection; follow it by hand
+            _, ws, cell = conn.get_active_cell()
+            prefetcher.selection_changed(ws, int(cell.Row))
+
+    def on_add_row() -> None:
+        run_on_active_cell("add_row_to_category", lambda inserter, ws, row: inserter.add_row_to_category(ws, row))
+
+    def on_add_rows(count: int) -> None:
+        if count == 1:
+            on_add_row()
+            return
+        run_on_active_cell(
+            f"add_rows_to_category_x{count}",
+            lambda inserter, ws, row: inserter.add_rows_to_category(ws, row, count),
+        )
+
+    def on_add_category() -> None:
+        run_on_active_cell("add_new_category", lambda inserter, ws, row: inserter.add_new_category(ws, row))
+
+    # Excel is driven from one worker thread; repeated Add Row presses queue up as one batch insert
+    worker = CommandWorker(
+        {CMD_ADD_ROWS: on_add_rows, CMD_ADD_CATEGORY: on_add_category},
+        setup=connect,
+        batchable=(CMD_ADD_ROWS,),
+        max_batch=MAX_BATCH_ROWS,
+        idle=idle if prefetch else None,
+    )
+    LinePuncherGUI(on_add_row, on_add_category, on_add_rows, worker=worker).run()
+
+
+def run_analysis(args: argparse.Namespace, repo_root: str) -> None:
+    from analyzer.analysis_cache import AnalysisCache
+    from analyzer.excel_pattern_analyzer import ExcelPatternAnalyzer, write_json_report, write_ndjson_report
+    from analyzer.session_pool import DEFAULT_RECYCLE_AFTER
 
-    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
     target_dir = args.directory
     if not os.path.isabs(target_dir):
         target_dir = os.path.join(repo_root, target_dir)
 
-    out_path = args.out_path
+    report_format = args.report_format
+    if report_format is None:
+        report_format = "json" if (args.out_path or "").lower().endswith(".json") else "ndjson"
+    out_path = args.out_path or os.path.join("reports", f"analysis.{report_format}")
     if not os.path.isabs(out_path):
         out_path = os.path.join(repo_root, out_path)
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
 
-    if args.run_gui:
-        # GUI mode
-        conn = ExcelConnector()
-        inserter = RowInserter()
-
-        def on_add_row() -> None:
-            app = conn.application()
-            with ExcelPerformanceTuner(app):
-                _, ws, cell = conn.get_active_cell()
-                inserter.add_row_to_category(ws, int(cell.Row))
+    analyzer = ExcelPatternAnalyzer(
+        directory_path=target_dir,
+        include_borders=args.include_borders,
+        bulk_read=not args.per_cell,
+        backend=args.backend,
+        compact=args.compact,
+        coverage=args.coverage,
+        recycle_after=DEFAULT_RECYCLE_AFTER if args.recycle_after is None else args.recycle_after,
+    )
+    cache = None
+    if not args.no_cache:
+        cache_dir = args.cache_dir
+        if not os.path.isabs(cache_dir):
+            cache_dir = os.path.join(repo_root, cache_dir)
+        cache = AnalysisCache(cache_dir, analyzer.cache_options(args.max_cells))
+    files = analyzer.iter_analyze(
+        max_cells_per_sheet=args.max_cells,
+        workers=args.workers,
+        file_timeout=args.file_timeout or None,
+        cache=cache,
+    )
+    if report_format == "ndjson":
+        write_ndjson_report(files, out_path)
+    else:
+        write_json_report({"files": list(files)}, out_path)
+    if cache is not None:
+        print(f"Cache: {cache.hits} reused, {cache.misses} analyzed")
+    print(f"Wrote report to: {out_path}")
 
-        def on_add_category() -> None:
-            app = conn.application()
-            with ExcelPerformanceTuner(app):
-                _, ws, cell = conn.get_active_cell()
-                inserter.add_new_category(ws, int(cell.Row))
 
-        LinePuncherGUI(on_add_row, on_add_category).run()
-        return
+def main() -> None:
+    args = parse_args()
 
-    # Analysis mode
-    analyzer = ExcelPatternAnalyzer(directory_path=target_dir, include_borders=args.include_borders)
-    results = analyzer.analyze(max_cells_per_sheet=args.max_cells)
-    write_json_report(results, out_path)
-    print(f"Wrote report to: {out_path}")
+    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+    if args.run_gui:
+        run_gui(args, repo_root)
+    else:
+        run_analysis(args, repo_root)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,162 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from analyzer.sheet_snapshot import MergeTuple
+
+
+def _bottom(area: MergeTuple) -> int:
+    return area[0] + area[2] - 1
+
+
+def _right(area: MergeTuple) -> int:
+    return area[1] + area[3] - 1
+
+
+class MergeIndex:
+    """Merge areas of a sheet indexed for point and row-range queries.
+
+    Areas are kept sorted by top row next to a running maximum of their
+    bottom rows, so "which areas intersect rows a..b" is two bisections plus
+    the matches. Merge areas never overlap, so each column's areas form
+    disjoint row intervals and "which area covers (r, c)" is one bisection
+    in that column. Inserting rows shifts the areas without re-sorting (their order
+    by top row cannot change), no sheet access needed.
+    """
+
+    def __init__(self, merges: Iterable[MergeTuple] = ()) -> None:
+        self._areas: List[MergeTuple] = sorted(set(merges))
+        self._reindex()
+
+    def _reindex(self) -> None:
+        self._tops = [area[0] for area in self._areas]
+        self._max_bottoms: List[int] = []
+        self._refresh_max_bottoms(0)
+        self._columns: Dict[int, List[MergeTuple]] = {}
+        for area in self._areas:
+            for c in range(area[1], _right(area) + 1):
+                self._columns.setdefault(c, []).append(area)
+        self._column_tops = {c: [area[0] for area in areas] for c, areas in self._columns.items()}
+
+    def _refresh_max_bottoms(self, start: int) -> None:
+        del self._max_bottoms[start:]
+        running = self._max_bottoms[-1] if self._max_bottoms else 0
+        for area in self._areas[start:]:
+            running = max(running, _bottom(area))
+            self._max_bottoms.append(running)
+
+    def __len__(self) -> int:
+        return len(self._areas)
+
+    def __iter__(self) -> Iterator[MergeTuple]:
+        return iter(self._areas)
+
+    # -- queries -------------------------------------------------------------
+
+    def at(self, row: int, col: int) -> Optional[MergeTuple]:
+        """The merge area covering (row, col), if any."""
+        areas = self._columns.get(col)
+        if not areas:
+            return None
+        i = bisect_right(self._column_tops[col], row) - 1
+        if i >= 0 and _bottom(areas[i]) >= row:
+            return areas[i]
+        return None
+
+    def intersecting_rows(self, first_row: int, last_row: int) -> List[MergeTuple]:
+        """Areas with at least one row in first_row..last_row, ordered by top row."""
+        lo = bisect_left(self._max_bottoms, first_row)
+        hi = bisect_right(self._tops, last_row)
+        return [area for area in self._areas[lo:hi] if _bottom(area) >= first_row]
+
+    def intersecting(self, first_row: int, first_col: int, last_row: int, last_col: int) -> List[MergeTuple]:
+        return [
+            area for area in self.intersecting_rows(first_row, last_row)
+            if area[1] <= last_col and _right(area) >= first_col
+        ]
+
+    def starting_on_row(self, row: int) -> List[MergeTuple]:
+        lo = bisect_left(self._tops, row)
+        hi = bisect_right(self._tops, row)
+        return self._areas[lo:hi]
+
+    # -- updates ---------------------------------------------------------------
+
+    def add(self, area: MergeTuple) -> MergeTuple:
+        """Add a merge made on the sheet; like Excel, overlapping areas are absorbed.
+
+        Returns the area actually stored.
+        """
+        top, left = area[0], area[1]
+        bottom, right = _bottom(area), _right(area)
+        while True:
+            overlapping = self.intersecting(top, left, bottom, right)
+            grown = (
+                min([top] + [a[0] for a in overlapping]),
+                min([left] + [a[1] for a in overlapping]),
+                max([bottom] + [_bottom(a) for a in overlapping]),
+                max([right] + [_right(a) for a in overlapping]),
+            )
+            if grown == (top, left, bottom, right):
+                break
+            top, left, bottom, right = grown
+        for old in overlapping:
+            self.remove(old)
+
+        merged = (top, left, bottom - top + 1, right - left + 1)
+        i = bisect_left(self._areas, merged)
+        self._areas.insert(i, merged)
+        self._tops.insert(i, top)
+        self._refresh_max_bottoms(i)
+        for c in range(left, right + 1):
+            areas = self._columns.setdefault(c, [])
+            tops = self._column_tops.setdefault(c, [])
+            j = bisect_left(tops, top)
+            areas.insert(j, merged)
+            tops.insert(j, top)
+        return merged
+
+    def remove(self, area: MergeTuple) -> None:
+        i = bisect_left(self._areas, area)
+        if i >= len(self._areas) or self._areas[i] != area:
+            return
+        del self._areas[i]
+        del self._tops[i]
+        self._refresh_max_bottoms(i)
+        for c in range(area[1], _right(area) + 1):
+            areas = self._columns[c]
+            j = areas.index(area)
+            del areas[j]
+            del self._column_tops[c][j]
+
+    def insert_rows(self, at: int, count: int = 1) -> None:
+        """Mirror inserting ``count`` rows at ``at``: areas below move down, spanning areas grow.
+
+        In place: the areas from the first one with top >= at are shifted,
+        the spanning ones (before it, reaching ``at``) grow, and only the
+        columns of those areas have their lists updated.
+        """
+        first_shifted = bisect_left(self._tops, at)
+        first_reaching = bisect_left(self._max_bottoms, at)
+        columns = set()
+        for i in range(first_reaching, len(self._areas)):
+            top, left, nrows, ncols = self._areas[i]
+            if i >= first_shifted:
+                self._areas[i] = (top + count, left, nrows, ncols)
+                self._tops[i] = top + count
+            elif top + nrows - 1 >= at:
+                self._areas[i] = (top, left, nrows + count, ncols)
+            else:
+                continue
+            columns.update(range(left, left + ncols))
+        self._refresh_max_bottoms(first_reaching)
+        for c in columns:
+            areas, tops = self._columns[c], self._column_tops[c]
+            j = bisect_left(tops, at)
+            for k in range(j, len(areas)):
+                top, left, nrows, ncols = areas[k]
+                areas[k] = (top + count, left, nrows, ncols)
+                tops[k] = top + count
+            # At most one area per column spans the insertion point, just before the shifted ones
+            if j > 0 and _bottom(areas[j - 1]) >= at:
+                top, left, nrows, ncols = areas[j - 1]
+                areas[j - 1] = (top, left, nrows + count, ncols)
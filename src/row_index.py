@@ -0,0 +1,125 @@
+from array import array
+from typing import Any, Dict, Optional, Tuple
+
+# Row classes stored in RowSignatureIndex.classify() arrays
+ROW_SPACER = 0
+ROW_DATA = 1
+ROW_HEADER = 2
+ROW_TOTAL = 3
+
+TOTAL_LABELS = ("total", "subtotal", "grand total", "sum")
+
+# (widest 1xN merge width, its left column, 1xN merge count, filled cells, total label)
+RowSignature = Tuple[int, int, int, int, bool]
+
+
+def _is_total_label(text: str) -> bool:
+    label = text.strip().lower()
+    return any(label.startswith(t) for t in TOTAL_LABELS)
+
+
+class RowSignatureIndex:
+    """Compact per-row signatures of a SheetStructure window, one array per field.
+
+    Built in one pass over the model's merge index and values (no sheet
+    access): the widest single-row merge starting on each row within
+    ``max_cols`` (and its left column, the leftmost on ties), the number of
+    such merges, the count of non-empty cells and whether the first
+    non-empty cell reads like a total. ``classify`` turns the arrays into
+    header/data/spacer/total codes in one pass, so "nearest header/data
+    row" questions are array scans over the window.
+    """
+
+    def __init__(self, first_row: int, last_row: int, max_cols: int) -> None:
+        n = max(0, last_row - first_row + 1)
+        self.first_row = first_row
+        self.last_row = last_row
+        self.max_cols = max_cols
+        self.widest = array("H", [0] * n)
+        self.widest_left = array("H", [0] * n)
+        self.merges = array("H", [0] * n)
+        self.filled = array("H", [0] * n)
+        self.total = array("b", [0] * n)
+        self._classes: Dict[Tuple[int, float, int], array] = {}
+
+    @classmethod
+    def build(cls, structure: Any, max_cols: int) -> "RowSignatureIndex":
+        index = cls(structure.first_row, structure.last_row, max_cols)
+        for i, row in enumerate(range(index.first_row, index.last_row + 1)):
+            for _top, left, nrows, ncols in structure.merge_index.starting_on_row(row):
+                if nrows != 1 or ncols < 2 or left > max_cols:
+                    continue
+                index.merges[i] += 1
+                if ncols > index.widest[i] or (ncols == index.widest[i] and left < index.widest_left[i]):
+                    index.widest[i] = ncols
+                    index.widest_left[i] = left
+            values = structure.values.get(row) or ()
+            first_text = ""
+            for text in values[:max_cols]:
+                if text.strip():
+                    index.filled[i] += 1
+                    if not first_text:
+                        first_text = text
+            index.total[i] = 1 if first_text and _is_total_label(first_text) else 0
+        return index
+
+    def _slot(self, row: int) -> Optional[int]:
+        if self.first_row <= row <= self.last_row:
+            return row - self.first_row
+        return None
+
+    def signature(self, row: int) -> Optional[RowSignature]:
+        i = self._slot(row)
+        if i is None:
+            return None
+        return self.widest[i], self.widest_left[i], self.merges[i], self.filled[i], bool(self.total[i])
+
+    def classify(self, used_cols: int, threshold_ratio: float = 0.5, min_width: int = 5) -> array:
+        """Class code per window row; header uses the is_header_like_row width rule."""
+        key = (used_cols, threshold_ratio, min_width)
+        classes = self._classes.get(key)
+        if classes is None:
+            need = max(min_width, int(used_cols * threshold_ratio))
+            classes = array("b", [
+                ROW_HEADER if widest and widest >= need
+                else ROW_TOTAL if total
+                else ROW_SPACER if not filled and not merges
+                else ROW_DATA
+                for widest, merges, filled, total in zip(self.widest, self.merges, self.filled, self.total)
+            ])
+            self._classes[key] = classes
+        return classes
+
+    def row_class(self, row: int, used_cols: int, threshold_ratio: float = 0.5, min_width: int = 5) -> Optional[int]:
+        i = self._slot(row)
+        if i is None:
+            return None
+        return self.classify(used_cols, threshold_ratio, min_width)[i]
+
+    def covers(self, first_row: int, last_row: int) -> bool:
+        return self.first_row <= min(first_row, last_row) and max(first_row, last_row) <= self.last_row
+
+    def nearest_non_header(self, start_row: int, stop_row: int, used_cols: int) -> Optional[int]:
+        """First row from start_row towards stop_row (either direction) that is not header-like.
+
+        Both rows must be covered (see ``covers``).
+        """
+        classes = self.classify(used_cols)
+        i, j = start_row - self.first_row, stop_row - self.first_row
+        step = 1 if j >= i else -1
+        for k in range(i, j + step, step):
+            if classes[k] != ROW_HEADER:
+                return self.first_row + k
+        return None
+
+    def widest_block(self, first_row: int, last_row: int) -> Optional[Tuple[int, int, int]]:
+        """(row, left, width) of the widest 1xN merge scanning last_row up to first_row.
+
+        The nearest row wins ties, and the leftmost block within a row, as in
+        find_nearest_header_merge_ws. Both rows must be covered.
+        """
+        best: Optional[Tuple[int, int, int]] = None
+        for k in range(last_row - self.first_row, first_row - self.first_row - 1, -1):
+            if self.widest[k] and (best is None or self.widest[k] > best[2]):
+                best = (self.first_row + k, self.widest_left[k], self.widest[k])
+        return best
@@ -1,26 +1,101 @@
-from typing import Any
+from typing import Any, List, Optional
+from category_context import CategoryContextCache
 from pattern_analyzer import (
     find_nearest_header_merge_ws,
     find_vertical_merges_touching_row,
     find_nearest_data_row,
     detect_effective_max_cols,
 )
-from format_utils import (
-    copy_merge_and_borders_from_above,
-    apply_horizontal_merges_like_row,
-    extend_vertical_merges_below,
-    apply_borders_like_row,
-    apply_neighbor_edge_borders,
-)
+from row_plan import CategoryStamp, RowPlan, RowPlanner
+from sheet_structure import SheetStructure
 
 
 class RowInserter:
-    def __init__(self) -> None:
-        pass
+    def __init__(self, context_cache: Optional[CategoryContextCache] = None, dry_run: bool = False) -> None:
+        # With a cache, the sheet model is reused between clicks instead of rebuilt each time
+        self.context_cache = context_cache
+        # Plan every write but make none; last_plans/last_write_count report what would have been done
+        self.dry_run = dry_run
+        self.last_plans: List[RowPlan] = []
+
+    @property
+    def last_write_count(self) -> int:
+        """COM writes (planned, with dry_run) of the last operation."""
+        return sum(plan.write_count for plan in self.last_plans)
+
+    def _structure(self, ws: Any, active_row: int) -> SheetStructure:
+        if self.context_cache is not None:
+            return self.context_cache.structure_for(ws, active_row)
+        return SheetStructure.build(ws, anchor_row=active_row)
+
+    def _planner(self, ws: Any, structure: SheetStructure) -> RowPlanner:
+        planner = RowPlanner(ws, structure, dry_run=self.dry_run)
+        self.last_plans = planner.plans
+        return planner
+
+    def _finish(self, ws: Any, ok: bool, stamp: Optional[CategoryStamp] = None) -> None:
+        if self.context_cache is None:
+            return
+        if ok and not self.dry_run:
+            self.context_cache.note_inserted(ws, self.last_plans)
+            if stamp is not None:
+                self.context_cache.store_stamp(ws, stamp)
+        else:
+            # A half-done operation (or a dry run's model-only inserts) leaves the cached model out of step with the sheet
+            self.context_cache.forget(ws)
+
+    def prefetch(self, ws: Any, active_row: int) -> None:
+        """Read what an operation at active_row would, into the cached model; nothing is written.
+
+        Needs a context cache. The next operation at the same row starts
+        from this model instead of re-reading it (see CategoryContextCache.warm).
+        """
+        if self.context_cache is None:
+            return
+        structure = self.context_cache.warm(ws, active_row)
+        verticals = find_vertical_merges_touching_row(ws, active_row, structure=structure)
+        used_cols = detect_effective_max_cols(ws, anchor_row=active_row, structure=structure)
+        # Template and neighbour rows of Add Row (the row above when at the bottom of a block)
+        rows = [active_row, active_row + 1]
+        if any(active_row == top + nrows - 1 for top, _left, nrows, _ncols in verticals):
+            rows.append(active_row - 1)
+        # ... and of Add New Category
+        header = find_nearest_header_merge_ws(ws, start_row=active_row, structure=structure)
+        if header:
+            rows.append(header.row)
+            data_row = find_nearest_data_row(ws, start_row=active_row, used_cols=used_cols, structure=structure)
+            if data_row is not None:
+                rows.append(data_row)
+        for row in rows:
+            if row >= 1:
+                structure.cell_borders(row, 1)
+                structure.cell_format(row, 1)
 
     def add_row_to_category(self, ws: Any, active_row: int) -> None:
+        self.add_rows_to_category(ws, active_row, 1)
+
+    def add_rows_to_category(self, ws: Any, active_row: int, count: int) -> None:
+        """Insert ``count`` category rows below active_row in one go.
+
+        The template row is resolved once, the rows are inserted with one
+        ``Insert`` and formatted, merged and bordered with range-level
+        operations over the whole block; vertical merges grow by ``count``.
+        """
+        if count < 1:
+            return
+        ok = False
+        try:
+            self._add_rows_to_category(ws, active_row, count)
+            ok = True
+        finally:
+            self._finish(ws, ok)
+
+    def _add_rows_to_category(self, ws: Any, active_row: int, count: int) -> None:
+        # One bulk read of the rows around the active row; the helpers query it instead of the sheet
+        structure = self._structure(ws, active_row)
+
         # Determine if the active row is the bottom of a vertical merge area.
-        verticals = find_vertical_merges_touching_row(ws, active_row)
+        verticals = find_vertical_merges_touching_row(ws, active_row, structure=structure)
         is_bottom = False
         for top, _left, nrows, _ncols in verticals:
             if active_row == top + nrows - 1:
@@ -33,58 +108,73 @@ class RowInserter:
         except Exception:
             active_col = 1
 
-        ws.Rows(active_row + 1).Insert()
-        used_cols = detect_effective_max_cols(ws, anchor_row=active_row)
+        planner = self._planner(ws, structure)
+        planner.insert_rows(active_row + 1, count)
+        used_cols = detect_effective_max_cols(ws, anchor_row=active_row, structure=structure)
 
         # If at bottom of a category block, copy from interior row and extend vertical merges
         ref_row = active_row if not is_bottom else max(1, active_row - 1)
-        copy_merge_and_borders_from_above(ws, target_row=active_row + 1, ref_row=ref_row, max_cols=used_cols)
-        apply_horizontal_merges_like_row(ws, source_row=ref_row, target_row=active_row + 1, max_cols=used_cols)
-        apply_borders_like_row(ws, source_row=ref_row, target_row=active_row + 1, max_cols=used_cols)
-        apply_neighbor_edge_borders(ws, target_row=active_row + 1, left_col=1, right_col=used_cols)
-        if verticals:
-            extend_vertical_merges_below(ws, verticals)
-
-        # Restore selection
-        try:
-            ws.Cells(active_row + 1, active_col).Select()
-        except Exception:
-            pass
+        target_row = active_row + 1
+        planner.commit(planner.plan_row_like(target_row, ref_row, used_cols, rows=count, verticals=verticals))
+
+        # Restore selection on the last new row, where repeated single inserts would leave it
+        self._select(ws, active_row + count, active_col)
 
     def add_new_category(self, ws: Any, active_row: int) -> None:
+        ok = False
+        stamp = None
+        try:
+            stamp = self._add_new_category(ws, active_row)
+            ok = True
+        finally:
+            self._finish(ws, ok, stamp)
+
+    def _add_new_category(self, ws: Any, active_row: int) -> Optional[CategoryStamp]:
+        """Returns the CategoryStamp for the next click in this table (None without a cache or header)."""
         # Insert a spacer and a header-like row using nearest header merge
         try:
             active_col = int(ws.Application.ActiveCell.Column)
         except Exception:
             active_col = 1
 
-        ws.Rows(active_row + 1).Insert()
-        used_cols = detect_effective_max_cols(ws, anchor_row=active_row)
-        header = find_nearest_header_merge_ws(ws, start_row=active_row)
+        structure = self._structure(ws, active_row)
+        planner = self._planner(ws, structure)
+        if self.context_cache is not None:
+            # Template rows stamped by earlier clicks are not read again
+            planner.preload(self.context_cache.stamp_rows(ws, active_row))
+        planner.insert_rows(active_row + 1)
+        used_cols = detect_effective_max_cols(ws, anchor_row=active_row, structure=structure)
+        header = find_nearest_header_merge_ws(ws, start_row=active_row, structure=structure)
         if header:
-            copy_merge_and_borders_from_above(ws, target_row=active_row + 1, ref_row=header.row, max_cols=used_cols)
-            apply_horizontal_merges_like_row(ws, source_row=header.row, target_row=active_row + 1, max_cols=used_cols)
-            apply_borders_like_row(ws, source_row=header.row, target_row=active_row + 1, max_cols=used_cols)
-            apply_neighbor_edge_borders(ws, target_row=active_row + 1, left_col=1, right_col=used_cols)
+            target_row = active_row + 1
+            planner.commit(planner.plan_row_like(target_row, header.row, used_cols))
             # After creating a header row, immediately add a data-style row below using nearest data row as template
-            data_template_row = find_nearest_data_row(ws, start_row=active_row, used_cols=used_cols)
+            data_template_row = find_nearest_data_row(ws, start_row=active_row, used_cols=used_cols, structure=structure)
             if data_template_row is not None:
-                ws.Rows(active_row + 2).Insert()
-                copy_merge_and_borders_from_above(ws, target_row=active_row + 2, ref_row=data_template_row, max_cols=used_cols)
-                apply_horizontal_merges_like_row(ws, source_row=data_template_row, target_row=active_row + 2, max_cols=used_cols)
-                apply_borders_like_row(ws, source_row=data_template_row, target_row=active_row + 2, max_cols=used_cols)
-                apply_neighbor_edge_borders(ws, target_row=active_row + 2, left_col=1, right_col=used_cols)
-                try:
-                    ws.Cells(active_row + 2, active_col).Select()
-                except Exception:
-                    pass
+                planner.insert_rows(active_row + 2)
+                target_row = active_row + 2
+                planner.commit(planner.plan_row_like(target_row, data_template_row, used_cols))
+                self._select(ws, active_row + 2, active_col)
+                if self.context_cache is None or self.dry_run:
+                    return None
+                if data_template_row >= target_row:
+                    data_template_row += 1
+                # The next click here uses the new rows as its templates and active row; the rows
+                # around them are only bordered against, so their formats are not read for the stamp
+                rows = {r: planner.row_styles(r, used_cols, formats=False) for r in (active_row, active_row + 3)}
+                for r in (header.row, data_template_row, active_row + 1, active_row + 2):
+                    rows[r] = planner.row_styles(r, used_cols)
+                return CategoryStamp(header.row, rows)
         else:
-            copy_merge_and_borders_from_above(ws, target_row=active_row + 1, ref_row=active_row, max_cols=used_cols)
-            apply_borders_like_row(ws, source_row=active_row, target_row=active_row + 1, max_cols=used_cols)
-            apply_neighbor_edge_borders(ws, target_row=active_row + 1, left_col=1, right_col=used_cols)
-            try:
-                ws.Cells(active_row + 1, active_col).Select()
-            except Exception:
-                pass
-
+            target_row = active_row + 1
+            planner.commit(planner.plan_row_like(target_row, active_row, used_cols, merges=False))
+            self._select(ws, active_row + 1, active_col)
+        return None
 
+    def _select(self, ws: Any, row: int, col: int) -> None:
+        if self.dry_run:
+            return
+        try:
+            ws.Cells(row, col).Select()
+        except Exception:
+            pass
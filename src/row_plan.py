@@ -0,0 +1,663 @@
+"""Desired-state planning for the rows RowInserter formats.
+
+Copying a template row is done in passes that overwrite each other: the
+target's borders are cleared, redrawn like the template and then matched to
+the rows above and below, and its formats are rewritten even when the
+inserted row already carries them. ``RowPlanner`` runs those same passes on
+an in-memory model of the rows' edges and formats, seeded from the
+``SheetStructure`` snapshot, and keeps only the net result: a ``RowPlan`` of
+range-level writes for the properties that actually change. In a dry run
+plans are only built and counted, nothing is written to the sheet.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from analyzer.sheet_snapshot import MergeTuple, block_range
+from format_utils import (
+    XL_EDGE_BOTTOM,
+    XL_EDGE_LEFT,
+    XL_EDGE_RIGHT,
+    XL_EDGE_TOP,
+    XL_INSIDE_HORIZONTAL,
+    XL_INSIDE_VERTICAL,
+    XL_PASTE_FORMATS,
+    BorderJob,
+    BorderWrite,
+    border_jobs,
+    copy_row_formats,
+    row_has_merges,
+    row_spans,
+    span_border_writes,
+    value_runs,
+)
+from sheet_structure import FONT_PROPS, INTERIOR_PROPS, SheetStructure
+
+XL_LINE_STYLE_NONE = -4142
+XL_THIN = 2
+# An edge without a line, as read back after clearing it
+NO_LINE = {"line_style": XL_LINE_STYLE_NONE, "weight": XL_THIN, "color": 0}
+SIDES = ("left", "top", "bottom", "right")
+# cell side -> (row offset, col offset, side) of the same line seen from the neighbour
+_SHARED_SIDE = {"left": (0, -1, "right"), "right": (0, 1, "left"), "top": (-1, 0, "bottom"), "bottom": (1, 0, "top")}
+_BORDER_PROPS = (("LineStyle", "line_style"), ("Weight", "weight"), ("Color", "color"))
+# Property groups written (and failing) together, as format_utils._apply_format does
+_FORMAT_GROUPS = (
+    (None, ("NumberFormat",)),
+    (None, ("HorizontalAlignment", "VerticalAlignment", "WrapText")),
+    ("Font", FONT_PROPS),
+    ("Interior", INTERIOR_PROPS),
+)
+
+BorderProps = Tuple[Tuple[str, Any], ...]
+EdgeKey = Tuple[int, int, str]  # (row, col, side)
+
+
+# ---------------------------------------------------------------------------
+# Plan steps
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class InsertStep:
+    at: int
+    count: int = 1
+
+    @property
+    def writes(self) -> int:
+        return 1
+
+    def apply(self, ws: Any) -> bool:
+        if self.count == 1:
+            ws.Rows(self.at).Insert()
+        else:
+            ws.Rows(self.at).Resize(self.count).Insert()
+        return True
+
+
+@dataclass
+class PasteStep:
+    """All of ref_row's formats onto rows target_row..last_row with one Copy/PasteSpecial."""
+
+    ref_row: int
+    target_row: int
+    last_row: int
+    max_cols: int
+    structure: SheetStructure
+
+    @property
+    def writes(self) -> int:
+        return 3  # Copy, PasteSpecial, CutCopyMode
+
+    def apply(self, ws: Any) -> bool:
+        pasted = False
+        try:
+            block_range(ws, self.ref_row, 1, self.ref_row, self.max_cols).Copy()
+            block_range(ws, self.target_row, 1, self.last_row, self.max_cols).PasteSpecial(Paste=XL_PASTE_FORMATS)
+            pasted = True
+        except Exception:
+            pass
+        finally:
+            try:
+                ws.Application.CutCopyMode = False
+            except Exception:
+                pass
+        if not pasted:
+            rows = self.last_row - self.target_row + 1
+            copy_row_formats(ws, self.ref_row, self.target_row, self.max_cols, self.structure, rows=rows)
+        return True
+
+
+@dataclass
+class FormatStep:
+    r1: int
+    c1: int
+    r2: int
+    c2: int
+    props: Dict[str, Any]  # read_uniform_format keys ("NumberFormat", "Font.Name", ...)
+
+    @property
+    def writes(self) -> int:
+        return len(self.props)
+
+    def apply(self, ws: Any) -> bool:
+        rng = block_range(ws, self.r1, self.c1, self.r2, self.c2)
+        for owner, names in _FORMAT_GROUPS:
+            keys = [(name, f"{owner}.{name}" if owner else name) for name in names]
+            keys = [(name, key) for name, key in keys if key in self.props]
+            if not keys:
+                continue
+            try:
+                target = getattr(rng, owner) if owner else rng
+                for name, key in keys:
+                    setattr(target, name, self.props[key])
+            except Exception:
+                pass
+        return True
+
+
+@dataclass
+class BorderStep:
+    r1: int
+    c1: int
+    r2: int
+    c2: int
+    idx: int
+    props: BorderProps  # (("LineStyle", value), ("Weight", value), ...) in assignment order
+
+    @property
+    def writes(self) -> int:
+        return len(self.props)
+
+    def apply(self, ws: Any) -> bool:
+        try:
+            border = block_range(ws, self.r1, self.c1, self.r2, self.c2).Borders(self.idx)
+            for name, value in self.props:
+                setattr(border, name, value)
+        except Exception:
+            return False
+        return True
+
+
+@dataclass
+class MergeStep:
+    r1: int
+    c1: int
+    r2: int
+    c2: int
+    across: bool = False
+    # Merge areas the model records once the merge is made
+    areas: List[MergeTuple] = field(default_factory=list)
+
+    @property
+    def writes(self) -> int:
+        return 1
+
+    def apply(self, ws: Any) -> bool:
+        try:
+            rng = block_range(ws, self.r1, self.c1, self.r2, self.c2)
+            if self.across:
+                # Merge(Across=True) merges each row of the block separately
+                rng.Merge(True)
+            else:
+                rng.Merge()
+        except Exception:
+            return False
+        return True
+
+
+@dataclass
+class RowStyles:
+    """One row's styles as the planner reads them: formats of columns 1..max_cols, borders one column past that (or its last span)."""
+
+    max_cols: int
+    spans: List[Tuple[int, int]]
+    merged: bool
+    borders: Dict[int, Dict[str, Any]]
+    formats: Dict[int, Dict[str, Any]]
+    # read_row_signature of the row when it was stamped (see CategoryContextCache.store_stamp)
+    signature: Optional[Tuple[Any, ...]] = None
+
+
+@dataclass
+class CategoryStamp:
+    """Rows of one Add New Category as it left them, for the next click in the same table.
+
+    Holds the header and data template rows, the new category's rows and
+    the borders of the rows around them. Preloaded into the planner they are
+    not read from the sheet again; the next category is still planned and
+    diffed like any other, so only reads are saved. Each row carries a
+    style signature, checked against the sheet before the stamp is used.
+    """
+
+    header_row: int
+    rows: Dict[int, RowStyles]
+
+    def insert_rows(self, at: int, count: int) -> None:
+        def shift(row: int) -> int:
+            return row + count if row >= at else row
+
+        self.header_row = shift(self.header_row)
+        self.rows = {shift(row): styles for row, styles in self.rows.items()}
+
+    def touches(self, first_row: int, last_row: int) -> bool:
+        return any(first_row <= row <= last_row for row in self.rows)
+
+
+@dataclass
+class RowPlan:
+    """Writes for one formatting step, in order; rows first_row..last_row are the ones whose styles change."""
+
+    first_row: int
+    last_row: int
+    steps: List[Any] = field(default_factory=list)
+
+    @property
+    def write_count(self) -> int:
+        return sum(step.writes for step in self.steps)
+
+
+# ---------------------------------------------------------------------------
+# Style model
+# ---------------------------------------------------------------------------
+
+
+class _Layer:
+    """One row as the planner sees it: ``base`` row's styles on the sheet, overridden by ``values``."""
+
+    __slots__ = ("base", "values")
+
+    def __init__(self, base: int, values: Dict[Any, Any]) -> None:
+        self.base = base
+        self.values = values
+
+
+class _StyleModel:
+    """Per-row styles (edges or formats) planned so far, on top of what ``read`` finds on the sheet.
+
+    Inserted rows are copies of the row above them: they read through to
+    that row, and when it is rewritten later they keep its old values.
+    """
+
+    def __init__(self, read: Callable[[int, Any], Any]) -> None:
+        self._read = read
+        self._layers: Dict[int, _Layer] = {}
+
+    def get(self, row: int, key: Any) -> Any:
+        layer = self._layers.get(row)
+        if layer is None:
+            return self._read(row, key)
+        if key in layer.values:
+            return layer.values[key]
+        return self._read(layer.base, key)
+
+    def set(self, row: int, key: Any, value: Any) -> None:
+        for other, layer in self._layers.items():
+            if other != row and layer.base == row and key not in layer.values:
+                layer.values[key] = self._read(row, key)
+        layer = self._layers.get(row)
+        if layer is None:
+            layer = self._layers[row] = _Layer(row, {})
+        layer.values[key] = value
+
+    def copy_row(self, source: int, target: int) -> None:
+        """Make ``target`` a copy of ``source`` (inserted row, pasted formats)."""
+        layer = self._layers.get(source)
+        self._layers[target] = _Layer(layer.base, dict(layer.values)) if layer is not None else _Layer(source, {})
+
+    def same_rows(self, a: int, b: int, keep: Callable[[Any], bool]) -> bool:
+        """True when rows a and b are known to hold the same values for every key ``keep`` accepts."""
+        def state(row: int) -> Tuple[int, Dict[Any, Any]]:
+            layer = self._layers.get(row)
+            if layer is None:
+                return row, {}
+            return layer.base, {k: v for k, v in layer.values.items() if keep(k)}
+
+        return state(a) == state(b)
+
+    def insert_rows(self, at: int, count: int) -> None:
+        def shift(row: int) -> int:
+            return row + count if row >= at else row
+
+        self._layers = {shift(row): _Layer(shift(layer.base), layer.values) for row, layer in self._layers.items()}
+
+
+def _no_line(style: Any) -> bool:
+    return isinstance(style, dict) and style.get("line_style") in (XL_LINE_STYLE_NONE, 0)
+
+
+def _drawn(style: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Edge left by assigning LineStyle, Weight and Color from ``style`` (None clears it)."""
+    if style is None:
+        return dict(NO_LINE)
+    line_style = style["line_style"]
+    # Weight/Color on an edge without a line draw a continuous one
+    return {
+        "line_style": 1 if line_style in (XL_LINE_STYLE_NONE, 0) else line_style,
+        "weight": style.get("weight"),
+        "color": style.get("color"),
+    }
+
+
+def _line_props(before: Sequence[Any], final: Dict[str, Any]) -> BorderProps:
+    """Assignments that turn every side in ``before`` into ``final`` (empty when nothing changes)."""
+    if _no_line(final):
+        if all(_no_line(side) for side in before):
+            return ()
+        return (("LineStyle", 0),)
+    props = []
+    for name, key in _BORDER_PROPS:
+        for side in before:
+            known = isinstance(side, dict) and "error" not in side and side.get(key) is not None
+            if not known or side[key] != final[key]:
+                props.append((name, final[key]))
+                break
+    return tuple(props)
+
+
+def _job_edges(r1: int, r2: int, c1: int, c2: int, idx: int) -> Iterator[EdgeKey]:
+    """Cell sides a Range(r1..r2, c1..c2).Borders(idx) assignment covers."""
+    if idx == XL_EDGE_LEFT:
+        for r in range(r1, r2 + 1):
+            yield r, c1, "left"
+    elif idx == XL_EDGE_RIGHT:
+        for r in range(r1, r2 + 1):
+            yield r, c2, "right"
+    elif idx == XL_EDGE_TOP:
+        for c in range(c1, c2 + 1):
+            yield r1, c, "top"
+    elif idx == XL_EDGE_BOTTOM:
+        for c in range(c1, c2 + 1):
+            yield r2, c, "bottom"
+    elif idx == XL_INSIDE_VERTICAL:
+        for r in range(r1, r2 + 1):
+            for c in range(c1, c2):
+                yield r, c, "right"
+    elif idx == XL_INSIDE_HORIZONTAL:
+        for r in range(r1, r2):
+            for c in range(c1, c2 + 1):
+                yield r, c, "bottom"
+
+
+def _rectangles(lines: Dict[int, Dict[int, BorderProps]]) -> List[List[Any]]:
+    """[outer1, outer2, inner1, inner2, props] blocks of lines with equal writes.
+
+    ``lines`` maps an outer position (line row or line column) to inner
+    positions; runs along the inner axis are joined across consecutive
+    outer positions.
+    """
+    blocks: List[List[Any]] = []
+    open_blocks: Dict[Tuple[int, int, BorderProps], List[Any]] = {}
+    for outer in sorted(lines):
+        for first, last, props in value_runs(lines[outer]):
+            block = open_blocks.get((first, last, props))
+            if block is not None and block[1] == outer - 1:
+                block[1] = outer
+                continue
+            block = [outer, outer, first, last, props]
+            blocks.append(block)
+            open_blocks[(first, last, props)] = block
+    return blocks
+
+
+# ---------------------------------------------------------------------------
+# Planner
+# ---------------------------------------------------------------------------
+
+
+class RowPlanner:
+    """Plans (and unless ``dry_run``, makes) the writes of one RowInserter operation.
+
+    Structural edits go through ``insert_rows``; each formatted row (block)
+    is planned with ``plan_row_like`` and written with ``commit``. The model
+    carries over between plans, so a dry run of several steps sees the
+    effect of the earlier ones.
+    """
+
+    def __init__(self, ws: Any, structure: SheetStructure, dry_run: bool = False) -> None:
+        self.ws = ws
+        self.structure = structure
+        self.dry_run = dry_run
+        self.plans: List[RowPlan] = []
+        self._edges = _StyleModel(self._read_edge)
+        self._formats = _StyleModel(self._read_format)
+        # Rows whose styles are known without reading the sheet (preload)
+        self._known: Dict[int, RowStyles] = {}
+        # Sides rewritten by the plan being built, with their value before it
+        self._before: Dict[EdgeKey, Any] = {}
+
+    @property
+    def write_count(self) -> int:
+        return sum(plan.write_count for plan in self.plans)
+
+    def preload(self, rows: Dict[int, RowStyles]) -> None:
+        """Use these styles for template rows instead of reading them (see CategoryStamp)."""
+        self._known.update(rows)
+
+    def row_styles(self, row: int, max_cols: int, formats: bool = True) -> RowStyles:
+        """``row`` as planned so far, in the shape preload takes; without ``formats`` only its borders."""
+        spans = self._row_spans(row, max_cols)
+        # Edges shared with the next column are read through the cell to the right
+        last_col = (max(spans[-1][1], max_cols) if spans else max_cols) + 1
+        return RowStyles(
+            max_cols=max_cols,
+            spans=spans,
+            merged=self._has_merges(row, max_cols),
+            borders=self._row_borders(row, 1, last_col),
+            formats={c: self._formats.get(row, c) for c in range(1, max_cols + 1)} if formats else {},
+        )
+
+    def insert_rows(self, at: int, count: int = 1) -> None:
+        """Insert ``count`` rows at ``at``; like Excel, they start as copies of the row above."""
+        plan = RowPlan(at, at + count - 1, [InsertStep(at, count)])
+        self.plans.append(plan)
+        if not self.dry_run:
+            plan.steps[0].apply(self.ws)
+        self.structure.insert_rows(at, count, virtual=self.dry_run)
+        self._known = {(row + count if row >= at else row): styles for row, styles in self._known.items()}
+        for model in (self._edges, self._formats):
+            model.insert_rows(at, count)
+            if at > 1:
+                for row in range(at, at + count):
+                    model.copy_row(at - 1, row)
+
+    def commit(self, plan: RowPlan) -> None:
+        """Write ``plan`` (nothing in a dry run) and record its merges in the structure."""
+        self.plans.append(plan)
+        for step in plan.steps:
+            ok = True if self.dry_run else step.apply(self.ws)
+            if ok and isinstance(step, MergeStep):
+                for area in step.areas:
+                    self.structure.add_merge(*area)
+        if not self.dry_run:
+            self.structure.invalidate_rows(plan.first_row, plan.last_row)
+
+    def plan_row_like(
+        self,
+        target_row: int,
+        ref_row: int,
+        max_cols: int,
+        rows: int = 1,
+        merges: bool = True,
+        verticals: Sequence[MergeTuple] = (),
+    ) -> RowPlan:
+        """Make rows target_row..target_row+rows-1 look like ref_row over columns 1..max_cols.
+
+        The desired state is built on the model in the order the live copy
+        made its writes: ref_row's formats, its horizontal merges (with
+        ``merges``), cleared borders redrawn like ref_row's perimeter edges
+        and top/bottom edges matched to the neighbouring rows; ``verticals``
+        are vertical merges grown by ``rows``. Only edges and format
+        properties that end up different from the current state are written,
+        one Range-level assignment per block of equal changes.
+        """
+        last_row = target_row + rows - 1
+        plan = RowPlan(target_row - 1, last_row + 1)
+        self._before = {}
+        self._plan_formats(plan, target_row, last_row, ref_row, max_cols)
+
+        self._paint(self._clear_jobs(target_row, last_row, max_cols))
+        spans = self._row_spans(ref_row, max_cols)
+        if merges:
+            for left, right in spans:
+                if right > left:
+                    areas = [(r, left, 1, right - left + 1) for r in range(target_row, last_row + 1)]
+                    plan.steps.append(MergeStep(target_row, left, last_row, right, across=rows > 1, areas=areas))
+        self._borders_like_row(spans, ref_row, target_row, last_row, max_cols)
+        self._neighbor_edges(target_row, last_row, max_cols)
+        plan.steps.extend(self._border_steps())
+
+        for top, left, nrows, ncols in verticals:
+            # Extend by the inserted rows (after insertion)
+            plan.steps.append(
+                MergeStep(top, left, top + nrows - 1 + rows, left + ncols - 1, areas=[(top, left, nrows + rows, ncols)])
+            )
+        return plan
+
+    # -- formats ------------------------------------------------------------------
+
+    def _plan_formats(self, plan: RowPlan, target_row: int, last_row: int, ref_row: int, max_cols: int) -> None:
+        targets = range(target_row, last_row + 1)
+        if all(self._formats.same_rows(r, ref_row, lambda c: c <= max_cols) for r in targets):
+            # Inserted below the template: Excel already formatted them like it
+            return
+        if not any(self._has_merges(row, max_cols) for row in [ref_row, *targets]):
+            plan.steps.append(PasteStep(ref_row, target_row, last_row, max_cols, self.structure))
+            for r in targets:
+                self._formats.copy_row(ref_row, r)
+                # The paste brings ref_row's borders along (the target cells' own sides)
+                for c in range(1, max_cols + 1):
+                    for side in SIDES:
+                        self._edges.set(r, (c, side), self._edge(ref_row, c, side))
+            return
+        formats = {c: self._formats.get(ref_row, c) for c in range(1, max_cols + 1)}
+        for first, last, fmt in value_runs(formats):
+            if not fmt:
+                continue
+            current = [self._formats.get(r, c) for r in targets for c in range(first, last + 1)]
+            props = {key: value for key, value in fmt.items() if any(cur.get(key) != value for cur in current)}
+            if props:
+                plan.steps.append(FormatStep(target_row, first, last_row, last, props))
+            for r in targets:
+                for c in range(first, last + 1):
+                    self._formats.set(r, c, fmt)
+
+    def _read_format(self, row: int, col: int) -> Dict[str, Any]:
+        known = self._known.get(row)
+        if known is not None and col in known.formats:
+            return known.formats[col]
+        return self.structure.cell_format(row, col)
+
+    def _row_spans(self, row: int, max_cols: int) -> List[Tuple[int, int]]:
+        known = self._known.get(row)
+        if known is not None and known.max_cols == max_cols:
+            return known.spans
+        return row_spans(self.ws, row, max_cols, self.structure)
+
+    def _has_merges(self, row: int, max_cols: int) -> bool:
+        known = self._known.get(row)
+        if known is not None and known.max_cols == max_cols:
+            return known.merged
+        merges = self.structure.merges_in_row(row, max_cols)
+        if merges is not None:
+            return bool(merges)
+        # Outside the model: ask the sheet, where the row may not have moved yet in a dry run
+        return row_has_merges(self.ws, self.structure.sheet_row(row), max_cols, None)
+
+    # -- borders ------------------------------------------------------------------
+
+    def _read_edge(self, row: int, key: Tuple[int, str]) -> Any:
+        known = self._known.get(row)
+        if known is not None and key[0] in known.borders:
+            return known.borders[key[0]].get(key[1])
+        return self.structure.cell_border(row, key[0], key[1])
+
+    def _edge(self, row: int, col: int, side: str) -> Any:
+        return self._edges.get(row, (col, side))
+
+    def _row_borders(self, row: int, c1: int, c2: int) -> Dict[int, Dict[str, Any]]:
+        return {c: {side: self._edge(row, c, side) for side in SIDES} for c in range(c1, c2 + 1)}
+
+    def _set_edge(self, row: int, col: int, side: str, value: Dict[str, Any]) -> None:
+        key = (row, col, side)
+        if key not in self._before:
+            self._before[key] = self._edge(row, col, side)
+        self._edges.set(row, (col, side), value)
+
+    def _paint(self, jobs: List[BorderJob]) -> None:
+        for r1, r2, c1, c2, idx, style in jobs:
+            line = _drawn(style)
+            for row, col, side in _job_edges(r1, r2, c1, c2, idx):
+                self._set_edge(row, col, side, line)
+                # Neighbouring cells share the edge
+                dr, dc, other = _SHARED_SIDE[side]
+                if row + dr >= 1 and col + dc >= 1:
+                    self._set_edge(row + dr, col + dc, other, line)
+
+    @staticmethod
+    def _clear_jobs(first_row: int, last_row: int, max_cols: int) -> List[BorderJob]:
+        # Every cell edge of the block: the outline plus the inside lines
+        jobs: List[BorderJob] = []
+        for idx in (
+            XL_EDGE_LEFT, XL_EDGE_TOP, XL_EDGE_BOTTOM, XL_EDGE_RIGHT, XL_INSIDE_VERTICAL, XL_INSIDE_HORIZONTAL
+        ):
+            if (idx == XL_INSIDE_VERTICAL and max_cols < 2) or (idx == XL_INSIDE_HORIZONTAL and last_row == first_row):
+                continue
+            jobs.append((first_row, last_row, 1, max_cols, idx, None))
+        return jobs
+
+    def _borders_like_row(
+        self, spans: List[Tuple[int, int]], source_row: int, target_row: int, last_row: int, max_cols: int
+    ) -> None:
+        # Perimeter edges of each span of source_row (merged blocks by their range edges)
+        # Edges shared with the next column are read through the cell to the right
+        last_col = (max(spans[-1][1], max_cols) if spans else max_cols) + 1
+        source = self._row_borders(source_row, 1, last_col)
+        sides: Tuple[str, ...] = SIDES
+        if source_row == target_row - 1:
+            self._paint(border_jobs(target_row, target_row, span_border_writes(spans, source, ("top",))))
+            source = self._row_borders(source_row, 1, last_col)
+            if last_row == target_row:
+                sides = ("left", "bottom", "right")
+        self._paint(border_jobs(target_row, last_row, span_border_writes(spans, source, sides)))
+
+    def _neighbor_edges(self, target_row: int, last_row: int, right_col: int) -> None:
+        # Top edges from the bottoms of the row above, bottom edges from the tops of the row below
+        tops: List[BorderWrite] = []
+        bottoms: List[BorderWrite] = []
+        for c in range(1, right_col + 1):
+            if target_row > 1:
+                tops.append((c, "top", self._edge(target_row - 1, c, "bottom")))
+            bottoms.append((c, "bottom", self._edge(last_row + 1, c, "top")))
+        if last_row == target_row:
+            self._paint(border_jobs(target_row, target_row, tops + bottoms))
+        else:
+            self._paint(border_jobs(target_row, target_row, tops))
+            self._paint(border_jobs(last_row, last_row, bottoms))
+
+    def _border_steps(self) -> List[BorderStep]:
+        """Range-level writes taking every line rewritten by the plan from its old to its final style."""
+        horizontal: Dict[int, Dict[int, BorderProps]] = {}  # line row (top edge of) -> col -> writes
+        vertical: Dict[int, Dict[int, BorderProps]] = {}  # line col (left edge of) -> row -> writes
+        for row, col, side in self._before:
+            if side in ("top", "bottom"):
+                k = row if side == "top" else row + 1
+                if col in horizontal.get(k, {}):
+                    continue
+                keys = [(k, col, "top"), (k - 1, col, "bottom")]
+            else:
+                p = col if side == "left" else col + 1
+                if row in vertical.get(p, {}):
+                    continue
+                keys = [(row, p, "left"), (row, p - 1, "right")]
+            keys = [key for key in keys if key[0] >= 1 and key[1] >= 1]
+            final = self._edge(*keys[0])
+            props = _line_props([self._before.get(key, self._edge(*key)) for key in keys], final)
+            if side in ("top", "bottom"):
+                horizontal.setdefault(k, {})[col] = props
+            else:
+                vertical.setdefault(p, {})[row] = props
+
+        steps: List[BorderStep] = []
+        for k1, k2, a, z, props in _rectangles(horizontal):
+            if not props:
+                continue
+            if k1 == k2:
+                steps.append(BorderStep(k1, a, k1, z, XL_EDGE_TOP, props))
+                continue
+            if k1 == 1:
+                steps.append(BorderStep(1, a, 1, z, XL_EDGE_TOP, props))
+                k1 = 2
+            # Inside lines of rows k1-1..k2 are the lines k1..k2
+            steps.append(BorderStep(k1 - 1, a, k2, z, XL_INSIDE_HORIZONTAL, props))
+        for p1, p2, a, z, props in _rectangles(vertical):
+            if not props:
+                continue
+            if p1 == p2:
+                steps.append(BorderStep(a, p1, z, p1, XL_EDGE_LEFT, props))
+                continue
+            if p1 == 1:
+                steps.append(BorderStep(a, 1, z, 1, XL_EDGE_LEFT, props))
+                p1 = 2
+            steps.append(BorderStep(a, p1 - 1, z, p2, XL_INSIDE_VERTICAL, props))
+        return steps
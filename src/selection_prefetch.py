@@ -0,0 +1,65 @@
+import time
+from typing import Any, Callable, Optional, Tuple
+
+from row_inserter import RowInserter
+
+# Seconds the selection has to rest before the rows around it are read
+PREFETCH_DELAY_S = 0.25
+
+
+class SelectionPrefetcher:
+    """Reads the rows around the selection ahead of the next button press (GUI ``--prefetch``).
+
+    Fed by Excel's selection and change events on the COM worker thread:
+    a selection change (or the end of an operation) schedules
+    ``RowInserter.prefetch`` for the active row once the selection has
+    rested for ``delay`` seconds, and further movement reschedules it.
+    ``run_due`` is polled from the worker's idle loop, so commands always
+    come first. Changes Excel reports re-read exactly the affected rows of
+    the cached model. Formatting changed by hand is not an Excel change
+    event: it is picked up when the selection moves, as a warmed model is
+    dropped on every selection change.
+    """
+
+    def __init__(
+        self,
+        inserter: RowInserter,
+        delay: float = PREFETCH_DELAY_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.inserter = inserter
+        self.delay = delay
+        self.clock = clock
+        self.prefetched = 0
+        # (ws, row, due time) of the prefetch waiting for the selection to rest
+        self._pending: Optional[Tuple[Any, int, float]] = None
+
+    def selection_changed(self, ws: Any, row: int) -> None:
+        if self.inserter.context_cache is None:
+            return
+        self.inserter.context_cache.cool()
+        self._pending = (ws, row, self.clock() + self.delay)
+
+    def sheet_changed(self, ws: Any, first_row: int, last_row: int) -> None:
+        if self.inserter.context_cache is not None:
+            self.inserter.context_cache.note_changed(ws, first_row, last_row)
+
+    def cancel(self) -> None:
+        self._pending = None
+
+    def run_due(self) -> bool:
+        """Prefetch if the selection has rested long enough; True when it ran."""
+        if self._pending is None:
+            return False
+        ws, row, due = self._pending
+        if self.clock() < due:
+            return False
+        self._pending = None
+        try:
+            self.inserter.prefetch(ws, row)
+        except Exception:
+            # Speculative: the operation itself reads whatever is missing
+            self.inserter.context_cache.cool()
+            return False
+        self.prefetched += 1
+        return True
@@ -0,0 +1,448 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from analyzer.sheet_snapshot import (
+    BORDER_SIDES,
+    MergeTuple,
+    a1_address,
+    block_range,
+    enumerate_com_merges,
+    format_value,
+    read_cell_border,
+    read_uniform_run_border,
+)
+from merge_index import MergeIndex
+from row_index import RowSignatureIndex
+
+# Rows read above the anchor (header scan looks 20 up, data-row scan 25) and below it;
+# anything outside the window is read from the live sheet
+WINDOW_ROWS_ABOVE = 25
+WINDOW_ROWS_BELOW = 3
+# Column window: helpers default to 30 columns, detect_effective_max_cols caps at 50
+DEFAULT_MAX_COLS = 30
+HARD_CAP_COLS = 50
+
+FORMAT_PROPS = ("NumberFormat", "HorizontalAlignment", "VerticalAlignment", "WrapText")
+FONT_PROPS = ("Name", "Size", "Bold", "Italic", "Color")
+INTERIOR_PROPS = ("Color", "Pattern")
+# "left"/"top"/"bottom"/"right" -> Borders index
+_SIDE_INDEX = {name: idx for idx, name in BORDER_SIDES.items()}
+
+
+def read_uniform_format(rng: Any) -> Optional[Dict[str, Any]]:
+    """Number format, alignment, font and interior shared by the whole range, or None if mixed.
+
+    Keys are ``NumberFormat``, ``Font.Name``, ``Interior.Color`` etc. Excel
+    returns Null for a property that differs across a range, so the first
+    None ends the read.
+    """
+    fmt: Dict[str, Any] = {}
+    for prop in FORMAT_PROPS:
+        value = getattr(rng, prop)
+        if value is None:
+            return None
+        fmt[prop] = value
+    font = rng.Font
+    for prop in FONT_PROPS:
+        value = getattr(font, prop)
+        if value is None:
+            return None
+        fmt[f"Font.{prop}"] = value
+    interior = rng.Interior
+    for prop in INTERIOR_PROPS:
+        value = getattr(interior, prop)
+        if value is None:
+            return None
+        fmt[f"Interior.{prop}"] = value
+    return fmt
+
+
+def _read_runs(
+    ws: Any,
+    row: int,
+    c1: int,
+    c2: int,
+    read_uniform: Callable[[Any], Optional[Dict[str, Any]]],
+    read_single: Callable[[Any], Optional[Dict[str, Any]]],
+    out: Dict[int, Dict[str, Any]],
+    min_run: int = 2,
+) -> None:
+    """Fill out[col] for row[c1..c2] with one range read per uniform run, bisecting mixed runs.
+
+    Runs shorter than ``min_run`` are read cell by cell.
+    """
+    if c2 - c1 + 1 < min_run:
+        for c in range(c1, c2 + 1):
+            try:
+                out[c] = read_single(ws.Cells(row, c)) or {}
+            except Exception:
+                out[c] = {}
+        return
+    try:
+        shared = read_uniform(block_range(ws, row, c1, row, c2))
+    except Exception:
+        shared = None
+    if shared is not None:
+        for c in range(c1, c2 + 1):
+            out[c] = shared
+        return
+    mid = (c1 + c2) // 2
+    _read_runs(ws, row, c1, mid, read_uniform, read_single, out, min_run)
+    _read_runs(ws, row, mid + 1, c2, read_uniform, read_single, out, min_run)
+
+
+def read_row_border(ws: Any, row: int, c1: int, c2: int, idx: int) -> Dict[int, Dict[str, Any]]:
+    """One side (``BORDER_SIDES`` index) of each cell's borders in row[c1..c2], one range read per uniform run."""
+    out: Dict[int, Dict[str, Any]] = {}
+    if c1 <= c2:
+        # A left/right probe reads two edges (outer and inside), as much as two cells
+        _read_runs(
+            ws,
+            row,
+            c1,
+            c2,
+            lambda rng: read_uniform_run_border(rng, idx),
+            lambda cell: read_cell_border(cell, idx),
+            out,
+            min_run=2 if idx in (2, 3) else 3,
+        )
+    return out
+
+
+def read_row_formats(ws: Any, row: int, c1: int, c2: int) -> Dict[int, Dict[str, Any]]:
+    """``read_uniform_format`` of each cell in row[c1..c2] ({} when unreadable), one range read per uniform run."""
+    out: Dict[int, Dict[str, Any]] = {}
+    if c1 <= c2:
+        _read_runs(ws, row, c1, c2, read_uniform_format, read_uniform_format, out)
+    return out
+
+
+# Borders of a one-row range compared by read_row_signature: left, top, bottom, right, inside vertical
+SIGNATURE_BORDERS = (1, 2, 3, 4, 11)
+
+
+def read_row_signature(ws: Any, row: int, cols: int, formats: bool = True) -> Optional[Tuple[Any, ...]]:
+    """Range-level style reads of row[1..cols], one per property; None when unreadable.
+
+    Excel returns Null for a property the cells do not share, so this is a
+    coarse fingerprint: a hand edit that changes any shared property, or
+    makes it mixed, changes the signature; one inside an already mixed
+    property does not. Without ``formats`` only the borders are read.
+    """
+    try:
+        rng = block_range(ws, row, 1, row, cols)
+        values: List[Any] = []
+        if formats:
+            values += [getattr(rng, prop) for prop in FORMAT_PROPS]
+            font = rng.Font
+            values += [getattr(font, prop) for prop in FONT_PROPS]
+            interior = rng.Interior
+            values += [getattr(interior, prop) for prop in INTERIOR_PROPS]
+        for idx in SIGNATURE_BORDERS:
+            border = rng.Borders(idx)
+            values += [border.LineStyle, border.Weight, border.Color]
+    except Exception:
+        return None
+    return tuple(values)
+
+
+def _read_merges(ws: Any, first_row: int, last_row: int, cols: int) -> List[MergeTuple]:
+    try:
+        return enumerate_com_merges(ws, first_row, 1, last_row - first_row + 1, cols)
+    except Exception:
+        return []
+
+
+def _read_values(ws: Any, first_row: int, last_row: int, cols: int) -> Dict[int, List[str]]:
+    values: Dict[int, List[str]] = {}
+    try:
+        raw = block_range(ws, first_row, 1, last_row, cols).Value
+        for i, row_values in enumerate(raw or ()):
+            values[first_row + i] = [format_value(v) for v in row_values]
+    except Exception:
+        return {}
+    return values
+
+
+class SheetStructure:
+    """Model of the rows around an active row, built once per RowInserter operation.
+
+    Values come from one ``Range.Value`` read of the window and merge areas
+    are enumerated once; borders (per side) and formats are read lazily per
+    row over the used columns, one range read per uniform run. The
+    ``pattern_analyzer`` and ``format_utils`` helpers query this model (pass
+    ``structure=``) instead of probing the worksheet cell by cell. Callers
+    keep it in step with their own edits via ``insert_rows``, ``add_merge``
+    and ``invalidate_rows``; anything outside the window is read from the
+    live sheet.
+    """
+
+    def __init__(
+        self,
+        ws: Any,
+        first_row: int,
+        last_row: int,
+        cols: int,
+        used_cols: int,
+        values: Dict[int, List[str]],
+        merges: List[MergeTuple],
+    ) -> None:
+        self.ws = ws
+        self.first_row = first_row
+        self.last_row = last_row
+        self.cols = cols
+        self.used_cols = used_cols
+        self.values = values
+        self.merge_index = MergeIndex(merges)
+        # row -> side -> col -> border, each side read on first use
+        self._borders: Dict[int, Dict[str, Dict[int, Dict[str, Any]]]] = {}
+        self._formats: Dict[int, Dict[int, Dict[str, Any]]] = {}
+        self._row_indexes: Dict[int, RowSignatureIndex] = {}
+        # (at, count) of rows inserted in the model only (dry runs); live reads map around them
+        self._virtual_inserts: List[Tuple[int, int]] = []
+
+    @classmethod
+    def build(
+        cls,
+        ws: Any,
+        anchor_row: int,
+        rows_above: int = WINDOW_ROWS_ABOVE,
+        rows_below: int = WINDOW_ROWS_BELOW,
+        hard_cap: int = HARD_CAP_COLS,
+    ) -> "SheetStructure":
+        try:
+            used = ws.UsedRange
+            used_cols = int(used.Columns.Count)
+            # Merged cells are formatted, so none lie right of the used range
+            merge_cols = int(used.Column) + used_cols - 1
+        except Exception:
+            used_cols = merge_cols = hard_cap
+        used_cols = min(used_cols, hard_cap)
+        cols = max(DEFAULT_MAX_COLS, used_cols)
+        first_row = max(1, anchor_row - rows_above)
+        last_row = anchor_row + rows_below
+
+        values = _read_values(ws, first_row, last_row, cols)
+        merges = _read_merges(ws, first_row, last_row, min(cols, merge_cols))
+        return cls(ws, first_row, last_row, cols, used_cols, values, merges)
+
+    def covers(self, anchor_row: int, rows_above: int = WINDOW_ROWS_ABOVE, rows_below: int = WINDOW_ROWS_BELOW) -> bool:
+        """True when the window still spans what ``build(ws, anchor_row)`` would have read."""
+        return self.first_row <= max(1, anchor_row - rows_above) and anchor_row + rows_below <= self.last_row
+
+    def refresh(self) -> None:
+        """Re-read the window's values, check its merges and forget cached styles.
+
+        For reusing a model across operations: edits typed, formatted or
+        merged by hand in between are picked up. The merges are re-enumerated
+        only when ``merges_unchanged`` finds the sheet differs from the model.
+        """
+        self.values = _read_values(self.ws, self.first_row, self.last_row, self.cols)
+        if not self.merges_unchanged():
+            self.merge_index = MergeIndex(_read_merges(self.ws, self.first_row, self.last_row, self.cols))
+        self._borders.clear()
+        self._formats.clear()
+        self._row_indexes.clear()
+
+    def merges_unchanged(self) -> bool:
+        """True when the sheet's merge areas in the window are still the model's.
+
+        One ``MergeArea`` read per area of the model and one ``MergeCells``
+        read per stretch of cells the model has unmerged, rows with the same
+        unmerged columns read together.
+        """
+        try:
+            for top, left, nrows, ncols in self.merge_index.intersecting(self.first_row, 1, self.last_row, self.cols):
+                expected = f"{a1_address(top, left)}:{a1_address(top + nrows - 1, left + ncols - 1)}"
+                if str(self.ws.Range(a1_address(top, left)).MergeArea.Address) != expected:
+                    return False
+            for r1, c1, r2, c2 in self._unmerged_blocks():
+                state = block_range(self.ws, r1, c1, r2, c2).MergeCells
+                if state is None or bool(state):
+                    return False
+        except Exception:
+            return False
+        return True
+
+    def _unmerged_blocks(self) -> List[Tuple[int, int, int, int]]:
+        """(r1, c1, r2, c2) blocks covering the window cells outside the model's merge areas."""
+        blocks: List[Tuple[int, int, int, int]] = []
+        # (c1, c2) -> first row of the open block for that column stretch
+        open_blocks: Dict[Tuple[int, int], int] = {}
+        for row in range(self.first_row, self.last_row + 2):
+            segments = set()
+            if row <= self.last_row:
+                col = 1
+                for area in sorted(self.merge_index.intersecting(row, 1, row, self.cols), key=lambda a: a[1]):
+                    if area[1] > col:
+                        segments.add((col, area[1] - 1))
+                    col = max(col, area[1] + area[3])
+                if col <= self.cols:
+                    segments.add((col, self.cols))
+            for segment in [seg for seg in open_blocks if seg not in segments]:
+                blocks.append((open_blocks.pop(segment), segment[0], row - 1, segment[1]))
+            for segment in segments:
+                open_blocks.setdefault(segment, row)
+        return blocks
+
+    def refresh_rows(self, first_row: int, last_row: int) -> None:
+        """Re-read the values of rows first_row..last_row and forget their cached styles.
+
+        For a change reported by Excel (``SheetChange``) while the rest of
+        the model stays as read; rows outside the window are read live anyway.
+        """
+        lo, hi = max(first_row, self.first_row), min(last_row, self.last_row)
+        if lo <= hi:
+            values = _read_values(self.ws, lo, hi, self.cols)
+            if not values:
+                self.refresh()
+                return
+            self.values.update(values)
+        # A whole-column change spans a million rows; walk the cached rows instead
+        for table in (self._borders, self._formats):
+            for r in [r for r in table if first_row <= r <= last_row]:
+                del table[r]
+        self._row_indexes.clear()
+
+    def sheet_row(self, row: int) -> int:
+        """The live sheet row holding model row ``row`` (differs only after virtual inserts)."""
+        for at, count in reversed(self._virtual_inserts):
+            if row >= at + count:
+                row -= count
+            elif row >= at:
+                # Not on the sheet yet; it would be formatted like the row above
+                row = at - 1
+        return row
+
+    # -- merges --------------------------------------------------------------
+
+    def _in_window(self, row: int, col: int) -> bool:
+        return self.first_row <= row <= self.last_row and 1 <= col <= self.cols
+
+    def merge_area(self, row: int, col: int) -> MergeTuple:
+        """Same result as pattern_analyzer._get_merge_area for the cell at (row, col)."""
+        if self._in_window(row, col):
+            area = self.merge_index.at(row, col)
+            return area if area is not None else (row, col, 1, 1)
+        live_row = self.sheet_row(row)
+        cell = self.ws.Cells(live_row, col)
+        if bool(getattr(cell, "MergeCells", False)):
+            area = cell.MergeArea
+            return int(area.Row) + row - live_row, int(area.Column), int(area.Rows.Count), int(area.Columns.Count)
+        return row, col, 1, 1
+
+    def horizontal_merges(self, row: int, max_cols: int) -> Optional[List[MergeTuple]]:
+        """Single-row merges starting on ``row`` with their left edge within max_cols.
+
+        Returns None when the question reaches outside the window.
+        """
+        if not (self.first_row <= row <= self.last_row) or max_cols > self.cols:
+            return None
+        return [
+            area for area in self.merge_index.starting_on_row(row)
+            if area[2] == 1 and area[3] > 1 and area[1] <= max_cols
+        ]
+
+    def merges_in_row(self, row: int, max_cols: int) -> Optional[List[MergeTuple]]:
+        """Merge areas with a cell in row[1..max_cols]; None when the question reaches outside the window."""
+        if not (self.first_row <= row <= self.last_row) or max_cols > self.cols:
+            return None
+        return self.merge_index.intersecting(row, 1, row, max_cols)
+
+    def add_merge(self, top: int, left: int, nrows: int, ncols: int) -> None:
+        """Record a merge made on the sheet; like Excel, overlapping areas are absorbed."""
+        self.merge_index.add((top, left, nrows, ncols))
+        self._row_indexes.clear()
+
+    def row_index(self, max_cols: int) -> Optional[RowSignatureIndex]:
+        """Row signatures of the window for merges within max_cols (built on first use).
+
+        None when max_cols reaches past the modelled columns.
+        """
+        if max_cols > self.cols:
+            return None
+        index = self._row_indexes.get(max_cols)
+        if index is None:
+            index = self._row_indexes[max_cols] = RowSignatureIndex.build(self, max_cols)
+        return index
+
+    # -- values, borders, formats -----------------------------------------------
+
+    def value(self, row: int, col: int) -> str:
+        row_values = self.values.get(row)
+        if row_values is not None and 1 <= col <= len(row_values):
+            return row_values[col - 1]
+        if self._in_window(row, col):
+            return ""
+        cell = self.ws.Cells(self.sheet_row(row), col)
+        return str(getattr(cell, "Text", "") or getattr(cell, "Value", ""))
+
+    def _styles_at(
+        self,
+        row_styles: Dict[int, Dict[str, Any]],
+        row: int,
+        col: int,
+        read_row: Callable[[Any, int, int, int], Dict[int, Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        # Rows are read over the used columns plus the next one (whose left edge closes the
+        # table); the rest of the window's columns only when a caller asks for one of them
+        if not row_styles:
+            row_styles.update(read_row(self.ws, self.sheet_row(row), 1, min(self.cols, self.used_cols + 1)))
+        if col not in row_styles:
+            if col <= self.cols:
+                row_styles.update(read_row(self.ws, self.sheet_row(row), max(row_styles, default=0) + 1, self.cols))
+            else:
+                row_styles.update(read_row(self.ws, self.sheet_row(row), col, col))
+        return row_styles[col]
+
+    def cell_border(self, row: int, col: int, side: str) -> Dict[str, Any]:
+        """One side ("left", "top", "bottom" or "right") of a cell's borders ({} when unreadable).
+
+        Each side is read separately, so a caller matching only the edges
+        next to a row never reads the rest of its borders.
+        """
+        idx = _SIDE_INDEX[side]
+        sides = self._borders.setdefault(row, {})
+        return self._styles_at(
+            sides.setdefault(side, {}), row, col, lambda ws, r, c1, c2: read_row_border(ws, r, c1, c2, idx)
+        )
+
+    def cell_borders(self, row: int, col: int) -> Dict[str, Any]:
+        """Borders of one cell in the ``read_cell_borders`` shape."""
+        return {side: self.cell_border(row, col, side) for side in BORDER_SIDES.values()}
+
+    def cell_format(self, row: int, col: int) -> Dict[str, Any]:
+        """Number format/alignment/font/interior of one cell ({} when unreadable)."""
+        return self._styles_at(self._formats.setdefault(row, {}), row, col, read_row_formats)
+
+    def invalidate_rows(self, first_row: int, last_row: int) -> None:
+        """Forget cached borders/formats after the caller rewrote them on the sheet."""
+        for r in range(first_row, last_row + 1):
+            self._borders.pop(r, None)
+            self._formats.pop(r, None)
+
+    # -- structural edits ---------------------------------------------------------
+
+    def insert_rows(self, at: int, count: int = 1, virtual: bool = False) -> None:
+        """Mirror ``ws.Rows(at).Insert()`` for ``count`` rows.
+
+        Rows at/after ``at`` move down, merges spanning the insertion point
+        grow, and the new rows start empty with styles read on demand (Excel
+        formats them like the row above). With ``virtual`` the sheet itself
+        was not changed (a dry run): later reads are mapped to the rows as
+        they still are on the sheet, and the new rows read as the row above.
+        """
+        def shift(table: Dict[int, Any]) -> Dict[int, Any]:
+            return {(r + count if r >= at else r): v for r, v in table.items()}
+
+        self.values = shift(self.values)
+        self._borders = shift(self._borders)
+        self._formats = shift(self._formats)
+        for r in range(at, at + count):
+            self.values[r] = [""] * self.cols
+
+        if self.last_row >= at:
+            self.last_row += count
+        self.merge_index.insert_rows(at, count)
+        self._row_indexes.clear()
+        if virtual:
+            self._virtual_inserts.append((at, count))
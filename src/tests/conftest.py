@@ -0,0 +1,69 @@
+import glob
+import os
+import sys
+
+import pytest
+
+# Run from anywhere: make src/ importable like main.py does
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SRC_DIR)
+
+BASE_CASE_DIR = os.path.join(os.path.dirname(SRC_DIR), "Base Case Files")
+
+
+def base_case_files():
+    return sorted(glob.glob(os.path.join(BASE_CASE_DIR, "*.xls")))
+
+
+@pytest.fixture
+def base_case_paths():
+    paths = base_case_files()
+    if not paths:
+        pytest.skip("Base Case Files not present")
+    return paths
+
+
+# The row inserter as it was before the structure model and the planner: pattern_analyzer,
+# format_utils and row_inserter copied unchanged, so the current code can be compared with it
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline")
+BASELINE_MODULES = ("pattern_analyzer", "format_utils", "row_inserter")
+_baseline = {}
+
+
+def baseline_row_inserter():
+    """The baseline RowInserter class, loaded without replacing the current modules."""
+    if "RowInserter" not in _baseline:
+        import importlib.util
+
+        saved = {name: sys.modules.get(name) for name in BASELINE_MODULES}
+        try:
+            for name in BASELINE_MODULES:
+                spec = importlib.util.spec_from_file_location(name, os.path.join(BASELINE_DIR, f"{name}.py"))
+                module = importlib.util.module_from_spec(spec)
+                # The copies import each other by their plain names
+                sys.modules[name] = module
+                spec.loader.exec_module(module)
+            _baseline["RowInserter"] = sys.modules["row_inserter"].RowInserter
+        finally:
+            for name, module in saved.items():
+                if module is None:
+                    sys.modules.pop(name, None)
+                else:
+                    sys.modules[name] = module
+    return _baseline["RowInserter"]
+
+
+def sheet_state(ws):
+    """Everything an operation can change on a fake sheet; edges without a line compare equal to no edge."""
+    cells = {
+        key: (
+            data.value,
+            data.fmt,
+            data.font,
+            data.interior,
+            {idx: border for idx, border in data.borders.items() if border[0] != -4142},
+        )
+        for key, data in ws.cells.items()
+        if not data.is_default()
+    }
+    return cells, sorted(map(tuple, ws.merges))
@@ -0,0 +1,48 @@
+import os
+import shutil
+
+import pytest
+
+from analyzer import analysis_cache
+from analyzer.analysis_cache import AnalysisCache
+from analyzer.excel_pattern_analyzer import ExcelPatternAnalyzer
+from conftest import base_case_files
+
+
+def test_max_cells_is_only_keyed_without_bulk_reads(tmp_path):
+    bulk = ExcelPatternAnalyzer(str(tmp_path), bulk_read=True)
+    per_cell = ExcelPatternAnalyzer(str(tmp_path), bulk_read=False)
+    assert bulk.cache_options(100) == bulk.cache_options(2000)
+    assert per_cell.cache_options(100) != per_cell.cache_options(2000)
+
+
+def test_sampled_results_are_not_cached_under_bulk_keys(tmp_path):
+    analyzer = ExcelPatternAnalyzer(str(tmp_path), bulk_read=True)
+    assert analyzer._cacheable({"sheets": [{"coverage": "cells"}]})
+    assert not analyzer._cacheable({"sheets": [{"coverage": "cells"}, {"coverage": "sampled"}]})
+
+
+@pytest.mark.skipif(not base_case_files(), reason="Base Case Files not present")
+def test_each_file_is_hashed_once_per_run(tmp_path, monkeypatch):
+    book_dir = tmp_path / "books"
+    book_dir.mkdir()
+    for path in base_case_files()[:2]:
+        shutil.copy(path, book_dir)
+    hashed = []
+    file_digest = analysis_cache.file_digest
+
+    def counting_digest(path, *args):
+        hashed.append(os.path.basename(path))
+        return file_digest(path, *args)
+
+    monkeypatch.setattr(analysis_cache, "file_digest", counting_digest)
+    analyzer = ExcelPatternAnalyzer(str(book_dir))
+    cold = AnalysisCache(str(tmp_path / "cache"), analyzer.cache_options(2000))
+    first = analyzer.analyze(cache=cold)
+    assert sorted(hashed) == sorted(os.listdir(book_dir))
+    assert cold.misses == 2 and not cold._miss_keys
+
+    hashed.clear()
+    warm = AnalysisCache(str(tmp_path / "cache"), analyzer.cache_options(2000))
+    assert analyzer.analyze(cache=warm) == first
+    assert warm.hits == 2 and len(hashed) == 2
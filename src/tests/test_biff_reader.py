@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from analyzer.biff_reader import BUILTIN_FORMATS, BiffWorkbook, snapshot_biff_sheet
+from analyzer.sheet_snapshot import format_number, snapshot_com_sheet
+from conftest import base_case_files
+from fake_excel import fake_workbook_from_biff
+
+pytestmark = pytest.mark.skipif(not base_case_files(), reason="Base Case Files not present")
+
+
+def _values(snapshot):
+    return {(r, c): snapshot.value_at(r, c) for r, c in snapshot.iter_coords() if snapshot.value_at(r, c)}
+
+
+@pytest.mark.parametrize("path", base_case_files(), ids=os.path.basename)
+def test_biff_snapshot_matches_the_com_snapshot(path):
+    # The fake holds the raw numbers with their NumberFormat, as Range.Value/NumberFormat report them
+    book = BiffWorkbook.from_path(path)
+    workbook = fake_workbook_from_biff(book, path)
+    for sheet in book.worksheets:
+        biff = _values(snapshot_biff_sheet(book, sheet))
+        com = _values(snapshot_com_sheet(workbook.Worksheets(sheet.name)))
+        assert biff == com, sheet.name
+
+
+def test_number_cells_show_their_format():
+    shown = {}
+    for path in base_case_files():
+        book = BiffWorkbook.from_path(path)
+        for sheet in book.worksheets:
+            for key, value in sheet.numbers.items():
+                shown.setdefault(book.xf_number_format(sheet.cells[key][1]), (value, sheet.cells[key][0]))
+    value, text = shown["m/d/yyyy"]
+    assert text.count("/") == 2 and text != str(value)
+    value, text = shown["0.00"]
+    assert text == f"{value:.2f}"
+
+
+@pytest.mark.parametrize("path", base_case_files(), ids=os.path.basename)
+def test_biff_numbers_and_formats_match_xlrd(path):
+    xlrd = pytest.importorskip("xlrd")
+    book = BiffWorkbook.from_path(path)
+    reference = xlrd.open_workbook(path, formatting_info=True)
+    for sheet in book.worksheets:
+        ref_sheet = reference.sheet_by_name(sheet.name)
+        for (r, c), value in sheet.numbers.items():
+            cell = ref_sheet.cell(r - 1, c - 1)
+            assert cell.value == value
+            format_key = reference.xf_list[cell.xf_index].format_key
+            assert book.xfs[cell.xf_index].format_index == format_key
+            # xlrd's built-in strings are not Excel's en-US ones ("m/d/yy" for 14); compare the file's own
+            if format_key not in BUILTIN_FORMATS:
+                fmt = reference.format_map[format_key].format_str
+                assert book.formats[format_key] == fmt
+                assert sheet.cells[(r, c)][0] == format_number(value, fmt), (sheet.name, r, c)
+
+
+@pytest.mark.parametrize("path", base_case_files(), ids=os.path.basename)
+def test_cells_without_a_record_take_their_row_or_column_xf(path):
+    xlrd = pytest.importorskip("xlrd")
+    book = BiffWorkbook.from_path(path)
+    reference = xlrd.open_workbook(path, formatting_info=True)
+    for sheet in book.worksheets:
+        ref_sheet = reference.sheet_by_name(sheet.name)
+        snapshot = snapshot_biff_sheet(book, sheet, include_styles=True)
+        for r, c in snapshot.iter_coords():
+            if r > ref_sheet.nrows or c > ref_sheet.ncols:
+                continue
+            xf = ref_sheet.cell_xf_index(r - 1, c - 1)
+            assert sheet.cell_xf(r, c) == xf, (sheet.name, r, c)
+            assert snapshot.fonts[(r, c)] == book.xf_font(xf)
+            assert snapshot.borders[(r, c)] == book.xf_borders(xf)
@@ -0,0 +1,83 @@
+import os
+import random
+
+import pytest
+
+from category_context import CategoryContextCache
+from conftest import base_case_files, sheet_state
+from fake_excel import FakeApplication, clone_sheet, load_biff_workbook
+from row_inserter import RowInserter
+from row_plan import CategoryStamp, InsertStep, RowPlan, RowStyles
+from sheet_structure import read_row_signature
+
+
+def _stamp(ws, cache, header_row, rows):
+    stamp = CategoryStamp(header_row, {row: RowStyles(3, [], False, {}, {1: {}}) for row in rows})
+    cache.store_stamp(ws, stamp)
+    return stamp
+
+
+def _reformat(ws, first_row, last_row):
+    for row in range(max(first_row, 1), last_row + 1):
+        cell = ws.Cells(row, 1)
+        cell.Font.Bold = not cell.Font.Bold
+        cell.Interior.Color = 255
+        cell.Borders(3).LineStyle = 1
+
+
+def test_insert_only_plans_rekey_the_shifted_stamps():
+    ws = FakeApplication().Workbooks.Add().Worksheets(1)
+    cache = CategoryContextCache()
+    cache.structure_for(ws, 5)
+    stamp = _stamp(ws, cache, 5, [5, 6])
+    ws.Rows(3).Insert()
+    cache.note_inserted(ws, [RowPlan(3, 3, [InsertStep(3)])])
+    entry = next(iter(cache._entries.values()))
+    assert entry.stamps == {6: stamp}
+    assert sorted(stamp.rows) == [6, 7]
+
+
+def test_stamps_of_rows_reformatted_by_hand_are_dropped():
+    ws = FakeApplication().Workbooks.Add().Worksheets(1)
+    cache = CategoryContextCache()
+    cache.structure_for(ws, 5)
+    _stamp(ws, cache, 5, [5, 6])
+    _stamp(ws, cache, 20, [20, 21])
+    # Stamps outside the rows an operation at 6 searches are left alone
+    assert sorted(cache.stamp_rows(ws, 6)) == [5, 6]
+    assert sorted(cache.stamp_rows(ws, 22)) == [5, 6, 20, 21]
+    _reformat(ws, 21, 21)
+    assert sorted(cache.stamp_rows(ws, 22)) == [5, 6]
+    entry = next(iter(cache._entries.values()))
+    assert list(entry.stamps) == [5]
+
+
+def test_row_signature_sees_borders_and_formats():
+    ws = FakeApplication().Workbooks.Add().Worksheets(1)
+    before = read_row_signature(ws, 2, 3)
+    ws.Cells(2, 2).Borders(4).LineStyle = 1
+    borders = read_row_signature(ws, 2, 3)
+    ws.Cells(2, 3).Font.Bold = True
+    assert len({before, borders, read_row_signature(ws, 2, 3)}) == 3
+    assert read_row_signature(ws, 2, 3, formats=False) == read_row_signature(ws, 2, 3, formats=False)
+
+
+@pytest.mark.skipif(not base_case_files(), reason="Base Case Files not present")
+@pytest.mark.parametrize("path", base_case_files(), ids=os.path.basename)
+def test_new_category_after_hand_reformatting_matches_uncached(path):
+    # The rows above a new category (its template and the category itself) are reformatted
+    # between two clicks; the stamp taken by the first click must not be used for the second
+    rng = random.Random(os.path.basename(path))
+    ws = load_biff_workbook(path).Worksheets(1)
+    first_row, _first_col, last_row, _last_col = ws.used_bounds()
+    row = rng.randint(first_row, last_row)
+    runs = []
+    for cache in (None, CategoryContextCache()):
+        sheet = clone_sheet(ws)
+        inserter = RowInserter(context_cache=cache)
+        inserter.add_new_category(sheet, row)
+        new_row = int(sheet.Application.ActiveCell.Row)
+        _reformat(sheet, new_row - 4, new_row)
+        inserter.add_new_category(sheet, new_row)
+        runs.append(sheet_state(sheet))
+    assert runs[1] == runs[0]
@@ -0,0 +1,68 @@
+import os
+
+from com_profiler import ComProfiler, profile_operation
+from conftest import sheet_state
+from fake_excel import FakeApplication
+from row_inserter import RowInserter
+
+
+def _sheet():
+    ws = FakeApplication().Workbooks.Add().Worksheets(1)
+    for row in range(1, 6):
+        ws.Cells(row, 1).Value = f"Item {row}"
+        ws.Cells(row, 2).Borders(9).LineStyle = 1
+    ws.add_merge(2, 2, 1, 2)
+    return ws
+
+
+def _paint(ws):
+    ws.Cells(1, 1).Borders(3).LineStyle = 1
+    return ws.Range(ws.Cells(1, 1), ws.Cells(1, 2)).Value
+
+
+def test_operations_record_each_com_event_at_its_call_site():
+    profiler = ComProfiler()
+    ws = profiler.wrap(_sheet(), "Worksheet")
+    ws.Cells(1, 1).Value
+    with profiler.operation("Add Row") as profile:
+        _paint(ws)
+    assert profiler.profiles == [profile]
+
+    rows = {(row["member"], row["kind"]): row for row in profile.flat_rows()}
+    assert {key: row["calls"] for key, row in rows.items()} == {
+        ("Worksheet.Cells", "call"): 3,
+        ("Range.Borders", "get"): 1,
+        ("Borders.Item", "call"): 1,
+        ("Border.LineStyle", "set"): 1,
+        ("Worksheet.Range", "call"): 1,
+        ("Range.Value", "get"): 1,
+    }
+    assert {row["call_site"] for row in rows.values()} == {"tests.test_com_profiler._paint"}
+    stacks = profile.collapsed_stacks()
+    assert len(stacks) == len(rows)
+    assert all(line.startswith("Add Row;tests.test_com_profiler.") for line in stacks)
+    assert profile.summary().startswith("Add Row: wall ")
+
+
+def test_profiles_are_written_when_an_out_dir_is_set(tmp_path):
+    profiler = ComProfiler(out_dir=str(tmp_path))
+    ws = profiler.wrap(_sheet(), "Worksheet")
+    with profile_operation(profiler, "Add Row / New Category"):
+        _paint(ws)
+    names = sorted(os.listdir(tmp_path))
+    assert [os.path.splitext(name)[1] for name in names] == [".folded", ".txt"]
+    assert all("Add_Row___New_Category" in name for name in names)
+    with profile_operation(None, "Add Row"):
+        _paint(ws)
+    assert len(profiler.profiles) == 1
+
+
+def test_a_profiled_sheet_changes_like_the_bare_sheet():
+    bare = _sheet()
+    RowInserter().add_row_to_category(bare, 3)
+    profiler = ComProfiler()
+    wrapped = _sheet()
+    with profiler.operation("Add Row") as profile:
+        RowInserter().add_row_to_category(profiler.wrap(wrapped, "Worksheet"), 3)
+    assert sheet_state(wrapped) == sheet_state(bare)
+    assert profile.total_calls > 0
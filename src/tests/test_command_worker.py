@@ -0,0 +1,142 @@
+import threading
+import time
+
+from gui.command_worker import CommandWorker
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+class _Recorder:
+    """Handlers that record their calls and the thread they ran on; "slow" waits for ``release``."""
+
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def handler(self, name):
+        def run(*args):
+            self.threads.add(threading.get_ident())
+            self.calls.append((name,) + args)
+            if name == "slow":
+                self.started.set()
+                assert self.release.wait(5.0)
+            if name == "fail":
+                raise RuntimeError("no active sheet")
+
+        return run
+
+    def worker(self, **kwargs):
+        names = ("slow", "add_rows", "add_category", "fail")
+        return CommandWorker({name: self.handler(name) for name in names}, batchable=("add_rows",), **kwargs)
+
+
+def test_commands_run_in_order_on_one_thread():
+    recorder = _Recorder()
+    recorder.release.set()
+    worker = recorder.worker()
+    worker.start()
+    try:
+        for name in ("add_category", "fail", "add_rows", "add_category"):
+            assert worker.submit(name)
+        _wait_for(lambda: len(recorder.calls) == 4 and worker.pending() == 0)
+    finally:
+        worker.stop()
+    assert recorder.calls == [("add_category",), ("fail",), ("add_rows", 1), ("add_category",)]
+    assert len(recorder.threads) == 1 and threading.get_ident() not in recorder.threads
+    levels = [level for level, _message in worker.poll_status()]
+    assert levels == ["busy", "done", "busy", "error", "busy", "done", "busy", "done"]
+
+
+def test_presses_while_busy_add_to_the_pending_batch():
+    recorder = _Recorder()
+    worker = recorder.worker(max_pending=2, max_batch=4)
+    worker.start()
+    try:
+        worker.submit("slow")
+        assert recorder.started.wait(5.0)
+        assert all(worker.submit("add_rows") for _ in range(4))
+        # The batch is full: the next press starts another one
+        assert worker.submit("add_rows", 2)
+        assert not worker.submit("add_category")
+        assert worker.pending() == 2
+        recorder.release.set()
+        _wait_for(lambda: len(recorder.calls) == 3)
+    finally:
+        worker.stop()
+    assert recorder.calls == [("slow",), ("add_rows", 4), ("add_rows", 2)]
+    assert ("error", "Busy: too many queued commands, press ignored") in worker.poll_status()
+
+
+def test_setup_waits_for_the_first_command_and_is_retried():
+    attempts = []
+
+    def setup():
+        attempts.append(threading.get_ident())
+        if len(attempts) == 1:
+            raise OSError("Excel is not running")
+
+    recorder = _Recorder()
+    recorder.release.set()
+    worker = CommandWorker({"add_category": recorder.handler("add_category")}, setup=setup)
+    worker.start()
+    try:
+        time.sleep(0.05)
+        assert attempts == []
+        worker.submit("add_category")
+        _wait_for(lambda: worker.pending() == 0 and len(attempts) == 1)
+        worker.submit("add_category")
+        _wait_for(lambda: recorder.calls)
+    finally:
+        worker.stop()
+    assert len(attempts) == 2 and set(attempts) == recorder.threads
+    messages = worker.poll_status()
+    assert ("error", "Could not connect to Excel: Excel is not running") in messages
+    assert messages[-1][0] == "done"
+
+
+def test_stop_drops_pending_commands():
+    recorder = _Recorder()
+    worker = recorder.worker()
+    worker.start()
+    worker.submit("slow")
+    assert recorder.started.wait(5.0)
+    worker.submit("add_category")
+    threading.Timer(0.05, recorder.release.set).start()
+    worker.stop()
+    assert recorder.calls == [("slow",)]
+    assert not worker.submit("add_category")
+
+
+def test_idle_runs_on_the_worker_between_commands():
+    recorder = _Recorder()
+    recorder.release.set()
+    idle_threads = []
+    connected = threading.Event()
+
+    def idle():
+        idle_threads.append(threading.get_ident())
+        raise RuntimeError("event pump failed")
+
+    worker = CommandWorker(
+        {"add_category": recorder.handler("add_category")}, setup=connected.set, idle=idle, idle_interval=0.01
+    )
+    worker.start()
+    try:
+        # Connected at start, before any command
+        assert connected.wait(5.0)
+        _wait_for(lambda: len(idle_threads) >= 2)
+        worker.submit("add_category")
+        _wait_for(lambda: recorder.calls)
+        calls = len(idle_threads)
+        _wait_for(lambda: len(idle_threads) > calls)
+    finally:
+        worker.stop()
+    assert set(idle_threads) == recorder.threads
+    assert worker.poll_status()[:2] == [("busy", "Connecting to Excel..."), ("done", "Ready")]
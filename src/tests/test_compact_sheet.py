@@ -0,0 +1,57 @@
+import json
+import pickle
+import shutil
+
+import pytest
+
+from analyzer.compact_sheet import CompactSheet
+from analyzer.excel_pattern_analyzer import ExcelPatternAnalyzer, report_json_default
+from conftest import base_case_files
+from tools.report_io import iter_sheet_cells
+
+
+def _sheet():
+    sheet = CompactSheet()
+    thin = {"bottom": {"line_style": 1, "weight": 2, "color": 0}}
+    bold = {"name": "Arial", "bold": True}
+    sheet.add_cell(1, 1, "Total", (1, 1, 1, 2), thin, bold)
+    sheet.add_cell(1, 2, "", (1, 1, 1, 2), thin, bold)
+    sheet.add_cell(2, 1, "3")
+    sheet.add_cell(2, 2, "4", None, dict(thin), {"bold": True, "name": "Arial"})
+    return sheet
+
+
+def test_merges_and_styles_are_stored_once():
+    sheet = _sheet()
+    assert len(sheet) == 4
+    assert sheet.merges == [(1, 1, 1, 2)]
+    assert len(sheet.border_styles) == 1 and len(sheet.font_styles) == 1
+    assert sheet.merge_block_sizes() == {"1x2": 2}
+    assert sheet.cell(2)["borders"] == {} and sheet.cell(2)["merge"] is None
+
+
+def test_columnar_sheet_survives_json_and_pickle():
+    sheet = _sheet()
+    cells = list(sheet.iter_cells())
+    assert cells[0]["address"] == "$A$1" and cells[1]["merge"] == {"top": 1, "left": 1, "rows": 1, "cols": 2}
+    encoded = json.loads(json.dumps(sheet, default=report_json_default))
+    assert list(CompactSheet.from_dict(encoded).iter_cells()) == cells
+    assert list(iter_sheet_cells({"columnar": encoded})) == cells
+    assert list(pickle.loads(pickle.dumps(sheet)).iter_cells()) == cells
+    assert list(CompactSheet.from_cells(cells).iter_cells()) == cells
+
+
+@pytest.mark.skipif(not base_case_files(), reason="Base Case Files not present")
+@pytest.mark.parametrize("coverage", ["cells", "regions"])
+def test_compact_report_expands_to_the_per_cell_report(tmp_path, coverage):
+    shutil.copy(base_case_files()[0], tmp_path)
+    reports = [
+        ExcelPatternAnalyzer(str(tmp_path), include_borders=True, compact=compact, coverage=coverage).analyze()
+        for compact in (False, True)
+    ]
+    per_cell, compact = (report["files"][0]["sheets"] for report in reports)
+    assert len(compact) == len(per_cell)
+    for full, small in zip(per_cell, compact):
+        assert isinstance(small["columnar"], CompactSheet)
+        assert list(small.pop("columnar").iter_cells()) == full.pop("cells")
+        assert small == full
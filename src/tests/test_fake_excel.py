@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from conftest import BASE_CASE_DIR
+from fake_excel import FakeApplication, load_biff_workbook
+from row_inserter import RowInserter
+
+
+def _overlapping(merges):
+    return [
+        (a, b)
+        for i, a in enumerate(merges)
+        for b in merges[i + 1:]
+        if a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+    ]
+
+
+def _sheet():
+    wb = FakeApplication().Workbooks.Add()
+    return wb.Worksheets(1)
+
+
+def test_merge_absorbs_areas_reached_only_by_the_grown_target():
+    ws = _sheet()
+    # Listed first, so a single pass sees it before the target has grown into row 3
+    ws.add_merge(3, 3, 3, 4)
+    ws.add_merge(1, 1, 3, 2)
+    ws.Range("A2:C2").Merge()
+    assert ws.merges == [[1, 1, 3, 4]]
+
+
+def test_merge_keeps_disjoint_areas():
+    ws = _sheet()
+    ws.add_merge(5, 1, 5, 3)
+    ws.Range("A1:B2").Merge()
+    assert sorted(ws.merges) == [[1, 1, 2, 2], [5, 1, 5, 3]]
+
+
+def test_add_new_category_leaves_no_overlapping_merges():
+    path = os.path.join(BASE_CASE_DIR, "Spee-D #11 ppb GW table.xls")
+    if not os.path.exists(path):
+        pytest.skip("Base Case Files not present")
+    ws = load_biff_workbook(path).Worksheets("T-4 VEGE Water Levels")
+    ws.Cells(15, 1).Select()
+    RowInserter().add_new_category(ws, 15)
+    assert _overlapping(ws.merges) == []
@@ -0,0 +1,118 @@
+import random
+
+import pytest
+
+from analyzer.sheet_snapshot import block_range, read_cell_borders
+from conftest import sheet_state
+from fake_excel import FakeApplication
+from format_utils import _apply_format, border_jobs, copy_row_formats, span_border_writes, value_runs
+from sheet_structure import SheetStructure, read_row_formats, read_uniform_format
+
+SIDES = ("left", "top", "bottom", "right")
+SIDE_INDEX = {"left": 1, "top": 2, "bottom": 3, "right": 4}
+STYLES = [
+    {"line_style": 1, "weight": 2, "color": 0},
+    {"line_style": 1, "weight": -4138, "color": 0},
+    {"line_style": -4115, "weight": 2, "color": 255},
+    {"line_style": None, "weight": None, "color": None},
+]
+COLS = 6
+
+
+def _assign(border, style):
+    border.LineStyle = style["line_style"]
+    border.Weight = style["weight"]
+    border.Color = style["color"]
+
+
+def _per_cell(ws, first_row, last_row, writes):
+    # What a cell-by-cell copy does: every row of the block gets the writes, cell by cell
+    for row in range(first_row, last_row + 1):
+        for col, side, style in writes:
+            if style and style.get("line_style") is not None:
+                _assign(ws.Cells(row, col).Borders(SIDE_INDEX[side]), style)
+
+
+def _batched(ws, jobs):
+    for r1, r2, c1, c2, idx, style in jobs:
+        _assign(block_range(ws, r1, c1, r2, c2).Borders(idx), style)
+
+
+def _edges(ws):
+    return [read_cell_borders(ws.Cells(row, col)) for row in range(1, 7) for col in range(1, COLS + 2)]
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_border_jobs_paint_what_per_cell_writes_paint(seed):
+    rng = random.Random(seed)
+    first_row = rng.randint(2, 3)
+    last_row = first_row + rng.randint(0, 2)
+    writes = [
+        (col, side, rng.choice(STYLES))
+        for col in range(1, COLS + 1)
+        for side in SIDES
+        if rng.random() < 0.7
+    ]
+    sheets = [FakeApplication().Workbooks.Add().Worksheets(1) for _ in range(2)]
+    for ws in sheets:
+        ws.Cells(first_row - 1, 2).Borders(3).LineStyle = 1
+        ws.Cells(last_row, COLS).Borders(4).LineStyle = -4115
+    _per_cell(sheets[0], first_row, last_row, writes)
+    jobs = border_jobs(first_row, last_row, writes)
+    _batched(sheets[1], jobs)
+    assert _edges(sheets[1]) == _edges(sheets[0])
+    drawn = [write for write in writes if write[2]["line_style"] is not None]
+    assert len(jobs) <= len(drawn) * (last_row - first_row + 1)
+
+
+def test_span_border_writes_outline_merged_spans():
+    thin, thick = STYLES[0], STYLES[1]
+    borders = {
+        1: {"left": thin, "top": thin, "bottom": thin, "right": thin},
+        2: {"left": thin, "top": thick, "bottom": thin},
+        3: {"top": thick, "bottom": thick, "right": thick},
+    }
+    writes = span_border_writes([(1, 1), (2, 3)], borders, ("left", "top", "bottom", "right"))
+    assert writes == [
+        (1, "left", thin), (1, "top", thin), (1, "bottom", thin), (1, "right", thin),
+        (2, "left", thin), (2, "top", thick), (3, "top", thick), (2, "bottom", None), (3, "bottom", None),
+        (3, "right", thick),
+    ]
+    assert span_border_writes([(2, 3)], borders, ("top",)) == [(2, "top", thick), (3, "top", thick)]
+
+
+def test_value_runs_join_equal_neighbours_only():
+    assert value_runs({1: "a", 2: "a", 4: "a", 5: "b", 6: "b"}) == [(1, 2, "a"), (4, 4, "a"), (5, 6, "b")]
+
+
+def _formatted_sheet(seed):
+    rng = random.Random(seed)
+    ws = FakeApplication().Workbooks.Add().Worksheets(1)
+    for col in range(1, 9):
+        # Runs of equal formats, broken at random columns
+        if col == 1 or rng.random() < 0.4:
+            bold = rng.random() < 0.5
+            fill = rng.choice([16777215, 65535])
+            number_format = rng.choice(["General", "0.00"])
+        cell = ws.Cells(2, col)
+        cell.Font.Bold = bold
+        cell.Interior.Color = fill
+        cell.NumberFormat = number_format
+    return ws
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("cached", [False, True])
+def test_copy_row_formats_matches_a_cell_by_cell_copy(seed, cached):
+    expected = _formatted_sheet(seed)
+    for row in (3, 4):
+        for col in range(1, 9):
+            _apply_format(expected.Cells(row, col), read_uniform_format(expected.Cells(2, col)))
+    ws = _formatted_sheet(seed)
+    structure = SheetStructure.build(ws, anchor_row=3) if cached else None
+    ws.Application.counter.reset()
+    copy_row_formats(ws, 2, 3, 8, structure, rows=2)
+    assert sheet_state(ws) == sheet_state(expected)
+    runs = len(value_runs(read_row_formats(ws, 2, 1, 8)))
+    writes = ws.Application.counter.by_kind().get("set", 0)
+    assert writes == runs * 11
@@ -0,0 +1,157 @@
+import os
+import random
+
+import pytest
+
+import headless_punch
+from analyzer.biff_reader import BiffWorkbook, CompoundFile, iter_records
+from conftest import base_case_files
+from fake_excel import DEFAULT_FONT, FakeApplication, biff_xf_style, load_biff_workbook
+from headless_punch import PunchJob, PunchUnsupported, _run_job, punch_workbook
+from row_inserter import RowInserter
+
+REC_OBJ = 0x005D
+REC_MSODRAWING = 0x00EC
+REC_EOF = 0x000A
+XL_LINE_STYLE_NONE = -4142
+# Border index -> (row step, column step, facing index on that neighbour)
+FACING = {1: (0, -1, 4), 4: (0, 1, 1), 2: (-1, 0, 3), 3: (1, 0, 2)}
+
+
+def _has_drawing(book, name):
+    sheet = next(s for s in book.sheets if s.name == name)
+    for _pos, rec_id, _data in iter_records(book.stream, sheet.offset):
+        if rec_id in (REC_MSODRAWING, REC_OBJ):
+            return True
+        if rec_id == REC_EOF:
+            return False
+    return False
+
+
+def _visible(ws, plain_fonts):
+    """Values, fonts and borders as shown: a cell side is drawn by either cell that shares it.
+
+    The writer may store a shared edge on the other cell than Excel's copy
+    did, so the files are compared on what is drawn, not where it is stored.
+    """
+    def line(data, idx):
+        border = data.borders.get(idx) if data is not None else None
+        return None if border is None or border[0] == XL_LINE_STYLE_NONE else border
+
+    keys = set(ws.cells)
+    for r, c in list(keys):
+        keys.update((r + dr, c + dc) for dr, dc, _facing in FACING.values())
+    out = {}
+    for r, c in keys:
+        data = ws.cells.get((r, c))
+        font = tuple(sorted(data.font.items())) if data is not None else None
+        if font in plain_fonts:
+            font = None
+        borders = {}
+        for idx, (dr, dc, facing) in FACING.items():
+            drawn = line(data, idx) or line(ws.cells.get((r + dr, c + dc)), facing)
+            if drawn:
+                borders[idx] = drawn
+        value = data.value if data is not None else None
+        if value is not None or borders or font is not None:
+            out[(r, c)] = (value, borders, font)
+    return out
+
+
+def _merges(ws):
+    return sorted(tuple(area) for area in ws.merges if (area[0], area[1]) != (area[2], area[3]))
+
+
+def _jobs(path):
+    book = BiffWorkbook.from_path(path)
+    sheets = [ws for ws in load_biff_workbook(path).Worksheets if ws.cells]
+    sheets = [ws for ws in sheets if not _has_drawing(book, ws.Name)]
+    if not sheets:
+        return []
+    ws = max(sheets, key=lambda w: len(w.cells))
+    first_row, _first_col, last_row, _last_col = ws.used_bounds()
+    rng = random.Random(os.path.basename(path))
+    return [
+        PunchJob(path, ws.Name, rng.randint(first_row, last_row), op, 3)
+        for op in ("add_row", "add_rows", "add_category", "add_row")
+    ]
+
+
+@pytest.mark.skipif(not base_case_files(), reason="Base Case Files not present")
+@pytest.mark.parametrize("path", base_case_files(), ids=os.path.basename)
+def test_punched_file_reads_back_like_the_model(path, tmp_path):
+    jobs = _jobs(path)
+    if not jobs:
+        pytest.skip("no sheet without drawings")
+    out = str(tmp_path / os.path.basename(path))
+    result = punch_workbook(path, jobs, out)
+    assert result["rows_added"] > 0
+
+    expected = load_biff_workbook(path)
+    inserter = RowInserter()
+    for job in jobs:
+        _run_job(inserter, expected.Worksheets(job.sheet), job)
+    got = load_biff_workbook(out)
+    plain_fonts = {tuple(sorted(DEFAULT_FONT.items())), tuple(sorted(biff_xf_style(BiffWorkbook.from_path(path), 15)[1].items()))}
+    for want, have in zip(expected.Worksheets, got.Worksheets):
+        assert have.Name == want.Name
+        assert _merges(have) == _merges(want), want.Name
+        assert _visible(have, plain_fonts) == _visible(want, plain_fonts), want.Name
+
+    # Everything but the Workbook stream is copied byte for byte
+    before, after = CompoundFile.from_path(path), CompoundFile.from_path(out)
+    for entry in before.entries:
+        if entry.entry_type == 2 and entry.name != "Workbook":
+            assert after.read_stream(entry.name) == before.read_entry(entry), entry.name
+
+
+@pytest.mark.skipif(not base_case_files(), reason="Base Case Files not present")
+def test_punched_file_opens_in_xlrd(tmp_path):
+    xlrd = pytest.importorskip("xlrd")
+    path = base_case_files()[0]
+    jobs = _jobs(path)
+    out = str(tmp_path / os.path.basename(path))
+    punch_workbook(path, jobs, out)
+    expected = load_biff_workbook(path)
+    inserter = RowInserter()
+    for job in jobs:
+        _run_job(inserter, expected.Worksheets(job.sheet), job)
+    book = xlrd.open_workbook(out, formatting_info=True)
+    sheet = book.sheet_by_name(jobs[0].sheet)
+    # xlrd: (first row, last row + 1, first col, last col + 1), zero-based
+    merges = sorted((r1 + 1, c1 + 1, r2, c2) for r1, r2, c1, c2 in sheet.merged_cells)
+    assert merges == _merges(expected.Worksheets(jobs[0].sheet))
+
+
+def test_merge_records_reject_overlapping_areas():
+    ws = FakeApplication().Workbooks.Add().Worksheets(1)
+    ws.add_merge(1, 1, 3, 2)
+    ws.add_merge(3, 2, 3, 4)
+    with pytest.raises(PunchUnsupported, match="overlapping"):
+        headless_punch._WorkbookPatcher._merge_records(ws)
+
+
+def test_merge_records_accept_touching_areas():
+    ws = FakeApplication().Workbooks.Add().Worksheets(1)
+    ws.add_merge(1, 1, 3, 2)
+    ws.add_merge(3, 3, 3, 4)
+    ws.add_merge(4, 1, 4, 2)
+    assert headless_punch._WorkbookPatcher._merge_records(ws)
+
+
+@pytest.mark.skipif(not base_case_files(), reason="Base Case Files not present")
+def test_punch_leaves_the_file_alone_when_merges_would_overlap(tmp_path, monkeypatch):
+    path = base_case_files()[0]
+    jobs = _jobs(path)[:1]
+
+    def overlapping_job(inserter, ws, job):
+        _run_job(inserter, ws, job)
+        ws.add_merge(1, 1, 2, 2)
+        ws.add_merge(2, 2, 3, 3)
+
+    monkeypatch.setattr(headless_punch, "_run_job", overlapping_job)
+    out = tmp_path / "out.xls"
+    with pytest.raises(PunchUnsupported, match="overlapping"):
+        punch_workbook(path, jobs, str(out))
+    assert not out.exists()
+    assert not (tmp_path / "out.xls.tmp").exists()
@@ -0,0 +1,49 @@
+import random
+
+from merge_index import MergeIndex
+
+
+def _rebuilt_insert(merges, at, count):
+    shifted = []
+    for top, left, nrows, ncols in merges:
+        if top >= at:
+            shifted.append((top + count, left, nrows, ncols))
+        elif top + nrows - 1 >= at:
+            shifted.append((top, left, nrows + count, ncols))
+        else:
+            shifted.append((top, left, nrows, ncols))
+    return MergeIndex(shifted)
+
+
+def _state(index):
+    return index._areas, index._tops, index._max_bottoms, index._columns, index._column_tops
+
+
+def _random_merges(rng, count):
+    index = MergeIndex()
+    for _ in range(count):
+        top, left = rng.randint(1, 60), rng.randint(1, 12)
+        area = (top, left, rng.randint(1, 4), rng.randint(1, 4))
+        if not index.intersecting(area[0], area[1], area[0] + area[2] - 1, area[1] + area[3] - 1):
+            index.add(area)
+    return list(index)
+
+
+def test_insert_rows_shifts_and_grows_areas():
+    index = MergeIndex([(2, 1, 1, 3), (3, 4, 3, 1), (6, 2, 1, 2)])
+    index.insert_rows(4, 2)
+    assert list(index) == [(2, 1, 1, 3), (3, 4, 5, 1), (8, 2, 1, 2)]
+    assert index.at(6, 4) == (3, 4, 5, 1)
+    assert index.at(8, 3) == (8, 2, 1, 2)
+    assert index.at(6, 2) is None
+    assert index.intersecting_rows(6, 6) == [(3, 4, 5, 1)]
+
+
+def test_insert_rows_matches_a_rebuilt_index():
+    rng = random.Random(9)
+    for _ in range(200):
+        merges = _random_merges(rng, 25)
+        at, count = rng.randint(1, 70), rng.randint(1, 3)
+        index = MergeIndex(merges)
+        index.insert_rows(at, count)
+        assert _state(index) == _state(_rebuilt_insert(merges, at, count)), (merges, at, count)
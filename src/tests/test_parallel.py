@@ -0,0 +1,36 @@
+import shutil
+import time
+
+import pytest
+
+from analyzer import parallel
+from analyzer.excel_pattern_analyzer import ExcelPatternAnalyzer
+from conftest import base_case_files
+
+
+@pytest.mark.skipif(len(base_case_files()) < 4, reason="Base Case Files not present")
+def test_worker_dying_while_idle_gets_no_work(tmp_path, monkeypatch):
+    for path in base_case_files()[:4]:
+        shutil.copy(path, tmp_path)
+    started = []
+
+    class RecordedWorker(parallel._Worker):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            started.append(self)
+
+    monkeypatch.setattr(parallel, "_Worker", RecordedWorker)
+    analyzer = ExcelPatternAnalyzer(str(tmp_path))
+    files = analyzer._list_excel_files()
+    results = parallel.iter_files_parallel(analyzer._worker_config(), files, max_cells=2000, workers=2)
+    out = [next(results)]
+    # The worker that finished first is idle until the next dispatch. Let its queue feeder
+    # let go of the shared results lock first: a process killed holding it blocks every worker
+    time.sleep(0.5)
+    for worker in started:
+        if worker.current is None:
+            worker.kill()
+    out.extend(results)
+    assert [result["file"] for result in out] == files
+    assert not [result["error"] for result in out if "error" in result]
+    assert len(started) > 2
@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from analyzer.excel_pattern_analyzer import ExcelPatternAnalyzer
+from analyzer.sheet_snapshot import a1_address, block_range, read_cell_borders, read_cell_font, snapshot_com_sheet
+from conftest import base_case_files
+from fake_excel import load_biff_workbook
+
+
+def test_sample_cells_skips_merge_interiors_without_a_cap():
+    analyzer = ExcelPatternAnalyzer(".", coverage="regions")
+    coords = analyzer._sample_cells(3, 3, 2, merges=[(1, 1, 2, 2)])
+    assert coords == [(1, 1), (1, 3), (2, 3), (3, 1), (3, 2), (3, 3)]
+    assert len(analyzer._sample_cells(3, 3, 2)) <= 2
+
+
+def test_unknown_coverage_is_rejected():
+    with pytest.raises(ValueError):
+        ExcelPatternAnalyzer(".", coverage="rows")
+
+
+def _merged_sheet(path):
+    for ws in load_biff_workbook(path).Worksheets:
+        if ws.merges:
+            return ws
+    pytest.skip("no merged sheet")
+
+
+@pytest.mark.skipif(not base_case_files(), reason="Base Case Files not present")
+@pytest.mark.parametrize("path", base_case_files(), ids=os.path.basename)
+def test_regions_report_each_merge_once_with_its_area_styles(path):
+    ws = _merged_sheet(path)
+    cells = ExcelPatternAnalyzer(".")._analyze_snapshot(snapshot_com_sheet(ws))
+    snapshot = snapshot_com_sheet(ws, include_styles=True, style_regions=True)
+    regions = ExcelPatternAnalyzer(".", coverage="regions")._analyze_snapshot(snapshot)
+
+    interiors = set()
+    for top, left, nrows, ncols in snapshot.merges:
+        interiors.update((r, c) for r in range(top, top + nrows) for c in range(left, left + ncols))
+        interiors.discard((top, left))
+    expected = [cell["address"] for cell in cells["cells"] if (cell["row"], cell["col"]) not in interiors]
+    assert [cell["address"] for cell in regions["cells"]] == expected
+    area_counts = regions["merge_blocks_summary"]["area_counts"]
+    assert sum(area_counts.values()) == len(snapshot.merges) == len(set(snapshot.merges))
+
+    for cell in regions["cells"]:
+        merge = cell["merge"]
+        if merge is None:
+            styled = ws.Cells(cell["row"], cell["col"])
+        else:
+            assert cell["address"] == a1_address(merge["top"], merge["left"])
+            bottom, right = merge["top"] + merge["rows"] - 1, merge["left"] + merge["cols"] - 1
+            styled = block_range(ws, merge["top"], merge["left"], bottom, right)
+        assert cell["borders"] == read_cell_borders(styled)
+        assert cell["font"] == read_cell_font(ws.Cells(cell["row"], cell["col"]))
@@ -0,0 +1,52 @@
+from analyzer.excel_pattern_analyzer import write_json_report, write_ndjson_report
+from tools.report_io import default_report_path, iter_report_sheets
+
+
+def _files():
+    sheet = {"name": "Sheet1", "used_rows": 3, "used_cols": 2, "merge_blocks_summary": {"block_sizes": {"1x2": 1}}}
+    return [
+        {"file": "a.xls", "sheets": [sheet, dict(sheet, name="Sheet2")]},
+        {"file": "b.xls", "error": "could not open"},
+        {"file": "c.xls", "sheets": [dict(sheet, name="Totals")]},
+    ]
+
+
+def _pairs(path):
+    return [(header["file"], sheet) for header, sheet in iter_report_sheets(path)]
+
+
+def test_ndjson_report_reads_back_like_the_json_report(tmp_path):
+    ndjson_path = str(tmp_path / "analysis.ndjson")
+    json_path = str(tmp_path / "analysis.json")
+    assert write_ndjson_report(iter(_files()), ndjson_path) == 3
+    write_json_report({"files": _files()}, json_path)
+    assert _pairs(ndjson_path) == _pairs(json_path)
+    assert [name for name, _sheet in _pairs(ndjson_path)] == ["a.xls", "a.xls", "c.xls"]
+    with open(ndjson_path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines[-1] == '{"type":"end","file_count":3}'
+
+
+def test_interrupted_ndjson_report_keeps_the_files_written(tmp_path):
+    path = str(tmp_path / "analysis.ndjson")
+
+    def interrupted():
+        yield from _files()[:2]
+        raise KeyboardInterrupt
+
+    try:
+        write_ndjson_report(interrupted(), path)
+    except KeyboardInterrupt:
+        pass
+    # A crash can also leave half a line behind
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"type":"sheet","file":"c.xls","na')
+    assert [name for name, _sheet in _pairs(path)] == ["a.xls", "a.xls"]
+    with open(path, encoding="utf-8") as f:
+        assert '"type":"end"' not in f.read()
+
+
+def test_default_report_path_prefers_the_ndjson_report(tmp_path):
+    assert default_report_path(str(tmp_path)).endswith("analysis.json")
+    (tmp_path / "analysis.ndjson").write_text("")
+    assert default_report_path(str(tmp_path)).endswith("analysis.ndjson")
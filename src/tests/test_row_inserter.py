@@ -0,0 +1,145 @@
+import os
+import random
+
+import pytest
+
+from category_context import CategoryContextCache
+from conftest import base_case_files, baseline_row_inserter, sheet_state
+from fake_excel import clone_sheet, load_biff_workbook
+from row_inserter import RowInserter
+
+OPERATIONS = ("add_row_to_category", "add_new_category")
+# Sampled active rows per sheet and clicks per sequence; enough to reach headers, merges and sheet edges
+ROWS_PER_SHEET = 3
+CLICKS = 6
+
+pytestmark = pytest.mark.skipif(not base_case_files(), reason="Base Case Files not present")
+
+
+def _sheets(path):
+    return list(load_biff_workbook(path).Worksheets)
+
+
+def _sample_rows(ws, rng, count):
+    first_row, _first_col, last_row, _last_col = ws.used_bounds()
+    return rng.sample(range(first_row, last_row + 1), min(count, last_row - first_row + 1))
+
+
+def _click(inserter, ws, operation, *args):
+    getattr(inserter, operation)(ws, int(ws.Application.ActiveCell.Row), *args)
+
+
+@pytest.mark.parametrize("path", base_case_files(), ids=os.path.basename)
+def test_single_click_matches_baseline(path):
+    baseline = baseline_row_inserter()
+    rng = random.Random(os.path.basename(path))
+    for ws in _sheets(path):
+        for row in _sample_rows(ws, rng, ROWS_PER_SHEET):
+            for operation in OPERATIONS:
+                expected, actual = clone_sheet(ws), clone_sheet(ws)
+                for sheet, inserter in ((expected, baseline()), (actual, RowInserter())):
+                    sheet.Cells(row, 1).Select()
+                    _click(inserter, sheet, operation)
+                assert sheet_state(actual) == sheet_state(expected), (ws.Name, row, operation)
+
+
+@pytest.mark.parametrize("path", base_case_files(), ids=os.path.basename)
+def test_click_sequences_match_baseline(path):
+    # Consecutive clicks from where the last one left the selection, with and without the
+    # context cache (reused models, Add New Category stamps)
+    baseline = baseline_row_inserter()
+    rng = random.Random(os.path.basename(path))
+    for ws in _sheets(path):
+        for start in _sample_rows(ws, rng, 1):
+            operations = [rng.choice(OPERATIONS) for _ in range(CLICKS)]
+            runs = []
+            for inserter in (baseline(), RowInserter(), RowInserter(context_cache=CategoryContextCache())):
+                sheet = clone_sheet(ws)
+                sheet.Cells(start, 1).Select()
+                for operation in operations:
+                    _click(inserter, sheet, operation)
+                runs.append(sheet_state(sheet))
+            assert runs[1] == runs[0], (ws.Name, start, operations)
+            assert runs[2] == runs[0], (ws.Name, start, operations, "cached")
+
+
+@pytest.mark.parametrize("path", base_case_files(), ids=os.path.basename)
+def test_dry_run_changes_nothing_and_counts_the_live_writes(path):
+    rng = random.Random(os.path.basename(path))
+    for ws in _sheets(path):
+        for row in _sample_rows(ws, rng, 2):
+            for operation, args in (("add_row_to_category", ()), ("add_rows_to_category", (3,)), ("add_new_category", ())):
+                dry_sheet, live_sheet = clone_sheet(ws), clone_sheet(ws)
+                before = sheet_state(dry_sheet)
+                dry, live = RowInserter(dry_run=True), RowInserter()
+                getattr(dry, operation)(dry_sheet, row, *args)
+                getattr(live, operation)(live_sheet, row, *args)
+                assert sheet_state(dry_sheet) == before, (ws.Name, row, operation)
+                assert dry.last_write_count == live.last_write_count, (ws.Name, row, operation)
+
+
+@pytest.mark.parametrize("path", base_case_files(), ids=os.path.basename)
+def test_uncached_add_row_costs_no_more_than_baseline(path):
+    # Consecutive Add Row clicks without the context cache: each builds its model from scratch
+    baseline = baseline_row_inserter()
+    rng = random.Random(os.path.basename(path))
+    for ws in _sheets(path):
+        for start in _sample_rows(ws, rng, 2):
+            costs = []
+            for inserter in (baseline(), RowInserter()):
+                sheet = clone_sheet(ws)
+                counter = sheet.Application.counter
+                sheet.Cells(start, 1).Select()
+                clicks = []
+                for _ in range(4):
+                    counter.reset()
+                    _click(inserter, sheet, "add_row_to_category")
+                    clicks.append(counter.total)
+                costs.append(clicks)
+            assert all(new <= old for old, new in zip(*costs)), (ws.Name, start, costs)
+
+
+def _row(state, row, borders=True):
+    return {col: data if borders else data[:4] for (r, col), data in state[0].items() if r == row}
+
+
+@pytest.mark.parametrize("path", base_case_files(), ids=os.path.basename)
+def test_add_rows_formats_every_new_row_like_one_click_in_one_insert(path):
+    count = 3
+    rng = random.Random(os.path.basename(path))
+    for ws in _sheets(path):
+        for row in _sample_rows(ws, rng, 2):
+            one, many, clicks = clone_sheet(ws), clone_sheet(ws), clone_sheet(ws)
+            RowInserter().add_row_to_category(one, row)
+            clicks.Cells(row, 1).Select()
+            inserter = RowInserter()
+            clicks.Application.counter.reset()
+            for _ in range(count):
+                _click(inserter, clicks, "add_row_to_category")
+            many.row_edits.clear()
+            many.Application.counter.reset()
+            RowInserter().add_rows_to_category(many, row, count)
+            assert many.row_edits == [("insert", row + 1, count)], (ws.Name, row)
+            assert many.Application.counter.total < clicks.Application.counter.total, (ws.Name, row)
+
+            single, block = sheet_state(one), sheet_state(many)
+            # New rows share the lines between them, so their borders are left out
+            for k in range(1, count + 1):
+                assert _row(block, row + k, False) == _row(single, row + 1, False), (ws.Name, row, k)
+            first_row, _first_col, last_row, _last_col = ws.used_bounds()
+            for r in range(first_row, last_row + 2):
+                if r <= row:
+                    assert _row(block, r) == _row(single, r), (ws.Name, row, r)
+                elif r >= row + 2:
+                    assert _row(block, r + count - 1) == _row(single, r), (ws.Name, row, r)
+
+            # Horizontal merges of the new row repeat on every new row; merges through it grow by count
+            merges = []
+            for top, left, bottom, right in single[1]:
+                if top == bottom == row + 1:
+                    merges += [(row + k, left, row + k, right) for k in range(1, count + 1)]
+                else:
+                    top += count - 1 if top > row + 1 else 0
+                    bottom += count - 1 if bottom > row else 0
+                    merges.append((top, left, bottom, right))
+            assert sorted(merges) == block[1], (ws.Name, row)
@@ -0,0 +1,102 @@
+from fake_excel import FakeApplication
+from format_utils import XL_EDGE_BOTTOM, XL_EDGE_LEFT, XL_EDGE_RIGHT, XL_EDGE_TOP, XL_INSIDE_HORIZONTAL, XL_INSIDE_VERTICAL
+from row_plan import BorderStep, InsertStep, RowPlanner, XL_THIN, _rectangles
+from sheet_structure import SheetStructure
+
+THIN = {"line_style": 1, "weight": XL_THIN, "color": 0}
+EDGES = (XL_EDGE_LEFT, XL_EDGE_TOP, XL_EDGE_BOTTOM, XL_EDGE_RIGHT)
+
+
+def _sheet(boxed_rows=(), cols=3):
+    ws = FakeApplication().Workbooks.Add().Worksheets(1)
+    for row in boxed_rows:
+        for col in range(1, cols + 1):
+            ws.Cells(row, col).Value = f"r{row}c{col}"
+            for idx in EDGES:
+                ws.Cells(row, col).Borders(idx).LineStyle = 1
+    return ws
+
+
+def _planner(ws, anchor_row=1, dry_run=False):
+    return RowPlanner(ws, SheetStructure.build(ws, anchor_row=anchor_row), dry_run=dry_run)
+
+
+def _edges(ws, row, cols=3):
+    return [[ws.Cells(row, col).Borders(idx).LineStyle for idx in EDGES] for col in range(1, cols + 1)]
+
+
+# -- _rectangles -----------------------------------------------------------------
+
+
+def test_rectangles_join_equal_runs_across_consecutive_lines():
+    props = (("LineStyle", 1),)
+    lines = {3: {1: props, 2: props, 3: props}, 4: {1: props, 2: props, 3: props}}
+    assert _rectangles(lines) == [[3, 4, 1, 3, props]]
+
+
+def test_rectangles_split_on_gaps_and_different_writes():
+    a, b = (("LineStyle", 1),), (("LineStyle", 0),)
+    lines = {2: {1: a, 2: a, 3: b}, 4: {1: a, 2: a}}
+    assert _rectangles(lines) == [[2, 2, 1, 2, a], [2, 2, 3, 3, b], [4, 4, 1, 2, a]]
+
+
+# -- _border_steps ---------------------------------------------------------------
+
+
+def test_border_steps_write_one_range_per_line():
+    ws = _sheet()
+    planner = _planner(ws)
+    planner._paint([(2, 2, 1, 3, XL_EDGE_BOTTOM, THIN)])
+    steps = planner._border_steps()
+    assert [(s.r1, s.c1, s.r2, s.c2, s.idx) for s in steps] == [(3, 1, 3, 3, XL_EDGE_TOP)]
+    assert steps[0].props[0] == ("LineStyle", 1)
+
+
+def test_border_steps_use_inside_lines_for_stacked_rows():
+    ws = _sheet()
+    planner = _planner(ws)
+    planner._paint([(2, 4, 1, 3, XL_INSIDE_HORIZONTAL, THIN), (2, 4, 1, 3, XL_INSIDE_VERTICAL, THIN)])
+    steps = {(s.r1, s.c1, s.r2, s.c2, s.idx) for s in planner._border_steps()}
+    assert steps == {(2, 1, 4, 3, XL_INSIDE_HORIZONTAL), (2, 1, 4, 3, XL_INSIDE_VERTICAL)}
+
+
+def test_border_steps_skip_lines_already_drawn():
+    ws = _sheet(boxed_rows=[2])
+    planner = _planner(ws)
+    planner._paint([(2, 2, 1, 3, XL_EDGE_BOTTOM, THIN), (2, 2, 1, 3, XL_EDGE_TOP, THIN)])
+    assert planner._border_steps() == []
+
+
+def test_border_steps_clear_lines_the_plan_removes():
+    ws = _sheet(boxed_rows=[2])
+    planner = _planner(ws)
+    planner._paint([(2, 2, 1, 3, XL_EDGE_BOTTOM, None)])
+    steps = planner._border_steps()
+    assert steps == [BorderStep(3, 1, 3, 3, XL_EDGE_TOP, (("LineStyle", 0),))]
+
+
+# -- plans on a sheet ------------------------------------------------------------
+
+
+def test_plan_row_like_copies_the_reference_borders():
+    ws = _sheet(boxed_rows=[1, 2])
+    planner = _planner(ws, anchor_row=2)
+    planner.insert_rows(3)
+    planner.commit(planner.plan_row_like(3, 2, 3))
+    assert _edges(ws, 3) == _edges(ws, 2)
+
+
+def test_dry_run_plans_the_live_writes_without_making_them():
+    # Row 3 is inserted as a copy of the empty row 2 and then formatted like the boxed row 1
+    dry_ws, live_ws = _sheet(boxed_rows=[1]), _sheet(boxed_rows=[1])
+    counts = []
+    for ws, dry_run in ((dry_ws, True), (live_ws, False)):
+        planner = _planner(ws, anchor_row=2, dry_run=dry_run)
+        planner.insert_rows(3)
+        planner.commit(planner.plan_row_like(3, 1, 3, merges=False))
+        counts.append(planner.write_count)
+        assert isinstance(planner.plans[0].steps[0], InsertStep)
+    assert counts[0] == counts[1] > 1
+    assert _edges(live_ws, 3) == _edges(live_ws, 1)
+    assert dry_ws.row_edits == []
+    assert _edges(dry_ws, 3) == [[-4142] * 4] * 3
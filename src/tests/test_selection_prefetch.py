@@ -0,0 +1,125 @@
+import os
+import random
+
+import pytest
+
+from category_context import CategoryContextCache
+from conftest import base_case_files, sheet_state
+from fake_excel import FakeApplication, clone_sheet, load_biff_workbook
+from row_inserter import RowInserter
+from selection_prefetch import SelectionPrefetcher
+
+# Events between the clicks of a simulated session: clicks, value edits Excel reports, selection moves
+EVENTS = ("add_row_to_category", "add_new_category", "edit", "move")
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Inserter(RowInserter):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.prefetched_rows = []
+
+    def prefetch(self, ws, active_row):
+        self.prefetched_rows.append(active_row)
+        super().prefetch(ws, active_row)
+
+
+def test_prefetch_waits_for_the_selection_to_rest():
+    ws = FakeApplication().Workbooks.Add().Worksheets(1)
+    clock = _Clock()
+    inserter = _Inserter(context_cache=CategoryContextCache())
+    prefetcher = SelectionPrefetcher(inserter, delay=0.25, clock=clock)
+    prefetcher.selection_changed(ws, 3)
+    clock.now += 0.2
+    prefetcher.selection_changed(ws, 4)
+    clock.now += 0.2
+    assert not prefetcher.run_due()
+    clock.now += 0.1
+    assert prefetcher.run_due()
+    assert not prefetcher.run_due()
+    assert inserter.prefetched_rows == [4] and prefetcher.prefetched == 1
+
+    prefetcher.selection_changed(ws, 5)
+    prefetcher.cancel()
+    clock.now += 1.0
+    assert not prefetcher.run_due()
+
+
+def test_without_a_context_cache_nothing_is_prefetched():
+    ws = FakeApplication().Workbooks.Add().Worksheets(1)
+    inserter = _Inserter()
+    prefetcher = SelectionPrefetcher(inserter, delay=0)
+    prefetcher.selection_changed(ws, 3)
+    prefetcher.sheet_changed(ws, 3, 3)
+    assert not prefetcher.run_due()
+    assert inserter.prefetched_rows == []
+
+
+def test_a_warm_model_is_used_once_and_cooled_by_a_move():
+    ws = FakeApplication().Workbooks.Add().Worksheets(1)
+    cache = CategoryContextCache()
+    structure = cache.warm(ws, 5)
+    refreshed = []
+    structure.refresh = lambda: refreshed.append(True)
+    assert cache.structure_for(ws, 5) is structure and not refreshed
+    cache.structure_for(ws, 5)
+    assert refreshed == [True]
+    # Warming a known model reads it again; after the selection moves the next use does too
+    cache.warm(ws, 5)
+    assert len(refreshed) == 2
+    cache.cool()
+    cache.structure_for(ws, 5)
+    assert len(refreshed) == 3
+
+
+def _session(ws, start, events, inserter, prefetcher=None):
+    """Replay events from ``start``; returns the COM calls made by the clicks themselves."""
+    counter = ws.Application.counter
+    click_calls = 0
+    ws.Cells(start, 1).Select()
+    if prefetcher is not None:
+        prefetcher.selection_changed(ws, start)
+        prefetcher.run_due()
+    for event, dr, col, value in events:
+        row = int(ws.Application.ActiveCell.Row)
+        target = max(1, row + dr)
+        if event == "edit":
+            ws.Cells(target, col).Value = value
+            if prefetcher is not None:
+                prefetcher.sheet_changed(ws, target, target)
+            continue
+        if event == "move":
+            ws.Cells(target, 1).Select()
+        else:
+            counter.reset()
+            getattr(inserter, event)(ws, row)
+            click_calls += counter.total
+        if prefetcher is not None:
+            # Excel raises no events during an operation; the worker follows the selection after it
+            prefetcher.selection_changed(ws, int(ws.Application.ActiveCell.Row))
+            prefetcher.run_due()
+    return click_calls
+
+
+@pytest.mark.skipif(not base_case_files(), reason="Base Case Files not present")
+@pytest.mark.parametrize("path", base_case_files(), ids=os.path.basename)
+def test_prefetched_sessions_match_uncached_ones_with_cheaper_clicks(path):
+    rng = random.Random(os.path.basename(path))
+    costs = [0, 0]
+    for ws in load_biff_workbook(path).Worksheets:
+        first_row, _first_col, last_row, _last_col = ws.used_bounds()
+        start = rng.randint(first_row, last_row)
+        events = [(rng.choice(EVENTS), rng.randint(-3, 3), rng.randint(1, 6), f"x{i}") for i in range(8)]
+        plain, warm = clone_sheet(ws), clone_sheet(ws)
+        costs[0] += _session(plain, start, events, RowInserter())
+        inserter = RowInserter(context_cache=CategoryContextCache())
+        costs[1] += _session(warm, start, events, inserter, SelectionPrefetcher(inserter, delay=0))
+        assert sheet_state(warm) == sheet_state(plain), (ws.Name, start, events)
+    assert costs[1] <= costs[0]
@@ -0,0 +1,119 @@
+import pytest
+
+from analyzer.backends import ComReaderBackend
+from analyzer.session_pool import XL_CALCULATION_MANUAL, XL_UPDATE_LINKS_NEVER, ExcelSessionPool
+from conftest import base_case_files
+from fake_excel import FakeApplication
+
+MB = 1024 * 1024
+
+needs_files = pytest.mark.skipif(not base_case_files(), reason="Base Case Files not present")
+
+
+class _Launcher:
+    """Pool factory handing out fake applications, with a settable memory reading per instance."""
+
+    def __init__(self, app_class=FakeApplication):
+        self.app_class = app_class
+        self.apps = []
+        self.memory = {}
+
+    def __call__(self):
+        app = self.app_class()
+        self.apps.append(app)
+        self.memory[id(app)] = 100 * MB
+        return app
+
+    def probe(self, app):
+        return self.memory[id(app)]
+
+
+class _CalculationNeedsWorkbook(FakeApplication):
+    # Like Excel: Calculation can't be changed while no workbook is open
+    def __setattr__(self, name, value):
+        if name == "Calculation" and not self._workbooks:
+            raise RuntimeError("Calculation needs an open workbook")
+        super().__setattr__(name, value)
+
+
+def _pool(launcher, **kwargs):
+    return ExcelSessionPool(factory=launcher, memory_probe=launcher.probe, **kwargs)
+
+
+def _read(pool, path, times=1):
+    for _ in range(times):
+        pool.close_workbook(pool.open_workbook(path))
+
+
+def test_instances_are_tuned_for_reading():
+    launcher = _Launcher()
+    with _pool(launcher, size=2) as pool:
+        assert len(pool.sessions) == 2
+        for app in launcher.apps:
+            assert app.ScreenUpdating is False and app.EnableEvents is False
+            assert app.DisplayAlerts is False and app.AskToUpdateLinks is False
+            assert app.Calculation == XL_CALCULATION_MANUAL
+    assert all(app.quit_called for app in launcher.apps)
+
+
+@needs_files
+def test_workbooks_open_read_only_without_updating_links():
+    launcher = _Launcher()
+    with _pool(launcher, size=2) as pool:
+        first = pool.open_workbook(base_case_files()[0])
+        second = pool.open_workbook(base_case_files()[0])
+        assert first.open_options == {"UpdateLinks": XL_UPDATE_LINKS_NEVER, "ReadOnly": True}
+        # The second workbook goes to the idle instance
+        assert [s.open_workbooks for s in pool.sessions] == [1, 1]
+        pool.close_workbook(first)
+        pool.close_workbook(second)
+        assert first.closed and pool.stats()["files_opened"] == [1, 1]
+
+
+@needs_files
+def test_manual_calculation_is_set_after_the_first_open():
+    launcher = _Launcher(_CalculationNeedsWorkbook)
+    with _pool(launcher) as pool:
+        assert launcher.apps[0].Calculation != XL_CALCULATION_MANUAL
+        _read(pool, base_case_files()[0])
+        assert launcher.apps[0].Calculation == XL_CALCULATION_MANUAL
+
+
+@needs_files
+def test_instances_are_recycled_after_recycle_after_files():
+    launcher = _Launcher()
+    with _pool(launcher, recycle_after=2, max_memory_growth_mb=None) as pool:
+        _read(pool, base_case_files()[0], times=5)
+        assert pool.recycled == 2 and len(launcher.apps) == 3
+        assert [app.quit_called for app in launcher.apps] == [True, True, False]
+        assert pool.stats()["files_opened"] == [1]
+
+
+@needs_files
+def test_instances_are_recycled_when_their_memory_grows():
+    launcher = _Launcher()
+    path = base_case_files()[0]
+    with _pool(launcher, recycle_after=0, max_memory_growth_mb=64) as pool:
+        _read(pool, path, times=3)
+        assert pool.recycled == 0
+        first = launcher.apps[0]
+        wb = pool.open_workbook(path)
+        launcher.memory[id(first)] += 65 * MB
+        # Not while a workbook is still open on it
+        _read(pool, path)
+        assert pool.recycled == 0
+        pool.close_workbook(wb)
+        _read(pool, path)
+        assert pool.recycled == 1 and first.quit_called
+        assert pool.sessions[0].app is launcher.apps[1]
+
+
+def test_a_shared_pool_outlives_the_backend():
+    launcher = _Launcher()
+    pool = _pool(launcher)
+    backend = ComReaderBackend(session_pool=pool)
+    backend.start()
+    backend.close()
+    assert pool.started and not launcher.apps[0].quit_called
+    pool.close()
+    assert launcher.apps[0].quit_called
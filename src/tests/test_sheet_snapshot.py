@@ -0,0 +1,76 @@
+import datetime
+import os
+
+import pytest
+
+from analyzer.sheet_snapshot import format_number, read_cell_borders, read_cell_font, snapshot_com_sheet
+from conftest import base_case_files
+from fake_excel import FakeApplication, load_biff_workbook
+
+
+@pytest.mark.parametrize(
+    "value, number_format, text",
+    [
+        (0.1 + 0.2, "General", "0.3"),
+        (1234.5, "#,##0.00", "1,234.50"),
+        (2.5, "0", "3"),
+        (0.256, "0.0%", "25.6%"),
+        (-5, "0.00;(0.00)", "(5.00)"),
+        (0, '0.00;-0.00;"-"', "-"),
+        (12345.678, "0.00E+00", "1.23E+04"),
+        (12, "0.0#", "12.0"),
+        (1234567, '0.0,," M"', "1.2 M"),
+        (-1234.5, "#,##0.00_);[Red](#,##0.00)", "(1,234.50)"),
+        (45123.5, "m/d/yyyy h:mm AM/PM", "7/16/2023 12:00 PM"),
+        (45000, "yyyy-mm-dd", "2023-03-15"),
+        (0.75, "h:mm", "18:00"),
+        (datetime.datetime(2024, 3, 5, 14, 7), "dd-mmm-yy", "05-Mar-24"),
+        (datetime.datetime(2024, 3, 5), "General", "3/5/2024"),
+        ("abc", "0.00", "abc"),
+        (True, "0", "TRUE"),
+    ],
+)
+def test_format_number_renders_like_range_text(value, number_format, text):
+    assert format_number(value, number_format) == text
+
+
+def test_snapshot_shows_numbers_through_their_column_format():
+    app = FakeApplication()
+    ws = app.Workbooks.Add().Worksheets(1)
+    ws.Cells(1, 1).Value = "Depth"
+    ws.Cells(1, 2).Value = "Date"
+    for row in range(2, 12):
+        ws.Cells(row, 1).Value = row / 3
+        ws.Cells(row, 1).NumberFormat = "0.00"
+        ws.Cells(row, 2).Value = 45000.0 + row
+        ws.Cells(row, 2).NumberFormat = "m/d/yyyy"
+    ws.Cells(11, 1).NumberFormat = "0.0"
+    app.counter.reset()
+    snapshot = snapshot_com_sheet(ws)
+    assert snapshot.value_at(1, 1) == "Depth"
+    assert snapshot.value_at(2, 1) == "0.67"
+    assert snapshot.value_at(11, 1) == "3.7"
+    assert snapshot.value_at(2, 2) == "3/17/2023"
+    # The date column is read once and the depth column bisected down to its odd cell,
+    # rather than one read per number
+    reads = sum(n for (_kind, name), n in app.counter.counts.items() if name.endswith(".NumberFormat"))
+    assert reads == 1 + 9
+
+
+@pytest.mark.skipif(not base_case_files(), reason="Base Case Files not present")
+@pytest.mark.parametrize("path", base_case_files(), ids=os.path.basename)
+def test_style_snapshot_matches_per_cell_reads_in_fewer_calls(path):
+    for ws in load_biff_workbook(path).Worksheets:
+        counter = ws.Application.counter
+        counter.reset()
+        snapshot_com_sheet(ws)
+        unstyled = counter.total
+        counter.reset()
+        snapshot = snapshot_com_sheet(ws, include_styles=True)
+        calls = counter.total - unstyled
+        counter.reset()
+        for r, c in snapshot.iter_coords():
+            cell = ws.Cells(r, c)
+            assert snapshot.borders[(r, c)] == read_cell_borders(cell), (ws.Name, r, c)
+            assert snapshot.fonts[(r, c)] == read_cell_font(cell), (ws.Name, r, c)
+        assert calls < counter.total, ws.Name
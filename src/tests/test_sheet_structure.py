@@ -0,0 +1,42 @@
+from fake_excel import FakeApplication
+from sheet_structure import SheetStructure
+
+
+def _sheet():
+    ws = FakeApplication().Workbooks.Add().Worksheets(1)
+    ws.add_merge(2, 1, 2, 3)
+    ws.add_merge(3, 4, 5, 4)
+    return ws
+
+
+def test_merges_unchanged_after_the_model_tracks_the_sheet():
+    ws = _sheet()
+    structure = SheetStructure.build(ws, anchor_row=4)
+    assert structure.merges_unchanged()
+    ws.Rows(3).Insert()
+    structure.insert_rows(3)
+    ws.Range("B7:C7").Merge()
+    structure.add_merge(7, 2, 1, 2)
+    assert structure.merges_unchanged()
+
+
+def test_refresh_picks_up_merges_made_and_removed_by_hand():
+    ws = _sheet()
+    structure = SheetStructure.build(ws, anchor_row=4)
+    ws.Range("E4:F4").Merge()
+    assert not structure.merges_unchanged()
+    structure.refresh()
+    assert structure.merge_area(4, 6) == (4, 5, 1, 2)
+
+    ws.Range("A2").MergeArea.UnMerge()
+    structure.refresh()
+    assert structure.merge_area(2, 2) == (2, 2, 1, 1)
+    assert structure.merges_unchanged()
+
+
+def test_refresh_sees_two_areas_merged_into_one():
+    ws = _sheet()
+    structure = SheetStructure.build(ws, anchor_row=4)
+    ws.Range("A2:D5").Merge()
+    structure.refresh()
+    assert list(structure.merge_index) == [(2, 1, 4, 4)]
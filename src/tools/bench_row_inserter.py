@@ -0,0 +1,146 @@
+import argparse
+import glob
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+# Run as a script from the repo root: make src/ importable like main.py does
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SRC_DIR)
+REPO_ROOT = os.path.dirname(SRC_DIR)
+
+from fake_excel import FakeWorksheet, load_biff_workbook, tile_sheet  # noqa: E402
+from row_inserter import RowInserter  # noqa: E402
+
+OPERATIONS = ("add_row_to_category", "add_new_category")
+# Operations taking a row count after the active row
+BATCH_OPERATIONS = ("add_rows_to_category",)
+
+
+def _largest_sheet(path: str) -> Optional[FakeWorksheet]:
+    best = None
+    best_cells = 0
+    for ws in load_biff_workbook(path).Worksheets:
+        first_row, first_col, last_row, last_col = ws.used_bounds()
+        cells = (last_row - first_row + 1) * (last_col - first_col + 1)
+        if cells > best_cells:
+            best, best_cells = ws, cells
+    return best
+
+
+def bench_sheet(
+    ws: FakeWorksheet, operation: str, size: int, repeats: int, seed: int = 0, count: int = 1, dry_run: bool = False
+) -> Dict[str, Any]:
+    """Run ``operation`` ``repeats`` times on a copy of ``ws`` tiled to ``size`` rows.
+
+    Clicks land on random rows of the tiled table and accumulate on the same
+    sheet, like consecutive button presses. Returns per-click call counts
+    (gets/sets/total), planned writes and wall times. With ``dry_run`` the
+    clicks are only planned and the sheet stays as it is.
+    """
+    # Always work on a copy; size 0 keeps the layout's own row count
+    sheet = tile_sheet(ws, size)
+    first_row, _first_col, last_row, _last_col = sheet.used_bounds()
+    counter = sheet.Application.counter
+    rng = random.Random(seed)
+    inserter = RowInserter(dry_run=dry_run)
+    calls: List[int] = []
+    writes: List[int] = []
+    gets: List[int] = []
+    sets: List[int] = []
+    times: List[float] = []
+    for _ in range(repeats):
+        row = rng.randint(first_row, last_row)
+        counter.enabled = False
+        sheet.Cells(row, 1).Select()
+        counter.enabled = True
+        counter.reset()
+        start = time.perf_counter()
+        if operation in BATCH_OPERATIONS:
+            getattr(inserter, operation)(sheet, row, count)
+        else:
+            getattr(inserter, operation)(sheet, row)
+        times.append(time.perf_counter() - start)
+        kinds = counter.by_kind()
+        calls.append(counter.total)
+        writes.append(inserter.last_write_count)
+        gets.append(kinds.get("get", 0))
+        sets.append(kinds.get("set", 0))
+    return {
+        "rows": last_row - first_row + 1,
+        "operation": operation,
+        "clicks": repeats,
+        "count": count if operation in BATCH_OPERATIONS else 1,
+        "calls_mean": statistics.mean(calls),
+        "calls_max": max(calls),
+        "gets_mean": statistics.mean(gets),
+        "sets_mean": statistics.mean(sets),
+        "writes_mean": statistics.mean(writes),
+        "ms_median": statistics.median(times) * 1000.0,
+        "ms_max": max(times) * 1000.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark RowInserter operations against Base Case File layouts on the fake Excel model"
+    )
+    parser.add_argument(
+        "--files",
+        type=str,
+        default=os.path.join(REPO_ROOT, "Base Case Files", "*.xls"),
+        help="Glob of .xls layouts (default: the repo's Base Case Files, wherever this is run from)",
+    )
+    parser.add_argument(
+        "--sizes", type=str, default="0,250,1000", help="Comma-separated table sizes in rows (0 = layout as-is)"
+    )
+    parser.add_argument("--repeats", type=int, default=5, help="Clicks per layout, size and operation")
+    parser.add_argument("--ops", type=str, default=",".join(OPERATIONS), help="Comma-separated operations")
+    parser.add_argument(
+        "--count", type=int, default=10, help="Rows per click for add_rows_to_category"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only plan the clicks (calls are then the planning reads)")
+    parser.add_argument("--json", type=str, default=None, help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    operations = [op.strip() for op in args.ops.split(",") if op.strip()]
+    results: List[Dict[str, Any]] = []
+    paths = sorted(glob.glob(args.files))
+    if not paths:
+        raise SystemExit(f"No layouts match {args.files}")
+
+    print(f"{'layout':<40} {'rows':>6} {'operation':<20} {'calls':>8} {'gets':>8} {'sets':>7} {'writes':>7} {'ms':>8}")
+    for path in paths:
+        try:
+            ws = _largest_sheet(path)
+        except Exception as e:
+            print(f"{os.path.basename(path)}: skipped ({e})")
+            continue
+        if ws is None:
+            continue
+        layout = f"{os.path.basename(path)}:{ws.Name}"
+        for size in sizes:
+            for operation in operations:
+                result = bench_sheet(ws, operation, size, args.repeats, count=args.count, dry_run=args.dry_run)
+                result["layout"] = layout
+                results.append(result)
+                print(
+                    f"{layout[:40]:<40} {result['rows']:>6} {operation:<20} {result['calls_mean']:>8.0f} "
+                    f"{result['gets_mean']:>8.0f} {result['sets_mean']:>7.0f} {result['writes_mean']:>7.0f} "
+                    f"{result['ms_median']:>8.1f}"
+                )
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
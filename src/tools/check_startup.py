@@ -0,0 +1,90 @@
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What each main.py mode imports before it does any work, the modules it must
+# not pull in, and its import-time budget in milliseconds (whole interpreter
+# import graph, best of --repeats runs).
+MODES: Dict[str, Tuple[List[str], Tuple[str, ...], float]] = {
+    "cli": (
+        ["main"],
+        ("tkinter", "keyboard", "win32com", "pythoncom", "analyzer", "gui", "row_inserter", "excel_connector"),
+        150.0,
+    ),
+    "gui": (
+        ["main", "gui.command_worker", "gui.gui_interface"],
+        ("keyboard", "win32com", "pythoncom", "analyzer", "row_inserter", "excel_connector"),
+        300.0,
+    ),
+    "analysis": (
+        ["main", "analyzer.analysis_cache", "analyzer.excel_pattern_analyzer", "analyzer.session_pool"],
+        ("tkinter", "keyboard", "gui", "row_inserter"),
+        400.0,
+    ),
+}
+
+
+def measure(modules: List[str]) -> Dict[str, int]:
+    """Self import time in microseconds per module, from ``python -X importtime``."""
+    code = f"import sys; sys.path.insert(0, {SRC_DIR!r}); " + "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=SRC_DIR,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+    times: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        times[parts[2].strip()] = int(parts[0])
+    return times
+
+
+def _forbidden(times: Dict[str, int], banned: Tuple[str, ...]) -> List[str]:
+    return sorted(m for m in times if m.split(".")[0] in banned or m in banned)
+
+
+def check_mode(mode: str, repeats: int = 3, budget_scale: float = 1.0) -> List[str]:
+    """Problems found for one mode (empty when within budget and no banned imports)."""
+    modules, banned, budget_ms = MODES[mode]
+    runs = [measure(modules) for _ in range(max(1, repeats))]
+    best = min(runs, key=lambda t: sum(t.values()))
+    total_ms = sum(best.values()) / 1000.0
+    slowest = sorted(best.items(), key=lambda kv: kv[1], reverse=True)[:5]
+    print(f"{mode:9s} {total_ms:7.1f} ms (budget {budget_ms * budget_scale:.0f} ms); slowest: "
+          + ", ".join(f"{name} {us / 1000.0:.1f}" for name, us in slowest))
+
+    problems = []
+    # A module that failed to import (e.g. pywin32 off Windows) still shows up as attempted
+    for name in _forbidden(best, banned):
+        problems.append(f"{mode}: imports {name}")
+    if total_ms > budget_ms * budget_scale:
+        problems.append(f"{mode}: {total_ms:.1f} ms over the {budget_ms * budget_scale:.0f} ms budget")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check main.py startup imports per mode against -X importtime budgets")
+    parser.add_argument("--mode", choices=sorted(MODES), action="append", help="Mode to check (default: all)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="Multiply every budget (slow machines/CI)")
+    args = parser.parse_args()
+
+    problems: List[str] = []
+    for mode in args.mode or sorted(MODES):
+        problems.extend(check_mode(mode, args.repeats, args.budget_scale))
+    for problem in problems:
+        print(f"FAIL {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
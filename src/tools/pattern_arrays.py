@@ -0,0 +1,254 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except Exception:  # optional: only the vectorized statistics need it
+    np = None
+
+from pattern_stats import BORDER_SIDES, PatternStats
+from report_io import iter_report_sheets, iter_sheet_cells
+
+# One record per reported cell. Missing values are 0 (merge/border/font size) or -1 (bold).
+CELL_FIELDS = [
+    ("sheet", "i4"),
+    ("row", "i4"),
+    ("col", "i4"),
+    ("merge_top", "i4"),
+    ("merge_left", "i4"),
+    ("merge_rows", "i4"),
+    ("merge_cols", "i4"),
+    ("border_left", "i2"),
+    ("border_top", "i2"),
+    ("border_right", "i2"),
+    ("border_bottom", "i2"),
+    ("font_size", "i2"),
+    ("bold", "i1"),
+]
+BORDER_FIELDS = tuple(f"border_{side}" for side in BORDER_SIDES)
+
+DEFAULT_PERCENTILES = (25, 50, 75, 90)
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("NumPy is required for vectorized pattern statistics (pip install numpy).")
+
+
+def _weight(borders: Dict[str, Any], side: str) -> int:
+    info = borders.get(side)
+    if isinstance(info, dict):
+        w = info.get("weight")
+        if isinstance(w, int) and w > 0:
+            return w
+    return 0
+
+
+def _font_fields(font: Dict[str, Any]) -> Tuple[int, int]:
+    size = font.get("size")
+    bold = font.get("bold")
+    return (
+        size if isinstance(size, int) and size > 0 else 0,
+        int(bold) if isinstance(bold, bool) else -1,
+    )
+
+
+class CellArrayBuilder:
+    """Collects report sheets into one NumPy structured array (``CELL_FIELDS``).
+
+    Columnar sheets are converted with array lookups into their style and
+    merge tables; per-cell sheets go through one tuple per cell. ``sheets``
+    keeps file/name/used size per sheet id (the ``sheet`` field).
+    """
+
+    def __init__(self) -> None:
+        _require_numpy()
+        self.dtype = np.dtype(CELL_FIELDS)
+        self.sheets: List[Dict[str, Any]] = []
+        self._chunks: List[Any] = []
+
+    def add_sheet(self, file_entry: Dict[str, Any], sheet: Dict[str, Any]) -> None:
+        sheet_id = len(self.sheets)
+        self.sheets.append({
+            "file": file_entry.get("file", ""),
+            "name": sheet.get("name", ""),
+            "used_rows": sheet.get("used_rows", 0),
+            "used_cols": sheet.get("used_cols", 0),
+        })
+        columnar = sheet.get("columnar")
+        if columnar:
+            chunk = self._from_columnar(sheet_id, columnar)
+        else:
+            chunk = self._from_cells(sheet_id, iter_sheet_cells(sheet))
+        if len(chunk):
+            self._chunks.append(chunk)
+
+    def _from_cells(self, sheet_id: int, cells: Iterable[Dict[str, Any]]) -> Any:
+        records = []
+        for cell in cells:
+            merge = cell.get("merge") or {}
+            borders = cell.get("borders") or {}
+            size, bold = _font_fields(cell.get("font") or {})
+            records.append((
+                sheet_id,
+                cell.get("row", 0),
+                cell.get("col", 0),
+                merge.get("top", 0),
+                merge.get("left", 0),
+                merge.get("rows", 0),
+                merge.get("cols", 0),
+                *(_weight(borders, side) for side in BORDER_SIDES),
+                size,
+                bold,
+            ))
+        return np.array(records, dtype=self.dtype)
+
+    def _from_columnar(self, sheet_id: int, columnar: Dict[str, Any]) -> Any:
+        rows = np.asarray(columnar.get("row", []), dtype="i4")
+        out = np.zeros(len(rows), dtype=self.dtype)
+        if not len(rows):
+            return out
+        out["sheet"] = sheet_id
+        out["row"] = rows
+        out["col"] = np.asarray(columnar.get("col", []), dtype="i4")
+
+        # Id -1 ("none") indexes the zero row appended to each lookup table
+        merges = np.zeros((len(columnar.get("merges", [])) + 1, 4), dtype="i4")
+        if len(merges) > 1:
+            merges[:-1] = columnar["merges"]
+        merge_ids = np.asarray(columnar.get("merge", []), dtype="i4")
+        for i, field in enumerate(("merge_top", "merge_left", "merge_rows", "merge_cols")):
+            out[field] = merges[merge_ids, i]
+
+        border_styles = columnar.get("border_styles", [])
+        weights = np.zeros((len(border_styles) + 1, len(BORDER_SIDES)), dtype="i2")
+        for i, style in enumerate(border_styles):
+            weights[i] = [_weight(style or {}, side) for side in BORDER_SIDES]
+        border_ids = np.asarray(columnar.get("border", []), dtype="i4")
+        for i, field in enumerate(BORDER_FIELDS):
+            out[field] = weights[border_ids, i]
+
+        font_styles = columnar.get("font_styles", [])
+        fonts = np.zeros((len(font_styles) + 1, 2), dtype="i2")
+        fonts[-1, 1] = -1
+        for i, style in enumerate(font_styles):
+            fonts[i] = _font_fields(style or {})
+        font_ids = np.asarray(columnar.get("font", []), dtype="i4")
+        out["font_size"] = fonts[font_ids, 0]
+        out["bold"] = fonts[font_ids, 1]
+        return out
+
+    def build(self) -> Any:
+        if not self._chunks:
+            return np.zeros(0, dtype=self.dtype)
+        cells = np.concatenate(self._chunks)
+        self._chunks = [cells]
+        return cells
+
+
+def load_cell_array(report_path: str) -> Tuple[Any, List[Dict[str, Any]]]:
+    """(cells, sheets) for a report: the structured cell array and per-sheet metadata."""
+    builder = CellArrayBuilder()
+    for file_entry, sheet in iter_report_sheets(report_path):
+        builder.add_sheet(file_entry, sheet)
+    return builder.build(), builder.sheets
+
+
+def value_counts(values: Any) -> List[Tuple[int, int]]:
+    """(value, count) for positive values, in order of first appearance."""
+    values = values[values > 0]
+    uniques, first, counts = np.unique(values, return_index=True, return_counts=True)
+    order = np.argsort(first, kind="stable")
+    return [(int(uniques[i]), int(counts[i])) for i in order]
+
+
+def merge_size_counts(cells: Any) -> List[Tuple[str, int]]:
+    """("RxC", cells in a merge of that size) in order of first appearance."""
+    merged = cells[cells["merge_rows"] > 0]
+    if not len(merged):
+        return []
+    pairs = np.stack([merged["merge_rows"], merged["merge_cols"]], axis=1)
+    uniques, first, counts = np.unique(pairs, axis=0, return_index=True, return_counts=True)
+    order = np.argsort(first, kind="stable")
+    return [(f"{uniques[i][0]}x{uniques[i][1]}", int(counts[i])) for i in order]
+
+
+def merge_anchors(cells: Any) -> Any:
+    """One record per merge area: the cells reported at a merge's top-left corner."""
+    return cells[
+        (cells["merge_rows"] > 0)
+        & (cells["row"] == cells["merge_top"])
+        & (cells["col"] == cells["merge_left"])
+    ]
+
+
+def percentiles(values: Any, qs: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, float]:
+    if not len(values):
+        return {}
+    return {f"p{q:g}": float(v) for q, v in zip(qs, np.percentile(values, qs))}
+
+
+def per_sheet(cells: Any, sheet_count: int, mask: Optional[Any] = None, weights: Optional[Any] = None) -> Any:
+    """Group-by sheet id: count of (masked) cells, or the sum of ``weights`` over them."""
+    ids = cells["sheet"] if mask is None else cells["sheet"][mask]
+    if weights is not None and mask is not None:
+        weights = weights[mask]
+    return np.bincount(ids, weights=weights, minlength=sheet_count)
+
+
+def compute_stats(cells: Any, sheets: List[Dict[str, Any]], qs: Sequence[float] = DEFAULT_PERCENTILES) -> PatternStats:
+    """PatternStats with the same counters as the streaming pass, plus distributions.
+
+    Merge sizes count the report's cells per merge size, which is what the
+    analyzer's ``block_sizes`` summaries hold.
+    """
+    stats = PatternStats()
+    last_file = None
+    for sheet in sheets:
+        if sheet["file"] != last_file:
+            last_file = sheet["file"]
+            stats.files += 1
+    stats.sheets = len(sheets)
+    stats.cells = int(len(cells))
+
+    for size_key, count in merge_size_counts(cells):
+        stats.add_merge_size(size_key, count)
+    weights = np.concatenate([cells[field] for field in BORDER_FIELDS])
+    for weight, count in value_counts(weights):
+        stats.border_weights[weight] = count
+    for size, count in value_counts(cells["font_size"]):
+        stats.font_sizes[size] = count
+    known_bold = cells["bold"] >= 0
+    stats.font_total = int(known_bold.sum())
+    stats.font_bold = int((cells["bold"] == 1).sum())
+
+    anchors = merge_anchors(cells)
+    horizontal = anchors[(anchors["merge_rows"] == 1) & (anchors["merge_cols"] > 1)]
+    vertical = anchors[(anchors["merge_cols"] == 1) & (anchors["merge_rows"] > 1)]
+    headers = anchors[anchors["merge_cols"] > 1]
+
+    n = len(sheets)
+    sheet_cells = per_sheet(cells, n)
+    sheet_bold = per_sheet(cells, n, mask=cells["bold"] == 1)
+    sheet_known_bold = per_sheet(cells, n, mask=known_bold)
+    sheet_merges = per_sheet(anchors, n)
+    sheet_widest = np.zeros(n, dtype="i4")
+    if len(horizontal):
+        np.maximum.at(sheet_widest, horizontal["sheet"], horizontal["merge_cols"])
+
+    stats.distributions = {
+        "horizontal_merge_width_percentiles": percentiles(horizontal["merge_cols"], qs),
+        "vertical_merge_height_percentiles": percentiles(vertical["merge_rows"], qs),
+        "header_height_percentiles": percentiles(headers["merge_rows"], qs),
+        "per_sheet": [
+            {
+                "file": sheet["file"],
+                "sheet": sheet["name"],
+                "cells": int(sheet_cells[i]),
+                "merges": int(sheet_merges[i]),
+                "widest_header": int(sheet_widest[i]),
+                "bold_ratio": round(float(sheet_bold[i] / sheet_known_bold[i]), 4) if sheet_known_bold[i] else None,
+            }
+            for i, sheet in enumerate(sheets)
+        ],
+    }
+    return stats
@@ -0,0 +1,147 @@
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from report_io import iter_sheet_cells
+
+BORDER_SIDES = ("left", "top", "right", "bottom")
+
+
+def _top(counter: "Counter[Any]", n: int, fmt: str) -> str:
+    return ", ".join(fmt.format(k, v) for k, v in counter.most_common(n))
+
+
+class PatternStats:
+    """Running merge/border/font counters over a report, fed one sheet at a time.
+
+    Memory is bounded by the number of distinct merge sizes, border weights
+    and font sizes, not by the report size, so every cell of every sheet is
+    counted (no sampling cap).
+    """
+
+    def __init__(self) -> None:
+        self.files = 0
+        self.sheets = 0
+        self.cells = 0
+        self.merge_sizes: Counter[str] = Counter()
+        self.horiz_merge_widths: Counter[int] = Counter()
+        self.vert_merge_heights: Counter[int] = Counter()
+        self.border_weights: Counter[int] = Counter()
+        self.font_sizes: Counter[int] = Counter()
+        self.font_bold = 0
+        self.font_total = 0
+        # Extra vectorized results (percentiles, per-sheet group-bys) from pattern_arrays.compute_stats
+        self.distributions: Dict[str, Any] = {}
+        self._last_file: Optional[str] = None
+
+    def add_sheet(self, file_entry: Dict[str, Any], sheet: Dict[str, Any]) -> None:
+        file_path = file_entry.get("file", "")
+        if file_path != self._last_file:
+            self._last_file = file_path
+            self.files += 1
+        self.sheets += 1
+        block_sizes: Dict[str, int] = sheet.get("merge_blocks_summary", {}).get("block_sizes", {})
+        for size_key, count in block_sizes.items():
+            self.add_merge_size(size_key, count)
+        for cell in iter_sheet_cells(sheet):
+            self.add_cell(cell)
+
+    def add_merge_size(self, size_key: str, count: int) -> None:
+        self.merge_sizes[size_key] += count
+        try:
+            rows, cols = size_key.split("x")
+            r = int(rows)
+            c = int(cols)
+            if r == 1 and c > 1:
+                self.horiz_merge_widths[c] += count
+            if c == 1 and r > 1:
+                self.vert_merge_heights[r] += count
+        except Exception:
+            pass
+
+    def add_cell(self, cell: Dict[str, Any]) -> None:
+        self.cells += 1
+        borders = cell.get("borders") or {}
+        for side in BORDER_SIDES:
+            info = borders.get(side)
+            if isinstance(info, dict):
+                w = info.get("weight")
+                if isinstance(w, int) and w > 0:
+                    self.border_weights[w] += 1
+        font = cell.get("font") or {}
+        size = font.get("size")
+        if isinstance(size, int) and size > 0:
+            self.font_sizes[size] += 1
+        bold = font.get("bold")
+        if isinstance(bold, bool):
+            self.font_total += 1
+            if bold:
+                self.font_bold += 1
+
+    @property
+    def bold_ratio(self) -> float:
+        return self.font_bold / self.font_total if self.font_total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Machine-readable stats (counter keys as strings, most common first)."""
+        def counts(counter: "Counter[Any]") -> Dict[str, int]:
+            return {str(k): v for k, v in counter.most_common()}
+
+        out = {
+            "files": self.files,
+            "sheets": self.sheets,
+            "cells": self.cells,
+            "merge_sizes": counts(self.merge_sizes),
+            "horizontal_merge_widths": counts(self.horiz_merge_widths),
+            "vertical_merge_heights": counts(self.vert_merge_heights),
+            "border_weights": counts(self.border_weights),
+            "font_sizes": counts(self.font_sizes),
+            "font_bold": self.font_bold,
+            "font_total": self.font_total,
+            "bold_ratio": round(self.bold_ratio, 4),
+        }
+        if self.distributions:
+            out["distributions"] = self.distributions
+        return out
+
+    def to_markdown(self) -> str:
+        top_sizes = _top(self.merge_sizes, 6, "{} ({})")
+        top_horiz = _top(self.horiz_merge_widths, 5, "{} cols ({})")
+        top_vert = _top(self.vert_merge_heights, 5, "{} rows ({})")
+        top_border_weights = _top(self.border_weights, 4, "{} ({})")
+        top_font_sizes = _top(self.font_sizes, 4, "{}pt ({})")
+        bold_ratio = f"{100 * self.bold_ratio:.1f}%" if self.font_total else "n/a"
+
+        md = []
+        md.append("### Sample Analysis Summary (auto-generated)\n")
+        md.append(f"- Files: {self.files}, sheets: {self.sheets}, cells: {self.cells}\n")
+        md.append(f"- Top merge block sizes: {top_sizes}\n")
+        md.append(f"- Common horizontal header widths: {top_horiz}\n")
+        md.append(f"- Common vertical category heights: {top_vert}\n")
+        if self.border_weights:
+            md.append(f"- Observed border weights: {top_border_weights}\n")
+        if self.font_sizes:
+            md.append(f"- Common font sizes: {top_font_sizes}; bold presence: {bold_ratio}\n")
+        widths = self.distributions.get("horizontal_merge_width_percentiles")
+        if widths:
+            md.append(f"- Header width percentiles: {', '.join(f'{k} {v:g}' for k, v in widths.items())}\n")
+        heights = self.distributions.get("vertical_merge_height_percentiles")
+        if heights:
+            md.append(f"- Category height percentiles: {', '.join(f'{k} {v:g}' for k, v in heights.items())}\n")
+
+        md.append("\n### Answers to Critical Questions (auto-generated)\n")
+        md.append("1. What do actual merge patterns look like?\n")
+        md.append(f"   - Frequent sizes: {top_sizes}. Horizontal 1xN and vertical Nx1 dominate.\n")
+        md.append("2. How many columns typically get merged?\n")
+        md.append(f"   - Common widths: {top_horiz}.\n")
+        md.append("3. Visual indicators separating categories?\n")
+        if self.border_weights:
+            md.append("   - Vertical Nx1 blocks indicate category fields; section headers use wide 1xN. Borders show recurring weights around edges.\n")
+        else:
+            md.append("   - Vertical Nx1 blocks indicate category fields; section headers use wide 1xN.\n")
+        md.append("4. Consistent border/formatting patterns?\n")
+        if self.border_weights or self.font_sizes:
+            md.append("   - Yes: repeated border weights and font sizes across sheets; copy perimeter borders and top-left font when inserting.\n")
+        else:
+            md.append("   - Some consistency expected; recommend copying perimeter borders and top-left font heuristically.\n")
+
+        return "".join(md)
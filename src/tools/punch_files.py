@@ -0,0 +1,76 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+# Run as a script from the repo root: make src/ importable like main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from headless_punch import OPERATIONS, PunchJob, punch_files  # noqa: E402
+
+
+def load_jobs(path: str) -> List[PunchJob]:
+    """Jobs from a CSV (header: file,sheet,row,op[,count]) or a JSON list of objects with those keys."""
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            entries: List[Dict[str, Any]] = json.load(f)
+    else:
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            entries = list(csv.DictReader(f))
+    jobs = []
+    for i, entry in enumerate(entries, 1):
+        try:
+            op = (entry.get("op") or "add_row").strip()
+            if op not in OPERATIONS:
+                raise ValueError(f"unknown op '{op}'")
+            jobs.append(PunchJob(
+                path=str(entry["file"]),
+                sheet=str(entry["sheet"]),
+                row=int(entry["row"]),
+                op=op,
+                count=int(entry.get("count") or 1),
+            ))
+        except (KeyError, TypeError, ValueError) as e:
+            raise SystemExit(f"{path}: job {i}: {e}")
+    return jobs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Apply RowInserter operations to .xls files on disk, without Excel"
+    )
+    parser.add_argument("jobs", help=f"CSV or JSON list of (file, sheet, row, op[, count]); ops: {', '.join(OPERATIONS)}")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Files processed in parallel")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--out-dir", type=str, default=None, help="Write punched files here under their own names")
+    target.add_argument("--in-place", action="store_true", help="Overwrite the input files")
+    parser.add_argument("--suffix", type=str, default="_punched", help="Name suffix when neither --out-dir nor --in-place")
+    parser.add_argument("--json", type=str, default=None, help="Also write per-file results to this JSON file")
+    args = parser.parse_args()
+
+    jobs = load_jobs(args.jobs)
+    start = time.perf_counter()
+    results = punch_files(jobs, out_dir=args.out_dir, suffix=args.suffix, in_place=args.in_place, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    for result in results:
+        name = os.path.basename(result["file"])
+        if result.get("error"):
+            failed += 1
+            print(f"FAIL {name}: {result['error']}")
+        else:
+            print(f"ok   {name}: {result['jobs']} job(s), {result['rows_added']} row(s) -> {result['out']} "
+                  f"({result['ms']:.0f} ms)")
+    print(f"{len(results) - failed}/{len(results)} file(s) punched in {elapsed:.2f} s")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
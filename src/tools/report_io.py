@@ -0,0 +1,110 @@
+import json
+import os
+from typing import Any, Dict, Iterator, Tuple
+
+
+def default_report_path(reports_dir: str = "reports", stem: str = "analysis") -> str:
+    """Prefer the streamed report when present, else fall back to the legacy JSON."""
+    ndjson_path = os.path.join(reports_dir, f"{stem}.ndjson")
+    if os.path.exists(ndjson_path):
+        return ndjson_path
+    return os.path.join(reports_dir, f"{stem}.json")
+
+
+def is_ndjson(path: str) -> bool:
+    if path.lower().endswith((".ndjson", ".jsonl")):
+        return True
+    if path.lower().endswith(".json"):
+        return False
+    # Unknown extension: a JSON document starts with "{" followed by "files"
+    with open(path, "r", encoding="utf-8") as f:
+        first = f.readline()
+    return first.strip().startswith("{\"type\"")
+
+
+def iter_report_sheets(path: str) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Yield (file_entry, sheet) pairs from an NDJSON or legacy JSON report.
+
+    NDJSON reports are read one line at a time, so memory stays bounded by the
+    largest sheet. ``file_entry`` carries the file-level keys (``file``,
+    ``error``) without the sheet list. Files without sheets are not yielded.
+    """
+    if not os.path.exists(path):
+        return
+    if not is_ndjson(path):
+        with open(path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+        for file_entry in report.get("files", []):
+            header = {k: v for k, v in file_entry.items() if k != "sheets"}
+            for sheet in file_entry.get("sheets", []):
+                yield header, sheet
+        return
+
+    header: Dict[str, Any] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A crash can leave a truncated last line; keep what was flushed
+                continue
+            kind = record.pop("type", None)
+            if kind == "file":
+                header = record
+            elif kind == "sheet":
+                file_path = record.pop("file", header.get("file", ""))
+                if header.get("file") != file_path:
+                    header = {"file": file_path}
+                yield header, record
+
+
+def _column_letter(col: int) -> str:
+    letters = ""
+    while col > 0:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def iter_sheet_cells(sheet: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yield per-cell dicts for a sheet in either the per-cell or the columnar encoding."""
+    columnar = sheet.get("columnar")
+    if not columnar:
+        yield from sheet.get("cells", [])
+        return
+
+    merges = columnar.get("merges", [])
+    border_styles = columnar.get("border_styles", [])
+    font_styles = columnar.get("font_styles", [])
+    columns = zip(
+        columnar.get("row", []),
+        columnar.get("col", []),
+        columnar.get("value", []),
+        columnar.get("merge", []),
+        columnar.get("border", []),
+        columnar.get("font", []),
+    )
+    for row, col, value, merge_id, border_id, font_id in columns:
+        merge = None
+        if merge_id >= 0:
+            top, left, nrows, ncols = merges[merge_id]
+            merge = {"top": top, "left": left, "rows": nrows, "cols": ncols}
+        yield {
+            "address": f"${_column_letter(col)}${row}",
+            "row": row,
+            "col": col,
+            "value_preview": value,
+            "merge": merge,
+            "borders": border_styles[border_id] if border_id >= 0 else {},
+            "font": font_styles[font_id] if font_id >= 0 else {},
+        }
+
+
+def iter_report_cells(path: str) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]]:
+    """Yield (file_entry, sheet, cell) triples from a report."""
+    for header, sheet in iter_report_sheets(path):
+        for cell in iter_sheet_cells(sheet):
+            yield header, sheet, cell
@@ -1,50 +1,49 @@
 import csv
-import json
 import os
-from typing import Dict, Any, List
-
-
-def load_report(path: str) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def write_merge_summary_csv(report: Dict[str, Any], out_csv: str) -> None:
-    rows: List[List[Any]] = []
-    rows.append(["file", "sheet", "merge_block_size", "count", "used_rows", "used_cols"])
-
-    for file_entry in report.get("files", []):
-        file_path = file_entry.get("file", "")
-        for sheet in file_entry.get("sheets", []):
-            block_sizes: Dict[str, int] = sheet.get("merge_blocks_summary", {}).get("block_sizes", {})
-            used_rows = sheet.get("used_rows", 0)
-            used_cols = sheet.get("used_cols", 0)
-            for size_key, count in block_sizes.items():
-                rows.append([
-                    os.path.basename(file_path),
-                    sheet.get("name", ""),
-                    size_key,
-                    count,
-                    used_rows,
-                    used_cols,
-                ])
+from typing import Dict, Any, Iterable, List, Tuple
 
+from report_io import default_report_path, iter_report_sheets
+
+
+MERGE_SUMMARY_HEADER = ["file", "sheet", "merge_block_size", "count", "used_rows", "used_cols"]
+
+
+def merge_summary_rows(file_entry: Dict[str, Any], sheet: Dict[str, Any]) -> Iterable[List[Any]]:
+    """CSV rows (MERGE_SUMMARY_HEADER) for one sheet's merge block sizes."""
+    file_path = file_entry.get("file", "")
+    block_sizes: Dict[str, int] = sheet.get("merge_blocks_summary", {}).get("block_sizes", {})
+    used_rows = sheet.get("used_rows", 0)
+    used_cols = sheet.get("used_cols", 0)
+    for size_key, count in block_sizes.items():
+        yield [
+            os.path.basename(file_path),
+            sheet.get("name", ""),
+            size_key,
+            count,
+            used_rows,
+            used_cols,
+        ]
+
+
+def write_merge_summary_csv_rows(sheets: Iterable[Tuple[Dict[str, Any], Dict[str, Any]]], out_csv: str) -> None:
+    """Write the CSV from streamed (file_entry, sheet) pairs, one sheet in memory at a time."""
     os.makedirs(os.path.dirname(out_csv), exist_ok=True)
     with open(out_csv, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
-        writer.writerows(rows)
+        writer.writerow(MERGE_SUMMARY_HEADER)
+        for file_entry, sheet in sheets:
+            writer.writerows(merge_summary_rows(file_entry, sheet))
 
 
 if __name__ == "__main__":
     import argparse
 
-    parser = argparse.ArgumentParser(description="Write merge summary CSV from analysis.json")
-    parser.add_argument("--in", dest="in_path", default=os.path.join("reports", "analysis.json"))
+    parser = argparse.ArgumentParser(description="Write merge summary CSV from an analysis report (.ndjson or .json)")
+    parser.add_argument("--in", dest="in_path", default=default_report_path())
     parser.add_argument("--out", dest="out_path", default=os.path.join("reports", "merge_summary.csv"))
     args = parser.parse_args()
 
-    report = load_report(args.in_path)
-    write_merge_summary_csv(report, args.out_path)
+    write_merge_summary_csv_rows(iter_report_sheets(args.in_path), args.out_path)
     print(f"Wrote CSV to: {args.out_path}")
 
 